@@ -1,14 +1,17 @@
 from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from research_system import EquityResearchSystem, ResearchCancelled
+from deadlines import parse_deadline_seconds
 import asyncio
 from datetime import datetime
 import logging
 import json
 import time
-from queue import Queue
-import threading
+import uuid
 import os
+from coalescing import SingleFlight
+from job_executor import AsyncJobExecutor, ExecutorBusy, INTERACTIVE, BATCH
+from job_store import create_job_store
 
 try:
     import firebase_admin
@@ -38,10 +41,31 @@ CORS(app, resources={
     }
 })
 
-# Store progress queues for active sessions
-progress_queues = {}
-session_user_map = {}
-session_cancel_flags = set()
+# Job owners, status, cancel flags and progress events live in a store shared
+# by every worker process (SQLite file by default, Redis for several hosts)
+# Each session keeps its newest JOB_EVENT_BUFFER progress events for SSE replay
+job_store = create_job_store(
+    os.getenv('JOB_STORE_URL') or None,
+    max_events=int(os.getenv('JOB_EVENT_BUFFER', '1000')),
+)
+# Finished jobs and their event logs are kept this long for late SSE readers
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', '3600'))
+# How often an SSE stream checks the store for events written by other
+# processes; writes from this process wake streams straight away
+SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', '1.0'))
+# ASGI streams back off to this while nothing is written to their session
+SSE_IDLE_POLL_MAX_SECONDS = float(os.getenv('SSE_IDLE_POLL_MAX_SECONDS', '15'))
+SSE_KEEPALIVE_SECONDS = 30
+# Shortest deadline_seconds a request may ask for; the stages need some time to do anything
+MIN_REQUEST_DEADLINE_SECONDS = float(os.getenv('MIN_REQUEST_DEADLINE_SECONDS', '30'))
+# Most symbols one /research/batch request may research
+MAX_BATCH_SYMBOLS = int(os.getenv('MAX_BATCH_SYMBOLS', '25'))
+# Bearer token required by /metrics when set; unset leaves it open for a local scraper
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+_last_job_purge = 0.0
+# Coalesces identical stock requests onto one running job; a finished report
+# is shared with anyone asking for the same symbol within the window.
+research_flights = SingleFlight(window_seconds=int(os.getenv('COALESCE_WINDOW_SECONDS', '60')))
 firestore_client = None
 firebase_app = None
 
@@ -101,10 +125,14 @@ def firebase_ready():
 
 def verify_request_user():
     """Verify Firebase ID token from Authorization header and return user id."""
+    return verify_auth_header(request.headers.get('Authorization', ''))
+
+
+def verify_auth_header(auth_header):
+    """Verify a "Bearer <Firebase ID token>" header value and return (uid, decoded_token)."""
     if not firebase_ready():
         raise RuntimeError("Firebase is not configured. Please complete setup.")
 
-    auth_header = request.headers.get('Authorization', '')
     if not auth_header.startswith('Bearer '):
         raise PermissionError("Missing or invalid Authorization header.")
 
@@ -165,159 +193,792 @@ def upsert_user_profile(uid, decoded):
         logger.error("Failed to upsert profile for %s: %s", uid, exc)
 
 
-def mark_session_cancelled(session_id):
-    if session_id:
-        session_cancel_flags.add(session_id)
+def sse_frame(update, seq=None):
+    """Format one SSE frame; frames with an id can be resumed via Last-Event-ID."""
+    frame = f"id: {seq}\n" if seq is not None else ""
+    return frame + f"data: {json.dumps(update)}\n\n"
 
 
-def clear_session_cancelled(session_id):
-    if session_id and session_id in session_cancel_flags:
-        session_cancel_flags.discard(session_id)
+def resume_sequence(headers, args):
+    """Sequence number a reconnecting SSE client last received, or 0."""
+    value = headers.get('Last-Event-ID') or args.get('last_event_id')
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
 
-# Create research system instance with reference to progress_queues
-research_system = EquityResearchSystem(progress_queues_ref=progress_queues, cancel_flags_ref=session_cancel_flags)
 
-# Initialise Firebase on startup
-initialize_firebase()
+def authorize_progress_stream(session_id, token):
+    """
+    Check that the caller may watch a session's progress.
 
-@app.route('/health', methods=['GET'])
-def health_check():
-    """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
-    })
+    Returns (job, error_payload, status_code); error_payload is None when the
+    stream may be opened. An unknown session is left to the stream to report.
+    """
+    job = job_store.get_job(session_id)
+    expected_user = job['owner'] if job else None
+    if not firebase_ready() or not expected_user:
+        return job, None, 200
 
-@app.route('/research/stock', methods=['POST'])
-def research_stock():
+    if not token:
+        logger.warning("SSE connection rejected for %s: missing auth token", session_id)
+        return job, {'error': 'Unauthorized'}, 401
+    try:
+        decoded = firebase_auth.verify_id_token(token)
+    except Exception as exc:
+        logger.warning("SSE token verification failed for %s: %s", session_id, exc)
+        return job, {'error': 'Unauthorized'}, 401
+    if decoded.get('uid') != expected_user:
+        logger.warning(
+            "SSE token user mismatch for %s. Expected %s got %s",
+            session_id,
+            expected_user,
+            decoded.get('uid')
+        )
+        return job, {'error': 'Forbidden'}, 403
+    return job, None, 200
+
+
+def next_progress_frames(session_id, log_session, last_seq):
     """
-    Single stock research endpoint - starts research and returns session_id
+    Collect the SSE frames a progress stream should send next.
 
-    Request body:
-    {
-        "symbol": "AAPL",
-        "exchange": "US"
-    }
+    Returns (frames, last_seq, finished); finished is True once the job has
+    reached a terminal state or this requester has cancelled.
     """
+    frames = []
+    for seq, update in job_store.read_events(log_session, after_seq=last_seq):
+        last_seq = seq
+        logger.info(f"Sending SSE update for {session_id}: {update}")
+        frames.append(sse_frame(update, seq))
+        if update['type'] in ['complete', 'error', 'cancelled']:
+            return frames, last_seq, True
+
+    # This requester may have cancelled while a shared job carries on
+    current = job_store.get_job(session_id)
+    if current is None or current['status'] == 'cancelled':
+        frames.append(sse_frame({'type': 'cancelled', 'message': 'Research cancelled by user'}))
+        return frames, last_seq, True
+    return frames, last_seq, False
+
+
+def stock_history_payload(report_bundle):
+    """Firestore history fields for a completed stock report."""
+    return {
+        'status': 'complete',
+        'completed_at': datetime.now().isoformat(),
+        'report': report_bundle.get('full_report'),
+        'sections': report_bundle.get('sections'),
+        'analyses': report_bundle.get('analyses'),
+        'sources': report_bundle.get('sources'),
+        'recommendation': report_bundle.get('recommendation'),
+        'metadata': report_bundle.get('metadata'),
+    }
+
+
+def publish_event(session_id, update):
+    """Append a progress event to the session's log in the job store."""
     try:
+        job_store.append_event(session_id, update)
+    except Exception as exc:
+        logger.error("Failed to record progress event for %s: %s", session_id, exc)
+
+
+def set_job_status(session_ids, status):
+    for session_id in session_ids:
         try:
-            uid, decoded_token = verify_request_user()
-        except PermissionError as exc:
-            return jsonify({'success': False, 'error': str(exc)}), 401
-        except RuntimeError as exc:
-            return jsonify({'success': False, 'error': str(exc)}), 500
+            job_store.update_job(session_id, status)
+        except Exception as exc:
+            logger.error("Failed to update job status for %s: %s", session_id, exc)
 
-        data = request.get_json() or {}
 
-        symbol = data.get('symbol', '').strip().upper()
-        exchange = data.get('exchange', 'US').upper()
+def purge_finished_jobs():
+    """Drop expired finished jobs from the store, at most once a minute."""
+    global _last_job_purge
+    now = time.time()
+    if now - _last_job_purge < 60:
+        return
+    _last_job_purge = now
+    try:
+        job_store.purge_finished(JOB_RETENTION_SECONDS)
+    except Exception as exc:
+        logger.error("Failed to purge finished jobs: %s", exc)
 
-        if not symbol:
-            return jsonify({'error': 'Symbol is required'}), 400
 
-        upsert_user_profile(uid, decoded_token)
+def request_deadline(data):
+    """A request's deadline_seconds, or None to use the server default (STOCK_/SECTOR_DEADLINE_SECONDS)."""
+    seconds = parse_deadline_seconds(data.get('deadline_seconds'))
+    return max(seconds, MIN_REQUEST_DEADLINE_SECONDS) if seconds is not None else None
 
-        session_id = f"stock_{symbol}_{int(time.time())}"
-        progress_queues[session_id] = Queue()
-        session_user_map[session_id] = uid
 
-        started_at = datetime.now().isoformat()
+def seed_checkpoints(source_session_id, session_id):
+    """Copy a previous session's stage checkpoints into a new session that resumes it."""
+    try:
+        copied = job_store.copy_checkpoints(source_session_id, session_id)
+        logger.info("Resuming %s from %s with %d checkpointed stages", session_id, source_session_id, copied)
+    except Exception as exc:
+        logger.error("Failed to copy checkpoints from %s to %s: %s", source_session_id, session_id, exc)
 
-        record_history_entry(uid, session_id, {
-            'type': 'stock',
-            'symbol': symbol,
-            'exchange': exchange,
-            'status': 'queued',
-            'started_at': started_at,
-            'user_id': uid,
-        }, merge=False, decoded=decoded_token)
 
+def stop_research_job(session_id, flight=None):
+    """
+    Cancel a research job now. A running job's task is cancelled wherever it is
+    waiting and reports its own cancellation; a job still in the queue never
+    starts, so its cancellation is reported here.
+    """
+    job_store.request_cancel(session_id)
+    if research_executor.cancel(session_id) != 'queued':
+        return
+    if flight is not None:
+        set_job_status(research_flights.finish(flight, success=False), 'cancelled')
+    set_job_status([session_id], 'cancelled')
+    publish_event(session_id, {'type': 'cancelled', 'message': 'Research cancelled by user'})
+
+
+def queue_position_reporter(session_id):
+    """Build the callback that tells a waiting session its place in the research queue and expected wait."""
+    def report(position, eta_seconds):
+        publish_event(session_id, {
+            'type': 'progress',
+            'message': (
+                f'Waiting for a free research slot (position {position} in queue, '
+                f'about {format_wait(eta_seconds)} to start)'
+            ),
+            'timestamp': datetime.now().isoformat(),
+            'agent': 'System',
+            'queue_position': position,
+            'eta_seconds': eta_seconds,
+        })
+    return report
+
+
+def format_wait(seconds):
+    if seconds < 60:
+        return f'{max(1, seconds)}s'
+    return f'{round(seconds / 60)} min'
+
+
+def busy_response(exc):
+    """Response payload for a submission the executor turned away (sent as 429 with Retry-After)."""
+    return {'success': False, 'error': str(exc), 'retry_after': exc.retry_after}, 429
+
+
+def retry_headers(payload):
+    """Retry-After header for a 429 payload from busy_response, else none."""
+    if payload.get('retry_after') is None:
+        return {}
+    return {'Retry-After': str(payload['retry_after'])}
+
+# Create research system instance reporting through the shared job store
+research_system = EquityResearchSystem(
+    job_store=job_store,
+    use_mcp_pool=os.getenv('MCP_POOL_ENABLED', 'true').lower() not in ('0', 'false', 'no'),
+)
+
+# Warm the shared MCP server pool so requests don't pay subprocess start-up
+research_system.start_mcp_pool()
+
+# Long-lived event loops that run research jobs from a bounded queue. A
+# cancelled job's task is cancelled mid-call; cancels made on other workers
+# reach it through the job store's flag within CANCEL_POLL_SECONDS.
+# The queue is shared fairly between users: stock research is interactive,
+# sector research is batch work that can't take every slot, and each user
+# has a running and a queued quota.
+research_executor = AsyncJobExecutor(
+    num_loops=int(os.getenv('RESEARCH_EVENT_LOOPS', '2')),
+    max_in_flight=int(os.getenv('MAX_IN_FLIGHT_RESEARCH', '4')),
+    max_queued=int(os.getenv('MAX_QUEUED_RESEARCH', '50')),
+    cancel_check=job_store.is_cancelled,
+    cancel_poll_seconds=float(os.getenv('CANCEL_POLL_SECONDS', '0.5')),
+    max_per_user=int(os.getenv('MAX_RESEARCH_PER_USER', '2')),
+    max_queued_per_user=int(os.getenv('MAX_QUEUED_RESEARCH_PER_USER', '5')),
+    max_batch_in_flight=int(os.getenv('MAX_BATCH_IN_FLIGHT')) if os.getenv('MAX_BATCH_IN_FLIGHT') else None,
+)
+research_executor.start()
+
+# Initialise Firebase on startup
+initialize_firebase()
+
+def start_stock_research(uid, decoded_token, data, resume_from=None):
+    """
+    Queue (or join) research for one stock on behalf of an authenticated user.
+
+    Shared by the Flask and ASGI endpoints; returns (response_payload, status_code).
+    With resume_from, the new session starts from that session's checkpoints.
+    """
+    symbol = data.get('symbol', '').strip().upper()
+    exchange = data.get('exchange', 'US').upper()
+    deadline_seconds = request_deadline(data)
+
+    if not symbol:
+        return {'error': 'Symbol is required'}, 400
+
+    # Reject symbols the ticker universe doesn't list before any agent work starts
+    universe = research_system.ticker_universe
+    if universe is not None and universe.covers_market(exchange) and universe.get(symbol, exchange) is None:
+        return {
+            'error': f'Unknown symbol {symbol} on {exchange}',
+            'suggestions': [listing.to_dict() for listing in universe.search(symbol, exchange, limit=5)],
+        }, 400
+
+    upsert_user_profile(uid, decoded_token)
+
+    session_id = f"stock_{symbol}_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+    purge_finished_jobs()
+
+    started_at = datetime.now().isoformat()
+
+    # Identical requests share one pipeline run (and the leader's deadline); only the leader starts a job
+    flight, is_leader = research_flights.join((symbol, exchange), session_id, uid, decoded_token)
+    # A follower's progress stream is the leader's event log
+    job_store.create_job(
+        session_id, uid, 'stock',
+        params={'symbol': symbol, 'exchange': exchange, 'deadline_seconds': deadline_seconds},
+        alias_of=None if is_leader else flight.leader_session_id,
+    )
+    if resume_from and is_leader:
+        seed_checkpoints(resume_from, session_id)
+
+    record_history_entry(uid, session_id, {
+        'type': 'stock',
+        'symbol': symbol,
+        'exchange': exchange,
+        'status': 'queued',
+        'started_at': started_at,
+        'user_id': uid,
+        'coalesced_with': None if is_leader else flight.leader_session_id,
+        'resumed_from': resume_from,
+    }, merge=False, decoded=decoded_token)
+
+    if not is_leader:
         logger.info(
-            "Starting stock research for %s (%s), session: %s, user: %s",
-            symbol, exchange, session_id, uid
+            "Coalescing stock research for %s (%s), session: %s joins %s, user: %s",
+            symbol, exchange, session_id, flight.leader_session_id, uid
+        )
+        if flight.done and flight.result is not None:
+            set_job_status([session_id], 'complete')
+            record_history_entry(
+                uid, session_id, stock_history_payload(flight.result), decoded=decoded_token
+            )
+        return {
+            'success': True,
+            'session_id': session_id,
+            'message': 'Joined research already in progress',
+            'user_id': uid,
+            'coalesced': True,
+        }, 200
+
+    logger.info(
+        "Starting stock research for %s (%s), session: %s, user: %s",
+        symbol, exchange, session_id, uid
+    )
+
+    async def record_for_requesters(requesters, payload):
+        # Firestore writes are blocking; keep them off the shared event loop
+        for requester_session, (requester_uid, requester_decoded) in requesters.items():
+            await asyncio.to_thread(
+                record_history_entry, requester_uid, requester_session, payload, decoded=requester_decoded
+            )
+
+    async def run_research():
+        try:
+            # A cancel can land while the start is being recorded; it must still finish the flight
+            with research_system._cancellation(session_id):
+                set_job_status(research_flights.requesters(flight), 'running')
+                publish_event(session_id, {
+                    'type': 'progress',
+                    'message': f'Research started for {symbol}',
+                    'timestamp': datetime.now().isoformat(),
+                    'agent': 'System'
+                })
+                await record_for_requesters(research_flights.requesters(flight), {
+                    'status': 'running',
+                    'last_message': f'Research started for {symbol}',
+                })
+
+            report_bundle = await research_system.research_stock(symbol, exchange, session_id, deadline_seconds)
+
+            requesters = research_flights.finish(flight, report_bundle)
+            set_job_status(requesters, 'complete')
+            publish_event(session_id, {
+                'type': 'complete',
+                'report': report_bundle.get('full_report'),
+                'sections': report_bundle.get('sections'),
+                'analyses': report_bundle.get('analyses'),
+                'sources': report_bundle.get('sources'),
+                'recommendation': report_bundle.get('recommendation'),
+                'metadata': report_bundle.get('metadata'),
+                'symbol': symbol,
+                'exchange': exchange,
+            })
+            await record_for_requesters(requesters, stock_history_payload(report_bundle))
+        except ResearchCancelled:
+            logger.info("Research cancelled for session %s", session_id)
+            requesters = research_flights.finish(flight, success=False)
+            set_job_status(requesters, 'cancelled')
+            publish_event(session_id, {
+                'type': 'cancelled',
+                'message': 'Research cancelled by user',
+                'symbol': symbol,
+                'exchange': exchange,
+            })
+            await record_for_requesters(requesters, {
+                'status': 'cancelled',
+                'completed_at': datetime.now().isoformat(),
+            })
+        except asyncio.CancelledError:
+            # Stopped without a user cancel (e.g. the loop is shutting down); don't leave
+            # a dead flight joinable or its requesters waiting
+            if not flight.done:
+                set_job_status(research_flights.finish(flight, success=False), 'cancelled')
+                publish_event(session_id, {
+                    'type': 'cancelled',
+                    'message': 'Research stopped before it finished',
+                    'symbol': symbol,
+                    'exchange': exchange,
+                })
+            raise
+        except Exception as e:
+            logger.error(f"Error in stock research: {str(e)}")
+            requesters = research_flights.finish(flight, success=False)
+            set_job_status(requesters, 'error')
+            publish_event(session_id, {
+                'type': 'error',
+                'error': str(e)
+            })
+            await record_for_requesters(requesters, {
+                'status': 'error',
+                'error': str(e),
+                'completed_at': datetime.now().isoformat(),
+            })
+
+    try:
+        research_executor.submit(
+            session_id, run_research, on_position=queue_position_reporter(session_id),
+            user=uid, priority=INTERACTIVE
         )
+    except ExecutorBusy as exc:
+        research_flights.finish(flight, success=False)
+        set_job_status([session_id], 'error')
+        record_history_entry(uid, session_id, {
+            'status': 'error',
+            'error': str(exc),
+            'completed_at': datetime.now().isoformat(),
+        }, decoded=decoded_token)
+        return busy_response(exc)
+
+    return {
+        'success': True,
+        'session_id': session_id,
+        'message': 'Research started',
+        'user_id': uid,
+    }, 200
 
-        def run_research():
-            time.sleep(2)
 
-            if session_id in progress_queues:
-                progress_queues[session_id].put({
+def start_sector_research(uid, decoded_token, data, resume_from=None):
+    """
+    Queue sector research on behalf of an authenticated user.
+
+    Shared by the Flask and ASGI endpoints; returns (response_payload, status_code).
+    With resume_from, the new session starts from that session's checkpoints.
+    """
+    sector = data.get('sector', '').strip()
+    exchange = data.get('exchange', 'US').upper()
+    num_companies = data.get('num_companies', 5)
+    deadline_seconds = request_deadline(data)
+
+    if not sector:
+        return {'error': 'Sector is required'}, 400
+
+    try:
+        num_companies = int(num_companies)
+        num_companies = max(1, min(num_companies, 10))
+    except (ValueError, TypeError):
+        num_companies = 5
+
+    upsert_user_profile(uid, decoded_token)
+
+    session_id = f"sector_{sector}_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+    purge_finished_jobs()
+    job_store.create_job(
+        session_id, uid, 'sector',
+        params={
+            'sector': sector,
+            'exchange': exchange,
+            'num_companies': num_companies,
+            'deadline_seconds': deadline_seconds,
+        },
+    )
+    if resume_from:
+        seed_checkpoints(resume_from, session_id)
+
+    started_at = datetime.now().isoformat()
+
+    record_history_entry(uid, session_id, {
+        'type': 'sector',
+        'sector': sector,
+        'exchange': exchange,
+        'num_companies': num_companies,
+        'status': 'queued',
+        'started_at': started_at,
+        'user_id': uid,
+        'resumed_from': resume_from,
+    }, merge=False, decoded=decoded_token)
+
+    logger.info(
+        "Starting sector research for %s (%s), %s companies, session: %s, user: %s",
+        sector, exchange, num_companies, session_id, uid
+    )
+
+    async def run_research():
+        finished = False
+        try:
+            # A cancel can land while the start is being recorded; it must still be reported
+            with research_system._cancellation(session_id):
+                set_job_status([session_id], 'running')
+                publish_event(session_id, {
                     'type': 'progress',
-                    'message': f'Research thread started for {symbol}',
+                    'message': f'Sector research started for {sector}',
                     'timestamp': datetime.now().isoformat(),
                     'agent': 'System'
                 })
-                record_history_entry(uid, session_id, {
+                await asyncio.to_thread(record_history_entry, uid, session_id, {
                     'status': 'running',
-                    'last_message': f'Research thread started for {symbol}',
+                    'last_message': f'Sector research started for {sector}',
                 }, decoded=decoded_token)
 
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                report_bundle = loop.run_until_complete(
-                    research_system.research_stock(symbol, exchange, session_id)
-                )
-
-                completed_at = datetime.now().isoformat()
-                record_history_entry(uid, session_id, {
-                    'status': 'complete',
-                    'completed_at': completed_at,
-                    'report': report_bundle.get('full_report'),
-                    'sections': report_bundle.get('sections'),
-                    'analyses': report_bundle.get('analyses'),
-                    'sources': report_bundle.get('sources'),
-                    'metadata': report_bundle.get('metadata'),
-                }, decoded=decoded_token)
+            report_bundle = await research_system.research_sector(
+                sector, exchange, num_companies, session_id, deadline_seconds
+            )
 
-                if session_id in progress_queues:
-                    progress_queues[session_id].put({
-                        'type': 'complete',
-                        'report': report_bundle.get('full_report'),
-                        'sections': report_bundle.get('sections'),
-                        'analyses': report_bundle.get('analyses'),
-                        'sources': report_bundle.get('sources'),
-                        'metadata': report_bundle.get('metadata'),
-                        'symbol': symbol,
-                        'exchange': exchange,
-                    })
-            except ResearchCancelled:
-                logger.info("Research cancelled for session %s", session_id)
-                record_history_entry(uid, session_id, {
-                    'status': 'cancelled',
-                    'completed_at': datetime.now().isoformat(),
-                }, decoded=decoded_token)
-                if session_id in progress_queues:
-                    progress_queues[session_id].put({
-                        'type': 'cancelled',
-                        'message': 'Research cancelled by user',
-                        'symbol': symbol,
-                        'exchange': exchange,
-                    })
-            except Exception as e:
-                logger.error(f"Error in stock research: {str(e)}")
-                record_history_entry(uid, session_id, {
-                    'status': 'error',
-                    'error': str(e),
-                    'completed_at': datetime.now().isoformat(),
+            set_job_status([session_id], 'complete')
+            finished = True
+            publish_event(session_id, {
+                'type': 'complete',
+                'report': report_bundle.get('full_report'),
+                'sections': report_bundle.get('sections'),
+                'metadata': report_bundle.get('metadata'),
+                'company_reports': report_bundle.get('company_reports'),
+                'screening': report_bundle.get('screening'),
+                'rankings': report_bundle.get('rankings'),
+                'sector': sector,
+                'exchange': exchange,
+                'num_companies': num_companies
+            })
+            completed_at = datetime.now().isoformat()
+            await asyncio.to_thread(record_history_entry, uid, session_id, {
+                'status': 'complete',
+                'completed_at': completed_at,
+                'report': report_bundle.get('full_report'),
+                'sections': report_bundle.get('sections'),
+                'metadata': report_bundle.get('metadata'),
+                'company_reports': report_bundle.get('company_reports'),
+                'screening': report_bundle.get('screening'),
+                'rankings': report_bundle.get('rankings'),
+            }, decoded=decoded_token)
+        except ResearchCancelled:
+            logger.info("Sector research cancelled for session %s", session_id)
+            set_job_status([session_id], 'cancelled')
+            publish_event(session_id, {
+                'type': 'cancelled',
+                'message': 'Sector research cancelled by user',
+                'sector': sector,
+                'exchange': exchange,
+                'num_companies': num_companies
+            })
+            await asyncio.to_thread(record_history_entry, uid, session_id, {
+                'status': 'cancelled',
+                'completed_at': datetime.now().isoformat(),
+            }, decoded=decoded_token)
+        except asyncio.CancelledError:
+            # Stopped without a user cancel (e.g. the loop is shutting down)
+            if not finished:
+                set_job_status([session_id], 'cancelled')
+                publish_event(session_id, {
+                    'type': 'cancelled',
+                    'message': 'Sector research stopped before it finished',
+                    'sector': sector,
+                    'exchange': exchange,
+                    'num_companies': num_companies
+                })
+            raise
+        except Exception as e:
+            logger.error(f"Error in sector research: {str(e)}")
+            set_job_status([session_id], 'error')
+            publish_event(session_id, {
+                'type': 'error',
+                'error': str(e)
+            })
+            await asyncio.to_thread(record_history_entry, uid, session_id, {
+                'status': 'error',
+                'error': str(e),
+                'completed_at': datetime.now().isoformat(),
+            }, decoded=decoded_token)
+
+    try:
+        # A sector run is roughly one stock run per company
+        research_executor.submit(
+            session_id, run_research, on_position=queue_position_reporter(session_id),
+            user=uid, priority=BATCH, cost=num_companies
+        )
+    except ExecutorBusy as exc:
+        set_job_status([session_id], 'error')
+        record_history_entry(uid, session_id, {
+            'status': 'error',
+            'error': str(exc),
+            'completed_at': datetime.now().isoformat(),
+        }, decoded=decoded_token)
+        return busy_response(exc)
+
+    return {
+        'success': True,
+        'session_id': session_id,
+        'message': 'Sector research started',
+        'user_id': uid,
+    }, 200
+
+
+def start_batch_research(uid, decoded_token, data, resume_from=None):
+    """
+    Queue research on a watchlist of stocks on behalf of an authenticated user.
+
+    Shared by the Flask and ASGI endpoints; returns (response_payload, status_code).
+    With resume_from, the new session starts from that session's checkpoints.
+    """
+    symbols = data.get('symbols')
+    exchange = data.get('exchange', 'US').upper()
+    deadline_seconds = request_deadline(data)
+
+    if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+        return {'error': 'symbols must be a list of tickers'}, 400
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    if not symbols:
+        return {'error': 'At least one symbol is required'}, 400
+    if len(symbols) > MAX_BATCH_SYMBOLS:
+        return {'error': f'At most {MAX_BATCH_SYMBOLS} symbols per batch'}, 400
+
+    universe = research_system.ticker_universe
+    if universe is not None and universe.covers_market(exchange):
+        unknown = [symbol for symbol in symbols if universe.get(symbol, exchange) is None]
+        if unknown:
+            return {'error': f'Unknown symbols on {exchange}: {", ".join(unknown)}'}, 400
+
+    upsert_user_profile(uid, decoded_token)
+
+    session_id = f"batch_{len(symbols)}_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+    purge_finished_jobs()
+    job_store.create_job(
+        session_id, uid, 'batch',
+        params={'symbols': symbols, 'exchange': exchange, 'deadline_seconds': deadline_seconds},
+    )
+    if resume_from:
+        seed_checkpoints(resume_from, session_id)
+
+    started_at = datetime.now().isoformat()
+
+    record_history_entry(uid, session_id, {
+        'type': 'batch',
+        'symbols': symbols,
+        'exchange': exchange,
+        'status': 'queued',
+        'started_at': started_at,
+        'user_id': uid,
+        'resumed_from': resume_from,
+    }, merge=False, decoded=decoded_token)
+
+    logger.info(
+        "Starting batch research for %d symbols (%s), session: %s, user: %s",
+        len(symbols), exchange, session_id, uid
+    )
+
+    async def run_research():
+        finished = False
+        try:
+            # A cancel can land while the start is being recorded; it must still be reported
+            with research_system._cancellation(session_id):
+                set_job_status([session_id], 'running')
+                publish_event(session_id, {
+                    'type': 'progress',
+                    'message': f'Batch research started for {len(symbols)} symbols',
+                    'timestamp': datetime.now().isoformat(),
+                    'agent': 'System'
+                })
+                await asyncio.to_thread(record_history_entry, uid, session_id, {
+                    'status': 'running',
+                    'last_message': f'Batch research started for {len(symbols)} symbols',
                 }, decoded=decoded_token)
-                if session_id in progress_queues:
-                    progress_queues[session_id].put({
-                        'type': 'error',
-                        'error': str(e)
-                    })
-            finally:
-                loop.close()
 
-        thread = threading.Thread(target=run_research, daemon=True)
-        thread.start()
+            batch_bundle = await research_system.research_batch(symbols, exchange, session_id, deadline_seconds)
+
+            set_job_status([session_id], 'complete')
+            finished = True
+            publish_event(session_id, {
+                'type': 'complete',
+                'report': batch_bundle.get('full_report'),
+                'summary': batch_bundle.get('summary'),
+                'failed': batch_bundle.get('failed'),
+                'metadata': batch_bundle.get('metadata'),
+                'symbols': symbols,
+                'exchange': exchange,
+            })
+            # Per-symbol reports stay in the job store (GET /research/batch/<session_id>/<symbol>);
+            # a whole watchlist of them would outgrow a history document
+            await asyncio.to_thread(record_history_entry, uid, session_id, {
+                'status': 'complete',
+                'completed_at': datetime.now().isoformat(),
+                'report': batch_bundle.get('full_report'),
+                'summary': batch_bundle.get('summary'),
+                'failed': batch_bundle.get('failed'),
+                'metadata': batch_bundle.get('metadata'),
+            }, decoded=decoded_token)
+        except ResearchCancelled:
+            logger.info("Batch research cancelled for session %s", session_id)
+            set_job_status([session_id], 'cancelled')
+            publish_event(session_id, {
+                'type': 'cancelled',
+                'message': 'Batch research cancelled by user',
+                'symbols': symbols,
+                'exchange': exchange,
+            })
+            await asyncio.to_thread(record_history_entry, uid, session_id, {
+                'status': 'cancelled',
+                'completed_at': datetime.now().isoformat(),
+            }, decoded=decoded_token)
+        except asyncio.CancelledError:
+            # Stopped without a user cancel (e.g. the loop is shutting down)
+            if not finished:
+                set_job_status([session_id], 'cancelled')
+                publish_event(session_id, {
+                    'type': 'cancelled',
+                    'message': 'Batch research stopped before it finished',
+                    'symbols': symbols,
+                    'exchange': exchange,
+                })
+            raise
+        except Exception as e:
+            logger.error(f"Error in batch research: {str(e)}")
+            set_job_status([session_id], 'error')
+            publish_event(session_id, {
+                'type': 'error',
+                'error': str(e)
+            })
+            await asyncio.to_thread(record_history_entry, uid, session_id, {
+                'status': 'error',
+                'error': str(e),
+                'completed_at': datetime.now().isoformat(),
+            }, decoded=decoded_token)
 
-        return jsonify({
-            'success': True,
-            'session_id': session_id,
-            'message': 'Research started',
-            'user_id': uid,
-        })
+    try:
+        # A batch run is roughly one stock run per symbol
+        research_executor.submit(
+            session_id, run_research, on_position=queue_position_reporter(session_id),
+            user=uid, priority=BATCH, cost=len(symbols)
+        )
+    except ExecutorBusy as exc:
+        set_job_status([session_id], 'error')
+        record_history_entry(uid, session_id, {
+            'status': 'error',
+            'error': str(exc),
+            'completed_at': datetime.now().isoformat(),
+        }, decoded=decoded_token)
+        return busy_response(exc)
+
+    return {
+        'success': True,
+        'session_id': session_id,
+        'message': 'Batch research started',
+        'user_id': uid,
+        'symbols': symbols,
+    }, 200
+
+
+def batch_symbol_report(uid, session_id, symbol):
+    """
+    One symbol's report from a batch session, as (response_payload, status_code).
+
+    Available as soon as the symbol's "symbol_complete" event is published,
+    and until the job is purged (JOB_RETENTION_SECONDS after it finishes).
+    """
+    job = job_store.get_job(session_id)
+    if job is None or job['kind'] != 'batch':
+        return {'success': False, 'error': 'Batch session not found'}, 404
+    if job['owner'] != uid:
+        return {'success': False, 'error': 'Forbidden'}, 403
+
+    symbol = symbol.strip().upper()
+    report_bundle = job_store.load_checkpoints(session_id).get(f"batch:{symbol}")
+    if report_bundle is None:
+        if symbol not in job['params'].get('symbols', []):
+            return {'success': False, 'error': f'{symbol} is not part of this batch'}, 404
+        return {'success': False, 'error': f'{symbol} has not finished yet', 'status': job['status']}, 404
+    return {'success': True, 'symbol': symbol, 'report': report_bundle}, 200
+
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    payload = {
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat()
+    }
+    if research_system.mcp_pool is not None:
+        payload['mcp_pool'] = research_system.mcp_pool.stats()
+    if research_system.tool_cache is not None:
+        payload['tool_cache'] = research_system.tool_cache.stats()
+    payload['executor'] = research_executor.stats()
+    return jsonify(payload)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text-format metrics for this worker: agent runs, tool calls, caches and queue"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+
+    rendered = research_system.metrics.render().rstrip('\n')
+    lines = [rendered] if rendered else []
+    for name, value in research_executor.stats().items():
+        kind = 'counter' if name.endswith('_total') else 'gauge'
+        lines.append(f"# TYPE research_executor_{name} {kind}")
+        lines.append(f"research_executor_{name} {value}")
+    if research_system.tool_cache is not None:
+        cache_stats = research_system.tool_cache.stats()
+        for name in ('hits', 'misses', 'coalesced', 'evictions'):
+            lines.append(f"# TYPE research_tool_cache_{name}_total counter")
+            lines.append(f"research_tool_cache_{name}_total {cache_stats[name]}")
+        lines.append("# TYPE research_tool_cache_bytes gauge")
+        lines.append(f"research_tool_cache_bytes {cache_stats['bytes']}")
+    return Response("\n".join(lines) + "\n", content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/research/stock', methods=['POST'])
+def research_stock():
+    """
+    Single stock research endpoint - starts research and returns session_id
+
+    Request body:
+    {
+        "symbol": "AAPL",
+        "exchange": "US",
+        "deadline_seconds": 180      (optional; default STOCK_DEADLINE_SECONDS)
+    }
+
+    With a deadline, stages that run out of time are cut short and the report
+    says so (metadata.deadline.truncated).
+
+    Responds 429 with Retry-After when the research queue, or the user's
+    share of it, is full; queue position and ETA arrive as progress events.
+    """
+    try:
+        try:
+            uid, decoded_token = verify_request_user()
+        except PermissionError as exc:
+            return jsonify({'success': False, 'error': str(exc)}), 401
+        except RuntimeError as exc:
+            return jsonify({'success': False, 'error': str(exc)}), 500
+
+        data = request.get_json() or {}
+
+        payload, status = start_stock_research(uid, decoded_token, data)
+        return jsonify(payload), status, retry_headers(payload)
 
     except Exception as e:
         logger.error(f"Error starting stock research: {str(e)}")
@@ -335,8 +996,12 @@ def research_sector():
     {
         "sector": "Technology",
         "exchange": "US",
-        "num_companies": 5
+        "num_companies": 5,
+        "deadline_seconds": 900      (optional; default SECTOR_DEADLINE_SECONDS)
     }
+
+    Sector runs are batch work: they queue behind interactive stock requests
+    in the fair queue and never hold every research slot.
     """
     try:
         try:
@@ -348,202 +1013,128 @@ def research_sector():
 
         data = request.get_json() or {}
 
-        sector = data.get('sector', '').strip()
-        exchange = data.get('exchange', 'US').upper()
-        num_companies = data.get('num_companies', 5)
-
-        if not sector:
-            return jsonify({'error': 'Sector is required'}), 400
+        payload, status = start_sector_research(uid, decoded_token, data)
+        return jsonify(payload), status, retry_headers(payload)
 
-        try:
-            num_companies = int(num_companies)
-            num_companies = max(1, min(num_companies, 10))
-        except (ValueError, TypeError):
-            num_companies = 5
+    except Exception as e:
+        logger.error(f"Error starting sector research: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-        upsert_user_profile(uid, decoded_token)
+@app.route('/research/batch', methods=['POST'])
+def research_batch():
+    """
+    Watchlist research endpoint - starts research and returns session_id
 
-        session_id = f"sector_{sector}_{int(time.time())}"
-        progress_queues[session_id] = Queue()
-        session_user_map[session_id] = uid
+    Request body:
+    {
+        "symbols": ["AAPL", "MSFT", "NVDA"],   (at most MAX_BATCH_SYMBOLS)
+        "exchange": "US",
+        "deadline_seconds": 180      (optional, per symbol; default STOCK_DEADLINE_SECONDS)
+    }
 
-        started_at = datetime.now().isoformat()
+    Each symbol gets a full stock report. The progress stream carries a
+    "symbol_complete" event as each one finishes (its report is then at
+    GET /research/batch/<session_id>/<symbol>), and the "complete" event
+    a summary table of every call.
+    """
+    try:
+        try:
+            uid, decoded_token = verify_request_user()
+        except PermissionError as exc:
+            return jsonify({'success': False, 'error': str(exc)}), 401
+        except RuntimeError as exc:
+            return jsonify({'success': False, 'error': str(exc)}), 500
 
-        record_history_entry(uid, session_id, {
-            'type': 'sector',
-            'sector': sector,
-            'exchange': exchange,
-            'num_companies': num_companies,
-            'status': 'queued',
-            'started_at': started_at,
-            'user_id': uid,
-        }, merge=False, decoded=decoded_token)
+        data = request.get_json() or {}
 
-        logger.info(
-            "Starting sector research for %s (%s), %s companies, session: %s, user: %s",
-            sector, exchange, num_companies, session_id, uid
-        )
+        payload, status = start_batch_research(uid, decoded_token, data)
+        return jsonify(payload), status, retry_headers(payload)
 
-        def run_research():
-            time.sleep(2)
+    except Exception as e:
+        logger.error(f"Error starting batch research: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-            if session_id in progress_queues:
-                progress_queues[session_id].put({
-                    'type': 'progress',
-                    'message': f'Sector research thread started for {sector}',
-                    'timestamp': datetime.now().isoformat(),
-                    'agent': 'System'
-                })
-                record_history_entry(uid, session_id, {
-                    'status': 'running',
-                    'last_message': f'Sector research thread started for {sector}',
-                }, decoded=decoded_token)
+@app.route('/research/batch/<session_id>/<symbol>', methods=['GET'])
+def research_batch_symbol(session_id, symbol):
+    """Report bundle for one symbol of a batch session"""
+    try:
+        uid, _ = verify_request_user()
+    except PermissionError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 401
+    except RuntimeError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 500
 
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                report_bundle = loop.run_until_complete(
-                    research_system.research_sector(sector, exchange, num_companies, session_id)
-                )
-
-                completed_at = datetime.now().isoformat()
-                record_history_entry(uid, session_id, {
-                    'status': 'complete',
-                    'completed_at': completed_at,
-                    'report': report_bundle.get('full_report'),
-                    'sections': report_bundle.get('sections'),
-                    'metadata': report_bundle.get('metadata'),
-                    'company_reports': report_bundle.get('company_reports'),
-                }, decoded=decoded_token)
+    payload, status = batch_symbol_report(uid, session_id, symbol)
+    return jsonify(payload), status
 
-                if session_id in progress_queues:
-                    progress_queues[session_id].put({
-                        'type': 'complete',
-                        'report': report_bundle.get('full_report'),
-                        'sections': report_bundle.get('sections'),
-                        'metadata': report_bundle.get('metadata'),
-                        'company_reports': report_bundle.get('company_reports'),
-                        'sector': sector,
-                        'exchange': exchange,
-                        'num_companies': num_companies
-                    })
-            except ResearchCancelled:
-                logger.info("Sector research cancelled for session %s", session_id)
-                record_history_entry(uid, session_id, {
-                    'status': 'cancelled',
-                    'completed_at': datetime.now().isoformat(),
-                }, decoded=decoded_token)
-                if session_id in progress_queues:
-                    progress_queues[session_id].put({
-                        'type': 'cancelled',
-                        'message': 'Sector research cancelled by user',
-                        'sector': sector,
-                        'exchange': exchange,
-                        'num_companies': num_companies
-                    })
-            except Exception as e:
-                logger.error(f"Error in sector research: {str(e)}")
-                record_history_entry(uid, session_id, {
-                    'status': 'error',
-                    'error': str(e),
-                    'completed_at': datetime.now().isoformat(),
-                }, decoded=decoded_token)
-                if session_id in progress_queues:
-                    progress_queues[session_id].put({
-                        'type': 'error',
-                        'error': str(e)
-                    })
-            finally:
-                loop.close()
+@app.route('/symbols/search', methods=['GET'])
+def search_symbols():
+    """
+    Prefix/fuzzy symbol lookup against the offline ticker universe
 
-        thread = threading.Thread(target=run_research, daemon=True)
-        thread.start()
+    Query params: q (symbol or company name), exchange (optional), limit (default 10)
+    """
+    try:
+        verify_request_user()
+    except PermissionError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 401
+    except RuntimeError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 500
 
-        return jsonify({
-            'success': True,
-            'session_id': session_id,
-            'message': 'Sector research started',
-            'user_id': uid,
-        })
+    universe = research_system.ticker_universe
+    if universe is None:
+        return jsonify({'success': False, 'error': 'Ticker universe is not configured'}), 503
 
-    except Exception as e:
-        logger.error(f"Error starting sector research: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    exchange = request.args.get('exchange', '').upper() or None
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    matches = universe.search(request.args.get('q', ''), exchange, limit=limit)
+    return jsonify({'success': True, 'results': [listing.to_dict() for listing in matches]})
 
 @app.route('/research/progress/<session_id>')
 def research_progress(session_id):
     """
     SSE endpoint for real-time research progress updates
     """
-    expected_user = session_user_map.get(session_id)
-    if firebase_ready() and expected_user:
-        token = request.args.get('token')
-        if not token:
-            logger.warning("SSE connection rejected for %s: missing auth token", session_id)
-            return Response(
-                json.dumps({'error': 'Unauthorized'}),
-                status=401,
-                mimetype='application/json'
-            )
-        try:
-            decoded = firebase_auth.verify_id_token(token)
-        except Exception as exc:
-            logger.warning("SSE token verification failed for %s: %s", session_id, exc)
-            return Response(
-                json.dumps({'error': 'Unauthorized'}),
-                status=401,
-                mimetype='application/json'
-            )
-        if decoded.get('uid') != expected_user:
-            logger.warning(
-                "SSE token user mismatch for %s. Expected %s got %s",
-                session_id,
-                expected_user,
-                decoded.get('uid')
-            )
-            return Response(
-                json.dumps({'error': 'Forbidden'}),
-                status=403,
-                mimetype='application/json'
-            )
+    job, error, status = authorize_progress_stream(session_id, request.args.get('token'))
+    if error is not None:
+        return Response(json.dumps(error), status=status, mimetype='application/json')
 
-    def cleanup_session():
-        progress_queues.pop(session_id, None)
-        session_user_map.pop(session_id, None)
-        clear_session_cancelled(session_id)
+    last_seq = resume_sequence(request.headers, request.args)
 
     def generate():
-        if session_id not in progress_queues:
-            logger.error(f"Session {session_id} not found in progress_queues")
-            yield f"data: {json.dumps({'type': 'error', 'error': 'Invalid session'})}\n\n"
+        nonlocal last_seq
+        if job is None:
+            logger.error(f"Session {session_id} not found in job store")
+            yield sse_frame({'type': 'error', 'error': 'Invalid session'})
             return
 
-        logger.info(f"Starting SSE stream for session {session_id}")
-        queue = progress_queues[session_id]
-        
+        logger.info(f"Starting SSE stream for session {session_id} after event {last_seq}")
+        # Coalesced sessions read the progress log of the job they joined
+        log_session = job.get('alias_of') or session_id
+        last_sent = time.monotonic()
+
         # Send initial connection message
-        yield f"data: {json.dumps({'type': 'connected', 'message': 'SSE stream connected'})}\n\n"
-        
+        yield "retry: 3000\n" + sse_frame({'type': 'connected', 'message': 'SSE stream connected'})
+
         while True:
-            try:
-                # Wait for updates with timeout
-                update = queue.get(timeout=30)
-                logger.info(f"Sending SSE update for {session_id}: {update}")
-                yield f"data: {json.dumps(update)}\n\n"
-                
-                # If complete or error, cleanup and exit
-                if update['type'] in ['complete', 'error', 'cancelled']:
-                    # Cleanup queue after a delay
-                    threading.Timer(5.0, cleanup_session).start()
-                    break
-                    
-            except:
-                # Send keepalive
+            frames, last_seq, finished = next_progress_frames(session_id, log_session, last_seq)
+            for frame in frames:
+                yield frame
+            if finished:
+                return
+            if frames:
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
                 logger.debug(f"Sending keepalive for {session_id}")
-                yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
+                yield sse_frame({'type': 'keepalive'})
+                last_sent = time.monotonic()
+            job_store.wait_for_change(SSE_POLL_INTERVAL)
 
     return Response(
         stream_with_context(generate()),
@@ -652,27 +1243,94 @@ def cancel_research(session_id):
     except RuntimeError as exc:
         return jsonify({'success': False, 'error': str(exc)}), 500
 
-    owner = session_user_map.get(session_id)
-    if owner is None:
+    job = job_store.get_job(session_id)
+    if job is None:
         return jsonify({'success': False, 'error': 'Session not found'}), 404
-    if owner != uid:
+    if job['owner'] != uid:
         return jsonify({'success': False, 'error': 'Forbidden'}), 403
 
-    mark_session_cancelled(session_id)
     record_history_entry(uid, session_id, {
         'status': 'cancelled',
         'completed_at': datetime.now().isoformat(),
     }, decoded=decoded)
 
-    queue = progress_queues.get(session_id)
-    if queue is not None:
-        queue.put({
-            'type': 'cancelled',
-            'message': 'Research cancelled by user',
-        })
+    # Ends this requester's stream even if a shared job keeps running
+    set_job_status([session_id], 'cancelled')
+
+    flight = research_flights.flight_for(session_id)
+    if flight is None:
+        if not job.get('alias_of'):
+            stop_research_job(session_id)
+        return jsonify({'success': True})
+
+    # Coalesced job: only stop the shared run once nobody is waiting on it
+    if research_flights.leave(flight, session_id) == 0 and not flight.done:
+        stop_research_job(flight.leader_session_id, flight)
 
     return jsonify({'success': True})
 
+@app.route('/research/resume/<session_id>', methods=['POST'])
+def resume_research(session_id):
+    """
+    Start a new session that repeats an unfinished one, skipping every stage
+    the original already checkpointed. Returns the new session_id.
+
+    Responds 409 while this worker is still running (or queueing) the job;
+    its progress stream is the way to follow it then.
+    """
+    try:
+        uid, decoded = verify_request_user()
+    except PermissionError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 401
+    except RuntimeError as exc:
+        return jsonify({'success': False, 'error': str(exc)}), 500
+
+    job = job_store.get_job(session_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    if job['owner'] != uid:
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    if job['status'] == 'complete':
+        return jsonify({'success': False, 'error': 'Research already completed'}), 409
+
+    # Coalesced sessions never ran stages themselves; resume the shared job
+    source = job.get('alias_of') or session_id
+
+    # A job this worker is still running can't be resumed; follow its progress stream instead
+    live_state = research_executor.state(source)
+    if live_state is not None:
+        return jsonify({
+            'success': False,
+            'error': f'Research is still {live_state}',
+            'session_id': session_id,
+        }), 409
+
+    # A job still marked queued/running was lost to a restart or is stuck.
+    # Detach this session the way cancel does: a shared job is only stopped
+    # once nobody else is waiting on it
+    if job['status'] not in ('error', 'cancelled'):
+        flight = research_flights.flight_for(session_id)
+        if flight is None:
+            if not job.get('alias_of'):
+                stop_research_job(session_id)
+        elif research_flights.leave(flight, session_id) == 0 and not flight.done:
+            stop_research_job(flight.leader_session_id, flight)
+        set_job_status([session_id], 'cancelled')
+    try:
+        if job['kind'] == 'sector':
+            payload, status = start_sector_research(uid, decoded, job['params'], resume_from=source)
+        elif job['kind'] == 'batch':
+            payload, status = start_batch_research(uid, decoded, job['params'], resume_from=source)
+        else:
+            payload, status = start_stock_research(uid, decoded, job['params'], resume_from=source)
+    except Exception as e:
+        logger.error(f"Error resuming research {session_id}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    if status == 200:
+        payload['resumed_from'] = source
+    return jsonify(payload), status, retry_headers(payload)
+
 @app.route('/')
 def index():
     """Root endpoint with API info"""
@@ -681,9 +1339,14 @@ def index():
         'version': '1.0.0',
         'endpoints': {
             'health': 'GET /health',
+            'metrics': 'GET /metrics',
             'stock_research': 'POST /research/stock',
             'sector_research': 'POST /research/sector',
-            'progress': 'GET /research/progress/<session_id>'
+            'batch_research': 'POST /research/batch',
+            'batch_symbol_report': 'GET /research/batch/<session_id>/<symbol>',
+            'progress': 'GET /research/progress/<session_id>',
+            'resume': 'POST /research/resume/<session_id>',
+            'symbol_search': 'GET /symbols/search?q=<query>'
         }
     })
 
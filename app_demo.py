@@ -1,11 +1,25 @@
 """
 Demo Flask Backend for Equity Research UI
 This is a simplified version that generates mock research reports for testing the UI.
+
+Load-testing mode (DEMO_LOAD_MODE=true or `python app_demo.py --load`) serves
+the same async API as app.py instead: research requests return a session_id,
+simulated agents publish progress over SSE through the job store and job
+executor, and sessions can be cancelled and listed in history. Drive it with
+`python test_sse.py --load N`.
 """
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 from datetime import datetime
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import threading
 import time
+import uuid
 import logging
 
 # Configure logging
@@ -296,14 +310,355 @@ The {sector} sector offers attractive opportunities with our recommended portfol
 *Powered by 8 AI Agents analyzing {num_companies} companies in parallel*
 """
 
+# ----------------------------------------------------------------------------
+# Load-testing mode: app.py's async contract with simulated agents
+# ----------------------------------------------------------------------------
+
+LOAD_MODE = os.getenv('DEMO_LOAD_MODE', 'false').lower() in ('1', 'true', 'yes') or '--load' in sys.argv
+# Seconds each simulated agent takes: fixed:S, uniform:LO,HI, lognormal:MEDIAN,SIGMA or exponential:MEAN
+DEMO_AGENT_LATENCY = os.getenv('DEMO_AGENT_LATENCY', 'lognormal:3,0.5')
+# Fraction of sessions that fail part-way through, to exercise the error path
+DEMO_FAILURE_RATE = float(os.getenv('DEMO_FAILURE_RATE', '0'))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', '3600'))
+SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', '1.0'))
+SSE_KEEPALIVE_SECONDS = 30
+
+STOCK_ANALYSTS = ['Financial Analyst', 'Technical Analyst', 'News Analyst', 'Risk Analyst']
+
+
+class SimulationCancelled(Exception):
+    """Raised inside a simulated run once its session has been cancelled."""
+    pass
+
+
+class SimulatedFailure(Exception):
+    """Raised by the simulated agent picked to fail (see DEMO_FAILURE_RATE)."""
+    pass
+
+
+def parse_latency_spec(spec):
+    """Turn a DEMO_AGENT_LATENCY spec into a function returning one sample in seconds."""
+    kind, _, arguments = spec.partition(':')
+    kind = kind.strip().lower()
+    try:
+        values = [float(value) for value in arguments.split(',') if value.strip()]
+        if kind == 'fixed':
+            seconds = values[0]
+            return lambda: seconds
+        if kind == 'uniform':
+            low, high = values
+            return lambda: random.uniform(low, high)
+        if kind == 'lognormal':
+            median, sigma = values
+            return lambda: random.lognormvariate(math.log(median), sigma)
+        if kind == 'exponential':
+            rate = 1 / values[0]
+            return lambda: random.expovariate(rate)
+    except (ValueError, IndexError, ZeroDivisionError):
+        pass
+    raise ValueError(f"Unsupported DEMO_AGENT_LATENCY: {spec!r}")
+
+
+def process_rss_bytes():
+    """Resident memory of this process, for per-session memory estimates under load."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return None
+
+
+if LOAD_MODE:
+    from job_executor import AsyncJobExecutor, ExecutorBusy, INTERACTIVE, BATCH
+    from job_store import create_job_store
+
+    # In-memory by default; point at the same store URL as app.py to compare backends
+    job_store = create_job_store(
+        os.getenv('DEMO_JOB_STORE_URL') or 'memory://',
+        max_events=int(os.getenv('JOB_EVENT_BUFFER', '1000')),
+    )
+    # Same executor settings as app.py, so queueing and fairness behave the same under load
+    research_executor = AsyncJobExecutor(
+        num_loops=int(os.getenv('RESEARCH_EVENT_LOOPS', '2')),
+        max_in_flight=int(os.getenv('MAX_IN_FLIGHT_RESEARCH', '4')),
+        max_queued=int(os.getenv('MAX_QUEUED_RESEARCH', '50')),
+        max_per_user=int(os.getenv('MAX_RESEARCH_PER_USER', '2')),
+        max_queued_per_user=int(os.getenv('MAX_QUEUED_RESEARCH_PER_USER', '5')),
+        max_batch_in_flight=int(os.getenv('MAX_BATCH_IN_FLIGHT')) if os.getenv('MAX_BATCH_IN_FLIGHT') else None,
+    )
+    research_executor.start()
+    sample_agent_seconds = parse_latency_spec(DEMO_AGENT_LATENCY)
+
+# uid -> {session_id: history entry}; stands in for app.py's Firestore history
+demo_history = {}
+_history_lock = threading.Lock()
+_last_job_purge = 0.0
+
+
+def demo_user():
+    """Requesting user: the bearer token itself (unverified), or a shared demo user."""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer ') and auth_header[7:].strip():
+        return auth_header[7:].strip()[:64]
+    return 'demo-user'
+
+
+def retry_headers(payload):
+    if payload.get('retry_after') is None:
+        return {}
+    return {'Retry-After': str(payload['retry_after'])}
+
+
+def record_history_entry(uid, session_id, payload, merge=True):
+    with _history_lock:
+        entries = demo_history.setdefault(uid, {})
+        if merge and session_id in entries:
+            entries[session_id].update(payload)
+        else:
+            entries[session_id] = dict(payload)
+
+
+def sse_frame(update, seq=None):
+    """Format one SSE frame; frames with an id can be resumed via Last-Event-ID."""
+    frame = f"id: {seq}\n" if seq is not None else ""
+    return frame + f"data: {json.dumps(update)}\n\n"
+
+
+def publish_event(session_id, update):
+    try:
+        job_store.append_event(session_id, update)
+    except Exception as exc:
+        logger.error("Failed to record progress event for %s: %s", session_id, exc)
+
+
+def publish_progress(session_id, message, agent=None):
+    update = {
+        'type': 'progress',
+        'message': message,
+        'timestamp': datetime.now().isoformat()
+    }
+    if agent:
+        update['agent'] = agent
+    publish_event(session_id, update)
+
+
+def purge_finished_jobs():
+    """Drop expired finished jobs from the store, at most once a minute."""
+    global _last_job_purge
+    now = time.time()
+    if now - _last_job_purge < 60:
+        return
+    _last_job_purge = now
+    try:
+        job_store.purge_finished(JOB_RETENTION_SECONDS)
+    except Exception as exc:
+        logger.error("Failed to purge finished jobs: %s", exc)
+
+
+def queue_position_reporter(session_id):
+    def report(position, eta_seconds):
+        publish_event(session_id, {
+            'type': 'progress',
+            'message': f'Waiting for a free research slot (position {position} in queue, about {eta_seconds}s to start)',
+            'timestamp': datetime.now().isoformat(),
+            'agent': 'System',
+            'queue_position': position,
+            'eta_seconds': eta_seconds,
+        })
+    return report
+
+
+async def cancellable_sleep(session_id, seconds):
+    """Sleep, checking the session's cancel flag a few times a second."""
+    deadline = time.monotonic() + seconds
+    while True:
+        if job_store.is_cancelled(session_id):
+            raise SimulationCancelled(f"Session {session_id} cancelled by user")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, 0.25))
+
+
+async def simulate_agent(session_id, agent, fail_agent=None, subject=None):
+    label = f"{agent} ({subject})" if subject else agent
+    publish_progress(session_id, f"{label} started...", agent)
+    await cancellable_sleep(session_id, sample_agent_seconds())
+    if agent == fail_agent:
+        publish_progress(session_id, f"{label} encountered an error: simulated failure", agent)
+        raise SimulatedFailure(f"Simulated failure in {label}")
+    publish_progress(session_id, f"{label} completed", agent)
+
+
+async def simulate_analysts(session_id, fail_agent=None, subject=None):
+    """The four specialist analysts in parallel, like the real pipeline."""
+    results = await asyncio.gather(
+        *(simulate_agent(session_id, agent, fail_agent, subject) for agent in STOCK_ANALYSTS),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def pick_failing_agent(agents):
+    return random.choice(agents) if random.random() < DEMO_FAILURE_RATE else None
+
+
+async def simulate_stock_research(session_id, symbol, exchange):
+    fail_agent = pick_failing_agent(STOCK_ANALYSTS + ['Report Generator'])
+    publish_progress(session_id, f"Starting research on {symbol}...")
+    publish_progress(session_id, "Connecting to MCP servers...")
+    publish_progress(session_id, "Servers connected!")
+    publish_progress(session_id, "Running specialist analysts in parallel...")
+    await simulate_analysts(session_id, fail_agent)
+    await simulate_agent(session_id, 'Report Generator', fail_agent)
+
+    publish_progress(session_id, "Generating final report...", 'Strategic Analyst')
+    await cancellable_sleep(session_id, sample_agent_seconds())
+    publish_progress(session_id, "Research completed successfully!", 'Strategic Analyst')
+    return {
+        'full_report': generate_mock_stock_report(symbol, exchange),
+        'sections': {},
+        'analyses': {},
+        'sources': [],
+        'recommendation': None,
+        'metadata': {'symbol': symbol, 'exchange': exchange, 'demo_mode': True},
+    }
+
+
+async def simulate_sector_research(session_id, sector, exchange, num_companies):
+    fail_agent = pick_failing_agent(STOCK_ANALYSTS + ['Report Generator'])
+    publish_progress(session_id, f"Starting SECTOR research on {sector}...", 'Sector Analyst')
+    publish_progress(session_id, "Step 1: Identifying top companies in sector...", 'Sector Analyst')
+    await cancellable_sleep(session_id, sample_agent_seconds())
+    publish_progress(session_id, "Sector Analyst completed Step 1: Top companies identified!", 'Sector Analyst')
+
+    tickers = [f"SYMBOL{i + 1}" for i in range(num_companies)]
+    limiter = asyncio.Semaphore(max(1, int(os.getenv('SECTOR_COMPANY_CONCURRENCY', '3'))))
+
+    async def research_company(index, ticker):
+        async with limiter:
+            publish_progress(session_id, f"Researching company {index}/{num_companies}: {ticker}...")
+            await simulate_analysts(session_id, fail_agent if index == 1 else None, ticker)
+            await simulate_agent(session_id, 'Report Generator', fail_agent if index == 1 else None, ticker)
+
+    results = await asyncio.gather(
+        *(research_company(index, ticker) for index, ticker in enumerate(tickers, start=1)),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    publish_progress(session_id, "Portfolio Strategist started...", 'Portfolio Strategist')
+    await cancellable_sleep(session_id, sample_agent_seconds())
+    publish_progress(session_id, "Portfolio Strategist completed", 'Portfolio Strategist')
+    return {
+        'full_report': generate_mock_sector_report(sector, exchange, num_companies),
+        'sections': {},
+        'metadata': {'sector': sector, 'exchange': exchange, 'demo_mode': True},
+        'company_reports': [],
+        'screening': [],
+        'rankings': [],
+    }
+
+
+def start_simulated_research(uid, kind, params, label):
+    """
+    Queue a simulated stock or sector run; returns (response_payload, status_code)
+    shaped like app.py's start_stock_research / start_sector_research.
+    """
+    session_id = f"{kind}_{label}_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+    purge_finished_jobs()
+    job_store.create_job(session_id, uid, kind, params=params)
+    record_history_entry(uid, session_id, {
+        'type': kind,
+        **params,
+        'status': 'queued',
+        'started_at': datetime.now().isoformat(),
+        'user_id': uid,
+    }, merge=False)
+
+    async def run_research():
+        job_store.update_job(session_id, 'running')
+        publish_progress(session_id, f"Research started for {label}", 'System')
+        record_history_entry(uid, session_id, {'status': 'running', 'last_message': f"Research started for {label}"})
+        try:
+            if kind == 'stock':
+                report_bundle = await simulate_stock_research(session_id, **params)
+            else:
+                report_bundle = await simulate_sector_research(session_id, **params)
+
+            job_store.update_job(session_id, 'complete')
+            record_history_entry(uid, session_id, {
+                'status': 'complete',
+                'completed_at': datetime.now().isoformat(),
+                'report': report_bundle['full_report'],
+                'metadata': report_bundle['metadata'],
+            })
+            update = {'type': 'complete', 'report': report_bundle['full_report']}
+            update.update((key, value) for key, value in report_bundle.items() if key != 'full_report')
+            update.update(params)
+            publish_event(session_id, update)
+        except SimulationCancelled:
+            logger.info("[DEMO] Research cancelled for session %s", session_id)
+            job_store.update_job(session_id, 'cancelled')
+            record_history_entry(uid, session_id, {'status': 'cancelled', 'completed_at': datetime.now().isoformat()})
+            publish_event(session_id, {'type': 'cancelled', 'message': 'Research cancelled by user', **params})
+        except Exception as e:
+            logger.error(f"[DEMO] Error in {kind} research: {str(e)}")
+            job_store.update_job(session_id, 'error')
+            record_history_entry(uid, session_id, {
+                'status': 'error',
+                'error': str(e),
+                'completed_at': datetime.now().isoformat(),
+            })
+            publish_event(session_id, {'type': 'error', 'error': str(e)})
+
+    try:
+        research_executor.submit(
+            session_id, run_research, on_position=queue_position_reporter(session_id),
+            user=uid, priority=INTERACTIVE if kind == 'stock' else BATCH,
+            cost=1 if kind == 'stock' else params['num_companies']
+        )
+    except ExecutorBusy as exc:
+        job_store.update_job(session_id, 'error')
+        record_history_entry(uid, session_id, {
+            'status': 'error',
+            'error': str(exc),
+            'completed_at': datetime.now().isoformat(),
+        })
+        return {'success': False, 'error': str(exc), 'retry_after': exc.retry_after}, 429
+
+    return {
+        'success': True,
+        'session_id': session_id,
+        'message': 'Research started' if kind == 'stock' else 'Sector research started',
+        'user_id': uid,
+        'demo_mode': True,
+    }, 200
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    payload = {
         'status': 'healthy',
-        'mode': 'demo',
+        'mode': 'demo-load' if LOAD_MODE else 'demo',
         'timestamp': datetime.now().isoformat()
-    })
+    }
+    if LOAD_MODE:
+        payload['executor'] = research_executor.stats()
+        payload['rss_bytes'] = process_rss_bytes()
+    return jsonify(payload)
 
 @app.route('/research/stock', methods=['POST'])
 def research_stock():
@@ -328,6 +683,12 @@ def research_stock():
         if not symbol:
             return jsonify({'error': 'Symbol is required'}), 400
 
+        if LOAD_MODE:
+            payload, status = start_simulated_research(
+                demo_user(), 'stock', {'symbol': symbol, 'exchange': exchange}, symbol
+            )
+            return jsonify(payload), status, retry_headers(payload)
+
         logger.info(f"[DEMO] Starting stock research for {symbol} ({exchange})")
 
         # Simulate research time (3-5 seconds for demo instead of 3-5 minutes)
@@ -385,6 +746,12 @@ def research_sector():
         except (ValueError, TypeError):
             num_companies = 5
 
+        if LOAD_MODE:
+            payload, status = start_simulated_research(
+                demo_user(), 'sector', {'sector': sector, 'exchange': exchange, 'num_companies': num_companies}, sector
+            )
+            return jsonify(payload), status, retry_headers(payload)
+
         logger.info(f"[DEMO] Starting sector research for {sector} ({exchange}), {num_companies} companies")
 
         # Simulate research time (5-8 seconds for demo instead of 10-20 minutes)
@@ -411,19 +778,128 @@ def research_sector():
             'error': str(e)
         }), 500
 
+@app.route('/research/progress/<session_id>')
+def research_progress(session_id):
+    """SSE progress stream (load mode), same frames as app.py"""
+    if not LOAD_MODE:
+        return jsonify({'error': 'Progress streams need load mode (DEMO_LOAD_MODE=true)'}), 404
+
+    job = job_store.get_job(session_id)
+    try:
+        last_seq = max(0, int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id')))
+    except (TypeError, ValueError):
+        last_seq = 0
+
+    def generate():
+        nonlocal last_seq
+        if job is None:
+            yield sse_frame({'type': 'error', 'error': 'Invalid session'})
+            return
+
+        last_sent = time.monotonic()
+        yield "retry: 3000\n" + sse_frame({'type': 'connected', 'message': 'SSE stream connected'})
+
+        while True:
+            sent = False
+            for seq, update in job_store.read_events(session_id, after_seq=last_seq):
+                last_seq = seq
+                sent = True
+                yield sse_frame(update, seq)
+                if update['type'] in ['complete', 'error', 'cancelled']:
+                    return
+            current = job_store.get_job(session_id)
+            if current is None or current['status'] == 'cancelled':
+                yield sse_frame({'type': 'cancelled', 'message': 'Research cancelled by user'})
+                return
+            if sent:
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+                yield sse_frame({'type': 'keepalive'})
+                last_sent = time.monotonic()
+            job_store.wait_for_change(SSE_POLL_INTERVAL)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/research/cancel/<session_id>', methods=['POST'])
+def cancel_research(session_id):
+    """Cancel a simulated run (load mode)"""
+    if not LOAD_MODE:
+        return jsonify({'success': False, 'error': 'Cancellation needs load mode (DEMO_LOAD_MODE=true)'}), 404
+
+    uid = demo_user()
+    job = job_store.get_job(session_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Session not found'}), 404
+    if job['owner'] != uid:
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+
+    record_history_entry(uid, session_id, {
+        'status': 'cancelled',
+        'completed_at': datetime.now().isoformat(),
+    })
+    job_store.update_job(session_id, 'cancelled')
+    job_store.request_cancel(session_id)
+    return jsonify({'success': True})
+
+@app.route('/history', methods=['GET'])
+def list_history():
+    """Recent sessions for the requesting user, newest first, without report bodies"""
+    limit = request.args.get('limit', 10, type=int)
+    with _history_lock:
+        entries = [
+            {**entry, 'session_id': session_id}
+            for session_id, entry in demo_history.get(demo_user(), {}).items()
+        ]
+    entries.sort(key=lambda entry: entry.get('started_at', ''), reverse=True)
+    for entry in entries:
+        entry.pop('report', None)
+    return jsonify({'success': True, 'history': entries[:limit]})
+
+@app.route('/history/<session_id>', methods=['GET'])
+def get_history_entry(session_id):
+    with _history_lock:
+        entry = demo_history.get(demo_user(), {}).get(session_id)
+        entry = dict(entry) if entry is not None else None
+    if entry is None:
+        return jsonify({'success': False, 'error': 'History entry not found'}), 404
+    entry['session_id'] = session_id
+    return jsonify({'success': True, 'entry': entry})
+
+@app.route('/history/<session_id>', methods=['DELETE'])
+def delete_history_entry(session_id):
+    with _history_lock:
+        entry = demo_history.get(demo_user(), {}).pop(session_id, None)
+    if entry is None:
+        return jsonify({'success': False, 'error': 'History entry not found'}), 404
+    return jsonify({'success': True})
+
 @app.route('/')
 def index():
     """Root endpoint with API info"""
+    endpoints = {
+        'health': 'GET /health',
+        'stock_research': 'POST /research/stock',
+        'sector_research': 'POST /research/sector'
+    }
+    if LOAD_MODE:
+        endpoints.update({
+            'progress': 'GET /research/progress/<session_id>',
+            'cancel': 'POST /research/cancel/<session_id>',
+            'history': 'GET /history',
+        })
     return jsonify({
         'name': 'Equity Research AI API (Demo Mode)',
         'version': '1.0.0-demo',
-        'mode': 'demo',
+        'mode': 'demo-load' if LOAD_MODE else 'demo',
         'note': 'This is a demo backend generating mock reports for UI testing',
-        'endpoints': {
-            'health': 'GET /health',
-            'stock_research': 'POST /research/stock',
-            'sector_research': 'POST /research/sector'
-        }
+        'endpoints': endpoints
     })
 
 if __name__ == '__main__':
@@ -432,12 +908,15 @@ if __name__ == '__main__':
     logger.info("=" * 60)
     logger.info("This is a demo backend for testing the UI")
     logger.info("It generates mock reports instead of real AI analysis")
+    if LOAD_MODE:
+        logger.info(f"Load mode: simulated agents, latency {DEMO_AGENT_LATENCY}, failure rate {DEMO_FAILURE_RATE}")
     logger.info("Server running at: http://localhost:5001")
     logger.info("=" * 60)
 
     app.run(
         host='0.0.0.0',
         port=5001,
-        debug=True,
+        # The reloader would run a second copy of the executor threads
+        debug=not LOAD_MODE,
         threaded=True
     )
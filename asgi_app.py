@@ -0,0 +1,185 @@
+"""
+ASGI entry point for the Equity Research API.
+
+Research submission and progress streams are served as coroutines, so an
+idle SSE connection costs a suspended task instead of a worker thread. Every
+other route is the Flask app mounted behind a WSGI adapter, and both share the
+same EquityResearchSystem, job store and executor from app.py.
+
+Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5001
+"""
+import asyncio
+import logging
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+from a2wsgi import WSGIMiddleware
+
+import app as api
+
+logger = logging.getLogger(__name__)
+
+
+async def authenticate(request):
+    """Return ((uid, decoded_token), None) or (None, error_response)."""
+    try:
+        # Token verification may fetch Google certs; keep it off the event loop
+        user = await asyncio.to_thread(api.verify_auth_header, request.headers.get('Authorization', ''))
+    except PermissionError as exc:
+        return None, JSONResponse({'success': False, 'error': str(exc)}, status_code=401)
+    except RuntimeError as exc:
+        return None, JSONResponse({'success': False, 'error': str(exc)}, status_code=500)
+    return user, None
+
+
+async def request_json(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def research_stock(request):
+    """Single stock research endpoint - starts research and returns session_id"""
+    user, error = await authenticate(request)
+    if error is not None:
+        return error
+    data = await request_json(request)
+    try:
+        payload, status = await asyncio.to_thread(api.start_stock_research, *user, data)
+    except Exception as e:
+        logger.error(f"Error starting stock research: {str(e)}")
+        return JSONResponse({'success': False, 'error': str(e)}, status_code=500)
+    return JSONResponse(payload, status_code=status, headers=api.retry_headers(payload))
+
+
+async def research_sector(request):
+    """Sector research endpoint - starts research and returns session_id"""
+    user, error = await authenticate(request)
+    if error is not None:
+        return error
+    data = await request_json(request)
+    try:
+        payload, status = await asyncio.to_thread(api.start_sector_research, *user, data)
+    except Exception as e:
+        logger.error(f"Error starting sector research: {str(e)}")
+        return JSONResponse({'success': False, 'error': str(e)}, status_code=500)
+    return JSONResponse(payload, status_code=status, headers=api.retry_headers(payload))
+
+
+async def research_batch(request):
+    """Watchlist research endpoint - starts research and returns session_id"""
+    user, error = await authenticate(request)
+    if error is not None:
+        return error
+    data = await request_json(request)
+    try:
+        payload, status = await asyncio.to_thread(api.start_batch_research, *user, data)
+    except Exception as e:
+        logger.error(f"Error starting batch research: {str(e)}")
+        return JSONResponse({'success': False, 'error': str(e)}, status_code=500)
+    return JSONResponse(payload, status_code=status, headers=api.retry_headers(payload))
+
+
+async def research_progress(request):
+    """SSE endpoint for real-time research progress updates"""
+    session_id = request.path_params['session_id']
+    job, error, status = await asyncio.to_thread(
+        api.authorize_progress_stream, session_id, request.query_params.get('token')
+    )
+    if error is not None:
+        return JSONResponse(error, status_code=status)
+
+    last_seq = api.resume_sequence(request.headers, request.query_params)
+
+    async def generate():
+        nonlocal last_seq
+        if job is None:
+            logger.error(f"Session {session_id} not found in job store")
+            yield api.sse_frame({'type': 'error', 'error': 'Invalid session'})
+            return
+
+        logger.info(f"Starting async SSE stream for session {session_id} after event {last_seq}")
+        # Coalesced sessions read the progress log of the job they joined
+        log_session = job.get('alias_of') or session_id
+        watched = {session_id, log_session}
+        next_keepalive = time.monotonic() + api.SSE_KEEPALIVE_SECONDS
+
+        yield "retry: 3000\n" + api.sse_frame({'type': 'connected', 'message': 'SSE stream connected'})
+
+        poll_interval = api.SSE_POLL_INTERVAL
+        check_store = True
+        while True:
+            # Reading the store takes a worker thread; only do it after a wakeup
+            # or a poll interval, which grows while the stream stays quiet
+            if check_store:
+                frames, last_seq, finished = await asyncio.to_thread(
+                    api.next_progress_frames, session_id, log_session, last_seq
+                )
+                for frame in frames:
+                    yield frame
+                if finished:
+                    return
+                if frames:
+                    poll_interval = api.SSE_POLL_INTERVAL
+                    next_keepalive = time.monotonic() + api.SSE_KEEPALIVE_SECONDS
+
+            now = time.monotonic()
+            if now >= next_keepalive:
+                yield api.sse_frame({'type': 'keepalive'})
+                next_keepalive = now + api.SSE_KEEPALIVE_SECONDS
+
+            # Woken straight away by writes from this process; the timeout
+            # covers keepalives and events written by other workers
+            poll_due = now + poll_interval
+            timeout = max(0.0, min(poll_due, next_keepalive) - now)
+            woken = await api.job_store.wait_for_change_async(watched, timeout)
+            check_store = woken or time.monotonic() >= poll_due
+            if woken:
+                poll_interval = api.SSE_POLL_INTERVAL
+            elif check_store:
+                poll_interval = min(poll_interval * 2, api.SSE_IDLE_POLL_MAX_SECONDS)
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+# Flask-CORS already covers the mounted routes; only the native ones need it here
+cors = [
+    Middleware(
+        CORSMiddleware,
+        allow_origins=['*'],
+        allow_methods=['GET', 'POST', 'DELETE', 'OPTIONS'],
+        allow_headers=['Content-Type', 'Authorization'],
+        expose_headers=['Content-Type'],
+    )
+]
+
+app = Starlette(routes=[
+    Route('/research/stock', research_stock, methods=['POST', 'OPTIONS'], middleware=cors),
+    Route('/research/sector', research_sector, methods=['POST', 'OPTIONS'], middleware=cors),
+    Route('/research/batch', research_batch, methods=['POST', 'OPTIONS'], middleware=cors),
+    Route('/research/progress/{session_id}', research_progress, methods=['GET'], middleware=cors),
+    Mount('/', app=WSGIMiddleware(api.app)),
+])
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5001))
+    logger.info("Starting Equity Research AI ASGI API on http://0.0.0.0:%d", port)
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,249 @@
+"""
+Offline benchmark for EquityResearchSystem.
+
+Runs research_stock, research_sector or research_batch end to end against a fake model
+provider and fake MCP servers (see replay.py), which answer from a recorded
+cassette or with synthetic data after a configurable latency. No network
+access or API keys are needed, so throughput and latency under concurrency
+can be compared before and after a change on a laptop.
+
+    # 12 stock reports, 4 at a time, synthetic answers
+    python benchmark.py stock --symbols AAPL MSFT NVDA --runs 12 --concurrency 4
+
+    # 2 sector reports replayed from a cassette at half the recorded latency
+    python benchmark.py sector --sector Technology --runs 2 --cassette cassettes/tech.json --time-scale 0.5
+
+    # 2 watchlist batches of 6 symbols each
+    python benchmark.py batch --symbols AAPL MSFT NVDA GOOGL AMZN META --runs 2 --concurrency 2
+
+    # Record a cassette from live calls (needs OPENAI_API_KEY, BRAVE_API_KEY, network)
+    python benchmark.py stock --symbols AAPL --runs 1 --record cassettes/aapl.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline throughput/latency benchmark for the research pipeline")
+    parser.add_argument("mode", choices=["stock", "sector", "batch"], help="Which research flow to run")
+    parser.add_argument("--symbols", nargs="+", default=["AAPL", "MSFT", "NVDA", "GOOGL"],
+                        help="Stock symbols, used round-robin across runs (stock mode)")
+    parser.add_argument("--sector", default="Technology", help="Sector name (sector mode)")
+    parser.add_argument("--exchange", default="US")
+    parser.add_argument("--num-companies", type=int, default=3, help="Companies per sector report")
+    parser.add_argument("--runs", type=int, default=8, help="Total research sessions to run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions in flight at once")
+    parser.add_argument("--cassette", help="Replay model and tool calls from this cassette")
+    parser.add_argument("--record", metavar="PATH", help="Call the live model and MCP servers and record a cassette")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for recorded latencies")
+    parser.add_argument("--model-latency", type=float, default=2.0, help="Seconds per synthetic model call")
+    parser.add_argument("--tool-latency", type=float, default=0.3, help="Seconds per synthetic tool call")
+    parser.add_argument("--no-synthetic", action="store_true",
+                        help="Fail calls the cassette doesn't cover instead of synthesizing them")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Wall-clock deadline per research session (default: STOCK_/SECTOR_DEADLINE_SECONDS)")
+    parser.add_argument("--sequential-analysts", action="store_true", help="Run the analysts one after another")
+    parser.add_argument("--no-tool-cache", action="store_true", help="Disable the MCP tool result cache")
+    parser.add_argument("--report-cache", action="store_true",
+                        help="Keep the report cache on (repeat runs of a symbol become cache hits)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the summary as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own log output")
+    return parser.parse_args(argv)
+
+
+def build_system(args, cassette):
+    # Imported here so PRICE_STORE_DIR, set in main(), is seen by the module-level stores
+    from agents import set_tracing_disabled
+    from agents.mcp import MCPServerStdio
+    from job_store import MemoryJobStore
+    from replay import RecordingMCPServer, RecordingModelProvider, ReplayMCPServer, ReplayModelProvider
+    from research_system import EquityResearchSystem
+
+    if args.record:
+        from agents.models.multi_provider import MultiProvider
+
+        model_provider = RecordingModelProvider(MultiProvider(), cassette)
+
+        def server_factory(kind, params):
+            server = MCPServerStdio(params=params, client_session_timeout_seconds=1200)
+            return RecordingMCPServer(server, cassette, kind)
+    else:
+        set_tracing_disabled(True)
+        synthetic = not args.no_synthetic
+        model_provider = ReplayModelProvider(
+            cassette,
+            time_scale=args.time_scale,
+            default_latency=args.model_latency,
+            synthetic=synthetic,
+        )
+
+        def server_factory(kind, params):
+            return ReplayMCPServer(
+                kind,
+                cassette,
+                time_scale=args.time_scale,
+                default_latency=args.tool_latency,
+                synthetic=synthetic,
+            )
+
+    return EquityResearchSystem(
+        concurrent_analysts=not args.sequential_analysts,
+        use_mcp_pool=False,
+        use_tool_cache=not args.no_tool_cache,
+        use_report_cache=args.report_cache,
+        stream_partials=False,
+        job_store=MemoryJobStore(),
+        model_provider=model_provider,
+        server_factory=server_factory,
+    )
+
+
+def _percentile(values: list, q: float) -> float:
+    return round(float(np.percentile(values, q)), 3) if values else None
+
+
+def summarize(args, results: list, wall_seconds: float, system) -> dict:
+    latencies = [r["seconds"] for r in results if r["ok"]]
+    agents = {}
+    for result in results:
+        for agent, totals in ((result.get("metrics") or {}).get("agents") or {}).items():
+            combined = agents.setdefault(agent, {})
+            for field, value in totals.items():
+                combined[field] = combined.get(field, 0) + value
+    completed = len(latencies)
+    runs = max(1, completed)
+    summary = {
+        "mode": args.mode,
+        "runs": len(results),
+        "completed": completed,
+        "failed": len(results) - completed,
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(completed / wall_seconds * 60, 2) if wall_seconds else None,
+        "latency_seconds": {
+            "mean": round(sum(latencies) / runs, 3) if latencies else None,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": round(max(latencies), 3) if latencies else None,
+        },
+        # Per-session averages across completed runs
+        "agents": {
+            agent: {field: round(value / runs, 3) for field, value in totals.items()}
+            for agent, totals in sorted(agents.items())
+        },
+        # Sessions that had at least one stage cut short by their deadline
+        "truncated_runs": sum(1 for r in results if r.get("truncated")),
+        "errors": [r["error"] for r in results if not r["ok"]][:5],
+    }
+    if system.tool_cache is not None:
+        summary["tool_cache"] = system.tool_cache.stats()
+    return summary
+
+
+def print_summary(summary: dict):
+    latency = summary["latency_seconds"]
+    print(f"\n{summary['mode']} research: {summary['completed']}/{summary['runs']} completed "
+          f"at concurrency {summary['concurrency']} in {summary['wall_seconds']}s")
+    print(f"  throughput: {summary['throughput_per_minute']} reports/min")
+    print(f"  latency:    mean {latency['mean']}s  p50 {latency['p50']}s  p95 {latency['p95']}s  max {latency['max']}s")
+    if summary["truncated_runs"]:
+        print(f"  truncated:  {summary['truncated_runs']} sessions had stages cut short by their deadline")
+    if summary["agents"]:
+        print(f"\n  {'agent':<24}{'runs':>6}{'wall s':>9}{'turns':>7}{'tools':>7}{'tool s':>9}{'tokens':>9}")
+        for agent, totals in summary["agents"].items():
+            tokens = totals.get("input_tokens", 0) + totals.get("output_tokens", 0)
+            print(f"  {agent:<24}{totals.get('runs', 0):>6}{totals.get('wall_seconds', 0):>9}"
+                  f"{totals.get('turns', 0):>7}{totals.get('tool_calls', 0):>7}"
+                  f"{totals.get('tool_seconds', 0):>9}{round(tokens):>9}")
+        print("  (per session)")
+    if "tool_cache" in summary:
+        print(f"\n  tool cache: {summary['tool_cache']}")
+    for error in summary["errors"]:
+        print(f"  error: {error}")
+
+
+async def run_benchmark(args, system) -> tuple:
+    limiter = asyncio.Semaphore(max(1, args.concurrency))
+    quiet = not args.verbose
+
+    async def one(index: int) -> dict:
+        async with limiter:
+            session_id = f"bench-{index}"
+            system.job_store.create_job(session_id, "benchmark", args.mode, {})
+            started = time.perf_counter()
+            try:
+                if args.mode == "stock":
+                    symbol = args.symbols[index % len(args.symbols)]
+                    payload = await system.research_stock(symbol, args.exchange, session_id, args.deadline)
+                elif args.mode == "batch":
+                    payload = await system.research_batch(args.symbols, args.exchange, session_id, args.deadline)
+                else:
+                    payload = await system.research_sector(
+                        args.sector, args.exchange, args.num_companies, session_id, args.deadline
+                    )
+                metadata = (payload.get("metadata") or {}) if isinstance(payload, dict) else {}
+                truncated = (metadata.get("deadline") or {}).get("truncated", [])
+                if args.mode == "batch":
+                    truncated = [stage for row in payload["summary"] for stage in row["truncated"]]
+                return {
+                    "ok": True,
+                    "seconds": time.perf_counter() - started,
+                    "metrics": metadata.get("metrics"),
+                    "truncated": truncated,
+                }
+            except Exception as e:
+                return {"ok": False, "seconds": time.perf_counter() - started, "error": f"{type(e).__name__}: {e}"}
+
+    # The pipeline logs every step to stdout; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(args.runs)))
+        wall_seconds = time.perf_counter() - started
+    return results, wall_seconds
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Keep benchmark price history out of the real store
+    os.environ.setdefault("PRICE_STORE_DIR", tempfile.mkdtemp(prefix="bench-prices-"))
+
+    from replay import Cassette
+
+    if args.record:
+        cassette = Cassette(args.record)
+    elif args.cassette:
+        cassette = Cassette.load(args.cassette)
+    else:
+        cassette = None
+
+    system = build_system(args, cassette)
+    results, wall_seconds = asyncio.run(run_benchmark(args, system))
+
+    summary = summarize(args, results, wall_seconds, system)
+    if cassette is not None:
+        summary["cassette"] = cassette.stats()
+    print_summary(summary)
+
+    if args.record:
+        cassette.save()
+        print(f"\nRecorded {cassette.stats()} to {args.record}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
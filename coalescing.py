@@ -0,0 +1,91 @@
+import threading
+import time
+
+
+class ResearchFlight:
+    """One in-progress (or recently finished) research job shared by several requesters."""
+
+    def __init__(self, key, leader_session_id: str):
+        self.key = key
+        self.leader_session_id = leader_session_id
+        # session_id -> (uid, decoded_token) for everyone waiting on this job
+        self.requesters = {}
+        self.done = False
+        self.result = None
+        self.finished_at = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical research requests onto one running job.
+
+    The first request for a key becomes the leader and does the work; later
+    requests join its flight and follow the leader's progress log and result.
+    A successful flight stays joinable for `window_seconds` after it finishes,
+    so a burst of requests for a popular symbol is served by one pipeline run.
+    """
+
+    def __init__(self, window_seconds: float = 60):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._by_session = {}
+
+    def _purge_expired(self):
+        now = time.time()
+        for key, flight in list(self._flights.items()):
+            if flight.done and now - flight.finished_at > self.window_seconds:
+                self._drop(flight)
+
+    def _drop(self, flight: ResearchFlight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        for session_id in list(flight.requesters):
+            self._by_session.pop(session_id, None)
+
+    def join(self, key, session_id: str, uid: str, decoded=None):
+        """
+        Attach a request to the flight for `key`, creating it if needed.
+
+        Returns (flight, is_leader).
+        """
+        with self._lock:
+            self._purge_expired()
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = ResearchFlight(key, session_id)
+                self._flights[key] = flight
+            flight.requesters[session_id] = (uid, decoded)
+            self._by_session[session_id] = flight
+            return flight, is_leader
+
+    def flight_for(self, session_id: str):
+        with self._lock:
+            return self._by_session.get(session_id)
+
+    def requesters(self, flight: ResearchFlight) -> dict:
+        with self._lock:
+            return dict(flight.requesters)
+
+    def leave(self, flight: ResearchFlight, session_id: str) -> int:
+        """Detach one requester; returns how many are still waiting on the flight."""
+        with self._lock:
+            flight.requesters.pop(session_id, None)
+            self._by_session.pop(session_id, None)
+            return len(flight.requesters)
+
+    def finish(self, flight: ResearchFlight, result=None, success: bool = True) -> dict:
+        """
+        Mark a flight finished and return the requesters to notify.
+
+        Failed flights are dropped straight away so the next request retries.
+        """
+        with self._lock:
+            flight.done = True
+            flight.result = result
+            flight.finished_at = time.time()
+            requesters = dict(flight.requesters)
+            if not success:
+                self._drop(flight)
+            return requesters
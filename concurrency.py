@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+
+class AsyncSlotLimiter:
+    """
+    Process-wide concurrency cap that can be awaited from any event loop.
+
+    asyncio.Semaphore is bound to a single loop, but research jobs run on
+    whichever loop their worker thread owns, so the slot count lives behind
+    a thread lock and waiters poll for a free slot.
+    """
+
+    def __init__(self, limit: int, poll_interval: float = 0.05):
+        self.limit = max(1, int(limit))
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._in_use = 0
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._in_use >= self.limit:
+                return False
+            self._in_use += 1
+            return True
+
+    async def acquire(self):
+        while not self.try_acquire():
+            await asyncio.sleep(self.poll_interval)
+
+    def release(self):
+        with self._lock:
+            if self._in_use > 0:
+                self._in_use -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
@@ -0,0 +1,118 @@
+import os
+import time
+
+# Planned share of a request's deadline for each stage, in pipeline order.
+# A stage may use whatever earlier stages left over, but never the time the
+# stages after it are planned to get.
+STOCK_STAGE_SHARES = {"analysts": 0.55, "report": 0.25, "strategic": 0.20}
+SECTOR_STAGE_SHARES = {"companies": 0.10, "research": 0.75, "portfolio": 0.15}
+
+# No stage gets less than this, however late it starts, as long as the
+# request's deadline still has that much time left
+MIN_STAGE_SECONDS = float(os.getenv("MIN_STAGE_SECONDS", "5"))
+
+# Held back from an analyst's budget so a run that overruns can still write
+# up what it gathered in one tool-less turn
+WRAP_UP_SECONDS = float(os.getenv("WRAP_UP_SECONDS", "20"))
+
+# Characters of gathered tool output handed to a wrap-up turn
+GATHERED_MAX_CHARS = 12000
+
+
+class StageTimeout(TimeoutError):
+    """An agent run went past its time budget; `gathered` is the tool output it had collected."""
+
+    def __init__(self, agent_label: str, budget: float, gathered: str = ""):
+        super().__init__(f"{agent_label} ran past its {budget:.0f}s time budget")
+        self.agent_label = agent_label
+        self.budget = budget
+        self.gathered = gathered
+
+
+def parse_deadline_seconds(value, default: float = None):
+    """A deadline in seconds from env/request input; None (no deadline) for empty, zero or invalid values."""
+    if value in (None, ""):
+        return default
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return default
+    return seconds if seconds > 0 else None
+
+
+def gathered_tool_output(result, max_chars: int = GATHERED_MAX_CHARS) -> str:
+    """Tool outputs a (possibly unfinished) run has collected so far, newest last, capped at max_chars."""
+    outputs = [
+        str(item.output) for item in getattr(result, "new_items", None) or []
+        if getattr(item, "type", None) == "tool_call_output_item"
+    ]
+    if not outputs:
+        return ""
+    per_output = max(500, max_chars // len(outputs))
+    text = "\n\n".join(output[:per_output] for output in outputs)
+    return text[-max_chars:]
+
+
+class Deadline:
+    """
+    Wall-clock budget for one research request, split into stage budgets.
+
+    Deadlines nest like MetricsScope: stage() and child() hand out
+    sub-deadlines, and stages truncated anywhere below are reported up to
+    every enclosing deadline (prefixed with the child's label, e.g. a ticker).
+    A sub-deadline never outlasts the deadlines it is nested in, and no
+    budget handed out here is longer than the time left.
+    """
+
+    def __init__(self, seconds: float, shares: dict = None, parent: "Deadline" = None, label: str = None):
+        self.seconds = seconds
+        self.shares = shares or {}
+        self.parent = parent
+        self.label = label
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds
+        self.truncated = []
+
+    def remaining(self) -> float:
+        remaining = max(0.0, self.expires_at - time.monotonic())
+        if self.parent is not None:
+            remaining = min(remaining, self.parent.remaining())
+        return remaining
+
+    def floored(self, seconds: float) -> float:
+        """`seconds`, raised to MIN_STAGE_SECONDS where possible but never past the time left."""
+        return min(max(MIN_STAGE_SECONDS, seconds), self.remaining())
+
+    def budget(self, name: str) -> float:
+        """Seconds for one of `shares`' stages: what's left minus what later stages are planned to get."""
+        names = list(self.shares)
+        reserve = sum(self.shares[later] for later in names[names.index(name) + 1:]) * self.seconds
+        return self.floored(self.remaining() - reserve)
+
+    def stage(self, name: str) -> "Deadline":
+        """Sub-deadline spanning budget(name) from now."""
+        return self.child(self.budget(name))
+
+    def child(self, seconds: float, shares: dict = None, label: str = None) -> "Deadline":
+        return Deadline(seconds, shares, parent=self, label=label)
+
+    def note_truncated(self, stage: str):
+        """Record that `stage` was cut short, here and in every enclosing deadline."""
+        deadline = self
+        while deadline is not None:
+            deadline.truncated.append(stage)
+            if deadline.label:
+                stage = f"{deadline.label}: {stage}"
+            deadline = deadline.parent
+
+    def was_truncated(self, stage: str) -> bool:
+        return stage in self.truncated
+
+    def to_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "seconds": round(self.seconds, 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "overrun_seconds": round(max(0.0, elapsed - self.seconds), 3),
+            "truncated": list(self.truncated),
+        }
@@ -144,6 +144,25 @@ export class ResearchAPI {
     return response.json();
   }
 
+  static async resumeResearch({ sessionId, token }) {
+    const response = await fetch(`${API_BASE}/research/resume/${sessionId}`, {
+      method: 'POST',
+      headers: buildHeaders(token),
+    });
+
+    if (!response.ok) {
+      let errorPayload = {};
+      try {
+        errorPayload = await response.json();
+      } catch (err) {
+        /* ignore */
+      }
+      return { success: false, error: errorPayload.error || 'Failed to resume research' };
+    }
+
+    return response.json();
+  }
+
   static connectProgressStream(sessionId, token, onUpdate) {
     let url = `${API_BASE}/research/progress/${sessionId}`;
     if (token) {
@@ -174,8 +193,9 @@ export class ResearchAPI {
         console.log('SSE data received:', data);
         onUpdate(data);
 
-        // Close connection on complete or error
-        if (data.type === 'complete' || data.type === 'error') {
+        // Close connection on complete, error or cancel; anything else that
+        // drops the stream reconnects and resumes from the last event id
+        if (data.type === 'complete' || data.type === 'error' || data.type === 'cancelled') {
           eventSource.close();
         }
       } catch (error) {
@@ -280,7 +300,8 @@ export function createProgressStream({ type, sessionId, token }, onProgress) {
   // Use an object to store state that needs to be accessed in callbacks
   const state = {
     agentStatuses: agents.map(a => ({ ...a, status: 'queued' })),
-    logs: []
+    logs: [],
+    drafts: {}
   };
 
   // Initial update with agents
@@ -357,6 +378,22 @@ export function createProgressStream({ type, sessionId, token }, onProgress) {
         elapsed: Math.floor((Date.now() - startTime) / 1000),
         logs: state.logs,
       });
+    } else if (update.type === 'partial') {
+      // Live preview of a report stage; deltas extend the draft at `offset`
+      const key = update.symbol ? `${update.symbol} ${update.stage}` : update.stage;
+      const current = state.drafts[key] || '';
+      if (update.reset) {
+        state.drafts = { ...state.drafts, [key]: update.delta || '' };
+      } else if (current.length === update.offset) {
+        state.drafts = { ...state.drafts, [key]: current + (update.delta || '') };
+      } else {
+        // Missed a chunk; wait for the next reset rather than show a garbled draft
+        return;
+      }
+      onProgress({
+        drafts: state.drafts,
+        latestDraft: { key, agent: update.agent, text: state.drafts[key] },
+      });
     } else if (update.type === 'complete') {
       clearInterval(timerInterval);
 
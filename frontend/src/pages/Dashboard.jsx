@@ -111,6 +111,7 @@ export function Dashboard() {
           sections: payload.sections,
           analyses: payload.analyses,
           sources: payload.sources,
+          recommendation: payload.recommendation,
           metadata: payload.metadata,
           symbol: payload.symbol || entry.symbol,
           sector: payload.sector || entry.sector,
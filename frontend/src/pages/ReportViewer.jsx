@@ -29,6 +29,7 @@ export function ReportViewer() {
   const sourcesData = location.state?.sources || {};
   const metadata = location.state?.metadata || {};
   const companyReports = location.state?.companyReports || {};
+  const structuredRecommendation = location.state?.recommendation || null;
 
   const isSectorReport = type === 'sector';
   const newsLinks = sourcesData.news_links || [];
@@ -68,6 +69,16 @@ export function ReportViewer() {
       return { action, confidence: parsedConfidence, color };
     };
 
+    // Priority 0: Structured recommendation from the Strategic Analyst
+    if (structuredRecommendation?.recommendation) {
+      const conviction = Number(structuredRecommendation.conviction);
+      return buildRecommendation(
+        structuredRecommendation.recommendation,
+        'MODERATE',
+        Number.isNaN(conviction) ? '' : `Conviction: ${conviction}/10`
+      );
+    }
+
     // Priority 1: Strategic section explicit recommendation
     const strategicMatch = strategicText.match(
       /My recommendation:\s*(Strong\s+Buy|Buy|Hold|Avoid|Sell)/i
@@ -103,7 +114,7 @@ export function ReportViewer() {
     }
 
     return defaultRecommendation;
-  }, [report, sectionsData]);
+  }, [report, sectionsData, structuredRecommendation]);
 
   // Extract key metrics from report
   const keyMetrics = useMemo(() => {
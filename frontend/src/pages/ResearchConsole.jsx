@@ -20,6 +20,7 @@ export function ResearchConsole() {
   const [agents, setAgents] = useState([]);
   const [elapsed, setElapsed] = useState(0);
   const [logs, setLogs] = useState([]);
+  const [draft, setDraft] = useState(null);
   const [complete, setComplete] = useState(false);
   const [result, setResult] = useState(null);
   const [error, setError] = useState(null);
@@ -28,6 +29,8 @@ export function ResearchConsole() {
   const [sessionId, setSessionId] = useState(null);
   const [cancelled, setCancelled] = useState(false);
   const [cancelling, setCancelling] = useState(false);
+  // Session whose checkpointed stages the next run should pick up from
+  const [resumeFrom, setResumeFrom] = useState(null);
 
   const researchType = symbol ? 'stock' : 'sector';
   const title = symbol ? `${symbol} (${exchange})` : `${sector} Sector`;
@@ -83,10 +86,16 @@ export function ResearchConsole() {
         setProgress(0);
         setAgents([]);
         setLogs([]);
+        setDraft(null);
         setError(null);
         setElapsed(0);
         let response;
-        if (researchType === 'stock') {
+        if (resumeFrom) {
+          response = await ResearchAPI.resumeResearch({ sessionId: resumeFrom, token: authToken });
+          if (!response.success) {
+            throw new Error(response.error || 'Failed to resume research');
+          }
+        } else if (researchType === 'stock') {
           response = await ResearchAPI.researchStock({ symbol, exchange, token: authToken });
         } else {
           response = await ResearchAPI.researchSector({ sector, exchange, numCompanies: 5, token: authToken });
@@ -120,6 +129,9 @@ export function ResearchConsole() {
               if (update.logs !== undefined) {
                 setLogs(update.logs);
               }
+              if (update.latestDraft !== undefined) {
+                setDraft(update.latestDraft);
+              }
               if (update.complete) {
                 setComplete(true);
                 setResult(update.result);
@@ -165,7 +177,7 @@ export function ResearchConsole() {
         cleanupFunction();
       }
     };
-  }, [symbol, sector, exchange, researchType, authToken, tokenReady]);
+  }, [symbol, sector, exchange, researchType, authToken, tokenReady, resumeFrom]);
 
   useEffect(() => {
     if (!cancelled && complete && result) {
@@ -177,6 +189,7 @@ export function ResearchConsole() {
             sections: result.sections,
             analyses: result.analyses,
             sources: result.sources,
+            recommendation: result.recommendation,
             metadata: result.metadata,
             companyReports: result.company_reports,
             symbol,
@@ -235,7 +248,14 @@ export function ResearchConsole() {
           <div className="text-6xl mb-4">⚠️</div>
           <h2 className="text-2xl font-bold mb-2">Research Failed</h2>
           <p className="text-text-secondary mb-6">{error}</p>
-          <Button onClick={() => navigate('/dashboard')}>Return to Dashboard</Button>
+          <div className="flex gap-3 justify-center">
+            {sessionId && (
+              <Button variant="secondary" onClick={() => setResumeFrom(sessionId)}>
+                Resume Research
+              </Button>
+            )}
+            <Button onClick={() => navigate('/dashboard')}>Return to Dashboard</Button>
+          </div>
         </Card>
       </div>
     );
@@ -344,6 +364,18 @@ export function ResearchConsole() {
                 )}
               </div>
             </Card>
+
+            {draft && draft.text && (
+              <>
+                <h2 className="text-xl font-bold mt-6 mb-4 flex items-center gap-2">
+                  ✍️ Draft Report
+                  <span className="text-sm font-normal text-text-secondary">{draft.agent}</span>
+                </h2>
+                <Card className="max-h-[400px] overflow-y-auto text-sm">
+                  <div className="whitespace-pre-wrap text-text-secondary">{draft.text}</div>
+                </Card>
+              </>
+            )}
           </motion.div>
         </div>
       </main>
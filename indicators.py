@@ -0,0 +1,234 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+TRADING_DAYS = 252
+
+# Bars back for each trailing return; YTD is handled separately
+RETURN_WINDOWS = {
+    "1W": 5,
+    "1M": 21,
+    "3M": 63,
+    "6M": 126,
+    "1Y": 252,
+}
+
+# Bars either side a high/low must dominate to count as a pivot
+PIVOT_SPAN = 5
+
+# Block length for the exponential smoothing below; keeps the (1 - alpha)**-k
+# weights well inside float64 range for any span used here
+_EWM_BLOCK = 128
+
+
+def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted mean y[t] = (1 - alpha) * y[t-1] + alpha * x[t],
+    seeded with x[0].
+
+    Evaluated in closed form a block at a time (cumsum of rescaled inputs)
+    rather than with a Python loop over every bar.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.empty_like(values)
+    if len(values) == 0:
+        return out
+    out[0] = values[0]
+    decay = 1.0 - alpha
+    carry = values[0]
+    for start in range(1, len(values), _EWM_BLOCK):
+        chunk = values[start:start + _EWM_BLOCK]
+        steps = np.arange(1, len(chunk) + 1)
+        smoothed = decay ** steps * (carry + alpha * np.cumsum(chunk * decay ** -steps))
+        out[start:start + len(chunk)] = smoothed
+        carry = smoothed[-1]
+    return out
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    return ewm(values, 2.0 / (span + 1))
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average, NaN until `window` values are available."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder's relative strength index."""
+    change = np.diff(close, prepend=close[0])
+    gain = ewm(np.clip(change, 0, None), 1.0 / period)
+    loss = ewm(np.clip(-change, 0, None), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = np.where(loss > 0, gain / loss, np.inf)
+    return 100.0 - 100.0 / (1.0 + strength)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous_close = np.concatenate(([close[0]], close[:-1]))
+    return np.maximum.reduce([high - low, np.abs(high - previous_close), np.abs(low - previous_close)])
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder's average true range."""
+    return ewm(true_range(high, low, close), 1.0 / period)
+
+
+def realized_volatility(log_returns: np.ndarray, window: int) -> float:
+    """Annualized standard deviation of the last `window` daily log returns."""
+    if len(log_returns) < window:
+        return float("nan")
+    return float(np.std(log_returns[-window:], ddof=1) * np.sqrt(TRADING_DAYS))
+
+
+def pivot_levels(high: np.ndarray, low: np.ndarray, span: int = PIVOT_SPAN):
+    """
+    Return (pivot_highs, pivot_lows): prices of bars whose high (low) is the
+    extreme of the `span` bars on each side.
+    """
+    width = 2 * span + 1
+    if len(high) < width:
+        return np.empty(0), np.empty(0)
+    centre_high = high[span:len(high) - span]
+    centre_low = low[span:len(low) - span]
+    is_high = centre_high >= sliding_window_view(high, width).max(axis=1)
+    is_low = centre_low <= sliding_window_view(low, width).min(axis=1)
+    return centre_high[is_high], centre_low[is_low]
+
+
+def nearest_levels(levels: np.ndarray, price: float, above: bool, count: int = 2, min_gap: float = 0.01) -> list:
+    """
+    The `count` distinct levels closest to `price` on one side, merging levels
+    within `min_gap` (relative) of each other.
+    """
+    side = np.sort(levels[levels > price]) if above else np.sort(levels[levels < price])[::-1]
+    picked = []
+    for level in side:
+        if all(abs(level - other) / other > min_gap for other in picked):
+            picked.append(float(level))
+        if len(picked) == count:
+            break
+    return picked
+
+
+def _pct(now: float, then: float) -> float:
+    if not np.isfinite(then) or then == 0:
+        return None
+    return round((now / then - 1.0) * 100, 2)
+
+
+def _round(value, digits: int = 2):
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def compute_indicators(bars: np.ndarray) -> dict:
+    """
+    Compute the technical fact set for a daily-bar array (price_store.BAR_DTYPE).
+
+    Every indicator is derived in one pass over the close/high/low/volume
+    columns; values are plain floats (or None when history is too short) so
+    the result can go straight into a prompt or report metadata.
+    """
+    bars = bars[np.isfinite(bars["close"])]
+    if len(bars) < 2:
+        return {}
+
+    close = np.asarray(bars["close"], dtype=float)
+    high = np.where(np.isfinite(bars["high"]), bars["high"], close)
+    low = np.where(np.isfinite(bars["low"]), bars["low"], close)
+    volume = np.nan_to_num(np.asarray(bars["volume"], dtype=float))
+    dates = bars["date"]
+    last = close[-1]
+
+    log_returns = np.diff(np.log(close))
+    year = close[-TRADING_DAYS:]
+    year_high, year_low = high[-TRADING_DAYS:], low[-TRADING_DAYS:]
+    running_peak = np.maximum.accumulate(year)
+
+    returns = {
+        label: _pct(last, close[-window - 1]) if len(close) > window else None
+        for label, window in RETURN_WINDOWS.items()
+    }
+    this_year = dates >= np.datetime64(str(dates[-1])[:4] + "-01-01", "D")
+    first_this_year = int(np.argmax(this_year)) if this_year.any() else len(close) - 1
+    returns["YTD"] = _pct(last, close[first_this_year - 1]) if first_this_year > 0 else None
+
+    sma_20, sma_50, sma_200 = sma(close, 20), sma(close, 50), sma(close, 200)
+    ema_12, ema_26 = ema(close, 12), ema(close, 26)
+    macd = ema_12 - ema_26
+    macd_signal = ema(macd, 9)
+    atr_14 = atr(high, low, close)
+
+    pivot_highs, pivot_lows = pivot_levels(year_high, year_low)
+    volume_20 = volume[-20:].mean() if len(volume) >= 20 else float("nan")
+    volume_60 = volume[-60:].mean() if len(volume) >= 60 else float("nan")
+
+    cross = None
+    if np.isfinite(sma_50[-1]) and np.isfinite(sma_200[-1]):
+        cross = "golden (50-day above 200-day)" if sma_50[-1] > sma_200[-1] else "death (50-day below 200-day)"
+
+    return {
+        "as_of": str(dates[-1]),
+        "bars": int(len(close)),
+        "last_close": _round(last),
+        "returns_pct": returns,
+        "high_52w": _round(year_high.max()),
+        "low_52w": _round(year_low.min()),
+        "pct_below_52w_high": _pct(last, year_high.max()),
+        "pct_above_52w_low": _pct(last, year_low.min()),
+        "sma_20": _round(sma_20[-1]),
+        "sma_50": _round(sma_50[-1]),
+        "sma_200": _round(sma_200[-1]),
+        "pct_vs_sma_50": _pct(last, sma_50[-1]),
+        "pct_vs_sma_200": _pct(last, sma_200[-1]),
+        "ma_cross": cross,
+        "ema_12": _round(ema_12[-1]),
+        "ema_26": _round(ema_26[-1]),
+        "macd": _round(macd[-1], 3),
+        "macd_signal": _round(macd_signal[-1], 3),
+        "rsi_14": _round(rsi(close)[-1], 1),
+        "atr_14": _round(atr_14[-1]),
+        "atr_pct": _round(atr_14[-1] / last * 100),
+        "volatility_20d_pct": _round(realized_volatility(log_returns, 20) * 100, 1),
+        "volatility_60d_pct": _round(realized_volatility(log_returns, 60) * 100, 1),
+        "volatility_1y_pct": _round(realized_volatility(log_returns, min(len(log_returns), TRADING_DAYS - 1)) * 100, 1),
+        "max_drawdown_1y_pct": _round((year / running_peak - 1.0).min() * 100),
+        "current_drawdown_pct": _round((last / running_peak[-1] - 1.0) * 100),
+        "support_levels": [_round(level) for level in nearest_levels(pivot_lows, last, above=False)],
+        "resistance_levels": [_round(level) for level in nearest_levels(pivot_highs, last, above=True)],
+        "volume_20d_avg": int(volume_20) if np.isfinite(volume_20) else None,
+        "volume_vs_60d_avg": _round(volume_20 / volume_60, 2) if volume_60 else None,
+        "last_volume_vs_20d_avg": _round(volume[-1] / volume_20, 2) if volume_20 else None,
+    }
+
+
+def format_fact_sheet(facts: dict) -> str:
+    """Render computed indicators as a compact block for the Technical Analyst prompt."""
+    def show(value, suffix=""):
+        return "n/a" if value is None else f"{value:,}{suffix}"
+
+    returns = facts.get("returns_pct", {})
+    lines = [
+        f"Data: {facts['bars']} daily bars through {facts['as_of']}; last close {show(facts['last_close'])}",
+        "Returns: " + ", ".join(f"{label} {show(value, '%')}" for label, value in returns.items()),
+        f"52-week range: low {show(facts['low_52w'])} / high {show(facts['high_52w'])}; "
+        f"{show(facts['pct_below_52w_high'], '%')} vs high, {show(facts['pct_above_52w_low'], '%')} vs low",
+        f"Moving averages: SMA20 {show(facts['sma_20'])}, SMA50 {show(facts['sma_50'])}, SMA200 {show(facts['sma_200'])}; "
+        f"price {show(facts['pct_vs_sma_50'], '%')} vs SMA50, {show(facts['pct_vs_sma_200'], '%')} vs SMA200; "
+        f"cross: {facts['ma_cross'] or 'n/a'}",
+        f"Momentum: RSI14 {show(facts['rsi_14'])}; MACD {show(facts['macd'])} vs signal {show(facts['macd_signal'])}",
+        f"Volatility (annualized): 20d {show(facts['volatility_20d_pct'], '%')}, 60d {show(facts['volatility_60d_pct'], '%')}, "
+        f"1y {show(facts['volatility_1y_pct'], '%')}; ATR14 {show(facts['atr_14'])} ({show(facts['atr_pct'], '%')} of price)",
+        f"Drawdown: current {show(facts['current_drawdown_pct'], '%')} from 1y peak; max 1y {show(facts['max_drawdown_1y_pct'], '%')}",
+        "Support (pivot lows): " + (", ".join(show(level) for level in facts["support_levels"]) or "none below price"),
+        "Resistance (pivot highs): " + (", ".join(show(level) for level in facts["resistance_levels"]) or "none above price"),
+        f"Volume: 20d avg {show(facts['volume_20d_avg'])}; 20d vs 60d avg x{show(facts['volume_vs_60d_avg'])}; "
+        f"last session x{show(facts['last_volume_vs_20d_avg'])} of 20d avg",
+    ]
+    return "\n".join(f"- {line}" for line in lines)
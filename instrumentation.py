@@ -0,0 +1,307 @@
+from agents.mcp import MCPServer
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import threading
+import time
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+TURN_BUCKETS = (1, 2, 3, 5, 8, 13, 20)
+TOKEN_BUCKETS = (500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+# Tool calls made outside any agent run (price history top-ups, screening)
+PIPELINE_AGENT = "Pipeline"
+
+METRIC_HELP = {
+    "research_agent_runs_total": ("counter", "Agent runs by outcome"),
+    "research_agent_run_seconds": ("histogram", "Wall time of one agent run"),
+    "research_agent_turns": ("histogram", "Model requests (turns) used by one agent run"),
+    "research_agent_tokens_total": ("counter", "Model tokens used by agent runs"),
+    "research_agent_run_tokens": ("histogram", "Input plus output tokens of one agent run"),
+    "research_tool_calls_total": ("counter", "MCP tool calls by tool and calling agent"),
+    "research_tool_errors_total": ("counter", "MCP tool calls that raised or returned an error"),
+    "research_tool_call_seconds": ("histogram", "Wall time of one MCP tool call, cache hits included"),
+    "research_session_seconds": ("histogram", "Wall time of a research session"),
+}
+
+# The metrics scope (see metrics_scope) and the agent whose run is in progress
+# in the current task; child tasks inherit both
+_current_scope = ContextVar("research_metrics_scope", default=None)
+_current_agent = ContextVar("research_metrics_agent", default=None)
+
+
+def current_agent() -> str:
+    """Label of the agent whose run is in progress in this task, or None."""
+    return _current_agent.get()
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labels: tuple, le: str = None) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if le is not None:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms for agent runs and MCP tool calls,
+    rendered in the Prometheus text exposition format.
+
+    Each worker process keeps its own registry; scrape every worker (or
+    aggregate with `sum by`) when running several.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name: str, labels: dict = None, value: float = 1):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: dict = None, buckets: tuple = SECONDS_BUCKETS):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()
+            }
+
+        lines = []
+        names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+        for name in names:
+            kind, text = METRIC_HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_label_text(labels)} {_number(value)}")
+            for (metric, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_label_text(labels, _number(bound))} {cumulative}")
+                lines.append(f"{name}_bucket{_label_text(labels, '+Inf')} {count}")
+                lines.append(f"{name}_sum{_label_text(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_label_text(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsScope:
+    """
+    Per-agent totals for one unit of work (a session, or one company's report).
+
+    Scopes nest: whatever is recorded in a scope is added to every enclosing
+    scope too, so a sector session sees the sum of its company reports.
+    """
+
+    FIELDS = ("runs", "errors", "wall_seconds", "turns", "tool_calls", "tool_errors", "tool_seconds",
+              "input_tokens", "output_tokens")
+
+    def __init__(self, parent: "MetricsScope" = None):
+        self.parent = parent
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._agents = {}
+
+    def add(self, agent: str, **values):
+        scope = self
+        while scope is not None:
+            with scope._lock:
+                totals = scope._agents.setdefault(agent, dict.fromkeys(self.FIELDS, 0))
+                for field, value in values.items():
+                    totals[field] += value
+            scope = scope.parent
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            agents = {agent: dict(totals) for agent, totals in self._agents.items()}
+        for totals in agents.values():
+            totals["wall_seconds"] = round(totals["wall_seconds"], 3)
+            totals["tool_seconds"] = round(totals["tool_seconds"], 3)
+        overall = {field: sum(totals[field] for totals in agents.values()) for field in self.FIELDS}
+        overall["wall_seconds"] = round(time.perf_counter() - self.started, 3)
+        overall["tool_seconds"] = round(overall["tool_seconds"], 3)
+        # Agents run concurrently, so their wall times add up to more than the session's
+        overall["agent_seconds"] = round(sum(totals["wall_seconds"] for totals in agents.values()), 3)
+        return {"totals": overall, "agents": agents}
+
+
+@contextmanager
+def metrics_scope():
+    """Open a MetricsScope for the current task (and tasks it starts) until the block exits."""
+    scope = MetricsScope(parent=_current_scope.get())
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def _record(agent: str, **values):
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.add(agent, **values)
+
+
+class AgentRun:
+    """Handle yielded by track_agent_run; set `result` to the finished RunResult."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.result = None
+
+
+@contextmanager
+def track_agent_run(registry: MetricsRegistry, agent: str):
+    """
+    Time one agent run and record its turns and token usage.
+
+    Usage is read from the RunResult the caller stores on the handle, or from
+    the run data the Agents SDK attaches to a failed run's exception. Tool
+    calls made during the run are attributed to `agent`.
+    """
+    run = AgentRun(agent)
+    token = _current_agent.set(agent)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield run
+        outcome = "ok"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    except Exception as e:
+        # Runs stopped at their time budget (deadlines.StageTimeout) are a TimeoutError
+        if isinstance(e, TimeoutError):
+            outcome = "timeout"
+        if run.result is None:
+            run.result = getattr(e, "run_data", None)
+        raise
+    finally:
+        _current_agent.reset(token)
+        elapsed = time.perf_counter() - started
+        usage = getattr(getattr(run.result, "context_wrapper", None), "usage", None)
+        turns = getattr(usage, "requests", 0) or 0
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+
+        labels = {"agent": agent}
+        registry.inc("research_agent_runs_total", {**labels, "outcome": outcome})
+        registry.observe("research_agent_run_seconds", elapsed, labels)
+        if turns:
+            registry.observe("research_agent_turns", turns, labels, TURN_BUCKETS)
+            registry.observe("research_agent_run_tokens", input_tokens + output_tokens, labels, TOKEN_BUCKETS)
+            registry.inc("research_agent_tokens_total", {**labels, "direction": "input"}, input_tokens)
+            registry.inc("research_agent_tokens_total", {**labels, "direction": "output"}, output_tokens)
+        _record(
+            agent,
+            runs=1,
+            errors=int(outcome != "ok"),
+            wall_seconds=elapsed,
+            turns=turns,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+        )
+
+
+@contextmanager
+def track_session(registry: MetricsRegistry, kind: str):
+    """Time a whole research session ("stock", "sector" or "batch") by outcome."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        registry.observe("research_session_seconds", time.perf_counter() - started, {"kind": kind, "outcome": outcome})
+
+
+class InstrumentedMCPServer(MCPServer):
+    """MCP server wrapper that times every tool call and counts it against the calling agent."""
+
+    def __init__(self, server: MCPServer, registry: MetricsRegistry):
+        super().__init__(use_structured_content=getattr(server, "use_structured_content", False))
+        self.server = server
+        self.registry = registry
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    async def connect(self):
+        await self.server.connect()
+
+    async def cleanup(self):
+        await self.server.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None):
+        return await self.server.list_tools(run_context, agent)
+
+    async def call_tool(self, tool_name: str, arguments: dict = None, meta: dict = None):
+        agent = _current_agent.get() or PIPELINE_AGENT
+        started = time.perf_counter()
+        failed = True
+        try:
+            if meta is None:
+                result = await self.server.call_tool(tool_name, arguments)
+            else:
+                result = await self.server.call_tool(tool_name, arguments, meta=meta)
+            failed = bool(getattr(result, "is_error", False) or getattr(result, "isError", False))
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self.registry.inc("research_tool_calls_total", {"tool": tool_name, "agent": agent})
+            self.registry.observe("research_tool_call_seconds", elapsed, {"tool": tool_name})
+            if failed:
+                self.registry.inc("research_tool_errors_total", {"tool": tool_name})
+            _record(agent, tool_calls=1, tool_errors=int(failed), tool_seconds=elapsed)
+
+    async def list_prompts(self):
+        return await self.server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: dict = None):
+        return await self.server.get_prompt(name, arguments)
@@ -0,0 +1,418 @@
+from concurrent.futures import Future
+import asyncio
+import itertools
+import threading
+import time
+
+# Scheduling classes: interactive (single-stock) jobs outweigh batch (sector)
+# jobs in the fair queue, and batch jobs never hold every slot at once
+INTERACTIVE = "interactive"
+BATCH = "batch"
+DEFAULT_CLASS_WEIGHTS = {INTERACTIVE: 4.0, BATCH: 1.0}
+# Starting guesses for run times, replaced by a moving average of real ones
+DEFAULT_EXPECTED_SECONDS = {INTERACTIVE: 180.0, BATCH: 900.0}
+EXPECTED_SECONDS_SMOOTHING = 0.2
+# How a started job ended; only completed runs feed the run-time estimate
+OUTCOMES = ("completed", "cancelled", "failed")
+
+
+class ExecutorBusy(Exception):
+    """Raised when the job queue is full and a new job cannot be accepted."""
+
+    def __init__(self, message: str, retry_after: int = None):
+        super().__init__(message)
+        # Seconds after which a retry has a fair chance of being accepted
+        self.retry_after = retry_after
+
+
+class _Job:
+    def __init__(self, job_id: str, coro_factory, on_position=None, user=None, priority: str = INTERACTIVE,
+                 cost: float = 1.0):
+        self.job_id = job_id
+        self.coro_factory = coro_factory
+        self.on_position = on_position
+        self.user = user
+        self.priority = priority
+        self.cost = cost
+        self.future = Future()
+        # Fair-queue tags (see AsyncJobExecutor._enqueue) and submission order
+        self.start_tag = 0.0
+        self.finish_tag = 0.0
+        self.seq = 0
+        # Last (position, eta) reported to on_position
+        self.reported = None
+        # Set once the job is dispatched / running on a worker loop
+        self.started_at = None
+        self.loop = None
+        self.task = None
+        self.cancel_requested = False
+
+
+class AsyncJobExecutor:
+    """
+    Runs research jobs on a small set of long-lived event loop threads.
+
+    Jobs wait in a bounded queue and are started only while fewer than
+    `max_in_flight` are running, so bursts queue up instead of oversubscribing
+    the box. The queue is a weighted fair queue over users: each user's jobs
+    are tagged with a virtual finish time (cost / class weight after the
+    user's previous job), and the job with the smallest tag that is within
+    its user's `max_per_user` running quota and its class's slot limit starts
+    next. Interactive jobs weigh more than batch jobs, and batch jobs are held
+    to `max_batch_in_flight` (below `max_in_flight`) so a slot stays free for
+    interactive work. The exception is a single-slot executor: there is no
+    slot to keep free, so batch jobs share it.
+
+    Waiting jobs are told their queue position and an estimated wait whenever
+    they change. Submissions beyond `max_queued` (or `max_queued_per_user`)
+    raise ExecutorBusy with a retry_after hint.
+
+    Each running job is its own asyncio task, so cancel() stops it at whatever
+    it is awaiting (a model request, an MCP call) instead of at the next
+    checkpoint. With `cancel_check(job_id)`, e.g. a shared job store's cancel
+    flag, running jobs are also cancelled within `cancel_poll_seconds` of a
+    cancel made by another process.
+    """
+
+    def __init__(
+        self,
+        num_loops: int = 2,
+        max_in_flight: int = 4,
+        max_queued: int = 50,
+        cancel_check=None,
+        cancel_poll_seconds: float = 0.5,
+        max_per_user: int = None,
+        max_queued_per_user: int = None,
+        max_batch_in_flight: int = None,
+        class_weights: dict = None,
+        expected_seconds: dict = None
+    ):
+        self.num_loops = max(1, num_loops)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.cancel_check = cancel_check
+        self.cancel_poll_seconds = max(0.05, cancel_poll_seconds)
+        # None or 0 = no per-user limit
+        self.max_per_user = max_per_user or None
+        self.max_queued_per_user = max_queued_per_user or None
+        # Batch jobs may take every slot but one; with a single slot they have to share it
+        batch_limit = max(1, self.max_in_flight - 1)
+        if max_batch_in_flight is None:
+            max_batch_in_flight = batch_limit
+        elif not 1 <= max_batch_in_flight <= batch_limit:
+            raise ValueError(
+                f"max_batch_in_flight must be between 1 and {batch_limit} with max_in_flight={self.max_in_flight}"
+            )
+        self.max_batch_in_flight = max_batch_in_flight
+        self.class_weights = {**DEFAULT_CLASS_WEIGHTS, **(class_weights or {})}
+        self._expected = {**DEFAULT_EXPECTED_SECONDS, **(expected_seconds or {})}
+        # (class, outcome) -> number of started jobs that ended that way
+        self._finished = {}
+
+        self._queue = []
+        self._seq = itertools.count()
+        # Start tag of the most recently dispatched job, and each user's last finish tag
+        self._virtual_time = 0.0
+        self._last_tags = {}
+        # Dispatched jobs (for quotas and ETAs) and those whose task is running (for cancel)
+        self._active = {}
+        self._running = {}
+        self._cond = threading.Condition()
+        self._loops = []
+        self._loop_cycle = None
+        self._dispatcher = None
+        self._started = False
+
+    def start(self):
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+
+        for index in range(self.num_loops):
+            loop_ready = threading.Event()
+            holder = {}
+
+            def run_loop(holder=holder, loop_ready=loop_ready):
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                holder["loop"] = loop
+                loop_ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run_loop, name=f"research-loop-{index}", daemon=True).start()
+            loop_ready.wait()
+            self._loops.append(holder["loop"])
+
+        self._loop_cycle = itertools.cycle(self._loops)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="research-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(
+        self,
+        job_id: str,
+        coro_factory,
+        on_position=None,
+        user=None,
+        priority: str = INTERACTIVE,
+        cost: float = 1.0
+    ) -> Future:
+        """
+        Queue a job. coro_factory is called on a worker loop to create the job's
+        coroutine; on_position(position, eta_seconds) is called while the job waits.
+
+        `user` is the fairness and quota key (None shares one anonymous flow),
+        `priority` the scheduling class (INTERACTIVE or BATCH) and `cost` the
+        job's expected work relative to a single-stock run.
+
+        Raises ExecutorBusy if the queue, or the user's share of it, is full.
+        """
+        if not self._started:
+            self.start()
+        if priority not in self.class_weights:
+            raise ValueError(f"Unknown priority class {priority!r}")
+        job = _Job(job_id, coro_factory, on_position, user, priority, max(cost, 0.01))
+        with self._cond:
+            free_slots = max(0, self.max_in_flight - len(self._active))
+            if len(self._queue) - free_slots >= self.max_queued:
+                raise ExecutorBusy("Research queue is full, please try again shortly", self._retry_after())
+            if self.max_queued_per_user is not None:
+                queued = sum(1 for waiting in self._queue if waiting.user == user)
+                if queued >= self.max_queued_per_user:
+                    raise ExecutorBusy(
+                        f"You already have {queued} research requests waiting; try again once one has started",
+                        self._retry_after(user),
+                    )
+            self._enqueue(job)
+            waiting = self._waiting_snapshot()
+            self._cond.notify_all()
+        self._notify_positions(waiting)
+        return job.future
+
+    def _enqueue(self, job: _Job):
+        # Start-time fair queuing: a user's job starts (virtually) when their
+        # previous one finishes, or now if they have nothing queued
+        job.seq = next(self._seq)
+        job.start_tag = max(self._virtual_time, self._last_tags.get(job.user, 0.0))
+        job.finish_tag = job.start_tag + job.cost / self.class_weights[job.priority]
+        self._last_tags[job.user] = job.finish_tag
+        self._queue.append(job)
+
+    def cancel(self, job_id: str):
+        """
+        Cancel a job. A queued job is dropped (its future is cancelled and it never
+        runs); a running job's task is cancelled on its loop. Returns "queued",
+        "running", or None if the job isn't known here.
+        """
+        with self._cond:
+            job = self._running.get(job_id)
+            if job is not None:
+                job.loop.call_soon_threadsafe(self._cancel_task, job)
+                return "running"
+            job = next((queued for queued in self._queue if queued.job_id == job_id), None)
+            if job is None:
+                return None
+            self._queue.remove(job)
+            waiting = self._waiting_snapshot()
+            self._cond.notify_all()
+        job.future.cancel()
+        self._notify_positions(waiting)
+        return "queued"
+
+    def state(self, job_id: str):
+        """Return "queued" or "running" for a job this executor still holds, else None."""
+        with self._cond:
+            if job_id in self._active or job_id in self._running:
+                return "running"
+            if any(queued.job_id == job_id for queued in self._queue):
+                return "queued"
+            return None
+
+    @staticmethod
+    def _cancel_task(job: _Job):
+        # Runs on the job's loop; cancelling more than once could interrupt cleanup
+        if job.cancel_requested or job.task is None or job.task.done():
+            return
+        job.cancel_requested = True
+        job.task.cancel()
+
+    async def _watch_cancel_flag(self, job: _Job):
+        while not job.task.done():
+            await asyncio.sleep(self.cancel_poll_seconds)
+            try:
+                cancelled = self.cancel_check(job.job_id)
+            except Exception as e:
+                print(f"[JOB_EXECUTOR] Cancel check failed for {job.job_id}: {e}")
+                continue
+            if cancelled:
+                self._cancel_task(job)
+                return
+
+    def _counts(self) -> tuple:
+        """Dispatched jobs per user and per class."""
+        per_user, per_class = {}, {}
+        for job in self._active.values():
+            per_user[job.user] = per_user.get(job.user, 0) + 1
+            per_class[job.priority] = per_class.get(job.priority, 0) + 1
+        return per_user, per_class
+
+    def _can_start(self, job: _Job, per_user: dict, per_class: dict) -> bool:
+        if self.max_per_user is not None and per_user.get(job.user, 0) >= self.max_per_user:
+            return False
+        return job.priority != BATCH or per_class.get(BATCH, 0) < self.max_batch_in_flight
+
+    def _plan(self) -> tuple:
+        """
+        Split the queue into (jobs the dispatcher can start right now, jobs
+        left waiting), both in fair-queue order.
+        """
+        per_user, per_class = self._counts()
+        free_slots = self.max_in_flight - len(self._active)
+        startable, waiting = [], []
+        for job in sorted(self._queue, key=lambda queued: (queued.finish_tag, queued.seq)):
+            if len(startable) < free_slots and self._can_start(job, per_user, per_class):
+                startable.append(job)
+                per_user[job.user] = per_user.get(job.user, 0) + 1
+                per_class[job.priority] = per_class.get(job.priority, 0) + 1
+            else:
+                waiting.append(job)
+        return startable, waiting
+
+    def _remaining_seconds(self, job: _Job, now: float) -> float:
+        return max(0.0, self._expected[job.priority] - (now - job.started_at))
+
+    def _waiting_snapshot(self) -> list:
+        """(job, position, eta_seconds) for every waiting job; eta spreads the work ahead over all slots."""
+        _, waiting = self._plan()
+        now = time.monotonic()
+        work_ahead = sum(self._remaining_seconds(job, now) for job in self._active.values())
+        snapshot = []
+        for position, job in enumerate(waiting, 1):
+            snapshot.append((job, position, round(work_ahead / self.max_in_flight)))
+            work_ahead += self._expected[job.priority]
+        return snapshot
+
+    def _retry_after(self, user=None) -> int:
+        """Seconds until the next dispatch: the soonest expected finish among running jobs (of `user`, if given)."""
+        now = time.monotonic()
+        remaining = [
+            self._remaining_seconds(job, now)
+            for job in self._active.values()
+            if user is None or job.user == user
+        ]
+        return max(1, round(min(remaining) if remaining else self._expected[INTERACTIVE]))
+
+    @staticmethod
+    def _notify_positions(waiting: list):
+        for job, position, eta in waiting:
+            if job.on_position is None:
+                continue
+            # Skip updates that only move the estimate a little
+            if job.reported is not None:
+                last_position, last_eta = job.reported
+                if position == last_position and abs(eta - last_eta) < max(15, last_eta * 0.2):
+                    continue
+            job.reported = (position, eta)
+            try:
+                job.on_position(position, eta)
+            except Exception as e:
+                print(f"[JOB_EXECUTOR] Failed to report queue position for {job.job_id}: {e}")
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while True:
+                    startable, _ = self._plan()
+                    if startable:
+                        break
+                    self._cond.wait()
+                job = startable[0]
+                self._queue.remove(job)
+                job.started_at = time.monotonic()
+                self._active[job.job_id] = job
+                self._virtual_time = max(self._virtual_time, job.start_tag)
+                # Users whose last tag is behind the virtual clock start from it anyway
+                for user, tag in list(self._last_tags.items()):
+                    if tag <= self._virtual_time:
+                        del self._last_tags[user]
+                waiting = self._waiting_snapshot()
+                loop = next(self._loop_cycle)
+            self._notify_positions(waiting)
+            asyncio.run_coroutine_threadsafe(self._run(job), loop)
+
+    async def _run(self, job: _Job):
+        watcher = None
+        try:
+            job.loop = asyncio.get_running_loop()
+            job.task = asyncio.create_task(job.coro_factory())
+            with self._cond:
+                self._running[job.job_id] = job
+            if self.cancel_check is not None:
+                watcher = asyncio.create_task(self._watch_cancel_flag(job))
+            result = await job.task
+        except asyncio.CancelledError:
+            job.future.cancel()
+            # Only swallow the job's own cancellation, not the worker loop shutting down
+            if job.task is None or not job.task.cancelled():
+                raise
+            self._record_outcome(job, "cancelled")
+        except BaseException as e:
+            job.future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            self._record_outcome(job, "failed")
+        else:
+            job.future.set_result(result)
+            # Jobs that handle their own cancellation (see research_system.ResearchCancelled) return normally
+            self._record_outcome(job, "cancelled" if self._was_cancelled(job) else "completed")
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            with self._cond:
+                if self._running.get(job.job_id) is job:
+                    del self._running[job.job_id]
+                if self._active.get(job.job_id) is job:
+                    del self._active[job.job_id]
+                waiting = self._waiting_snapshot()
+                self._cond.notify_all()
+            self._notify_positions(waiting)
+
+    def _was_cancelled(self, job: _Job) -> bool:
+        if job.cancel_requested:
+            return True
+        if self.cancel_check is None:
+            return False
+        try:
+            return bool(self.cancel_check(job.job_id))
+        except Exception as e:
+            print(f"[JOB_EXECUTOR] Cancel check failed for {job.job_id}: {e}")
+            return False
+
+    def _record_outcome(self, job: _Job, outcome: str):
+        elapsed = time.monotonic() - job.started_at
+        with self._cond:
+            key = (job.priority, outcome)
+            self._finished[key] = self._finished.get(key, 0) + 1
+            # Cancelled and failed runs stop early and would drag the estimate down
+            if outcome == "completed":
+                expected = self._expected[job.priority]
+                self._expected[job.priority] = expected + EXPECTED_SECONDS_SMOOTHING * (elapsed - expected)
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = {
+                "loops": len(self._loops),
+                "in_flight": len(self._active),
+                "queued": len(self._queue),
+                "max_in_flight": self.max_in_flight,
+                "max_queued": self.max_queued,
+                "users_queued": len({job.user for job in self._queue}),
+            }
+            _, per_class = self._counts()
+            for priority in self.class_weights:
+                stats[f"{priority}_in_flight"] = per_class.get(priority, 0)
+                stats[f"{priority}_queued"] = sum(1 for job in self._queue if job.priority == priority)
+                stats[f"{priority}_expected_seconds"] = round(self._expected[priority], 1)
+                for outcome in OUTCOMES:
+                    stats[f"{priority}_{outcome}_total"] = self._finished.get((priority, outcome), 0)
+            return stats
@@ -0,0 +1,555 @@
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import redis
+    from redis import exceptions as redis_exceptions
+except ImportError:
+    redis = None
+    redis_exceptions = None
+
+TERMINAL_STATUSES = ("complete", "error", "cancelled")
+
+
+class JobStore(ABC):
+    """
+    Session/job state shared by every worker process.
+
+    Holds each research job's owner, status and cancel flag, plus an
+    append-only log of its progress events with per-session sequence numbers.
+    Because the SSE request and the job may land on different workers, all of
+    this lives here rather than in module-level dicts.
+
+    Only the newest `max_events` events of a session are kept. Reading never
+    consumes events, so any number of SSE subscribers can follow one log and a
+    reconnecting client resumes from the last sequence number it saw.
+
+    Each job can also checkpoint the output of every pipeline stage it
+    completes (keyed by stage name, JSON-serialisable values). A resumed job
+    copies those checkpoints and skips the stages they cover.
+    """
+
+    def __init__(self, max_events: int = 1000):
+        self.max_events = max(1, max_events)
+        self._changed = threading.Condition()
+        # session_id -> {(loop, asyncio.Event)} for coroutines waiting on it
+        self._async_waiters = {}
+
+    def _signal_change(self, session_id: str = None):
+        with self._changed:
+            self._changed.notify_all()
+            waiters = list(self._async_waiters.get(session_id, ()))
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiting loop has already shut down
+                pass
+
+    def wait_for_change(self, timeout: float):
+        """
+        Sleep up to `timeout` seconds, waking early when this process writes
+        to the store. Writes from other processes are seen on the next poll.
+        """
+        with self._changed:
+            self._changed.wait(timeout)
+
+    async def wait_for_change_async(self, session_ids, timeout: float) -> bool:
+        """
+        Coroutine version of wait_for_change that only wakes for writes to the
+        given sessions, so idle streams cost a pending Event rather than a thread.
+
+        Returns True if a write from this process woke it, False on timeout.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._changed:
+            for session_id in session_ids:
+                self._async_waiters.setdefault(session_id, set()).add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._changed:
+                for session_id in session_ids:
+                    waiters = self._async_waiters.get(session_id)
+                    if waiters is not None:
+                        waiters.discard(waiter)
+                        if not waiters:
+                            del self._async_waiters[session_id]
+
+    @abstractmethod
+    def create_job(self, session_id: str, owner: str, kind: str, params: dict = None, alias_of: str = None):
+        """Register a new queued job."""
+
+    @abstractmethod
+    def get_job(self, session_id: str):
+        """Return the job record as a dict, or None."""
+
+    @abstractmethod
+    def update_job(self, session_id: str, status: str):
+        """Set a job's status; a job that no longer exists is left alone."""
+
+    @abstractmethod
+    def request_cancel(self, session_id: str):
+        """Flag a job as cancelled; a job that no longer exists is left alone."""
+
+    @abstractmethod
+    def is_cancelled(self, session_id: str) -> bool:
+        """Whether the job's cancel flag is set."""
+
+    @abstractmethod
+    def append_event(self, session_id: str, event: dict) -> int:
+        """Append a progress event and return its sequence number (starting at 1)."""
+
+    @abstractmethod
+    def read_events(self, session_id: str, after_seq: int = 0, limit: int = 500) -> list:
+        """Return [(seq, event), ...] with seq > after_seq in order."""
+
+    @abstractmethod
+    def save_checkpoint(self, session_id: str, stage: str, value):
+        """Record the output of a completed stage, replacing any earlier one."""
+
+    @abstractmethod
+    def load_checkpoints(self, session_id: str) -> dict:
+        """Return {stage: value} for every stage the session has checkpointed."""
+
+    def copy_checkpoints(self, source_session_id: str, target_session_id: str) -> int:
+        """Seed a resumed session with another session's checkpoints; returns how many."""
+        checkpoints = self.load_checkpoints(source_session_id)
+        for stage, value in checkpoints.items():
+            self.save_checkpoint(target_session_id, stage, value)
+        return len(checkpoints)
+
+    @abstractmethod
+    def delete_job(self, session_id: str):
+        """Drop a job with its events and checkpoints."""
+
+    @abstractmethod
+    def purge_finished(self, older_than_seconds: float):
+        """Drop finished jobs (and their events) last touched before the cutoff."""
+
+    def get_owner(self, session_id: str):
+        job = self.get_job(session_id)
+        return job["owner"] if job else None
+
+
+class MemoryJobStore(JobStore):
+    """In-process store for a single worker, tests and local runs."""
+
+    def __init__(self, max_events: int = 1000):
+        super().__init__(max_events)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._events = {}
+        self._checkpoints = {}
+
+    def create_job(self, session_id, owner, kind, params=None, alias_of=None):
+        now = time.time()
+        with self._lock:
+            self._jobs[session_id] = {
+                "session_id": session_id,
+                "owner": owner,
+                "kind": kind,
+                "status": "queued",
+                "params": params or {},
+                "alias_of": alias_of,
+                "cancelled": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            self._events.setdefault(session_id, [])
+
+    def get_job(self, session_id):
+        with self._lock:
+            job = self._jobs.get(session_id)
+            return dict(job) if job else None
+
+    def update_job(self, session_id, status):
+        with self._lock:
+            job = self._jobs.get(session_id)
+            if job:
+                job["status"] = status
+                job["updated_at"] = time.time()
+        self._signal_change(session_id)
+
+    def request_cancel(self, session_id):
+        with self._lock:
+            job = self._jobs.get(session_id)
+            if job:
+                job["cancelled"] = True
+                job["updated_at"] = time.time()
+        self._signal_change(session_id)
+
+    def is_cancelled(self, session_id):
+        with self._lock:
+            job = self._jobs.get(session_id)
+            return bool(job and job["cancelled"])
+
+    def append_event(self, session_id, event):
+        with self._lock:
+            events = self._events.setdefault(session_id, [])
+            seq = events[-1][0] + 1 if events else 1
+            events.append((seq, event))
+            if len(events) > self.max_events:
+                del events[:len(events) - self.max_events]
+        self._signal_change(session_id)
+        return seq
+
+    def read_events(self, session_id, after_seq=0, limit=500):
+        with self._lock:
+            events = self._events.get(session_id, [])
+            return [item for item in events if item[0] > after_seq][:limit]
+
+    def save_checkpoint(self, session_id, stage, value):
+        # Round-trip through JSON so values behave as they would in a shared store
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            self._checkpoints.setdefault(session_id, {})[stage] = payload
+
+    def load_checkpoints(self, session_id):
+        with self._lock:
+            stored = dict(self._checkpoints.get(session_id, {}))
+        return {stage: json.loads(payload) for stage, payload in stored.items()}
+
+    def delete_job(self, session_id):
+        with self._lock:
+            self._jobs.pop(session_id, None)
+            self._events.pop(session_id, None)
+            self._checkpoints.pop(session_id, None)
+
+    def purge_finished(self, older_than_seconds):
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            for session_id, job in list(self._jobs.items()):
+                if job["status"] in TERMINAL_STATUSES and job["updated_at"] < cutoff:
+                    self._jobs.pop(session_id, None)
+                    self._events.pop(session_id, None)
+                    self._checkpoints.pop(session_id, None)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Default store: one SQLite file shared by every worker on the host.
+
+    WAL mode lets SSE readers poll while a job appends events.
+    """
+
+    def __init__(self, path: str, max_events: int = 1000):
+        super().__init__(max_events)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    session_id TEXT PRIMARY KEY,
+                    owner TEXT,
+                    kind TEXT,
+                    status TEXT,
+                    params TEXT,
+                    alias_of TEXT,
+                    cancelled INTEGER DEFAULT 0,
+                    created_at REAL,
+                    updated_at REAL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_events (
+                    session_id TEXT,
+                    seq INTEGER,
+                    payload TEXT,
+                    created_at REAL,
+                    PRIMARY KEY (session_id, seq)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_checkpoints (
+                    session_id TEXT,
+                    stage TEXT,
+                    payload TEXT,
+                    created_at REAL,
+                    PRIMARY KEY (session_id, stage)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def create_job(self, session_id, owner, kind, params=None, alias_of=None):
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO jobs (session_id, owner, kind, status, params, alias_of, cancelled, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, 0, ?, ?)",
+            (session_id, owner, kind, json.dumps(params or {}), alias_of, now, now),
+        )
+
+    def get_job(self, session_id):
+        row = self._connect().execute(
+            "SELECT session_id, owner, kind, status, params, alias_of, cancelled, created_at, updated_at "
+            "FROM jobs WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "session_id": row[0],
+            "owner": row[1],
+            "kind": row[2],
+            "status": row[3],
+            "params": json.loads(row[4] or "{}"),
+            "alias_of": row[5],
+            "cancelled": bool(row[6]),
+            "created_at": row[7],
+            "updated_at": row[8],
+        }
+
+    def update_job(self, session_id, status):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE session_id = ?",
+            (status, time.time(), session_id),
+        )
+        self._signal_change(session_id)
+
+    def request_cancel(self, session_id):
+        self._connect().execute(
+            "UPDATE jobs SET cancelled = 1, updated_at = ? WHERE session_id = ?",
+            (time.time(), session_id),
+        )
+        self._signal_change(session_id)
+
+    def is_cancelled(self, session_id):
+        row = self._connect().execute(
+            "SELECT cancelled FROM jobs WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def append_event(self, session_id, event):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            seq = row[0] + 1
+            conn.execute(
+                "INSERT INTO job_events (session_id, seq, payload, created_at) VALUES (?, ?, ?, ?)",
+                (session_id, seq, json.dumps(event, default=str), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM job_events WHERE session_id = ? AND seq <= ?",
+                (session_id, seq - self.max_events),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._signal_change(session_id)
+        return seq
+
+    def read_events(self, session_id, after_seq=0, limit=500):
+        rows = self._connect().execute(
+            "SELECT seq, payload FROM job_events WHERE session_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (session_id, after_seq, limit),
+        ).fetchall()
+        return [(seq, json.loads(payload)) for seq, payload in rows]
+
+    def save_checkpoint(self, session_id, stage, value):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO job_checkpoints (session_id, stage, payload, created_at) VALUES (?, ?, ?, ?)",
+            (session_id, stage, json.dumps(value, default=str), time.time()),
+        )
+
+    def load_checkpoints(self, session_id):
+        rows = self._connect().execute(
+            "SELECT stage, payload FROM job_checkpoints WHERE session_id = ?", (session_id,)
+        ).fetchall()
+        return {stage: json.loads(payload) for stage, payload in rows}
+
+    def delete_job(self, session_id):
+        conn = self._connect()
+        conn.execute("DELETE FROM job_events WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM job_checkpoints WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM jobs WHERE session_id = ?", (session_id,))
+
+    def purge_finished(self, older_than_seconds):
+        cutoff = time.time() - older_than_seconds
+        conn = self._connect()
+        placeholders = ", ".join("?" for _ in TERMINAL_STATUSES)
+        for table in ("job_events", "job_checkpoints"):
+            conn.execute(
+                f"DELETE FROM {table} WHERE session_id IN (SELECT session_id FROM jobs "
+                f"WHERE status IN ({placeholders}) AND updated_at < ?)",
+                (*TERMINAL_STATUSES, cutoff),
+            )
+        conn.execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+            (*TERMINAL_STATUSES, cutoff),
+        )
+
+
+class RedisJobStore(JobStore):
+    """
+    Store for multi-host deployments, backed by any redis-py compatible client
+    (a real Redis, or a local stand-in such as fakeredis in development).
+    """
+
+    def __init__(self, client, prefix: str = "research", ttl_seconds: int = 24 * 3600, max_events: int = 1000):
+        super().__init__(max_events)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def _job_key(self, session_id):
+        return f"{self.prefix}:job:{session_id}"
+
+    def _events_key(self, session_id):
+        return f"{self.prefix}:events:{session_id}"
+
+    def _seq_key(self, session_id):
+        return f"{self.prefix}:seq:{session_id}"
+
+    def _checkpoints_key(self, session_id):
+        return f"{self.prefix}:checkpoints:{session_id}"
+
+    @staticmethod
+    def _text(value):
+        return value.decode() if isinstance(value, bytes) else value
+
+    def create_job(self, session_id, owner, kind, params=None, alias_of=None):
+        now = time.time()
+        key = self._job_key(session_id)
+        self.client.hset(key, mapping={
+            "session_id": session_id,
+            "owner": owner or "",
+            "kind": kind,
+            "status": "queued",
+            "params": json.dumps(params or {}),
+            "alias_of": alias_of or "",
+            "cancelled": "0",
+            "created_at": str(now),
+            "updated_at": str(now),
+        })
+        self.client.expire(key, self.ttl_seconds)
+
+    def get_job(self, session_id):
+        raw = self.client.hgetall(self._job_key(session_id))
+        data = {self._text(k): self._text(v) for k, v in raw.items()}
+        # A hash without these was never created by create_job (or is a stray partial write)
+        if "session_id" not in data or "owner" not in data:
+            return None
+        return {
+            "session_id": data["session_id"],
+            "owner": data.get("owner") or None,
+            "kind": data.get("kind"),
+            "status": data.get("status"),
+            "params": json.loads(data.get("params") or "{}"),
+            "alias_of": data.get("alias_of") or None,
+            "cancelled": data.get("cancelled") == "1",
+            "created_at": float(data.get("created_at", 0)),
+            "updated_at": float(data.get("updated_at", 0)),
+        }
+
+    def _update_existing(self, session_id, fields: dict) -> bool:
+        """Write fields to a job hash only if it still exists, so late writes can't revive an expired job."""
+        key = self._job_key(session_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    if not pipe.exists(key):
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.hset(key, mapping=fields)
+                    pipe.execute()
+                    return True
+                except redis_exceptions.WatchError:
+                    # Another writer touched the job in between; try again
+                    continue
+
+    def update_job(self, session_id, status):
+        if self._update_existing(session_id, {"status": status, "updated_at": str(time.time())}):
+            self._signal_change(session_id)
+
+    def request_cancel(self, session_id):
+        if self._update_existing(session_id, {"cancelled": "1", "updated_at": str(time.time())}):
+            self._signal_change(session_id)
+
+    def is_cancelled(self, session_id):
+        return self._text(self.client.hget(self._job_key(session_id), "cancelled")) == "1"
+
+    def append_event(self, session_id, event):
+        seq = int(self.client.incr(self._seq_key(session_id)))
+        events_key = self._events_key(session_id)
+        self.client.zadd(events_key, {json.dumps({"seq": seq, "event": event}, default=str): seq})
+        self.client.zremrangebyrank(events_key, 0, -self.max_events - 1)
+        self.client.expire(events_key, self.ttl_seconds)
+        self.client.expire(self._seq_key(session_id), self.ttl_seconds)
+        self._signal_change(session_id)
+        return seq
+
+    def read_events(self, session_id, after_seq=0, limit=500):
+        raw = self.client.zrangebyscore(self._events_key(session_id), f"({after_seq}", "+inf", start=0, num=limit)
+        items = [json.loads(self._text(item)) for item in raw]
+        return [(item["seq"], item["event"]) for item in items]
+
+    def save_checkpoint(self, session_id, stage, value):
+        key = self._checkpoints_key(session_id)
+        self.client.hset(key, stage, json.dumps(value, default=str))
+        self.client.expire(key, self.ttl_seconds)
+
+    def load_checkpoints(self, session_id):
+        raw = self.client.hgetall(self._checkpoints_key(session_id))
+        return {self._text(stage): json.loads(self._text(payload)) for stage, payload in raw.items()}
+
+    def delete_job(self, session_id):
+        self.client.delete(
+            self._job_key(session_id),
+            self._events_key(session_id),
+            self._seq_key(session_id),
+            self._checkpoints_key(session_id),
+        )
+
+    def purge_finished(self, older_than_seconds):
+        # Keys expire on their own after ttl_seconds
+        pass
+
+
+def create_job_store(url: str = None, max_events: int = 1000) -> JobStore:
+    """
+    Build a store from a URL:
+
+        sqlite:///path/to/jobs.db   (default: research_jobs.db next to the app)
+        redis://host:6379/0
+        memory://
+    """
+    url = url or "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "research_jobs.db")
+    if url.startswith("memory://"):
+        return MemoryJobStore(max_events=max_events)
+    if url.startswith("sqlite:///"):
+        return SQLiteJobStore(url[len("sqlite:///"):], max_events=max_events)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if redis is None:
+            raise RuntimeError("JOB_STORE_URL points at Redis but the redis package is not installed.")
+        return RedisJobStore(redis.Redis.from_url(url), max_events=max_events)
+    raise ValueError(f"Unsupported job store URL: {url}")
@@ -0,0 +1,375 @@
+from agents.mcp import MCPServer, MCPServerStdio
+from contextlib import asynccontextmanager
+from mcp.shared import exceptions as mcp_exceptions
+import asyncio
+import atexit
+import threading
+
+# mcp 2.x renamed McpError to MCPError
+MCPError = getattr(mcp_exceptions, "MCPError", None) or getattr(mcp_exceptions, "McpError")
+
+# JSON-RPC codes the MCP client raises itself when the transport is gone or hung
+CONNECTION_CLOSED = -32000
+REQUEST_TIMEOUT = -32001
+
+
+def _server_answered(error: BaseException) -> bool:
+    """True when an MCP error is a reply from a live server rather than a dead transport."""
+    if not isinstance(error, MCPError):
+        return False
+    code = getattr(getattr(error, "error", None), "code", None)
+    return code not in (CONNECTION_CLOSED, REQUEST_TIMEOUT)
+
+
+class _PoolMember:
+    """One long-lived MCP server connection owned by the pool."""
+
+    def __init__(self, kind: str, index: int):
+        self.kind = kind
+        self.index = index
+        self.server = None
+        self.healthy = False
+        self.error = None
+        self.leases = 0
+        self.restarts = 0
+        self.ready = asyncio.Event()
+        self.wake = asyncio.Event()
+        self.stopping = False
+        self.task = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}-{self.index}"
+
+
+class PooledMCPServer(MCPServer):
+    """
+    Lightweight MCP server handle leased from an MCPServerPool.
+
+    Agents use it like any connected server; every call is forwarded to the
+    pool's event loop, where the real stdio session lives. connect() and
+    cleanup() are no-ops because the pool owns the connection lifecycle.
+    """
+
+    def __init__(self, pool: "MCPServerPool", member: _PoolMember):
+        super().__init__(use_structured_content=False)
+        self._pool = pool
+        self._member = member
+
+    @property
+    def name(self) -> str:
+        return self._member.name
+
+    async def connect(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def list_tools(self, run_context=None, agent=None):
+        return await self._pool._call_member(
+            self._member, lambda server: server.list_tools(run_context, agent)
+        )
+
+    async def call_tool(self, tool_name: str, arguments: dict = None, meta: dict = None):
+        if meta is None:
+            return await self._pool._call_member(
+                self._member, lambda server: server.call_tool(tool_name, arguments)
+            )
+        return await self._pool._call_member(
+            self._member, lambda server: server.call_tool(tool_name, arguments, meta=meta)
+        )
+
+    async def list_prompts(self):
+        return await self._pool._call_member(self._member, lambda server: server.list_prompts())
+
+    async def get_prompt(self, name: str, arguments: dict = None):
+        return await self._pool._call_member(
+            self._member, lambda server: server.get_prompt(name, arguments)
+        )
+
+
+class MCPServerPool:
+    """
+    Process-wide pool of connected MCP servers, leased to research sessions.
+
+    Each server kind (e.g. "yahoo", "brave") gets up to `max_size` stdio
+    subprocesses that stay connected for the life of the process. The pool runs
+    its own event loop thread so the sessions survive the short-lived loops of
+    individual research jobs. Idle servers are pinged periodically and crashed
+    ones are restarted in the background.
+    """
+
+    def __init__(
+        self,
+        server_params: dict,
+        max_size: int = 2,
+        client_session_timeout_seconds: float = 1200,
+        health_check_interval: float = 60,
+        connect_timeout: float = 120
+    ):
+        self.server_params = server_params
+        self.max_size = max(1, max_size)
+        self.client_session_timeout_seconds = client_session_timeout_seconds
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+
+        self._members = {kind: [] for kind in server_params}
+        self._loop = None
+        self._thread = None
+        self._health_task = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self, warm: bool = True, wait: bool = False):
+        """
+        Start the pool's event loop thread.
+
+        With warm=True one server of every kind is connected straight away;
+        wait=True blocks until those connections are ready.
+        """
+        with self._start_lock:
+            if self.running:
+                return
+            loop_ready = threading.Event()
+
+            def run_loop():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                loop_ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="mcp-pool", daemon=True)
+            self._thread.start()
+            loop_ready.wait()
+            atexit.register(self.stop)
+
+            asyncio.run_coroutine_threadsafe(self._start_health_checks(), self._loop)
+
+        if warm:
+            future = asyncio.run_coroutine_threadsafe(self._warm(), self._loop)
+            if wait:
+                future.result(timeout=self.connect_timeout)
+
+    def stop(self, timeout: float = 15):
+        """Disconnect every pooled server and stop the pool's event loop."""
+        if not self.running:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            print(f"[MCP_POOL] Error during shutdown: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=timeout)
+        self._loop = None
+
+    async def _warm(self):
+        await asyncio.gather(
+            *(self._acquire_member(kind, lease=False) for kind in self._members),
+            return_exceptions=True
+        )
+        print(f"[MCP_POOL] Warmed pool: {self.stats()}")
+
+    async def _shutdown(self):
+        if self._health_task:
+            self._health_task.cancel()
+        tasks = []
+        for members in self._members.values():
+            for member in members:
+                member.stopping = True
+                member.wake.set()
+                if member.task:
+                    tasks.append(member.task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Server ownership (runs on the pool loop)
+    # ------------------------------------------------------------------
+
+    async def _keep_member(self, member: _PoolMember):
+        """
+        Own one server for its whole life: connect, wait until a restart or
+        shutdown is requested, clean up, repeat. Connect and cleanup must run in
+        the same task for the stdio transport to shut down cleanly.
+        """
+        backoff = 1
+        while not member.stopping:
+            server = MCPServerStdio(
+                params=self.server_params[member.kind],
+                name=member.name,
+                cache_tools_list=True,
+                client_session_timeout_seconds=self.client_session_timeout_seconds
+            )
+            member.wake.clear()
+            try:
+                await server.connect()
+                member.server = server
+                member.healthy = True
+                member.error = None
+                backoff = 1
+                print(f"[MCP_POOL] {member.name} connected")
+            except Exception as e:
+                member.error = e
+                print(f"[MCP_POOL] {member.name} failed to connect: {e}")
+            member.ready.set()
+
+            if member.healthy:
+                await member.wake.wait()
+            else:
+                try:
+                    await asyncio.wait_for(member.wake.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, 30)
+
+            member.healthy = False
+            member.ready.clear()
+            member.server = None
+            try:
+                await server.cleanup()
+            except Exception as e:
+                print(f"[MCP_POOL] Error cleaning up {member.name}: {e}")
+            if not member.stopping:
+                member.restarts += 1
+                print(f"[MCP_POOL] Restarting {member.name}")
+
+    def _spawn_member(self, kind: str) -> _PoolMember:
+        member = _PoolMember(kind, len(self._members[kind]))
+        member.task = asyncio.create_task(self._keep_member(member))
+        self._members[kind].append(member)
+        return member
+
+    async def _acquire_member(self, kind: str, lease: bool = True) -> _PoolMember:
+        """Pick the least-loaded healthy server of a kind, growing the pool up to max_size."""
+        members = self._members[kind]
+        idle_healthy = [m for m in members if m.healthy and m.leases == 0]
+        if idle_healthy:
+            member = idle_healthy[0]
+        elif len(members) < self.max_size:
+            member = self._spawn_member(kind)
+        else:
+            # Every server is busy; MCP sessions multiplex requests, so share one.
+            healthy = [m for m in members if m.healthy] or members
+            member = min(healthy, key=lambda m: m.leases)
+
+        if lease:
+            member.leases += 1
+        try:
+            await asyncio.wait_for(member.ready.wait(), timeout=self.connect_timeout)
+            if not member.healthy:
+                raise RuntimeError(f"MCP server {member.name} is unavailable: {member.error}")
+        except BaseException:
+            if lease:
+                member.leases -= 1
+            raise
+        return member
+
+    def _release_member(self, member: _PoolMember):
+        member.leases = max(0, member.leases - 1)
+
+    async def _check_member(self, member: _PoolMember) -> bool:
+        """Ping a server; request a restart if it doesn't answer."""
+        server = member.server
+        if not member.healthy or server is None:
+            return False
+        try:
+            session = getattr(server, "session", None)
+            if session is not None:
+                await asyncio.wait_for(session.send_ping(), timeout=15)
+            else:
+                await asyncio.wait_for(server.list_tools(), timeout=15)
+            return True
+        except Exception as e:
+            if _server_answered(e):
+                # e.g. ping isn't implemented, but the server is clearly alive
+                return True
+            if member.server is server:
+                print(f"[MCP_POOL] Health check failed for {member.name}: {e}")
+                member.healthy = False
+                member.wake.set()
+            return False
+
+    async def _start_health_checks(self):
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for members in self._members.values():
+                for member in members:
+                    if member.healthy and member.leases == 0:
+                        await self._check_member(member)
+
+    # ------------------------------------------------------------------
+    # Cross-loop access
+    # ------------------------------------------------------------------
+
+    async def _on_pool_loop(self, coro_factory):
+        """Await a coroutine on the pool loop from whichever loop the caller runs on."""
+        if not self.running:
+            raise RuntimeError("MCP server pool is not running")
+        if asyncio.get_running_loop() is self._loop:
+            return await coro_factory()
+        future = asyncio.run_coroutine_threadsafe(coro_factory(), self._loop)
+        return await asyncio.wrap_future(future)
+
+    async def _call_member(self, member: _PoolMember, call):
+        async def run():
+            await asyncio.wait_for(member.ready.wait(), timeout=self.connect_timeout)
+            server = member.server
+            if server is None:
+                raise RuntimeError(f"MCP server {member.name} is unavailable: {member.error}")
+            try:
+                return await call(server)
+            except Exception as e:
+                # Tool failures come back as results, so other exceptions usually
+                # mean a broken transport; verify in the background and restart if so.
+                if not _server_answered(e):
+                    asyncio.create_task(self._check_member(member))
+                raise
+
+        return await self._on_pool_loop(run)
+
+    @asynccontextmanager
+    async def lease(self, *kinds: str):
+        """
+        Lease one connected server per requested kind:
+
+            async with pool.lease("yahoo", "brave") as (yahoo_server, brave_server):
+                ...
+        """
+        if not self.running:
+            self.start(warm=False)
+
+        members = []
+        try:
+            for kind in kinds:
+                member = await self._on_pool_loop(lambda kind=kind: self._acquire_member(kind))
+                members.append(member)
+            yield [PooledMCPServer(self, member) for member in members]
+        finally:
+            if self.running:
+                for member in members:
+                    self._loop.call_soon_threadsafe(self._release_member, member)
+
+    def stats(self) -> dict:
+        return {
+            kind: [
+                {
+                    "name": member.name,
+                    "healthy": member.healthy,
+                    "leases": member.leases,
+                    "restarts": member.restarts,
+                }
+                for member in members
+            ]
+            for kind, members in self._members.items()
+        }
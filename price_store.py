@@ -0,0 +1,238 @@
+from contextlib import contextmanager
+from datetime import date
+import json
+import os
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# One fixed-size record per daily bar; a symbol's file is a flat array of these
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+# Smallest Yahoo Finance period covering a gap of up to N days
+REFRESH_PERIODS = [
+    (5, "5d"),
+    (30, "1mo"),
+    (90, "3mo"),
+    (180, "6mo"),
+    (365, "1y"),
+    (730, "2y"),
+    (1825, "5y"),
+    (3650, "10y"),
+]
+
+# Extra days fetched before the last stored bar to detect re-adjusted history
+OVERLAP_DAYS = 7
+
+
+def _field(record: dict, name: str):
+    for key, value in record.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def bars_from_records(records: list) -> np.ndarray:
+    """Convert get_historical_stock_prices records into a date-sorted BAR_DTYPE array."""
+    rows = []
+    for record in records or []:
+        day = _field(record, "date") or _field(record, "datetime") or _field(record, "index")
+        close = _field(record, "close")
+        if not day or close is None:
+            continue
+        rows.append((
+            np.datetime64(str(day)[:10], "D"),
+            _field(record, "open") if _field(record, "open") is not None else np.nan,
+            _field(record, "high") if _field(record, "high") is not None else np.nan,
+            _field(record, "low") if _field(record, "low") is not None else np.nan,
+            close,
+            _field(record, "volume") if _field(record, "volume") is not None else np.nan,
+        ))
+    bars = np.array(rows, dtype=BAR_DTYPE)
+    if len(bars) == 0:
+        return bars
+    # Sort, then keep the last bar reported for any repeated date
+    bars = bars[np.argsort(bars["date"], kind="stable")]
+    keep = np.ones(len(bars), dtype=bool)
+    keep[:-1] = bars["date"][1:] != bars["date"][:-1]
+    return bars[keep]
+
+
+def structured_payload(result) -> dict:
+    """Pull the JSON payload out of an MCP CallToolResult (structured or text)."""
+    if getattr(result, "is_error", False) or getattr(result, "isError", False):
+        return None
+    payload = getattr(result, "structured_content", None) or getattr(result, "structuredContent", None)
+    if isinstance(payload, dict):
+        return payload
+    for item in getattr(result, "content", None) or []:
+        text = getattr(item, "text", None)
+        if not text:
+            continue
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(payload, dict):
+            return payload
+    return None
+
+
+class PriceStore:
+    """
+    Local store of daily OHLCV bars, one append-only binary file per symbol.
+
+    Files are flat arrays of BAR_DTYPE records, so reads are np.memmap views:
+    a date-range query is a searchsorted plus a slice and copies nothing.
+    Refreshes fetch only the bars since the last stored date; if Yahoo has
+    re-adjusted older prices (a split or dividend), the history is rewritten.
+    """
+
+    def __init__(self, root_dir: str, initial_period: str = "5y"):
+        self.root_dir = root_dir
+        self.initial_period = initial_period
+        os.makedirs(root_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str) -> str:
+        safe_symbol = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in symbol.strip().upper())
+        return os.path.join(self.root_dir, f"{safe_symbol}.bars")
+
+    def read(self, symbol: str, start=None, end=None) -> np.ndarray:
+        """
+        Return the stored bars for `symbol` between start and end (inclusive
+        dates, either may be None) as a read-only memory-mapped view.
+        """
+        path = self._path(symbol)
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=BAR_DTYPE)
+        # Ignore a trailing partial record from a writer that is mid-append
+        count = size // BAR_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        bars = np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+
+        lo, hi = 0, count
+        if start is not None:
+            lo = int(np.searchsorted(bars["date"], np.datetime64(start, "D"), side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(bars["date"], np.datetime64(end, "D"), side="right"))
+        return bars[lo:hi]
+
+    def last_date(self, symbol: str):
+        bars = self.read(symbol)
+        return bars["date"][-1] if len(bars) else None
+
+    def symbols(self) -> list:
+        return sorted(name[:-len(".bars")] for name in os.listdir(self.root_dir) if name.endswith(".bars"))
+
+    @contextmanager
+    def _write_lock(self, path: str):
+        # A side lock file, so writers in other processes serialize even
+        # across replace() swapping the data file out
+        with self._lock, open(f"{path}.lock", "a") as lock_handle:
+            if fcntl is not None:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+            yield
+
+    def append(self, symbol: str, bars: np.ndarray) -> int:
+        """
+        Merge newer bars into the store and return how many records were written.
+
+        Bars dated before the last stored bar are ignored; a bar on the same
+        date replaces it, since the latest session may have been stored mid-day.
+        """
+        bars = np.asarray(bars, dtype=BAR_DTYPE)
+        if len(bars) == 0:
+            return 0
+        path = self._path(symbol)
+        with self._write_lock(path), open(path, "ab") as handle:
+            stored = self.read(symbol)
+            if len(stored):
+                last = stored["date"][-1]
+                bars = bars[bars["date"] >= last]
+                if len(bars) and bars["date"][0] == last:
+                    # Overwrite the last record in place, then append the rest
+                    with open(path, "r+b") as rewrite:
+                        rewrite.seek((len(stored) - 1) * BAR_DTYPE.itemsize)
+                        rewrite.write(bars[:1].tobytes())
+                    handle.write(bars[1:].tobytes())
+                    return len(bars)
+            handle.write(bars.tobytes())
+            return len(bars)
+
+    def replace(self, symbol: str, bars: np.ndarray):
+        """Atomically replace a symbol's whole history."""
+        bars = np.asarray(bars, dtype=BAR_DTYPE)
+        path = self._path(symbol)
+        with self._write_lock(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as handle:
+                handle.write(bars.tobytes())
+            os.replace(tmp_path, path)
+
+    def _refresh_period(self, symbol: str) -> str:
+        last = self.last_date(symbol)
+        if last is None:
+            return self.initial_period
+        gap_days = int((np.datetime64(date.today(), "D") - last).astype(int)) + OVERLAP_DAYS
+        for max_days, period in REFRESH_PERIODS:
+            if gap_days <= max_days:
+                return period
+        return "max"
+
+    @staticmethod
+    def _history_changed(stored: np.ndarray, fetched: np.ndarray) -> bool:
+        """True when fetched bars before the last stored date disagree with the store."""
+        if len(stored) < 2 or len(fetched) == 0:
+            return False
+        complete = fetched[fetched["date"] < stored["date"][-1]]
+        if len(complete) == 0:
+            return False
+        index = np.searchsorted(stored["date"], complete["date"])
+        index = np.clip(index, 0, len(stored) - 1)
+        matched = stored["date"][index] == complete["date"]
+        if not matched.any():
+            return False
+        return not np.allclose(stored["close"][index[matched]], complete["close"][matched], rtol=1e-6, equal_nan=True)
+
+    async def _fetch(self, server, symbol: str, period: str) -> np.ndarray:
+        result = await server.call_tool(
+            "get_historical_stock_prices",
+            {"symbol": symbol, "period": period, "interval": "1d", "adjusted": True},
+        )
+        payload = structured_payload(result)
+        if payload is None:
+            raise RuntimeError(f"No price history returned for {symbol}")
+        return bars_from_records(payload.get("prices"))
+
+    async def refresh(self, symbol: str, server) -> np.ndarray:
+        """
+        Bring `symbol` up to date from the Yahoo Finance MCP server and return
+        its full stored history.
+        """
+        period = self._refresh_period(symbol)
+        fetched = await self._fetch(server, symbol, period)
+        stored = self.read(symbol)
+
+        if self._history_changed(stored, fetched):
+            print(f"[PRICE_STORE] Adjusted history changed for {symbol}, reloading")
+            self.replace(symbol, await self._fetch(server, symbol, self.initial_period))
+        else:
+            written = self.append(symbol, fetched)
+            print(f"[PRICE_STORE] {symbol}: {written} bar(s) written from period={period}")
+        return self.read(symbol)
@@ -0,0 +1,646 @@
+from agents.items import ModelResponse, TResponseOutputItem
+from agents.mcp import MCPServer
+from agents.models.interface import Model, ModelProvider
+from agents.testing import ModelStep, ScriptedModel, assistant_message, function_call
+from agents.usage import Usage
+from functools import lru_cache
+from instrumentation import current_agent
+from mcp import types as mcp_types
+from pydantic import TypeAdapter
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import numpy as np
+
+CASSETTE_VERSION = 1
+
+# Masked out of prompts before hashing, so a recording made yesterday still
+# matches a prompt that embeds today's timestamp
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2})?(\.\d+)?")
+_PROMPT_SYMBOL = re.compile(r"(?:Stock symbol|Symbol|Ticker):\s*([A-Za-z0-9.\-^=]+)")
+
+# Input item types the model produced on an earlier turn of the same run
+_MODEL_ITEM_TYPES = {"function_call", "reasoning", "web_search_call", "file_search_call", "computer_call"}
+
+_OUTPUT_ITEMS = TypeAdapter(list[TResponseOutputItem])
+
+# Tickers handed out for list-of-companies fields in synthetic structured output
+SYNTHETIC_TICKERS = (
+    "AAPL", "MSFT", "NVDA", "GOOGL", "AMZN", "META", "AVGO", "ORCL", "CRM", "ADBE",
+    "AMD", "INTC", "CSCO", "QCOM", "TXN", "IBM", "NOW", "INTU", "AMAT", "MU",
+)
+
+# Yahoo Finance calls answer with these many trading days per period
+_PERIOD_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 22, "3mo": 66, "6mo": 126, "ytd": 200,
+    "1y": 252, "2y": 504, "5y": 1260, "10y": 2520, "max": 2520,
+}
+_HISTORY_DAYS = 2520
+
+
+def _schema(properties: dict, required: list = None) -> dict:
+    return {"type": "object", "properties": properties, "required": required or list(properties)}
+
+
+_SYMBOL = {"symbol": {"type": "string", "description": "Stock ticker symbol"}}
+
+# Tool lists served when no cassette recorded the real server's
+SYNTHETIC_TOOLS = {
+    "yahoo": [
+        {"name": "get_current_stock_price", "description": "Get the current stock price", "inputSchema": _schema(_SYMBOL)},
+        {"name": "get_stock_price_by_date", "description": "Get the closing price on a date",
+         "inputSchema": _schema({**_SYMBOL, "date": {"type": "string"}})},
+        {"name": "get_stock_price_date_range", "description": "Get closing prices between two dates",
+         "inputSchema": _schema({**_SYMBOL, "start_date": {"type": "string"}, "end_date": {"type": "string"}})},
+        {"name": "get_historical_stock_prices", "description": "Get daily OHLCV history for a period",
+         "inputSchema": _schema({**_SYMBOL, "period": {"type": "string"}, "interval": {"type": "string"}}, ["symbol"])},
+        {"name": "get_dividends", "description": "Get dividend history", "inputSchema": _schema(_SYMBOL)},
+        {"name": "get_income_statement", "description": "Get the annual income statement",
+         "inputSchema": _schema({**_SYMBOL, "freq": {"type": "string"}}, ["symbol"])},
+        {"name": "get_cashflow", "description": "Get the annual cash flow statement",
+         "inputSchema": _schema({**_SYMBOL, "freq": {"type": "string"}}, ["symbol"])},
+        {"name": "get_earning_dates", "description": "Get upcoming and past earnings dates", "inputSchema": _schema(_SYMBOL)},
+        {"name": "get_news", "description": "Get recent news headlines", "inputSchema": _schema(_SYMBOL)},
+        {"name": "get_company_overview", "description": "Get company profile and key statistics", "inputSchema": _schema(_SYMBOL)},
+    ],
+    "brave": [
+        {"name": "brave_web_search", "description": "Search the web",
+         "inputSchema": _schema({"query": {"type": "string"}, "count": {"type": "integer"}}, ["query"])},
+        {"name": "brave_local_search", "description": "Search for local businesses",
+         "inputSchema": _schema({"query": {"type": "string"}, "count": {"type": "integer"}}, ["query"])},
+    ],
+}
+
+
+class ReplayMiss(LookupError):
+    """Raised when a replay finds no recording for a call and synthetic answers are off."""
+
+
+def _item_get(item, key: str):
+    return item.get(key) if isinstance(item, dict) else getattr(item, key, None)
+
+
+def _opening_prompt(input) -> str:
+    if isinstance(input, str):
+        return input
+    for item in input or []:
+        if _item_get(item, "role") != "user":
+            continue
+        content = _item_get(item, "content")
+        if isinstance(content, str):
+            return content
+        return "\n".join(str(_item_get(part, "text") or "") for part in content or [])
+    return ""
+
+
+def prompt_digest(input) -> str:
+    """Digest of a run's opening user prompt, with timestamps masked."""
+    text = _TIMESTAMP.sub("<now>", _opening_prompt(input))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def model_turn(input) -> int:
+    """Number of model responses already in a run's input: 0 on the first call."""
+    if isinstance(input, str):
+        return 0
+    turns = 0
+    for item in input or []:
+        if _item_get(item, "type") in _MODEL_ITEM_TYPES or _item_get(item, "role") == "assistant":
+            turns += 1
+    return turns
+
+
+def _usage_dict(usage) -> dict:
+    if usage is None:
+        return {"requests": 1, "input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+    return {
+        "requests": getattr(usage, "requests", 1) or 1,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": getattr(usage, "total_tokens", 0) or input_tokens + output_tokens,
+    }
+
+
+def _synthetic_usage(input_tokens: int, output_tokens: int) -> Usage:
+    return Usage(
+        requests=1,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=input_tokens + output_tokens,
+    )
+
+
+def _tool_key(tool_name: str, arguments: dict) -> str:
+    return f"{tool_name}:{json.dumps(arguments or {}, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+class Cassette:
+    """
+    Recorded model responses and MCP tool results, saved as one JSON file.
+
+    Model responses are keyed by agent, turn and a digest of the run's opening
+    prompt, so replays find the same answer for the same question whatever
+    order concurrent runs make their calls in. Tool results are keyed by
+    server kind, tool name and canonical arguments. Repeated recordings under
+    one key are replayed round-robin.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.model_calls = {}
+        self.tool_calls = {}
+        self.tools = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls(path)
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')!r} in {path}")
+        cassette.model_calls = data.get("model_calls", {})
+        cassette.tool_calls = data.get("tool_calls", {})
+        cassette.tools = data.get("tools", {})
+        return cassette
+
+    def save(self, path: str = None):
+        path = path or self.path
+        if not path:
+            raise ValueError("Cassette has no path to save to")
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "model_calls": self.model_calls,
+                "tool_calls": self.tool_calls,
+                "tools": self.tools,
+            }
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(data, handle, indent=1)
+            os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model_keys": len(self.model_calls),
+                "model_responses": sum(len(entries) for entries in self.model_calls.values()),
+                "tool_keys": len(self.tool_calls),
+                "tool_results": sum(len(entries) for entries in self.tool_calls.values()),
+            }
+
+    def _next(self, key: str, entries: list):
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        return entries[cursor % len(entries)]
+
+    def record_model(self, agent: str, turn: int, digest: str, output: list, usage, seconds: float):
+        entry = {
+            "agent": agent,
+            "turn": turn,
+            "output": [item.model_dump(mode="json", exclude_none=True) for item in output],
+            "usage": _usage_dict(usage),
+            "seconds": round(seconds, 3),
+        }
+        with self._lock:
+            self.model_calls.setdefault(f"{agent}|{turn}|{digest}", []).append(entry)
+
+    def find_model(self, agent: str, turn: int, digest: str) -> dict:
+        """Recording for this exact prompt, else any recording of the same agent and turn."""
+        key = f"{agent}|{turn}|{digest}"
+        with self._lock:
+            entries = self.model_calls.get(key)
+            if entries:
+                return self._next(key, entries)
+            fallback_key = f"{agent}|{turn}|*"
+            prefix = f"{agent}|{turn}|"
+            entries = [entry for k, group in self.model_calls.items() if k.startswith(prefix) for entry in group]
+            if entries:
+                return self._next(fallback_key, entries)
+        return None
+
+    def record_tool(self, kind: str, tool_name: str, arguments: dict, result, seconds: float):
+        entry = {
+            "result": result.model_dump(mode="json", by_alias=True, exclude_none=True),
+            "seconds": round(seconds, 3),
+        }
+        with self._lock:
+            self.tool_calls.setdefault(f"{kind}|{_tool_key(tool_name, arguments)}", []).append(entry)
+
+    def find_tool(self, kind: str, tool_name: str, arguments: dict) -> dict:
+        key = f"{kind}|{_tool_key(tool_name, arguments)}"
+        with self._lock:
+            entries = self.tool_calls.get(key)
+            return self._next(key, entries) if entries else None
+
+    def record_tools(self, kind: str, tools: list):
+        with self._lock:
+            self.tools[kind] = [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools]
+
+
+# ----------------------------------------------------------------------------
+# Models
+# ----------------------------------------------------------------------------
+
+class RecordingModel(Model):
+    """Pass-through model that writes every response to a Cassette."""
+
+    def __init__(self, model: Model, cassette: Cassette):
+        self.model = model
+        self.cassette = cassette
+
+    def _record(self, input, output, usage, started: float):
+        self.cassette.record_model(
+            current_agent() or "unknown",
+            model_turn(input),
+            prompt_digest(input),
+            output,
+            usage,
+            time.perf_counter() - started,
+        )
+
+    async def get_response(self, system_instructions, input, *args, **kwargs) -> ModelResponse:
+        started = time.perf_counter()
+        response = await self.model.get_response(system_instructions, input, *args, **kwargs)
+        self._record(input, response.output, response.usage, started)
+        return response
+
+    async def stream_response(self, system_instructions, input, *args, **kwargs):
+        started = time.perf_counter()
+        async for event in self.model.stream_response(system_instructions, input, *args, **kwargs):
+            if getattr(event, "type", None) == "response.completed":
+                response = event.response
+                usage = getattr(response, "usage", None)
+                self._record(input, response.output, usage, started)
+            yield event
+
+    async def close(self):
+        close = getattr(self.model, "close", None)
+        if close is not None:
+            await close()
+
+
+class RecordingModelProvider(ModelProvider):
+    """Wraps another ModelProvider so every model call is recorded to a Cassette."""
+
+    def __init__(self, provider: ModelProvider, cassette: Cassette):
+        self.provider = provider
+        self.cassette = cassette
+
+    def get_model(self, model_name: str = None) -> Model:
+        return RecordingModel(self.provider.get_model(model_name), self.cassette)
+
+    async def aclose(self):
+        aclose = getattr(self.provider, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def sample_json(schema: dict, symbol: str = "AAPL", defs: dict = None, name: str = "", index: int = None):
+    """Smallest plausible value for a JSON schema, for synthetic structured output."""
+    if defs is None:
+        defs = schema.get("$defs", {})
+    if "$ref" in schema:
+        return sample_json(defs[schema["$ref"].rsplit("/", 1)[-1]], symbol, defs, name, index)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"] or schema[key]
+            return sample_json(options[0], symbol, defs, name, index)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = next((t for t in kind if t != "null"), "string")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {prop: sample_json(sub, symbol, defs, prop, index) for prop, sub in properties.items()}
+    if kind == "array":
+        count = max(schema.get("minItems", 0), min(schema.get("maxItems", 5), 5))
+        return [sample_json(schema.get("items", {}), symbol, defs, name, i) for i in range(count)]
+    if kind == "integer":
+        return max(schema.get("minimum", 0), min(schema.get("maximum", 7), 7))
+    if kind == "number":
+        return 42.0
+    if kind == "boolean":
+        return True
+
+    lowered = name.lower()
+    if lowered in ("symbol", "ticker") or lowered.endswith("_symbol") or lowered.endswith("_ticker"):
+        return SYNTHETIC_TICKERS[index % len(SYNTHETIC_TICKERS)] if index is not None else symbol
+    if "url" in lowered or "link" in lowered:
+        return f"https://example.com/{symbol.lower()}/{name or 'item'}/{index or 0}"
+    if "date" in lowered:
+        return time.strftime("%Y-%m-%d")
+    label = name.replace("_", " ") or "text"
+    return f"Synthetic {label} for {symbol}."
+
+
+class ReplayModel(Model):
+    """
+    Model that answers from a Cassette instead of calling an LLM.
+
+    Recorded responses are returned after their recorded latency times
+    `time_scale`. Calls the cassette doesn't cover get a synthetic response
+    (unless `synthetic` is off): on the first turn of an agent with tools, a
+    few tool calls; otherwise output matching the agent's output schema, or
+    plain text.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette = None,
+        time_scale: float = 1.0,
+        default_latency: float = 2.0,
+        synthetic: bool = True,
+        synthetic_tool_calls: int = 2,
+        synthetic_chars: int = 1500,
+        synthetic_tokens: tuple = (1500, 400),
+    ):
+        self.cassette = cassette
+        self.time_scale = time_scale
+        self.default_latency = default_latency
+        self.synthetic = synthetic
+        self.synthetic_tool_calls = synthetic_tool_calls
+        self.synthetic_chars = synthetic_chars
+        self.synthetic_tokens = synthetic_tokens
+
+    def _step(self, input, tools, output_schema) -> tuple:
+        agent = current_agent() or "unknown"
+        turn = model_turn(input)
+        entry = self.cassette.find_model(agent, turn, prompt_digest(input)) if self.cassette else None
+        if entry is not None:
+            output = _OUTPUT_ITEMS.validate_python(entry["output"])
+            usage = Usage(**entry["usage"])
+            return ModelStep(output=output, usage=usage), entry["seconds"] * self.time_scale
+        if not self.synthetic:
+            raise ReplayMiss(f"No recorded model response for {agent} turn {turn}")
+        return self._synthetic_step(input, turn, tools, output_schema), self.default_latency * self.time_scale
+
+    def _synthetic_step(self, input, turn: int, tools, output_schema) -> ModelStep:
+        prompt = _opening_prompt(input)
+        match = _PROMPT_SYMBOL.search(prompt)
+        symbol = match.group(1) if match else "AAPL"
+        input_tokens, output_tokens = self.synthetic_tokens
+
+        if turn == 0 and tools and self.synthetic_tool_calls:
+            output = [
+                function_call(
+                    tool.name,
+                    sample_json(getattr(tool, "params_json_schema", None) or {}, symbol),
+                    call_id=f"call_{uuid.uuid4().hex[:12]}",
+                )
+                for tool in tools[:self.synthetic_tool_calls]
+            ]
+            return ModelStep(output=output, usage=_synthetic_usage(input_tokens, output_tokens // 4))
+
+        if output_schema is not None and not output_schema.is_plain_text():
+            text = json.dumps(sample_json(output_schema.json_schema(), symbol))
+        else:
+            sentence = f"Synthetic analysis of {symbol} for offline benchmarking. "
+            text = (sentence * (self.synthetic_chars // len(sentence) + 1))[:self.synthetic_chars]
+        output = [assistant_message(text, item_id=f"msg_{uuid.uuid4().hex[:12]}")]
+        return ModelStep(output=output, usage=_synthetic_usage(input_tokens, output_tokens))
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                           tracing, *, previous_response_id=None, conversation_id=None, prompt=None) -> ModelResponse:
+        step, seconds = self._step(input, tools, output_schema)
+        await asyncio.sleep(seconds)
+        return await ScriptedModel([step]).get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+            previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+        )
+
+    async def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs,
+                              tracing, *, previous_response_id=None, conversation_id=None, prompt=None):
+        step, seconds = self._step(input, tools, output_schema)
+        events = [
+            event async for event in ScriptedModel([step]).stream_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing,
+                previous_response_id=previous_response_id, conversation_id=conversation_id, prompt=prompt,
+            )
+        ]
+        # Half the latency is time to first token, the rest is spread over the stream
+        await asyncio.sleep(seconds / 2)
+        pause = seconds / 2 / max(1, len(events))
+        for event in events:
+            yield event
+            await asyncio.sleep(pause)
+
+
+class ReplayModelProvider(ModelProvider):
+    """ModelProvider serving every model name from one ReplayModel; see ReplayModel for the options."""
+
+    def __init__(self, cassette: Cassette = None, **options):
+        self.model = ReplayModel(cassette, **options)
+
+    def get_model(self, model_name: str = None) -> Model:
+        return self.model
+
+
+# ----------------------------------------------------------------------------
+# MCP servers
+# ----------------------------------------------------------------------------
+
+class RecordingMCPServer(MCPServer):
+    """Pass-through MCP server wrapper that writes tool lists and tool results to a Cassette."""
+
+    def __init__(self, server: MCPServer, cassette: Cassette, kind: str):
+        super().__init__(use_structured_content=getattr(server, "use_structured_content", False))
+        self.server = server
+        self.cassette = cassette
+        self.kind = kind
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    async def connect(self):
+        await self.server.connect()
+
+    async def cleanup(self):
+        await self.server.cleanup()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None):
+        tools = await self.server.list_tools(run_context, agent)
+        self.cassette.record_tools(self.kind, tools)
+        return tools
+
+    async def call_tool(self, tool_name: str, arguments: dict = None, meta: dict = None):
+        started = time.perf_counter()
+        if meta is None:
+            result = await self.server.call_tool(tool_name, arguments)
+        else:
+            result = await self.server.call_tool(tool_name, arguments, meta=meta)
+        self.cassette.record_tool(self.kind, tool_name, arguments, result, time.perf_counter() - started)
+        return result
+
+    async def list_prompts(self):
+        return await self.server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: dict = None):
+        return await self.server.get_prompt(name, arguments)
+
+
+@lru_cache(maxsize=256)
+def _synthetic_history(symbol: str, day: str) -> tuple:
+    """Ten years of business-day OHLCV ending `day`, seeded by the symbol so every call agrees."""
+    seed = int(hashlib.sha1(symbol.upper().encode("utf-8")).hexdigest()[:8], 16)
+    rng = np.random.default_rng(seed)
+    end = np.datetime64(day)
+    dates = np.busday_offset(end, -np.arange(_HISTORY_DAYS)[::-1], roll="backward")
+    start_price = 20 + seed % 400
+    closes = start_price * np.exp(np.cumsum(rng.normal(0.0004, 0.018, _HISTORY_DAYS)))
+    opens = closes * (1 + rng.normal(0, 0.004, _HISTORY_DAYS))
+    highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, 0.006, _HISTORY_DAYS)))
+    lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, 0.006, _HISTORY_DAYS)))
+    volumes = rng.integers(1_000_000, 50_000_000, _HISTORY_DAYS)
+    return tuple(
+        {
+            "date": str(date),
+            "open": round(float(o), 2),
+            "high": round(float(h), 2),
+            "low": round(float(l), 2),
+            "close": round(float(c), 2),
+            "volume": int(v),
+        }
+        for date, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+    )
+
+
+def synthetic_tool_result(tool_name: str, arguments: dict = None) -> mcp_types.CallToolResult:
+    """Deterministic stand-in for a Yahoo Finance or Brave Search tool result."""
+    arguments = arguments or {}
+    symbol = str(arguments.get("symbol") or "AAPL").upper()
+    history = _synthetic_history(symbol, time.strftime("%Y-%m-%d"))
+    seed = int(hashlib.sha1(symbol.encode("utf-8")).hexdigest()[:8], 16)
+
+    if tool_name == "get_historical_stock_prices":
+        days = _PERIOD_DAYS.get(str(arguments.get("period", "1mo")), 22)
+        payload = {"symbol": symbol, "prices": list(history[-days:])}
+    elif tool_name == "get_company_overview":
+        payload = {
+            "symbol": symbol,
+            "companyName": f"{symbol} Holdings Inc.",
+            "sector": "Technology",
+            "marketCap": (seed % 2000 + 10) * 1_000_000_000,
+            "trailingPE": round(10 + seed % 40 + 0.5, 2),
+        }
+    elif tool_name in ("get_income_statement", "get_cashflow"):
+        years = [f"{int(history[-1]['date'][:4]) - offset}-12-31" for offset in range(1, 4)]
+        revenue = (seed % 300 + 20) * 1_000_000_000
+        rows = {"Total Revenue": 1.0, "Operating Income": 0.25, "Net Income": 0.18}
+        payload = {
+            "incomeStatement": [
+                {"index": row, **{year: round(revenue * share * (1 - 0.08 * i)) for i, year in enumerate(years)}}
+                for row, share in rows.items()
+            ]
+        }
+    elif tool_name.startswith("brave_"):
+        query = str(arguments.get("query", symbol))
+        payload = {
+            "results": [
+                {
+                    "title": f"{query}: synthetic headline {i + 1}",
+                    "url": f"https://example.com/news/{i + 1}",
+                    "description": f"Offline search result {i + 1} for {query}.",
+                }
+                for i in range(int(arguments.get("count", 5) or 5))
+            ]
+        }
+    else:
+        latest = history[-1]
+        payload = {"symbol": symbol, "tool": tool_name, "date": latest["date"], "price": latest["close"]}
+
+    return mcp_types.CallToolResult(
+        content=[mcp_types.TextContent(type="text", text=json.dumps(payload))],
+        structured_content=payload,
+        is_error=False,
+    )
+
+
+class ReplayMCPServer(MCPServer):
+    """
+    Local stand-in for the Yahoo Finance ("yahoo") or Brave Search ("brave")
+    MCP server.
+
+    Tool calls are answered from a Cassette after the recorded latency times
+    `time_scale`. Calls it doesn't cover get deterministic synthetic data,
+    seeded by the arguments, so price history, indicators and screening all
+    work offline; with `synthetic` off they return an error result instead.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        cassette: Cassette = None,
+        time_scale: float = 1.0,
+        default_latency: float = 0.3,
+        synthetic: bool = True,
+    ):
+        super().__init__(use_structured_content=False)
+        self.kind = kind
+        self.cassette = cassette
+        self.time_scale = time_scale
+        self.default_latency = default_latency
+        self.synthetic = synthetic
+
+    @property
+    def name(self) -> str:
+        return f"replay-{self.kind}"
+
+    async def connect(self):
+        pass
+
+    async def cleanup(self):
+        pass
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None):
+        tools = (self.cassette.tools.get(self.kind) if self.cassette else None) or SYNTHETIC_TOOLS.get(self.kind, [])
+        return [mcp_types.Tool.model_validate(tool) for tool in tools]
+
+    async def call_tool(self, tool_name: str, arguments: dict = None, meta: dict = None):
+        entry = self.cassette.find_tool(self.kind, tool_name, arguments) if self.cassette else None
+        if entry is not None:
+            await asyncio.sleep(entry["seconds"] * self.time_scale)
+            return mcp_types.CallToolResult.model_validate(entry["result"])
+
+        await asyncio.sleep(self.default_latency * self.time_scale)
+        if not self.synthetic:
+            return mcp_types.CallToolResult(
+                content=[mcp_types.TextContent(type="text", text=f"No recorded result for {tool_name}")],
+                is_error=True,
+            )
+        return synthetic_tool_result(tool_name, arguments)
+
+    async def list_prompts(self):
+        return mcp_types.ListPromptsResult(prompts=[])
+
+    async def get_prompt(self, name: str, arguments: dict = None):
+        raise ReplayMiss(f"{self.name} has no prompts")
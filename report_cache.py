@@ -0,0 +1,158 @@
+from collections import OrderedDict
+import copy
+import json
+import os
+import threading
+import time
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# How long each analyst's output stays usable for a repeat request
+DEFAULT_SECTION_TTLS = {
+    "financial": DAY,
+    "comparative": 6 * HOUR,
+    "technical": 30 * MINUTE,
+    "news": 30 * MINUTE,
+}
+
+
+# Bundle metadata that describes one session's run rather than the report;
+# the pipeline adds these per session, so they are never cached
+SESSION_METADATA_FIELDS = ("metrics", "deadline", "cache")
+
+
+def parse_section_ttls(text: str) -> dict:
+    """Parse "financial=86400,news=1800" into a TTL mapping layered over the defaults."""
+    ttls = dict(DEFAULT_SECTION_TTLS)
+    for part in (text or "").split(","):
+        if "=" not in part:
+            continue
+        name, seconds = part.split("=", 1)
+        try:
+            ttls[name.strip()] = float(seconds)
+        except ValueError:
+            print(f"[REPORT_CACHE] Ignoring invalid TTL entry: {part}")
+    return ttls
+
+
+class ReportCache:
+    """
+    Cache of completed stock reports keyed by normalized symbol/exchange.
+
+    Each analyst's output is stored with its own timestamp and judged against
+    its own TTL. A lookup returns the whole bundle only when every section is
+    still fresh; otherwise it returns the fresh analyses so just the stale
+    analysts need to run again before the report is re-synthesized.
+
+    Entries live in an in-memory LRU, optionally backed by JSON files on disk
+    so they survive restarts and can be shared by workers on the same host.
+    """
+
+    def __init__(self, section_ttls: dict = None, max_entries: int = 256, disk_dir: str = None):
+        self.section_ttls = section_ttls or dict(DEFAULT_SECTION_TTLS)
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(symbol: str, exchange: str) -> str:
+        return f"{(exchange or 'US').strip().upper()}:{symbol.strip().upper()}"
+
+    def _disk_path(self, key: str) -> str:
+        safe_key = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in key)
+        return os.path.join(self.disk_dir, f"{safe_key}.json")
+
+    def _load(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[REPORT_CACHE] Failed to read {key} from disk: {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, symbol: str, exchange: str):
+        """
+        Return (bundle, fresh_analyses).
+
+        bundle is a copy of the cached report when every section is fresh, else
+        None. fresh_analyses maps analyst name -> {"text", "generated_at"} for
+        the sections that can be reused.
+        """
+        entry = self._load(self.make_key(symbol, exchange))
+        if entry is None:
+            return None, {}
+
+        now = time.time()
+        fresh = {
+            name: analysis
+            for name, analysis in entry.get("analyses", {}).items()
+            if now - analysis.get("generated_at", 0) < self.section_ttls.get(name, 0)
+        }
+        if entry.get("bundle") and set(self.section_ttls) <= set(fresh):
+            return copy.deepcopy(entry["bundle"]), fresh
+        return None, fresh
+
+    def store(self, symbol: str, exchange: str, report_bundle: dict, analyses: dict):
+        """
+        Save a finished report.
+
+        analyses maps analyst name -> {"text", "generated_at"}; only successful
+        analyses should be passed so failed sections are retried next time.
+        The bundle is copied, so the caller may keep changing its own.
+        """
+        key = self.make_key(symbol, exchange)
+        if report_bundle is not None:
+            report_bundle = copy.deepcopy(report_bundle)
+            metadata = report_bundle.get("metadata") or {}
+            for field in SESSION_METADATA_FIELDS:
+                metadata.pop(field, None)
+        entry = {
+            "bundle": report_bundle,
+            "analyses": analyses,
+            "stored_at": time.time(),
+        }
+        self._remember(key, entry)
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(entry, handle, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[REPORT_CACHE] Failed to write {key} to disk: {e}")
+
+    def invalidate(self, symbol: str, exchange: str):
+        key = self.make_key(symbol, exchange)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
@@ -1,6 +1,7 @@
 # research_agents.py
 from agents import Agent
 from datetime import datetime
+from schemas import NewsAnalysis, ResearchReport, StrategicTake
 
 class FinancialAnalyst:
     """Analyzes company financials and valuation"""
@@ -113,6 +114,9 @@ If you're looking to enter or exit, what price levels should you care about?
 
 Use real numbers and percentages. Tell me what the price action means, not just what happened.
 
+If the request includes precomputed indicators, build your analysis on those numbers and
+only use tools for anything they don't cover.
+
 The current datetime is {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 CRITICAL: After calling 3-5 tools, STOP and write your analysis with whatever data you found.
@@ -183,6 +187,9 @@ CRITICAL RULES:
 
 The current datetime is {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
+Put the written analysis in `analysis` and list every article you relied on in `articles`
+(headline, date, source, url, why it matters) - that list is how readers find your sources.
+
 CRITICAL: After at most 3 web searches, STOP and write your analysis with whatever news you found.
 If news is limited, say so. DO NOT search endlessly. Deliver your analysis and STOP."""
 
@@ -192,7 +199,8 @@ If news is limited, say so. DO NOT search endlessly. Deliver your analysis and S
             name="News_Analyst",
             instructions=NewsAnalyst.get_instructions(),
             model="gpt-5-nano",
-            mcp_servers=mcp_servers
+            mcp_servers=mcp_servers,
+            output_type=NewsAnalysis
         )
 
 
@@ -213,34 +221,34 @@ Your job: Synthesize their findings into a clear, readable story that connects t
 
 Write like you're briefing someone smart who wants the facts without the fluff.
 
-Your report structure:
+Your report comes back as structured fields. Write each one in markdown (no top-level headings):
 
-## The Bottom Line
+**bottom_line** - The Bottom Line
 2-3 sentences: What does this company do, and what's the overall picture from all the analysis?
 Don't hedge - if it's messy, say it's messy. If it looks good, say that.
 
-## The Financial Picture
+**financial_picture** - The Financial Picture
 Pull from the Financial Analyst:
 - **The Key Numbers**: Revenue, profit, cash flow - what's growing, what's shrinking? Use actual figures and percentages.
 - **What You're Paying**: P/E ratio, valuation metrics - is this cheap, expensive, or fair?
 - **The Growth Story**: Where's the business headed? Expanding or stalling?
 - **Red Flags**: Any concerning trends? Debt piling up? Cash flow issues? Say it straight.
 
-## What the Chart Says
+**technical_picture** - What the Chart Says
 Pull from the Technical Analyst:
 - **The Trend**: Is the stock going up, down, or sideways? Over what timeframe?
 - **Price Levels to Watch**: Support and resistance with actual numbers - "watch $45 support, $58 resistance"
 - **Recent Performance**: Week, month, quarter - give percentages
 - **Technical Read**: What's the chart telling us about where this might go?
 
-## What's Been Happening
+**news_and_sentiment** - What's Been Happening
 Pull from the News Analyst:
 - **Recent Developments**: What actually happened in the last 30 days that matters? Deals, earnings, partnerships - with dates and why they matter
 - **The Vibe**: Are investors bullish, bearish, or confused? What's the sentiment?
 - **What's Next**: Upcoming events that could move the stock
 - **Risks**: What could go wrong based on the news flow? Be specific.
 
-## How It Stacks Up vs Competitors
+**peer_comparison** - How It Stacks Up vs Competitors
 Pull from the Comparative Analyst:
 - **The Competition**: Who are the real peers we're comparing against?
 - **Valuation Battle**: P/E, P/B, P/S ratios - who's cheap, who's expensive? Say it with numbers: "Trading at 25x vs peers at 18x"
@@ -249,14 +257,14 @@ Pull from the Comparative Analyst:
 - **The Ranking**: Where does this stock land? Cheapest? Fastest growing? Middle of the pack?
 - **What This Means**: Is this stock a bargain or are you overpaying for what you get?
 
-## Putting It All Together
+**synthesis** - Putting It All Together
 This is where you connect the dots:
 - **Why You'd Buy**: 2-3 specific reasons with data from the analysts (cite actual points: "Financial analyst found 30% revenue growth...")
 - **Why You'd Avoid**: 2-3 specific concerns (cite the issues: "Technical analyst sees broken support at $45...")
 - **The Big Questions**: What don't we know yet? What could change the story?
 - **What to Monitor**: Specific events, metrics, or milestones to watch
 
-## The Risk Reality Check
+**risks**, **risk_level**, **risk_level_reason** - The Risk Reality Check
 - List the real risks (not generic stuff - actual specific risks the analysts found)
 - **Risk Level**: Low, Medium, or High - with a clear reason why
 
@@ -267,7 +275,7 @@ Guidelines:
 - Connect the dots: "Revenue is up 20%, but the chart shows sellers at $60 - that's the disconnect"
 - Write like you're explaining to a smart friend, not writing a term paper
 
-After the Risk Assessment, you're done. Don't ask questions, don't offer more formats, just deliver the report.
+Fill in every field and you're done. Don't ask questions, don't offer more formats, just deliver the report.
 """
 
     @staticmethod
@@ -276,7 +284,8 @@ After the Risk Assessment, you're done. Don't ask questions, don't offer more fo
             name="Report_Generator",
             instructions=ReportGenerator.get_instructions(),
             model="gpt-5-nano",
-            mcp_servers=[]
+            mcp_servers=[],
+            output_type=ResearchReport
         )
 
 
@@ -354,39 +363,24 @@ class StrategicAnalyst:
 
 Write in first person. Be direct. Sound like a smart friend giving honest advice.
 
-Structure EXACTLY:
-
-## My Strategic Take 💡
-
-**My recommendation: [BUY / HOLD / AVOID]**
-[One sentence: why this is the right call right now]
-
-**What's really happening:**
-[2-3 sentences: the real strategic story behind the data - cut through the noise]
-
-**Why I'm [bullish/bearish/neutral]:**
-1. [Specific point with numbers - revenue impact, margin change, market share]
-2. [Competitive angle or moat analysis with specifics]
-3. [Catalyst with timeline and expected impact]
-
-**The opportunity/risk:**
-[If BUY: What's the upside? If AVOID: What's the danger? Be specific with numbers]
-
-**What happens next (6-12 months):**
-- **Base case:** [Most likely scenario with price target]
-- **Bull case:** [Best scenario with price target]
-- **Bear case:** [Worst scenario with price target]
-
-**What could derail this:**
-1. [Specific risk #1]
-2. [Specific risk #2]
-3. [Specific risk #3]
-
-**Bottom line:** [One clear sentence - would you buy this today or not?]
-**Conviction:** [X/10] - [Brief reason for confidence level]
+Fill in EVERY field of your take:
+
+- **recommendation**: BUY, HOLD or AVOID
+- **headline**: One sentence - why this is the right call right now
+- **whats_happening**: 2-3 sentences - the real strategic story behind the data, cut through the noise
+- **stance**: bullish, bearish or neutral
+- **reasons**: Exactly three:
+  1. Specific point with numbers - revenue impact, margin change, market share
+  2. Competitive angle or moat analysis with specifics
+  3. Catalyst with timeline and expected impact
+- **opportunity_or_risk**: If BUY, what's the upside? If AVOID, what's the danger? Be specific with numbers
+- **base_case** / **bull_case** / **bear_case**: What happens next (6-12 months) - the scenario and its price target
+- **derailers**: Three specific risks that could derail this
+- **bottom_line**: One clear sentence - would you buy this today or not?
+- **conviction** (1-10) and **conviction_reason**: Brief reason for confidence level
 
 CRITICAL RULES:
-- START with BUY/HOLD/AVOID - no waffling
+- Commit to BUY/HOLD/AVOID - no waffling
 - Use actual numbers from the report (P/E ratios, growth rates, prices)
 - Give specific price targets for 6-12 months
 - Make predictions, not summaries
@@ -412,5 +406,6 @@ Be the analyst who tells it straight. Would you actually put money in this today
             name="Strategic_Analyst",
             instructions=StrategicAnalyst.get_instructions(),
             model="gpt-5-nano",  # Use best model for strategic thinking
-            mcp_servers=[]
+            mcp_servers=[],
+            output_type=StrategicTake
         )
@@ -1,15 +1,34 @@
-from agents import Runner
+from agents import Runner, RunConfig
 from agents.mcp import MCPServerStdio
 from research_agents import FinancialAnalyst, TechnicalAnalyst, NewsAnalyst, ComparativeAnalyst, ReportGenerator, StrategicAnalyst
 from sector_agents import SectorAnalyst, PortfolioStrategist
+from concurrency import AsyncSlotLimiter
+from mcp_pool import MCPServerPool
+from tool_cache import CachedMCPServer, ToolResultCache
+from report_cache import ReportCache, parse_section_ttls
+from price_store import PriceStore
+from indicators import compute_indicators, format_fact_sheet
+from screening import CandidateScreener, format_screen_table
+from ticker_universe import load_ticker_universe
+from schemas import NewsAnalysis, ResearchReport, StrategicTake, SectorCompanies, SectorCompany, PortfolioRecommendation
+from synthesis import build_company_digest, estimate_tokens, run_usage
+from streaming import PartialOutputStream, PARTIAL_FLUSH_CHARS, PARTIAL_FLUSH_SECONDS
+from instrumentation import MetricsRegistry, InstrumentedMCPServer, metrics_scope, track_agent_run, track_session
+from deadlines import (
+    Deadline, StageTimeout, STOCK_STAGE_SHARES, SECTOR_STAGE_SHARES, MIN_STAGE_SECONDS, WRAP_UP_SECONDS,
+    gathered_tool_output, parse_deadline_seconds
+)
 import asyncio
 import os
-import re
 import sys
 import shutil
+import time
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
 from datetime import datetime
+from functools import partial
 from importlib import util as importlib_util
 from dotenv import load_dotenv
+from pydantic import BaseModel
 
 # Optional IPython import for notebook display (not needed in production)
 try:
@@ -28,14 +47,75 @@ class ResearchCancelled(Exception):
 # Load environment variables
 load_dotenv()
 
+# Caps how many companies are researched at once across ALL sector and batch
+# runs in this process, so concurrent requests can't multiply LLM/MCP traffic.
+COMPANY_RESEARCH_SLOTS = AsyncSlotLimiter(int(os.getenv("MAX_CONCURRENT_COMPANY_RESEARCH", "6")))
+
+# Shared by every research session so repeated quotes/financials/peer lookups
+# are answered without another MCP round trip.
+TOOL_RESULT_CACHE = ToolResultCache(max_bytes=int(os.getenv("TOOL_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# Completed reports, reused section by section while each section is fresh
+REPORT_CACHE = ReportCache(
+    section_ttls=parse_section_ttls(os.getenv("REPORT_CACHE_TTLS")),
+    disk_dir=os.getenv("REPORT_CACHE_DIR") or None
+)
+
+# Daily OHLCV history kept on disk and topped up incrementally from Yahoo Finance
+PRICE_STORE = PriceStore(
+    os.getenv("PRICE_STORE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "price_data")
+)
+
+# Offline symbol snapshot (TICKER_UNIVERSE_CSV) for sector discovery and symbol checks
+TICKER_UNIVERSE = load_ticker_universe()
+
+# Latency, turn, token and tool-call histograms for every agent run (served at /metrics)
+RESEARCH_METRICS = MetricsRegistry()
+
+ANALYST_LABELS = {
+    "financial": "Financial Analyst",
+    "technical": "Technical Analyst",
+    "news": "News Analyst",
+    "comparative": "Risk Analyst",
+}
+
+# Placeholder text the analyst helpers return instead of a real analysis
+ANALYSIS_FAILURE_MARKERS = (
+    "unavailable due to error",
+    "unable to retrieve detailed articles",
+)
+
 class EquityResearchSystem:
     """
-    Multi-agent equity research system with TWO modes:
+    Multi-agent equity research system with THREE modes:
     1. Single Company Research - Deep dive into one stock
     2. Sector Research - Identify top companies and compare them
+    3. Batch Research - Single company research over a watchlist
     """
 
-    def __init__(self, progress_queues_ref=None, cancel_flags_ref=None):
+    def __init__(
+        self,
+        progress_queues_ref=None,
+        cancel_flags_ref=None,
+        concurrent_analysts: bool = True,
+        max_parallel_companies: int = None,
+        screen_candidates: int = None,
+        digest_tokens: int = None,
+        synthesis_token_budget: int = None,
+        use_mcp_pool: bool = False,
+        mcp_pool_size: int = None,
+        use_tool_cache: bool = True,
+        use_report_cache: bool = True,
+        use_price_store: bool = True,
+        use_ticker_universe: bool = True,
+        stream_partials: bool = None,
+        job_store=None,
+        model_provider=None,
+        server_factory=None,
+        stock_deadline_seconds: float = None,
+        sector_deadline_seconds: float = None,
+        batch_concurrency: int = None
+    ):
         # Yahoo Finance MCP - for stock data
         yahoo_module_available = importlib_util.find_spec("mcp_yahoo_finance") is not None
         if yahoo_module_available:
@@ -43,7 +123,7 @@ class EquityResearchSystem:
             yahoo_args = ["-m", "mcp_yahoo_finance"]
         else:
             uvx_path = shutil.which("uvx")
-            if not uvx_path:
+            if not uvx_path and server_factory is None:
                 raise RuntimeError(
                     "mcp_yahoo_finance package is not installed and 'uvx' command is unavailable. "
                     "Install mcp-yahoo-finance (preferred) or add uvx to PATH."
@@ -68,65 +148,204 @@ class EquityResearchSystem:
         # Store reference to progress queues from app.py
         self.progress_queues_ref = progress_queues_ref
         self.cancel_flags_ref = cancel_flags_ref
+        # Shared job store (see job_store.py); when set, progress events and
+        # cancel flags go through it instead of the in-process references
+        self.job_store = job_store
+
+        # Run the four specialist analysts as parallel tasks over the shared
+        # MCP sessions instead of one after another.
+        self.concurrent_analysts = concurrent_analysts
+
+        # How many companies a single sector run researches at once
+        if max_parallel_companies is None:
+            max_parallel_companies = int(os.getenv("SECTOR_COMPANY_CONCURRENCY", "3"))
+        self.max_parallel_companies = max(1, max_parallel_companies)
+
+        # How many sector candidates to screen quantitatively before picking
+        # the ones that get full research (0 disables screening)
+        if screen_candidates is None:
+            screen_candidates = int(os.getenv("SECTOR_SCREEN_CANDIDATES", "30"))
+        self.screen_candidates = max(0, min(screen_candidates, 50))
+
+        # Token allowance per company digest, and for all digests together,
+        # in the Portfolio Strategist's prompt
+        if digest_tokens is None:
+            digest_tokens = int(os.getenv("SECTOR_DIGEST_TOKENS", "700"))
+        if synthesis_token_budget is None:
+            synthesis_token_budget = int(os.getenv("SECTOR_SYNTHESIS_TOKEN_BUDGET", "8000"))
+        self.digest_tokens = max(100, digest_tokens)
+        self.synthesis_token_budget = max(self.digest_tokens, synthesis_token_budget)
+
+        # Optional process-wide pool of long-lived MCP servers shared by all sessions
+        self.mcp_pool = None
+        if use_mcp_pool:
+            if mcp_pool_size is None:
+                mcp_pool_size = int(os.getenv("MCP_POOL_SIZE", "2"))
+            self.mcp_pool = MCPServerPool(
+                {
+                    "yahoo": self.yahoo_server_params,
+                    "brave": self.brave_server_params,
+                },
+                max_size=mcp_pool_size,
+                client_session_timeout_seconds=1200
+            )
 
-    @staticmethod
-    def _split_markdown_sections(markdown_text: str):
-        """Split markdown text into sections keyed by their H2 heading titles."""
-        if not markdown_text:
-            return {}
-        import re
-
-        pattern = re.compile(r'^##\s+(.+)$', re.MULTILINE)
-        sections = {}
-        matches = list(pattern.finditer(markdown_text))
-
-        if not matches:
-            return sections
+        # TTL cache in front of MCP tool calls made by the agents
+        self.tool_cache = TOOL_RESULT_CACHE if use_tool_cache else None
+
+        # Completed-report cache with per-section freshness
+        self.report_cache = REPORT_CACHE if use_report_cache else None
+
+        # Local daily price history shared by technicals and peer comparisons
+        self.price_store = PRICE_STORE if use_price_store else None
+        self.screener = CandidateScreener(self.price_store)
+
+        # Indexed symbol snapshot; None when TICKER_UNIVERSE_CSV isn't configured
+        self.ticker_universe = TICKER_UNIVERSE if use_ticker_universe else None
+
+        # Stream the synthesis stages to the progress channel as "partial" events
+        if stream_partials is None:
+            stream_partials = os.getenv("STREAM_PARTIAL_OUTPUT", "true").lower() not in ("0", "false", "no")
+        self.stream_partials = stream_partials
+        self.partial_flush_seconds = float(os.getenv("PARTIAL_FLUSH_SECONDS", str(PARTIAL_FLUSH_SECONDS)))
+        self.partial_flush_chars = int(os.getenv("PARTIAL_FLUSH_CHARS", str(PARTIAL_FLUSH_CHARS)))
+
+        # Process-wide agent and tool-call metrics; per-report totals go in metadata["metrics"]
+        self.metrics = RESEARCH_METRICS
+
+        # Overrides for offline runs (see replay.py): a ModelProvider serving
+        # every agent's model calls, and a server_factory(kind, params)
+        # returning the MCP server to use instead of a stdio subprocess.
+        # The factory applies to per-session servers, not to the shared pool.
+        self.run_config = RunConfig(model_provider=model_provider) if model_provider is not None else None
+        self.server_factory = server_factory
+
+        # Default wall-clock deadline per request (None = unbounded); stages
+        # that run past their share are cut short (see deadlines.py)
+        if stock_deadline_seconds is None:
+            stock_deadline_seconds = parse_deadline_seconds(os.getenv("STOCK_DEADLINE_SECONDS"))
+        if sector_deadline_seconds is None:
+            sector_deadline_seconds = parse_deadline_seconds(os.getenv("SECTOR_DEADLINE_SECONDS"))
+        self.stock_deadline_seconds = stock_deadline_seconds
+        self.sector_deadline_seconds = sector_deadline_seconds
+
+        # How many symbols a single batch run researches at once
+        if batch_concurrency is None:
+            batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.batch_concurrency = max(1, batch_concurrency)
+
+    def start_mcp_pool(self, wait: bool = False):
+        """Start and warm the shared MCP server pool, if this instance uses one."""
+        if self.mcp_pool is not None:
+            self.mcp_pool.start(warm=True, wait=wait)
+
+    @asynccontextmanager
+    async def _connected_servers(self, *kinds: str):
+        """
+        Yield connected MCP servers for the requested kinds ("yahoo", "brave").
 
-        for index, match in enumerate(matches):
-            title = match.group(1).strip()
-            start = match.end()
-            end = matches[index + 1].start() if index + 1 < len(matches) else len(markdown_text)
-            content = markdown_text[start:end].strip()
-            sections[title] = content
+        Servers are leased from the shared pool when one is configured; otherwise
+        fresh stdio subprocesses are spawned for this session and torn down after.
+        """
+        if self.mcp_pool is not None:
+            async with self.mcp_pool.lease(*kinds) as servers:
+                yield self._instrumented(self._with_tool_cache(servers))
+            return
+
+        params = {
+            "yahoo": self.yahoo_server_params,
+            "brave": self.brave_server_params,
+        }
+        async with AsyncExitStack() as stack:
+            servers = []
+            for kind in kinds:
+                if self.server_factory is not None:
+                    server = self.server_factory(kind, params[kind])
+                else:
+                    server = MCPServerStdio(
+                        params=params[kind],
+                        client_session_timeout_seconds=1200
+                    )
+                # Entering the context connects the server
+                servers.append(await stack.enter_async_context(server))
+            yield self._instrumented(self._with_tool_cache(servers))
+
+    def _with_tool_cache(self, servers: list) -> list:
+        """Wrap servers so repeated tool calls are answered from the shared cache."""
+        if self.tool_cache is None:
+            return servers
+        return [
+            server if isinstance(server, CachedMCPServer) else CachedMCPServer(server, self.tool_cache)
+            for server in servers
+        ]
+
+    def _instrumented(self, servers: list) -> list:
+        """Wrap servers so every tool call is timed and counted against the calling agent."""
+        return [
+            server if isinstance(server, InstrumentedMCPServer) else InstrumentedMCPServer(server, self.metrics)
+            for server in servers
+        ]
+
+    async def _run_agent(self, agent, prompt: str, max_turns: int, agent_label: str, budget: float = None):
+        """
+        Runner.run, recording wall time, turns, tool calls and tokens for `agent_label`.
 
-        return sections
+        With a budget (seconds) the run is stopped once it overruns and
+        StageTimeout is raised, carrying the tool output gathered so far.
+        """
+        with track_agent_run(self.metrics, agent_label) as run:
+            if budget is None:
+                run.result = await Runner.run(agent, prompt, max_turns=max_turns, run_config=self.run_config)
+            else:
+                # Streamed so that an overrun run can be stopped and its items read
+                run.result = Runner.run_streamed(agent, prompt, max_turns=max_turns, run_config=self.run_config)
+                await self._drain_within(run.result, budget, agent_label)
+        return run.result
 
     @staticmethod
-    def _extract_links(markdown_text: str):
-        """Return unique hyperlinks discovered in the provided markdown text."""
-        if not markdown_text:
-            return []
-        import re
-
-        urls = re.findall(r'https?://[^\s)]+', markdown_text)
-        # Preserve order while removing duplicates
-        seen = set()
-        unique_urls = []
-        for url in urls:
-            cleaned = url.rstrip('.,)')
-            if cleaned not in seen:
-                seen.add(cleaned)
-                unique_urls.append(cleaned)
-        return unique_urls
+    async def _drain_within(result, budget: float, agent_label: str, on_event=None):
+        """
+        Consume a streamed run's events, stopping the run with StageTimeout
+        after `budget` seconds (None = no limit). on_event(event) returning
+        True ends it early.
+        """
+        try:
+            async with asyncio.timeout(budget):
+                async for event in result.stream_events():
+                    if on_event is not None and on_event(event):
+                        result.cancel()
+                        break
+        except TimeoutError:
+            result.cancel()
+            raise StageTimeout(agent_label, budget, gathered_tool_output(result)) from None
+        except asyncio.CancelledError:
+            # The streamed run lives in its own task; stop it along with ours
+            result.cancel()
+            raise
 
     def _log_status(self, message: str, session_id: str = None, agent: str = None):
         """Log status message and send to progress queue if available"""
         print(f"[LOG_STATUS] {message}")
-        if session_id and self.progress_queues_ref is not None:
+        update = {
+            'type': 'progress',
+            'message': message,
+            'timestamp': datetime.now().isoformat()
+        }
+        if agent:
+            update['agent'] = agent
+        self._publish(session_id, update)
+
+    def _publish(self, session_id: str, update: dict):
+        """Send an event to the session's progress channel, if it has one."""
+        if session_id and self.job_store is not None:
+            try:
+                self.job_store.append_event(session_id, update)
+            except Exception as e:
+                print(f"[LOG_STATUS] Error recording progress for {session_id}: {e}")
+        elif session_id and self.progress_queues_ref is not None:
             try:
-                print(f"[LOG_STATUS] Using progress_queues_ref, session_id={session_id}, exists={session_id in self.progress_queues_ref}")
                 if session_id in self.progress_queues_ref:
-                    update = {
-                        'type': 'progress',
-                        'message': message,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    if agent:
-                        update['agent'] = agent
-                    print(f"[LOG_STATUS] Putting update in queue: {update}")
                     self.progress_queues_ref[session_id].put(update)
-                    print(f"[LOG_STATUS] Update queued successfully")
                 else:
                     print(f"[LOG_STATUS] Session {session_id} not found in progress_queues. Available: {list(self.progress_queues_ref.keys())}")
             except Exception as e:
@@ -135,6 +354,8 @@ class EquityResearchSystem:
                 traceback.print_exc()
 
     def _is_cancelled(self, session_id: str = None) -> bool:
+        if session_id is not None and self.job_store is not None:
+            return self.job_store.is_cancelled(session_id)
         if session_id is None or self.cancel_flags_ref is None:
             return False
         return session_id in self.cancel_flags_ref
@@ -143,27 +364,365 @@ class EquityResearchSystem:
         if self._is_cancelled(session_id):
             raise ResearchCancelled(f"Session {session_id} cancelled by user")
 
+    @contextmanager
+    def _cancellation(self, session_id: str = None):
+        """
+        Report a task cancellation that the user asked for (see
+        AsyncJobExecutor.cancel) as ResearchCancelled, once everything inside the
+        block, MCP sessions included, has been cleaned up. Other cancellations,
+        like a shutting-down loop, propagate unchanged.
+        """
+        try:
+            yield
+        except asyncio.CancelledError:
+            if not self._is_cancelled(session_id):
+                raise
+            task = asyncio.current_task()
+            if task is not None:
+                task.uncancel()
+            raise ResearchCancelled(f"Session {session_id} cancelled by user") from None
+
+    def _load_checkpoints(self, session_id: str = None) -> dict:
+        """Stage outputs this session already has, e.g. copied from the run it resumes."""
+        if not session_id or self.job_store is None:
+            return {}
+        try:
+            checkpoints = self.job_store.load_checkpoints(session_id)
+        except Exception as e:
+            print(f"[CHECKPOINT] Failed to load checkpoints for {session_id}: {e}")
+            return {}
+        if checkpoints:
+            self._log_status(f"Resuming: {len(checkpoints)} completed stages restored from checkpoints", session_id)
+        return checkpoints
+
+    def _save_checkpoint(self, session_id: str, stage: str, value):
+        """Persist one completed stage's output so a resumed run can skip it."""
+        if not session_id or self.job_store is None:
+            return
+        if isinstance(value, BaseModel):
+            value = value.model_dump()
+        try:
+            self.job_store.save_checkpoint(session_id, stage, value)
+        except Exception as e:
+            print(f"[CHECKPOINT] Failed to save {stage} for {session_id}: {e}")
+
+    @staticmethod
+    def _format_symbol(symbol: str, exchange: str) -> str:
+        """Format a ticker for Yahoo Finance."""
+        if exchange == "NSE" or exchange == "INDIA":
+            return f"{symbol}.NS"
+        if exchange == "BSE":
+            return f"{symbol}.BO"
+        return symbol
+
+    def _serve_cached_report(self, cached_bundle: dict, session_id: str = None) -> dict:
+        """Return a cached report bundle re-labelled for the current session."""
+        metadata = cached_bundle.setdefault("metadata", {})
+        metadata["cache"] = {"hit": True, "original_session_id": metadata.get("session_id")}
+        metadata["session_id"] = session_id
+        self._log_status("All report sections are fresh; returning cached report.", session_id, "Report Generator")
+        self._log_status("Research completed successfully!", session_id, "Strategic Analyst")
+        return cached_bundle
+
+    async def _refresh_price_history(self, full_symbol: str, yahoo_server, session_id: str = None):
+        """
+        Top up the local price store for a symbol and return its daily bars,
+        or None if the store is disabled or the refresh fails.
+        """
+        if self.price_store is None:
+            return None
+        try:
+            bars = await self.price_store.refresh(full_symbol, yahoo_server)
+        except Exception as e:
+            print(f"[PRICE_STORE] Refresh failed for {full_symbol}: {e}")
+            bars = self.price_store.read(full_symbol)
+        if len(bars) == 0:
+            return None
+        self._log_status(
+            f"Price history ready: {len(bars)} daily bars through {bars['date'][-1]}",
+            session_id,
+            "Technical Analyst"
+        )
+        return bars
+
+    async def _run_streamed(
+        self,
+        agent,
+        prompt: str,
+        max_turns: int,
+        agent_label: str,
+        stage: str,
+        session_id: str = None,
+        symbol: str = None,
+        budget: float = None
+    ):
+        """
+        Runner.run for the synthesis stages, forwarding the output as it is
+        written as coalesced "partial" progress events. Falls back to a plain
+        run when there is no session to stream to. Raises StageTimeout when
+        the run outlasts `budget` seconds.
+        """
+        if not (self.stream_partials and session_id):
+            return await self._run_agent(agent, prompt, max_turns, agent_label, budget)
+
+        def publish(delta: str, offset: int, reset: bool):
+            update = {
+                'type': 'partial',
+                'stage': stage,
+                'agent': agent_label,
+                'delta': delta,
+                'offset': offset,
+                'reset': reset,
+                'timestamp': datetime.now().isoformat()
+            }
+            if symbol:
+                update['symbol'] = symbol
+            self._publish(session_id, update)
+
+        partials = PartialOutputStream(
+            publish,
+            structured=agent.output_type is not None,
+            min_interval=self.partial_flush_seconds,
+            min_chars=self.partial_flush_chars,
+        )
+
+        def on_event(event) -> bool:
+            if event.type != "raw_response_event" or getattr(event.data, "type", None) != "response.output_text.delta":
+                return False
+            # Cancellation is checked once per flush rather than per token
+            return partials.feed(event.data.delta) and self._is_cancelled(session_id)
+
+        with track_agent_run(self.metrics, agent_label) as run:
+            result = run.result = Runner.run_streamed(agent, prompt, max_turns=max_turns, run_config=self.run_config)
+            await self._drain_within(result, budget, agent_label, on_event)
+            self._throw_if_cancelled(session_id)
+        partials.flush()
+        return result
+
+    async def _run_analyst(
+        self,
+        agent,
+        prompt: str,
+        max_turns: int,
+        agent_label: str,
+        analysis_label: str,
+        session_id: str = None,
+        deadline: Deadline = None
+    ) -> str:
+        """
+        Run one specialist analyst, turning failures into a readable placeholder.
+
+        With a deadline (the analysts' stage), a run that overruns it is cut
+        short and writes up what it gathered instead.
+        """
+        self._throw_if_cancelled(session_id)
+        self._log_status(f"{agent_label} started...", session_id, agent_label)
+        try:
+            result = await self._run_agent(agent, prompt, max_turns, agent_label, self._analyst_budget(deadline))
+            self._log_status(f"{agent_label} completed", session_id, agent_label)
+            return result.final_output
+        except StageTimeout as timeout:
+            output = await self._wrap_up_analysis(agent, prompt, timeout, deadline, session_id)
+            return output or f"{analysis_label} truncated: the time budget ran out before any analysis was written."
+        except Exception as e:
+            self._log_status(f"{agent_label} encountered an error: {str(e)}", session_id, agent_label)
+            print(f"[ERROR] {agent_label} failed: {e}")
+            return f"{analysis_label} unavailable due to error: {str(e)}"
+
+    async def _run_news_analyst(
+        self,
+        news_agent,
+        news_prompt: str,
+        full_symbol: str,
+        news_servers: list,
+        session_id: str = None,
+        deadline: Deadline = None
+    ) -> NewsAnalysis:
+        """
+        Run the News Analyst, falling back to a short summary when it runs out
+        of turns, or to a write-up of what it found when it runs out of time.
+        """
+        self._throw_if_cancelled(session_id)
+        self._log_status("News Analyst started...", session_id, "News Analyst")
+        try:
+            news_result = await self._run_agent(news_agent, news_prompt, 14, "News Analyst", self._analyst_budget(deadline))
+            self._log_status("News Analyst completed", session_id, "News Analyst")
+            return news_result.final_output
+        except StageTimeout as timeout:
+            output = await self._wrap_up_analysis(news_agent, news_prompt, timeout, deadline, session_id)
+            return output or NewsAnalysis(
+                analysis="News analysis truncated: the time budget ran out before any coverage was written up.",
+                articles=[]
+            )
+        except Exception as e:
+            error_text = str(e)
+            if "Max turns" not in error_text:
+                self._log_status(f"News Analyst encountered an error: {error_text}", session_id, "News Analyst")
+                print(f"[ERROR] News Analyst failed: {e}")
+                return NewsAnalysis(analysis=f"News analysis unavailable due to error: {error_text}", articles=[])
+
+        self._log_status(
+            "News Analyst hit the time limit while gathering fresh coverage; providing limited update.",
+            session_id,
+            "News Analyst",
+        )
+        fallback_prompt = f"""
+You attempted to research {full_symbol} for news within the last 30 days but ran out of time.
+Using the partial information you already gathered (even if minimal), write a concise update.
+If you truly found no qualifying articles, clearly state that recent coverage is sparse and note any
+relevant context you discovered along the way. Do NOT perform additional searches.
+"""
+        try:
+            fallback_agent = NewsAnalyst.create_agent(news_servers)
+            fallback_result = await self._run_agent(fallback_agent, fallback_prompt, 4, "News Analyst")
+            self._log_status(
+                "News Analyst provided a limited recent news summary.",
+                session_id,
+                "News Analyst",
+            )
+            return fallback_result.final_output
+        except Exception as fallback_error:
+            self._log_status(
+                "News Analyst reported that recent coverage is sparse.",
+                session_id,
+                "News Analyst",
+            )
+            print(f"[WARN] News Analyst fallback failed: {fallback_error}")
+            return NewsAnalysis(
+                analysis="News coverage in the last 30 days appears sparse; unable to retrieve detailed articles after multiple attempts.",
+                articles=[]
+            )
+
+    @staticmethod
+    def _analyst_budget(deadline: Deadline = None):
+        """Seconds an analyst may run within its stage, keeping time back for a wrap-up turn."""
+        if deadline is None:
+            return None
+        wrap_up = min(WRAP_UP_SECONDS, deadline.seconds / 3)
+        return deadline.floored(deadline.remaining() - wrap_up)
+
+    async def _wrap_up_analysis(
+        self,
+        agent,
+        prompt: str,
+        timeout: StageTimeout,
+        deadline: Deadline,
+        session_id: str = None
+    ):
+        """
+        Finish an analyst that ran out of time: one tool-less turn over the
+        tool output it had gathered. Returns None if that fails as well.
+        """
+        agent_label = timeout.agent_label
+        deadline.note_truncated(agent_label)
+        self._log_status(
+            f"{agent_label} reached its {timeout.budget:.0f}s time budget; writing up what it gathered",
+            session_id,
+            agent_label,
+        )
+        wrap_up_prompt = f"""{prompt}
+
+TIME LIMIT REACHED: the research time for this analysis has run out. Do NOT call any tools.
+Write the analysis now from the data gathered so far (below), and briefly note which parts
+could not be covered.
+
+DATA GATHERED SO FAR:
+{timeout.gathered or "Nothing was gathered before the time limit."}
+"""
+        try:
+            writer = agent.clone(mcp_servers=[], tools=[])
+            result = await self._run_agent(
+                writer, wrap_up_prompt, 2, agent_label, deadline.remaining()
+            )
+            self._log_status(f"{agent_label} completed (time-limited)", session_id, agent_label)
+            return result.final_output
+        except Exception as e:
+            self._log_status(f"{agent_label} ran out of time before writing up its analysis", session_id, agent_label)
+            print(f"[WARN] {agent_label} wrap-up failed: {e}")
+            return None
+
+    @staticmethod
+    def _unsynthesized_report(analyses: dict, timeout: StageTimeout) -> ResearchReport:
+        """Stand-in for a Report Generator that ran out of time: the analysts' sections as written."""
+        return ResearchReport(
+            bottom_line="This report was cut short to meet its deadline; the analysts' findings are shown as written.",
+            financial_picture=analyses["financial"],
+            technical_picture=analyses["technical"],
+            news_and_sentiment=analyses["news"],
+            peer_comparison=analyses["comparative"],
+            synthesis=f"Not available: {timeout}.",
+            risks=[],
+            risk_level="Not assessed",
+            risk_level_reason="see the analysts' sections above",
+        )
+
+    @staticmethod
+    async def _gather_tasks(runs: list) -> list:
+        """
+        Run coroutines as concurrent tasks and return their results in order.
+
+        Callers convert ordinary failures into placeholder results themselves, so the
+        only exceptions reaching here are cancellations; those cancel the siblings too.
+        """
+        tasks = [asyncio.create_task(run) for run in runs]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
     async def _research_stock_with_servers(
         self,
         symbol: str,
         exchange: str,
         yahoo_server,
         brave_server,
-        session_id: str = None
+        session_id: str = None,
+        checkpoints: dict = None,
+        deadline: Deadline = None
     ) -> str:
         """
         Internal helper: Research a stock using EXISTING connected servers.
         This is called by research_sector() to avoid nested server connections.
+
+        The report's per-agent timings, turns, tool calls and tokens are
+        returned in metadata["metrics"], and with a deadline, its budget and
+        any stages cut short in metadata["deadline"].
+        """
+        with metrics_scope() as metrics:
+            report_bundle = await self._research_stock_pipeline(
+                symbol, exchange, yahoo_server, brave_server, session_id, checkpoints, deadline
+            )
+        if isinstance(report_bundle, dict):
+            report_bundle.setdefault("metadata", {})["metrics"] = metrics.to_dict()
+            if deadline is not None:
+                report_bundle["metadata"]["deadline"] = deadline.to_dict()
+        return report_bundle
+
+    async def _research_stock_pipeline(
+        self,
+        symbol: str,
+        exchange: str,
+        yahoo_server,
+        brave_server,
+        session_id: str = None,
+        checkpoints: dict = None,
+        deadline: Deadline = None
+    ) -> dict:
+        """
+        The single-stock pipeline: four analysts, then report and strategic take.
+
+        Each analyst, the report and the strategic take are checkpointed under
+        "<symbol>:<stage>" as they finish; stages found in `checkpoints` are
+        restored instead of run again. With a deadline (STOCK_STAGE_SHARES),
+        stages that overrun their budget are cut short; truncated stages are
+        neither checkpointed nor cached.
         """
         self._throw_if_cancelled(session_id)
         
-        # Format symbol for Yahoo Finance
-        if exchange == "NSE" or exchange == "INDIA":
-            full_symbol = f"{symbol}.NS"
-        elif exchange == "BSE":
-            full_symbol = f"{symbol}.BO"
-        else:
-            full_symbol = symbol
+        full_symbol = self._format_symbol(symbol, exchange)
         
         # Servers are ALREADY connected by the caller
         # Assign servers to different agents
@@ -242,89 +801,123 @@ Provide a clear summary: Is {full_symbol} a good value compared to peers?
 Current datetime: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Stock symbol: {full_symbol}"""
 
-        # Run analysts sequentially with status updates
-        self._throw_if_cancelled(session_id)
-        self._log_status("Financial Analyst started...", session_id, "Financial Analyst")
-        try:
-            financial_result = await Runner.run(financial_agent, fundamental_prompt, max_turns=20)
-            financial_analysis = financial_result.final_output
-            self._log_status("Financial Analyst completed", session_id, "Financial Analyst")
-        except Exception as e:
-            financial_analysis = f"Financial analysis unavailable due to error: {str(e)}"
-            self._log_status(f"Financial Analyst encountered an error: {str(e)}", session_id, "Financial Analyst")
-            print(f"[ERROR] Financial Analyst failed: {e}")
+        # Reuse analyst sections that are still fresh from an earlier report
+        cached_analyses = {}
+        if self.report_cache is not None:
+            cached_bundle, cached_analyses = self.report_cache.lookup(full_symbol, exchange)
+            if cached_bundle is not None:
+                return self._serve_cached_report(cached_bundle, session_id)
+
+        checkpoints = checkpoints or {}
+
+        def stage(name: str) -> str:
+            return f"{full_symbol}:{name}"
+
+        # The four specialists are independent of each other; only the
+        # ReportGenerator needs all of their outputs.
+        technical_max_turns = 20
+        restored = {
+            name: checkpoints[stage(name)]
+            for name in ANALYST_LABELS
+            if name not in cached_analyses and stage(name) in checkpoints
+        }
+        if "news" in restored:
+            restored["news"] = NewsAnalysis.model_validate(restored["news"])
+        pending = [name for name in ANALYST_LABELS if name not in cached_analyses and name not in restored]
+        technical_facts = checkpoints.get(stage("technical_facts"))
+        if "technical" in pending:
+            bars = await self._refresh_price_history(full_symbol, yahoo_server, session_id)
+            technical_facts = compute_indicators(bars) if bars is not None else None
+            if technical_facts:
+                self._save_checkpoint(session_id, stage("technical_facts"), technical_facts)
+        if technical_facts:
+            # The numbers are precomputed, so the agent only interprets them
+            technical_max_turns = 6
+            technical_prompt = f"""Analyze {full_symbol} stock from a technical perspective.
+
+These indicators were computed from local daily price history. Treat them as accurate and
+do not recompute them. Only call a market data tool for something not covered here,
+such as today's live quote.
+
+{format_fact_sheet(technical_facts)}
 
-        self._throw_if_cancelled(session_id)
-        self._log_status("Technical Analyst started...", session_id, "Technical Analyst")
-        try:
-            technical_result = await Runner.run(technical_agent, technical_prompt, max_turns=20)
-            technical_analysis = technical_result.final_output
-            self._log_status("Technical Analyst completed", session_id, "Technical Analyst")
-        except Exception as e:
-            technical_analysis = f"Technical analysis unavailable due to error: {str(e)}"
-            self._log_status(f"Technical Analyst encountered an error: {str(e)}", session_id, "Technical Analyst")
-            print(f"[ERROR] Technical Analyst failed: {e}")
+Provide a comprehensive technical analysis covering current trend, momentum, key price levels,
+volatility, recent performance, and technical outlook.
 
-        self._throw_if_cancelled(session_id)
-        self._log_status("News Analyst started...", session_id, "News Analyst")
-        try:
-            news_result = await Runner.run(news_agent, news_prompt, max_turns=14)
-            news_analysis = news_result.final_output
-            self._log_status("News Analyst completed", session_id, "News Analyst")
-        except Exception as e:
-            error_text = str(e)
-            if "Max turns" in error_text:
-                self._log_status(
-                    "News Analyst hit the time limit while gathering fresh coverage; providing limited update.",
-                    session_id,
-                    "News Analyst",
-                )
-                fallback_prompt = f"""
-You attempted to research {full_symbol} for news within the last 30 days but ran out of time.
-Using the partial information you already gathered (even if minimal), write a concise update.
-If you truly found no qualifying articles, clearly state that recent coverage is sparse and note any
-relevant context you discovered along the way. Do NOT perform additional searches.
-"""
-                try:
-                    fallback_agent = NewsAnalyst.create_agent(news_servers)
-                    fallback_result = await Runner.run(fallback_agent, fallback_prompt, max_turns=4)
-                    news_analysis = fallback_result.final_output
-                    self._log_status(
-                        "News Analyst provided a limited recent news summary.",
-                        session_id,
-                        "News Analyst",
-                    )
-                except Exception as fallback_error:
-                    news_analysis = "News coverage in the last 30 days appears sparse; unable to retrieve detailed articles after multiple attempts."
-                    self._log_status(
-                        "News Analyst reported that recent coverage is sparse.",
-                        session_id,
-                        "News Analyst",
-                    )
-                    print(f"[WARN] News Analyst fallback failed: {fallback_error}")
-            else:
-                news_analysis = f"News analysis unavailable due to error: {error_text}"
-                self._log_status(f"News Analyst encountered an error: {error_text}", session_id, "News Analyst")
-                print(f"[ERROR] News Analyst failed: {e}")
+Current datetime: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Stock symbol: {full_symbol}"""
 
-        self._throw_if_cancelled(session_id)
-        self._log_status("Risk Analyst started...", session_id, "Risk Analyst")
-        try:
-            comparative_result = await Runner.run(comparative_agent, comparative_prompt, max_turns=20)
-            comparative_analysis = comparative_result.final_output
-            self._log_status("Risk Analyst completed", session_id, "Risk Analyst")
-        except Exception as e:
-            comparative_analysis = f"Comparative analysis unavailable due to error: {str(e)}"
-            self._log_status(f"Risk Analyst encountered an error: {str(e)}", session_id, "Risk Analyst")
-            print(f"[ERROR] Risk Analyst failed: {e}")
+        for name in cached_analyses:
+            self._log_status(
+                f"{ANALYST_LABELS[name]} reused a recent analysis", session_id, ANALYST_LABELS[name]
+            )
+        for name in restored:
+            self._log_status(
+                f"{ANALYST_LABELS[name]} completed (restored from checkpoint)", session_id, ANALYST_LABELS[name]
+            )
+
+        def truncated(label: str) -> bool:
+            return deadline is not None and deadline.was_truncated(label)
+
+        # Started after the price refresh, so the analysts' budget isn't spent on it
+        analysts_deadline = deadline.stage("analysts") if deadline is not None else None
+        # Prompts and deadline are final here; each run is bound to them now
+        analyst_runs = {
+            "financial": partial(
+                self._run_analyst, financial_agent, fundamental_prompt, 20, "Financial Analyst", "Financial analysis",
+                session_id, analysts_deadline
+            ),
+            "technical": partial(
+                self._run_analyst, technical_agent, technical_prompt, technical_max_turns, "Technical Analyst",
+                "Technical analysis", session_id, analysts_deadline
+            ),
+            "news": partial(
+                self._run_news_analyst, news_agent, news_prompt, full_symbol, news_servers, session_id, analysts_deadline
+            ),
+            "comparative": partial(
+                self._run_analyst, comparative_agent, comparative_prompt, 20, "Risk Analyst", "Comparative analysis",
+                session_id, analysts_deadline
+            ),
+        }
+
+        async def run_and_checkpoint(name: str):
+            output = await analyst_runs[name]()
+            text = output.analysis if isinstance(output, NewsAnalysis) else output
+            # Failed and time-limited analysts are left for the resumed run to retry
+            if not any(marker in (text or "") for marker in ANALYSIS_FAILURE_MARKERS) and not truncated(ANALYST_LABELS[name]):
+                self._save_checkpoint(session_id, stage(name), output)
+            return output
+
+        if self.concurrent_analysts and len(pending) > 1:
+            self._log_status("Running specialist analysts in parallel...", session_id)
+            results = await self._gather_tasks([run_and_checkpoint(name) for name in pending])
+        else:
+            results = [await run_and_checkpoint(name) for name in pending]
+
+        analyses = {name: cached["text"] for name, cached in cached_analyses.items()}
+        analyses.update(restored)
+        analyses.update(zip(pending, results))
+        # The News Analyst cites its articles as fields; cached news keeps its links alongside the text
+        news_links = cached_analyses.get("news", {}).get("links", [])
+        if isinstance(analyses["news"], NewsAnalysis):
+            news_links = analyses["news"].links()
+            analyses["news"] = analyses["news"].to_markdown()
+        financial_analysis = analyses["financial"]
+        technical_analysis = analyses["technical"]
+        news_analysis = analyses["news"]
+        comparative_analysis = analyses["comparative"]
 
         # Synthesize into formal report
         self._throw_if_cancelled(session_id)
-        self._log_status("Report Generator started...", session_id, "Report Generator")
-        
-        report_agent = ReportGenerator.create_agent()
-        
-        synthesis_prompt = f"""
+        if stage("report") in checkpoints:
+            formal = ResearchReport.model_validate(checkpoints[stage("report")])
+            self._log_status("Report Generator completed (restored from checkpoint)", session_id, "Report Generator")
+        else:
+            self._log_status("Report Generator started...", session_id, "Report Generator")
+
+            report_agent = ReportGenerator.create_agent()
+
+            synthesis_prompt = f"""
 You have received analyses from four specialist analysts on {full_symbol}:
 
 ## FUNDAMENTAL ANALYSIS
@@ -341,18 +934,39 @@ You have received analyses from four specialist analysts on {full_symbol}:
 
 Please synthesize these into a comprehensive investment research report.
 """
-        
-        self._throw_if_cancelled(session_id)
-        report_result = await Runner.run(report_agent, synthesis_prompt, max_turns=3)
-        formal_report = report_result.final_output
-        self._log_status("Report Generator completed", session_id, "Report Generator")
+
+            self._throw_if_cancelled(session_id)
+            try:
+                report_result = await self._run_streamed(
+                    report_agent, synthesis_prompt, 3, "Report Generator", "report", session_id, full_symbol,
+                    deadline.budget("report") if deadline is not None else None
+                )
+                formal = report_result.final_output
+                # Built on time-limited analyses, it is redone when the run is resumed
+                if deadline is None or not deadline.truncated:
+                    self._save_checkpoint(session_id, stage("report"), formal)
+                self._log_status("Report Generator completed", session_id, "Report Generator")
+            except StageTimeout as timeout:
+                deadline.note_truncated("Report Generator")
+                formal = self._unsynthesized_report(analyses, timeout)
+                self._log_status(
+                    f"{timeout}; the report shows the analysts' sections as written",
+                    session_id,
+                    "Report Generator"
+                )
+        formal_report = formal.to_markdown()
 
         # Add the strategic analysis
-        self._log_status("Generating final report...", session_id, "Strategic Analyst")
-        
-        strategic_agent = StrategicAnalyst.create_agent()
-        
-        strategic_prompt = f"""
+        self._throw_if_cancelled(session_id)
+        if stage("strategic") in checkpoints:
+            strategic = StrategicTake.model_validate(checkpoints[stage("strategic")])
+            self._log_status("Strategic Analyst restored from checkpoint", session_id, "Strategic Analyst")
+        else:
+            self._log_status("Generating final report...", session_id, "Strategic Analyst")
+
+            strategic_agent = StrategicAnalyst.create_agent()
+
+            strategic_prompt = f"""
 You have the complete research report on {full_symbol}. 
 
 Your job: Think deeply about the strategic implications. 
@@ -364,32 +978,40 @@ FULL REPORT:
 
 Now provide your strategic analysis following your structured format.
 """
-        
-        self._throw_if_cancelled(session_id)
-        strategic_result = await Runner.run(strategic_agent, strategic_prompt, max_turns=3)
-        strategic_take = strategic_result.final_output
+
+            self._throw_if_cancelled(session_id)
+            try:
+                strategic_result = await self._run_streamed(
+                    strategic_agent, strategic_prompt, 3, "Strategic Analyst", "strategic", session_id, full_symbol,
+                    deadline.budget("strategic") if deadline is not None else None
+                )
+                strategic = strategic_result.final_output
+                if deadline is None or not deadline.truncated:
+                    self._save_checkpoint(session_id, stage("strategic"), strategic)
+            except StageTimeout as timeout:
+                # No call is better than a made-up one; the report stands on its own
+                deadline.note_truncated("Strategic Analyst")
+                strategic = None
+                self._log_status(f"{timeout}; finishing without a strategic take", session_id, "Strategic Analyst")
+        if strategic is not None:
+            strategic_take = strategic.to_markdown()
+        else:
+            strategic_take = (
+                "## Strategic Take\n\nNot available: the strategic analysis ran out of time for this request. "
+                "The report above is complete."
+            )
         
         # Combine formal report + strategic take
         final_report = formal_report + "\n\n---\n\n" + strategic_take
         generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        formal_sections = self._split_markdown_sections(formal_report)
-        news_links = self._extract_links(
-            (news_analysis or '') + '\n' + formal_sections.get('News & Sentiment Summary', '')
-        )
-
         report_bundle = {
             "full_report": final_report,
             "sections": {
-                "executive_summary": formal_sections.get('Executive Summary', '').strip(),
-                "fundamental": formal_sections.get('Fundamental Analysis Summary', '').strip(),
-                "technical": formal_sections.get('Technical Analysis Summary', '').strip(),
-                "news": formal_sections.get('News & Sentiment Summary', '').strip(),
-                "comparison": formal_sections.get('Peer Comparison Summary', '').strip(),
-                "synthesis": formal_sections.get('Synthesis & Investment Considerations', '').strip(),
-                "risk": formal_sections.get('Risk Assessment', '').strip(),
+                **formal.sections(),
                 "strategic": strategic_take.strip(),
             },
+            "recommendation": strategic.model_dump() if strategic is not None else None,
             "analyses": {
                 "financial": financial_analysis,
                 "technical": technical_analysis,
@@ -408,19 +1030,50 @@ Now provide your strategic analysis following your structured format.
                 "type": "stock",
             },
         }
+        if technical_facts:
+            report_bundle["metadata"]["technical_facts"] = technical_facts
+
+        if cached_analyses:
+            report_bundle["metadata"]["cache"] = {"reused_sections": sorted(cached_analyses)}
+
+        if self.report_cache is not None:
+            now = time.time()
+            cache_entries = {}
+            for name, text in analyses.items():
+                if name in cached_analyses:
+                    cache_entries[name] = cached_analyses[name]
+                elif truncated(ANALYST_LABELS[name]):
+                    continue
+                elif not any(marker in (text or "") for marker in ANALYSIS_FAILURE_MARKERS):
+                    cache_entries[name] = {"text": text, "generated_at": now}
+            if "news" in cache_entries:
+                cache_entries["news"] = {**cache_entries["news"], "links": news_links}
+            # A report whose synthesis was cut short is never served whole from the cache
+            synthesis_truncated = truncated("Report Generator") or truncated("Strategic Analyst")
+            self.report_cache.store(
+                full_symbol, exchange, None if synthesis_truncated else report_bundle, cache_entries
+            )
 
         self._log_status("Research completed successfully!", session_id, "Strategic Analyst")
 
         return report_bundle
     
     
-    async def research_stock(self, symbol: str, exchange: str = "US", session_id: str = None) -> str:
+    async def research_stock(
+        self,
+        symbol: str,
+        exchange: str = "US",
+        session_id: str = None,
+        deadline_seconds: float = None
+    ) -> str:
         """
         MODE 1: Deep research on a SINGLE company
         
         Args:
             symbol: Stock ticker (e.g., 'AAPL', 'RELIANCE.NS')
             exchange: Market identifier ('US', 'NSE', 'BSE')
+            deadline_seconds: Wall-clock budget for the whole request; defaults
+                to STOCK_DEADLINE_SECONDS (unbounded when unset)
         
         Returns:
             Comprehensive research report with strategic take
@@ -429,38 +1082,110 @@ Now provide your strategic analysis following your structured format.
         self._log_status(f"Starting research on {symbol}...", session_id)
         self._throw_if_cancelled(session_id)
         
-        # Format symbol for Yahoo Finance
-        if exchange == "NSE" or exchange == "INDIA":
-            full_symbol = f"{symbol}.NS"
-        elif exchange == "BSE":
-            full_symbol = f"{symbol}.BO"
-        else:
-            full_symbol = symbol
-        
-        async with MCPServerStdio(
-            params=self.yahoo_server_params,
-            client_session_timeout_seconds=1200
-        ) as yahoo_server, MCPServerStdio(
-            params=self.brave_server_params,
-            client_session_timeout_seconds=1200
-        ) as brave_server:
-
-            # Connect servers
+        full_symbol = self._format_symbol(symbol, exchange)
+        if deadline_seconds is None:
+            deadline_seconds = self.stock_deadline_seconds
+        deadline = Deadline(deadline_seconds, STOCK_STAGE_SHARES) if deadline_seconds else None
+
+        with self._cancellation(session_id), track_session(self.metrics, "stock"):
+            # A fully fresh cached report needs no servers or agents at all
+            if self.report_cache is not None:
+                cached_bundle, _ = self.report_cache.lookup(full_symbol, exchange)
+                if cached_bundle is not None:
+                    return self._serve_cached_report(cached_bundle, session_id)
+
             self._log_status("Connecting to MCP servers...", session_id)
-            await yahoo_server.connect()
-            await brave_server.connect()
-            self._log_status("Servers connected!", session_id)
-            self._throw_if_cancelled(session_id)
+            async with self._connected_servers("yahoo", "brave") as (yahoo_server, brave_server):
+                self._log_status("Servers connected!", session_id)
+                self._throw_if_cancelled(session_id)
 
-            # Use the helper function
-            final_report = await self._research_stock_with_servers(
-                symbol, exchange, yahoo_server, brave_server, session_id
-            )
+                # Use the helper function
+                final_report = await self._research_stock_with_servers(
+                    symbol, exchange, yahoo_server, brave_server, session_id, self._load_checkpoints(session_id),
+                    deadline
+                )
 
-            return final_report
+                return final_report
     
     
-    async def research_sector(self, sector: str, exchange: str = "US", num_companies: int = 5, session_id: str = None) -> str:
+    async def _screen_candidates(
+        self,
+        tickers: list,
+        exchange: str,
+        num_companies: int,
+        yahoo_server,
+        session_id: str = None
+    ):
+        """
+        Rank sector candidates quantitatively and keep the top num_companies.
+
+        Returns (selected_tickers, ranked_rows). Falls back to the Sector
+        Analyst's own order if the screen can't score anything.
+        """
+        self._log_status(
+            f"Screening {len(tickers)} candidates on valuation, growth, margins and momentum...",
+            session_id,
+            "Sector Analyst"
+        )
+        by_symbol = {self._format_symbol(ticker, exchange): ticker for ticker in tickers}
+        try:
+            ranked = await self.screener.screen(list(by_symbol), yahoo_server)
+        except Exception as e:
+            self._log_status(f"Screening failed, keeping the Sector Analyst's order: {e}", session_id)
+            return tickers[:num_companies], []
+        if not ranked:
+            self._log_status("No screening data available, keeping the Sector Analyst's order", session_id)
+            return tickers[:num_companies], []
+
+        selected = [by_symbol[row["symbol"]] for row in ranked[:num_companies]]
+        # Top up from the original list if too few candidates could be scored
+        for ticker in tickers:
+            if len(selected) >= num_companies:
+                break
+            if ticker not in selected:
+                selected.append(ticker)
+
+        self._log_status(
+            f"Screen complete: top {len(selected)} of {len(tickers)} selected for full research",
+            session_id,
+            "Sector Analyst"
+        )
+        return selected, ranked
+
+    @staticmethod
+    def _universe_sector_companies(sector: str, listings: list) -> SectorCompanies:
+        """Step 1 output built from ticker-universe listings instead of web searches."""
+        return SectorCompanies(sector=sector, companies=[
+            SectorCompany(
+                name=listing.name or listing.symbol,
+                ticker=listing.symbol,
+                exchange=listing.exchange,
+                description=" - ".join(part for part in (listing.sector, listing.industry) if part),
+                why_it_matters=(
+                    f"Market cap ${listing.market_cap / 1e9:,.1f}B" if listing.market_cap else "Market cap not available"
+                ),
+            )
+            for listing in listings
+        ])
+
+    def _known_tickers(self, tickers: list, exchange: str) -> list:
+        """
+        Drop tickers the ticker universe doesn't list for this exchange, unless
+        the snapshot doesn't cover the exchange or none of them would be left.
+        """
+        if self.ticker_universe is None or not self.ticker_universe.covers_market(exchange):
+            return tickers
+        known = [ticker for ticker in tickers if self.ticker_universe.get(ticker, exchange) is not None]
+        return known or tickers
+
+    async def research_sector(
+        self,
+        sector: str,
+        exchange: str = "US",
+        num_companies: int = 5,
+        session_id: str = None,
+        deadline_seconds: float = None
+    ) -> str:
         """
         MODE 2: Research an entire SECTOR
 
@@ -468,18 +1193,57 @@ Now provide your strategic analysis following your structured format.
             sector: Sector name (e.g., 'Technology', 'Banking')
             exchange: Market identifier ('US', 'NSE', 'BSE')
             num_companies: How many top companies to analyze (1-10)
+            deadline_seconds: Wall-clock budget for the whole request; defaults
+                to SECTOR_DEADLINE_SECONDS (unbounded when unset)
 
         Returns:
             Sector research report with rankings and recommendations
 
         Note: Each sector research takes 10-20 minutes. Don't run multiple
         sector researches in the same cell - run them separately.
+
+        The company list, the screen, each company's report and the portfolio
+        are checkpointed as they finish, so a resumed session picks up from
+        the first stage that didn't. Per-agent timings, turns, tool calls and
+        tokens for the whole session are returned in metadata["metrics"], and
+        with a deadline, its budget and any stages cut short in
+        metadata["deadline"].
+        """
+        if deadline_seconds is None:
+            deadline_seconds = self.sector_deadline_seconds
+        deadline = Deadline(deadline_seconds, SECTOR_STAGE_SHARES) if deadline_seconds else None
+
+        with self._cancellation(session_id), track_session(self.metrics, "sector"), metrics_scope() as metrics:
+            sector_payload = await self._research_sector_pipeline(sector, exchange, num_companies, session_id, deadline)
+        if isinstance(sector_payload, dict):
+            sector_payload["metadata"]["metrics"] = metrics.to_dict()
+            if deadline is not None:
+                sector_payload["metadata"]["deadline"] = deadline.to_dict()
+        return sector_payload
+
+    async def _research_sector_pipeline(
+        self,
+        sector: str,
+        exchange: str,
+        num_companies: int,
+        session_id: str = None,
+        deadline: Deadline = None
+    ):
+        """
+        Steps 1-3 of research_sector: find the companies, research each one, compare them.
+
+        With a deadline (SECTOR_STAGE_SHARES), each company's report gets an
+        equal slice of the research stage and the stages that overrun are cut
+        short; companies that can't start before the stage ends are skipped.
         """
 
         num_companies = min(num_companies, 10)
+        # Ask for a wider list when it will be screened down afterwards
+        candidate_count = max(num_companies, self.screen_candidates)
 
         self._log_status(f"Starting SECTOR research on {sector}...", session_id, "Sector Analyst")
         self._throw_if_cancelled(session_id)
+        checkpoints = self._load_checkpoints(session_id)
 
         # Small delay to ensure clean async state
         await asyncio.sleep(1)
@@ -488,20 +1252,39 @@ Now provide your strategic analysis following your structured format.
         sector_analysis = ""
         tickers = []
 
+        # The local snapshot answers Step 1 outright when it covers the sector
+        listings = []
+        if self.ticker_universe is not None:
+            listings = self.ticker_universe.top_by_market_cap(sector, exchange, candidate_count)
+
         try:
             # STEP 1: Identify top companies (separate connection for search)
             self._log_status("Step 1: Identifying top companies in sector...", session_id, "Sector Analyst")
 
-            async with MCPServerStdio(
-                params=self.brave_server_params,
-                client_session_timeout_seconds=1200
-            ) as search_server:
-
-                await search_server.connect()
+            if "sector:companies" in checkpoints:
+                sector_companies = SectorCompanies.model_validate(checkpoints["sector:companies"]["companies"])
+                sector_analysis = sector_companies.to_markdown()
+                tickers = checkpoints["sector:companies"]["tickers"]
+                self._log_status(
+                    f"Sector Analyst completed Step 1: {len(tickers)} companies restored from checkpoint",
+                    session_id,
+                    "Sector Analyst"
+                )
+            elif len(listings) >= num_companies:
+                sector_companies = self._universe_sector_companies(sector, listings)
+                sector_analysis = sector_companies.to_markdown()
+                tickers = sector_companies.tickers()
+                self._log_status(
+                    f"Sector Analyst completed Step 1: {len(tickers)} companies taken from the ticker universe",
+                    session_id,
+                    "Sector Analyst"
+                )
+            else:
+                async with self._connected_servers("brave") as (search_server,):
 
-                sector_agent = SectorAnalyst.create_agent([search_server])
+                    sector_agent = SectorAnalyst.create_agent([search_server])
 
-                sector_prompt = f"""Identify the top {num_companies} public companies in the {sector} sector.
+                    sector_prompt = f"""Identify the top {candidate_count} public companies in the {sector} sector.
 
 Focus on the {exchange} market.
 
@@ -513,73 +1296,140 @@ For each company provide:
 - Exchange
 - Brief description
 
-Deliver a clear list of {num_companies} companies with accurate ticker symbols."""
-
-                sector_result = await Runner.run(sector_agent, sector_prompt, max_turns=15)
-                sector_analysis = sector_result.final_output
-
-                self._log_status("Sector Analyst completed Step 1: Top companies identified!", session_id, "Sector Analyst")
-                self._log_status(f"Found companies: {sector_analysis[:200]}...", session_id, "Sector Analyst")
+Deliver a clear list of {candidate_count} companies with accurate ticker symbols."""
+
+                    companies_deadline = deadline.stage("companies") if deadline is not None else None
+                    try:
+                        sector_result = await self._run_agent(
+                            sector_agent, sector_prompt, 15, "Sector Analyst", self._analyst_budget(companies_deadline)
+                        )
+                        sector_companies = sector_result.final_output
+                    except StageTimeout as timeout:
+                        # List what the searches so far turned up
+                        sector_companies = await self._wrap_up_analysis(
+                            sector_agent, sector_prompt, timeout, companies_deadline, session_id
+                        )
+                        if sector_companies is None:
+                            raise
+                    sector_analysis = sector_companies.to_markdown()
+                    tickers = self._known_tickers(sector_companies.tickers(), exchange)
+
+                    self._log_status("Sector Analyst completed Step 1: Top companies identified!", session_id, "Sector Analyst")
+                    self._log_status(f"Found companies: {sector_analysis[:200]}...", session_id, "Sector Analyst")
+
+            if "sector:companies" not in checkpoints and (deadline is None or not deadline.truncated):
+                self._save_checkpoint(
+                    session_id, "sector:companies", {"companies": sector_companies.model_dump(), "tickers": tickers}
+                )
 
         except Exception as e:
             self._log_status(f"Error in sector identification: {e}", session_id)
             return f"Failed to identify companies in {sector} sector: {e}"
         
-        # Extract ticker symbols
-        ticker_pattern = r'\(([A-Z]+(?:\.[A-Z]+)?)\s*(?:,\s*[A-Z]+)?\)'
-        tickers = re.findall(ticker_pattern, sector_analysis)
-        
         if not tickers:
-            self._log_status("Could not extract tickers automatically.", session_id)
+            self._log_status("Sector Analyst returned no ticker symbols.", session_id)
             return sector_analysis
 
-        tickers = tickers[:num_companies]
-        self._log_status(f"Will analyze: {', '.join(tickers)}", session_id, "Sector Analyst")
-
-        # STEP 2: Research all companies using ONE set of connected servers
-        self._log_status(f"Step 2: Researching {len(tickers)} companies...", session_id, "Financial Analyst")
-        
+        tickers = tickers[:candidate_count]
+        screen_rows = []
         company_reports = {}
         
         # Connect servers ONCE outside the loop
         # Increased timeout for multi-company research
-        async with MCPServerStdio(
-            params=self.yahoo_server_params,
-            client_session_timeout_seconds=1200  # 10 minutes total
-        ) as yahoo_server, MCPServerStdio(
-            params=self.brave_server_params,
-            client_session_timeout_seconds=1200  # 10 minutes total
-        ) as brave_server:
-            
-            # Connect once
-            self._log_status("Connecting to research servers...", session_id)
-            await yahoo_server.connect()
-            await brave_server.connect()
+        self._log_status("Connecting to research servers...", session_id)
+        async with self._connected_servers("yahoo", "brave") as (yahoo_server, brave_server):
             self._log_status("Servers connected for all company research!", session_id)
             self._throw_if_cancelled(session_id)
 
-            # Now research each company using the SAME connected servers
-            for i, ticker in enumerate(tickers, 1):
+            if "sector:screen" in checkpoints:
+                tickers = checkpoints["sector:screen"]["tickers"]
+                screen_rows = checkpoints["sector:screen"]["rows"]
+                self._log_status("Screen restored from checkpoint", session_id, "Sector Analyst")
+            elif len(tickers) > num_companies:
+                tickers, screen_rows = await self._screen_candidates(
+                    tickers, exchange, num_companies, yahoo_server, session_id
+                )
                 self._throw_if_cancelled(session_id)
-                self._log_status(f"Company {i}/{len(tickers)}: {ticker}", session_id)
+                self._save_checkpoint(session_id, "sector:screen", {"tickers": tickers, "rows": screen_rows})
+            self._log_status(f"Will analyze: {', '.join(tickers)}", session_id, "Sector Analyst")
+
+            # STEP 2: Research all companies using ONE set of connected servers
+            self._log_status(f"Step 2: Researching {len(tickers)} companies...", session_id, "Financial Analyst")
+
+            # Research several companies at once on the SAME connected servers.
+            # The per-run semaphore bounds this sector run; the process-wide
+            # slots bound all sector runs together.
+            run_slots = asyncio.Semaphore(self.max_parallel_companies)
+
+            # Each finished report is compressed straight away (map); the
+            # Portfolio Strategist only ever sees the digests (reduce)
+            digest_tokens = min(self.digest_tokens, self.synthesis_token_budget // len(tickers))
+            screen_by_symbol = {row["symbol"]: row for row in screen_rows}
+            digests = {}
+
+            # Each company gets an equal slice of the research stage per wave of
+            # parallel runs, and never more than what is left of the stage
+            research_deadline = deadline.stage("research") if deadline is not None else None
+            if research_deadline is not None:
+                waves = -(-len(tickers) // self.max_parallel_companies)
+                company_seconds = research_deadline.seconds / waves
+
+            async def research_company(i: int, ticker: str):
+                if f"company:{ticker}" in checkpoints:
+                    report_bundle = checkpoints[f"company:{ticker}"]
+                    self._log_status(f"Company {i}/{len(tickers)}: {ticker} restored from checkpoint", session_id)
+                else:
+                    async with run_slots, COMPANY_RESEARCH_SLOTS:
+                        self._throw_if_cancelled(session_id)
+                        self._log_status(f"Company {i}/{len(tickers)}: {ticker}", session_id)
+
+                        try:
+                            company_deadline = None
+                            if research_deadline is not None:
+                                if research_deadline.remaining() < MIN_STAGE_SECONDS:
+                                    research_deadline.note_truncated(f"{ticker}: skipped")
+                                    raise TimeoutError("the sector deadline was reached before its research could start")
+                                company_deadline = research_deadline.child(
+                                    min(company_seconds, research_deadline.remaining()), STOCK_STAGE_SHARES, ticker
+                                )
+
+                            # Use helper function with existing connected servers
+                            report_bundle = await self._research_stock_with_servers(
+                                ticker, exchange, yahoo_server, brave_server, session_id, checkpoints, company_deadline
+                            )
+                            # A time-limited report is redone in full by a resumed run
+                            if company_deadline is None or not company_deadline.truncated:
+                                self._save_checkpoint(session_id, f"company:{ticker}", report_bundle)
+                        except ResearchCancelled:
+                            raise
+                        except Exception as e:
+                            self._log_status(f"Error researching {ticker}: {e}", session_id)
+                            report_bundle = {
+                                "full_report": f"Unable to complete research on {ticker}",
+                                "metadata": {
+                                    "symbol": ticker,
+                                    "exchange": exchange,
+                                    "error": str(e),
+                                }
+                            }
+
+                digest = build_company_digest(
+                    ticker, report_bundle, digest_tokens, screen_by_symbol.get(self._format_symbol(ticker, exchange))
+                )
+                digests[ticker] = digest
+                self._log_status(
+                    f"{ticker} digest ready: {digest['tokens']} tokens from a {digest['source_tokens']}-token report",
+                    session_id,
+                    "Portfolio Strategist"
+                )
+                return report_bundle
 
-                try:
-                    # Use helper function with existing connected servers
-                    report_bundle = await self._research_stock_with_servers(
-                        ticker, exchange, yahoo_server, brave_server, session_id
-                    )
-                    company_reports[ticker] = report_bundle
-
-                except Exception as e:
-                    self._log_status(f"Error researching {ticker}: {e}", session_id)
-                    company_reports[ticker] = {
-                        "full_report": f"Unable to complete research on {ticker}",
-                        "metadata": {
-                            "symbol": ticker,
-                            "exchange": exchange,
-                            "error": str(e),
-                        }
-                    }
+            results = await self._gather_tasks(
+                [research_company(i, ticker) for i, ticker in enumerate(tickers, 1)]
+            )
+            # Keep the SectorAnalyst's ordering for the final report
+            for ticker, report_bundle in zip(tickers, results):
+                company_reports[ticker] = report_bundle
 
             self._log_status(f"All {len(tickers)} companies researched!", session_id)
 
@@ -595,15 +1445,17 @@ Deliver a clear list of {num_companies} companies with accurate ticker symbols."
 ## Companies Analyzed:
 {', '.join(tickers)}
 
-## Individual Company Reports:
-
 """
+            if screen_rows:
+                combined_reports += (
+                    f"## Quantitative Screen ({len(screen_rows)} candidates, * = researched)\n\n"
+                    f"{format_screen_table(screen_rows, len(tickers))}\n\n"
+                )
+            combined_reports += "## Company Digests:\n\n"
+            combined_reports += "\n\n".join(digests[ticker]["text"] for ticker in tickers)
+            combined_reports += "\n\n"
 
-            for ticker, report_bundle in company_reports.items():
-                report_text = report_bundle.get("full_report") if isinstance(report_bundle, dict) else str(report_bundle)
-                combined_reports += f"\n{'='*60}\n## {ticker} FULL REPORT\n{'='*60}\n\n{report_text}\n\n"
-
-            portfolio_prompt = f"""You have detailed research reports on {len(tickers)} companies in the {sector} sector:
+            portfolio_prompt = f"""You have research digests on {len(tickers)} companies in the {sector} sector, condensed from full reports:
 
 {combined_reports}
 
@@ -617,9 +1469,52 @@ Remember to:
 
 Be decisive and opinionated."""
 
+            source_tokens = sum(digest["source_tokens"] for digest in digests.values())
+            token_usage = {
+                "digest_budget": digest_tokens,
+                "company_reports": source_tokens,
+                "digests": {ticker: digests[ticker]["tokens"] for ticker in tickers},
+                "portfolio_prompt": estimate_tokens(portfolio_prompt),
+            }
+            self._log_status(
+                f"Portfolio Strategist prompt: {token_usage['portfolio_prompt']} tokens "
+                f"(full reports: {source_tokens})",
+                session_id,
+                "Portfolio Strategist"
+            )
+
             self._throw_if_cancelled(session_id)
-            portfolio_result = await Runner.run(strategist, portfolio_prompt, max_turns=5)
-            portfolio_recommendations = portfolio_result.final_output
+            if "sector:portfolio" in checkpoints:
+                portfolio = PortfolioRecommendation.model_validate(checkpoints["sector:portfolio"]["output"])
+                token_usage["portfolio_model"] = checkpoints["sector:portfolio"]["usage"]
+                self._log_status("Portfolio Strategist restored from checkpoint", session_id, "Portfolio Strategist")
+            else:
+                try:
+                    portfolio_result = await self._run_streamed(
+                        strategist, portfolio_prompt, 5, "Portfolio Strategist", "portfolio", session_id,
+                        budget=deadline.budget("portfolio") if deadline is not None else None
+                    )
+                    portfolio = portfolio_result.final_output
+                    token_usage["portfolio_model"] = run_usage(portfolio_result)
+                    if deadline is None or not deadline.truncated:
+                        self._save_checkpoint(
+                            session_id, "sector:portfolio",
+                            {"output": portfolio.model_dump(), "usage": token_usage["portfolio_model"]}
+                        )
+                except StageTimeout as timeout:
+                    # Without rankings, the digests are the most useful thing to show
+                    deadline.note_truncated("Portfolio Strategist")
+                    portfolio = None
+                    self._log_status(f"{timeout}; showing the company digests unranked", session_id, "Portfolio Strategist")
+            if portfolio is not None:
+                portfolio_recommendations = portfolio.to_markdown()
+            else:
+                portfolio_recommendations = (
+                    "## My Sector Picks\n\nRankings not available: the portfolio comparison ran out of time "
+                    "for this request. Each company's call is summarized below.\n\n"
+                    + "\n\n".join(digests[ticker]["text"] for ticker in tickers)
+                )
+            token_usage["portfolio_output"] = estimate_tokens(portfolio_recommendations)
 
             self._log_status("Portfolio analysis complete!", session_id, "Portfolio Strategist")
         
@@ -636,9 +1531,14 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 ---
 
-## Detailed Company Reports
-
 """
+        if screen_rows:
+            final_sector_report += (
+                f"## Quantitative Screen\n\n{len(screen_rows)} candidates ranked on earnings yield, revenue growth, "
+                f"operating margin, 6-month momentum and volatility; * = researched in full.\n\n"
+                f"{format_screen_table(screen_rows, len(tickers))}\n\n---\n\n"
+            )
+        final_sector_report += "## Detailed Company Reports\n\n"
         
         for ticker, report_bundle in company_reports.items():
             report_text = report_bundle.get("full_report") if isinstance(report_bundle, dict) else str(report_bundle)
@@ -652,6 +1552,9 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             "sector_summary": sector_analysis,
             "portfolio_recommendations": portfolio_recommendations,
             "company_reports": company_reports,
+            "screening": screen_rows,
+            "companies": sector_companies.model_dump(),
+            "rankings": portfolio.model_dump() if portfolio is not None else None,
             "sections": {
                 "sector_summary": sector_analysis,
                 "portfolio": portfolio_recommendations,
@@ -660,6 +1563,8 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 "sector": sector,
                 "exchange": exchange,
                 "num_companies": len(tickers),
+                "candidates_screened": len(screen_rows),
+                "token_usage": token_usage,
                 "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 "session_id": session_id,
                 "type": "sector",
@@ -667,3 +1572,160 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         }
 
         return sector_payload
+
+    async def research_batch(
+        self,
+        symbols: list,
+        exchange: str = "US",
+        session_id: str = None,
+        deadline_seconds: float = None
+    ) -> dict:
+        """
+        MODE 3: Research a WATCHLIST of stocks in one session
+
+        Args:
+            symbols: Stock tickers (duplicates are researched once)
+            exchange: Market identifier ('US', 'NSE', 'BSE')
+            deadline_seconds: Wall-clock budget for EACH symbol's report;
+                defaults to STOCK_DEADLINE_SECONDS (unbounded when unset)
+
+        Returns:
+            Summary table plus every symbol's report bundle under "reports"
+
+        Every symbol runs the full single-company pipeline, batch_concurrency
+        at a time, on one set of MCP servers, so quotes and peer data fetched
+        for one symbol are reused by the others through the tool cache. Each
+        report is checkpointed as "batch:<SYMBOL>" and announced with a
+        "symbol_complete" progress event as soon as it finishes.
+        """
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol and symbol.strip()))
+        if deadline_seconds is None:
+            deadline_seconds = self.stock_deadline_seconds
+
+        with self._cancellation(session_id), track_session(self.metrics, "batch"), metrics_scope() as metrics:
+            batch_payload = await self._research_batch_pipeline(symbols, exchange, session_id, deadline_seconds)
+        batch_payload["metadata"]["metrics"] = metrics.to_dict()
+        return batch_payload
+
+    @staticmethod
+    def _batch_summary_row(symbol: str, report_bundle: dict) -> dict:
+        """One watchlist row: the call, conviction and bottom line from a report bundle."""
+        metadata = report_bundle.get("metadata") or {}
+        recommendation = report_bundle.get("recommendation") or {}
+        return {
+            "symbol": symbol,
+            "status": "error" if metadata.get("error") else "complete",
+            "recommendation": recommendation.get("recommendation"),
+            "conviction": recommendation.get("conviction"),
+            "bottom_line": recommendation.get("bottom_line"),
+            "truncated": (metadata.get("deadline") or {}).get("truncated", []),
+            "error": metadata.get("error"),
+        }
+
+    async def _research_batch_pipeline(
+        self,
+        symbols: list,
+        exchange: str,
+        session_id: str = None,
+        deadline_seconds: float = None
+    ) -> dict:
+        """Research each symbol of research_batch, publishing each report as it finishes."""
+        self._log_status(f"Starting BATCH research on {len(symbols)} symbols...", session_id)
+        self._throw_if_cancelled(session_id)
+        checkpoints = self._load_checkpoints(session_id)
+
+        run_slots = asyncio.Semaphore(self.batch_concurrency)
+        rows = {}
+
+        self._log_status("Connecting to MCP servers...", session_id)
+        async with self._connected_servers("yahoo", "brave") as (yahoo_server, brave_server):
+            self._log_status("Servers connected!", session_id)
+
+            async def research_symbol(symbol: str):
+                # Failed and time-limited reports are redone by a resumed run
+                restored = checkpoints.get(f"batch:{symbol}")
+                restored_row = self._batch_summary_row(symbol, restored) if restored is not None else None
+                if restored_row is not None and restored_row["status"] == "complete" and not restored_row["truncated"]:
+                    report_bundle = restored
+                    self._log_status(f"{symbol} restored from checkpoint", session_id)
+                else:
+                    async with run_slots, COMPANY_RESEARCH_SLOTS:
+                        self._throw_if_cancelled(session_id)
+                        self._log_status(f"Researching {symbol}...", session_id)
+                        deadline = Deadline(deadline_seconds, STOCK_STAGE_SHARES) if deadline_seconds else None
+
+                        try:
+                            report_bundle = await self._research_stock_with_servers(
+                                symbol, exchange, yahoo_server, brave_server, session_id, checkpoints, deadline
+                            )
+                        except ResearchCancelled:
+                            raise
+                        except Exception as e:
+                            self._log_status(f"Error researching {symbol}: {e}", session_id)
+                            report_bundle = {
+                                "full_report": f"Unable to complete research on {symbol}",
+                                "metadata": {
+                                    "symbol": self._format_symbol(symbol, exchange),
+                                    "exchange": exchange,
+                                    "error": str(e),
+                                }
+                            }
+                    # Saved either way: this is also where the report is fetched from on its own
+                    self._save_checkpoint(session_id, f"batch:{symbol}", report_bundle)
+
+                row = rows[symbol] = self._batch_summary_row(symbol, report_bundle)
+                self._publish(session_id, {
+                    "type": "symbol_complete",
+                    "message": f"{symbol} {'failed' if row['status'] == 'error' else 'complete'} "
+                               f"({len(rows)}/{len(symbols)})",
+                    **row,
+                    "completed": len(rows),
+                    "total": len(symbols),
+                    "timestamp": datetime.now().isoformat(),
+                })
+                return report_bundle
+
+            results = await self._gather_tasks([research_symbol(symbol) for symbol in symbols])
+
+        self._throw_if_cancelled(session_id)
+        reports = dict(zip(symbols, results))
+        summary = [rows[symbol] for symbol in symbols]
+
+        table = "| Symbol | Call | Conviction | Bottom line |\n|---|---|---|---|\n" + "\n".join(
+            f"| {row['symbol']} | {row['recommendation'] or ('Failed' if row['error'] else 'n/a')} | "
+            f"{row['conviction'] if row['conviction'] is not None else '-'} | "
+            f"{(row['bottom_line'] or row['error'] or '').replace('|', '/')} |"
+            for row in summary
+        )
+        final_batch_report = f"""# Watchlist Research Report
+Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+{table}
+
+---
+
+## Detailed Company Reports
+
+"""
+        for symbol, report_bundle in reports.items():
+            final_batch_report += f"\n## {symbol} - Detailed Analysis\n\n{report_bundle.get('full_report')}\n\n---\n\n"
+
+        failed = [row["symbol"] for row in summary if row["status"] == "error"]
+        self._log_status(
+            f"BATCH RESEARCH COMPLETE: {len(symbols) - len(failed)}/{len(symbols)} symbols researched", session_id
+        )
+
+        return {
+            "full_report": final_batch_report,
+            "summary": summary,
+            "reports": reports,
+            "failed": failed,
+            "metadata": {
+                "symbols": symbols,
+                "exchange": exchange,
+                "num_symbols": len(symbols),
+                "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "session_id": session_id,
+                "type": "batch",
+            }
+        }
@@ -0,0 +1,257 @@
+# schemas.py - Structured output types for the report-producing agents
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# Yahoo Finance suffixes the research pipeline adds itself (see _format_symbol)
+_EXCHANGE_SUFFIXES = (".NS", ".BO")
+
+
+def _bullets(items: list) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def _price(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:,.2f}"
+
+
+def plain_ticker(ticker: str) -> str:
+    """Upper-case a ticker and drop any exchange suffix."""
+    ticker = (ticker or "").strip().upper()
+    for suffix in _EXCHANGE_SUFFIXES:
+        if ticker.endswith(suffix):
+            return ticker[:-len(suffix)]
+    return ticker
+
+
+# --- News Analyst -----------------------------------------------------------
+
+class NewsArticle(BaseModel):
+    headline: str
+    date: str = Field(description="Publication date, YYYY-MM-DD")
+    source: str = Field(description="Publisher name")
+    url: str = Field(description="Link to the article; empty string if unknown")
+    why_it_matters: str
+
+
+class NewsAnalysis(BaseModel):
+    analysis: str = Field(description="The full news and sentiment analysis in markdown")
+    articles: List[NewsArticle] = Field(description="Every article the analysis relies on")
+
+    def links(self) -> list:
+        """Unique article URLs in the order they were cited."""
+        urls = (article.url.strip() for article in self.articles)
+        return list(dict.fromkeys(url for url in urls if url.startswith(("http://", "https://"))))
+
+    def to_markdown(self) -> str:
+        if not self.articles:
+            return self.analysis.strip()
+        linked = set(self.links())
+        sources = [
+            f"[{article.headline}]({article.url.strip()}) - {article.source}, {article.date}"
+            if article.url.strip() in linked
+            else f"{article.headline} - {article.source}, {article.date}"
+            for article in self.articles
+        ]
+        return f"{self.analysis.strip()}\n\n**Sources**\n{_bullets(sources)}"
+
+
+# --- Report Generator -------------------------------------------------------
+
+class ResearchReport(BaseModel):
+    bottom_line: str = Field(description="The Bottom Line: 2-3 sentences on the overall picture")
+    financial_picture: str = Field(description="The Financial Picture, in markdown")
+    technical_picture: str = Field(description="What the Chart Says, in markdown")
+    news_and_sentiment: str = Field(description="What's Been Happening, in markdown")
+    peer_comparison: str = Field(description="How It Stacks Up vs Competitors, in markdown")
+    synthesis: str = Field(description="Putting It All Together, in markdown")
+    risks: List[str] = Field(description="Specific risks the analysts found, one per item")
+    risk_level: Literal["Low", "Medium", "High", "Not assessed"] = Field(
+        description='Low, Medium or High; "Not assessed" only for reports cut short by a deadline'
+    )
+    risk_level_reason: str
+
+    def risk_markdown(self) -> str:
+        return f"{_bullets(self.risks)}\n\n**Risk Level:** {self.risk_level} - {self.risk_level_reason}"
+
+    def sections(self) -> dict:
+        """The report bundle's "sections" mapping (strategic is added by the caller)."""
+        return {
+            "executive_summary": self.bottom_line.strip(),
+            "fundamental": self.financial_picture.strip(),
+            "technical": self.technical_picture.strip(),
+            "news": self.news_and_sentiment.strip(),
+            "comparison": self.peer_comparison.strip(),
+            "synthesis": self.synthesis.strip(),
+            "risk": self.risk_markdown(),
+        }
+
+    def to_markdown(self) -> str:
+        return "\n\n".join([
+            f"## The Bottom Line\n{self.bottom_line.strip()}",
+            f"## The Financial Picture\n{self.financial_picture.strip()}",
+            f"## What the Chart Says\n{self.technical_picture.strip()}",
+            f"## What's Been Happening\n{self.news_and_sentiment.strip()}",
+            f"## How It Stacks Up vs Competitors\n{self.peer_comparison.strip()}",
+            f"## Putting It All Together\n{self.synthesis.strip()}",
+            f"## The Risk Reality Check\n{self.risk_markdown()}",
+        ])
+
+
+# --- Strategic Analyst ------------------------------------------------------
+
+class Scenario(BaseModel):
+    description: str
+    price_target: Optional[float] = Field(description="6-12 month price target in the stock's trading currency")
+
+
+class StrategicTake(BaseModel):
+    recommendation: Literal["BUY", "HOLD", "AVOID"]
+    headline: str = Field(description="One sentence: why this is the right call right now")
+    whats_happening: str = Field(description="2-3 sentences: the real strategic story behind the data")
+    stance: Literal["bullish", "bearish", "neutral"]
+    reasons: List[str] = Field(description="Three specific reasons, with numbers")
+    opportunity_or_risk: str
+    base_case: Scenario
+    bull_case: Scenario
+    bear_case: Scenario
+    derailers: List[str] = Field(description="Three specific things that could derail the call")
+    bottom_line: str = Field(description="One sentence: would you buy this today or not?")
+    conviction: int = Field(description="Conviction from 1 to 10")
+    conviction_reason: str
+
+    def to_markdown(self) -> str:
+        reasons = "\n".join(f"{i}. {reason}" for i, reason in enumerate(self.reasons, 1))
+        derailers = "\n".join(f"{i}. {risk}" for i, risk in enumerate(self.derailers, 1))
+        scenarios = "\n".join(
+            f"- **{label} case:** {scenario.description} (target: {_price(scenario.price_target)})"
+            for label, scenario in (("Base", self.base_case), ("Bull", self.bull_case), ("Bear", self.bear_case))
+        )
+        return f"""## My Strategic Take 💡
+
+**My recommendation: {self.recommendation}**
+{self.headline}
+
+**What's really happening:**
+{self.whats_happening}
+
+**Why I'm {self.stance}:**
+{reasons}
+
+**The opportunity/risk:**
+{self.opportunity_or_risk}
+
+**What happens next (6-12 months):**
+{scenarios}
+
+**What could derail this:**
+{derailers}
+
+**Bottom line:** {self.bottom_line}
+**Conviction:** {self.conviction}/10 - {self.conviction_reason}"""
+
+
+# --- Sector Analyst ---------------------------------------------------------
+
+class SectorCompany(BaseModel):
+    name: str
+    ticker: str = Field(description="Ticker symbol without any exchange suffix, e.g. RELIANCE not RELIANCE.NS")
+    exchange: str
+    description: str = Field(description="One sentence: what the company does")
+    why_it_matters: str
+
+
+class SectorCompanies(BaseModel):
+    sector: str
+    companies: List[SectorCompany] = Field(description="Largest and most relevant companies first")
+
+    def tickers(self) -> list:
+        return list(dict.fromkeys(plain_ticker(company.ticker) for company in self.companies if company.ticker.strip()))
+
+    def to_markdown(self) -> str:
+        lines = [f"## Top Companies in {self.sector}", ""]
+        for i, company in enumerate(self.companies, 1):
+            lines.append(f"{i}. **{company.name} ({plain_ticker(company.ticker)}, {company.exchange})**")
+            lines.extend(f"   - {text}" for text in (company.description, company.why_it_matters) if text)
+            lines.append("")
+        return "\n".join(lines).rstrip()
+
+
+# --- Portfolio Strategist ---------------------------------------------------
+
+class Scorecard(BaseModel):
+    valuation: float = Field(description="0-10")
+    growth: float = Field(description="0-10")
+    quality: float = Field(description="0-10")
+    momentum: float = Field(description="0-10")
+    overall: float = Field(description="0-10")
+
+
+class RankedPick(BaseModel):
+    rank: int
+    name: str
+    ticker: str = Field(description="Ticker symbol as given in the reports")
+    recommendation: Literal["BUY", "HOLD", "AVOID"]
+    why: str = Field(description="Why it ranks here, with specific numbers vs the others")
+    strengths: List[str]
+    price_target: Optional[float] = Field(description="12-month price target in the stock's trading currency")
+    price_target_reasoning: str
+    risk_level: Literal["Low", "Medium", "High"]
+    risk_reason: str
+    scores: Scorecard
+
+
+class Allocation(BaseModel):
+    ticker: str
+    percent: float = Field(description="Share of the $10,000; all allocations add up to 100")
+    rationale: str
+
+
+class SkippedPick(BaseModel):
+    ticker: str
+    reason: str
+
+
+class PortfolioRecommendation(BaseModel):
+    bottom_line: str = Field(description="2-3 sentences: what's happening in the sector and which stock to buy today")
+    rankings: List[RankedPick] = Field(description="Every company, best first")
+    allocations: List[Allocation]
+    avoid: List[SkippedPick]
+    sector_trends: str = Field(description="2-3 paragraphs on trends, tailwinds and headwinds")
+    final_take: str
+
+    def to_markdown(self) -> str:
+        medals = {1: "🥇 ", 2: "🥈 ", 3: "🥉 "}
+        parts = ["## My Sector Picks", f"### The Bottom Line Up Front\n{self.bottom_line.strip()}", "### The Rankings"]
+        for pick in sorted(self.rankings, key=lambda pick: pick.rank):
+            parts.append(
+                f"**{medals.get(pick.rank, '')}#{pick.rank}: {pick.name} ({pick.ticker}) - {pick.recommendation}**\n"
+                f"- Why: {pick.why}\n"
+                f"- Strengths:\n" + "\n".join(f"  - {strength}" for strength in pick.strengths) + "\n"
+                f"- Price target (12-month): {_price(pick.price_target)} - {pick.price_target_reasoning}\n"
+                f"- Risk level: {pick.risk_level} - {pick.risk_reason}"
+            )
+
+        table = [
+            "| Company | Valuation | Growth | Quality | Momentum | Overall |",
+            "|---------|-----------|--------|---------|----------|---------|",
+        ]
+        for pick in sorted(self.rankings, key=lambda pick: pick.rank):
+            s = pick.scores
+            table.append(
+                f"| {pick.ticker} | {s.valuation:g}/10 | {s.growth:g}/10 | {s.quality:g}/10 | "
+                f"{s.momentum:g}/10 | {s.overall:g}/10 |"
+            )
+        parts.append("### The Comparison Chart\n\n" + "\n".join(table))
+
+        allocations = [
+            f"- **{a.percent:g}% (${a.percent * 100:,.0f}) → {a.ticker}** - {a.rationale}" for a in self.allocations
+        ]
+        portfolio = "### My $10,000 Portfolio\n\n" + "\n".join(allocations)
+        if self.avoid:
+            portfolio += "\n\n**Don't Touch:**\n" + "\n".join(f"- **{skip.ticker}** - {skip.reason}" for skip in self.avoid)
+        parts.append(portfolio)
+
+        parts.append(f"### What's Happening in This Sector\n{self.sector_trends.strip()}")
+        parts.append(f"### My Final Take\n{self.final_take.strip()}")
+        return "\n\n".join(parts)
@@ -0,0 +1,200 @@
+import asyncio
+import re
+import warnings
+
+import numpy as np
+
+from indicators import compute_indicators
+from price_store import structured_payload
+
+# factor -> (weight, higher_is_better)
+SCREEN_FACTORS = {
+    "earnings_yield": (0.25, True),     # valuation: net income / market cap
+    "revenue_growth": (0.25, True),     # latest fiscal year vs the one before
+    "operating_margin": (0.20, True),
+    "momentum_6m": (0.20, True),
+    "volatility_1y": (0.10, False),
+}
+
+# Factor values beyond these percentiles are clipped before z-scoring so one
+# outlier can't dominate the composite
+WINSOR_PERCENTILES = (5, 95)
+
+# Candidates with data for less than this share of the factor weight rank
+# after every better-covered candidate
+MIN_COVERAGE = 0.5
+
+_DATE_COLUMN = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _statement_row(rows: list, *labels) -> list:
+    """Values of the first matching statement line item, newest period first."""
+    wanted = {label.lower() for label in labels}
+    for row in rows or []:
+        name = str(row.get("index") or row.get("Breakdown") or "").strip().lower()
+        if name in wanted:
+            periods = sorted((key for key in row if _DATE_COLUMN.match(key)), reverse=True)
+            return [row[key] for key in periods]
+    return []
+
+
+def _first_number(values: list, position: int = 0):
+    numbers = [value for value in values if isinstance(value, (int, float)) and np.isfinite(value)]
+    return float(numbers[position]) if len(numbers) > position else None
+
+
+def fundamentals_from_payloads(overview: dict, income: dict) -> dict:
+    """Valuation, growth and margin inputs from company overview + yearly income statement payloads."""
+    overview = overview or {}
+    rows = (income or {}).get("incomeStatement") or []
+    revenue = _statement_row(rows, "Total Revenue", "Operating Revenue")
+    net_income = _statement_row(rows, "Net Income", "Net Income Common Stockholders")
+    operating_income = _statement_row(rows, "Operating Income", "EBIT")
+
+    market_cap = overview.get("marketCap")
+    latest_revenue, prior_revenue = _first_number(revenue), _first_number(revenue, 1)
+    latest_income = _first_number(net_income)
+    latest_operating = _first_number(operating_income)
+
+    def ratio(numerator, denominator):
+        if numerator is None or not denominator:
+            return None
+        return numerator / denominator
+
+    growth = ratio(latest_revenue, prior_revenue)
+    return {
+        "name": overview.get("companyName"),
+        "market_cap": market_cap,
+        "earnings_yield": ratio(latest_income, market_cap),
+        "revenue_growth": growth - 1.0 if growth is not None else None,
+        "operating_margin": ratio(latest_operating, latest_revenue),
+    }
+
+
+def price_factors(bars) -> dict:
+    facts = compute_indicators(bars) if bars is not None and len(bars) else {}
+    returns = facts.get("returns_pct", {})
+    momentum = returns.get("6M")
+    volatility = facts.get("volatility_1y_pct")
+    return {
+        "momentum_6m": momentum / 100 if momentum is not None else None,
+        "volatility_1y": volatility / 100 if volatility is not None else None,
+    }
+
+
+def score_candidates(rows: list, factors: dict = None) -> list:
+    """
+    Rank candidate rows (dicts with a "symbol" plus factor values) by a
+    weighted composite of winsorized cross-sectional z-scores.
+
+    Missing factors score 0 (the cross-section average), but rows covering
+    less than MIN_COVERAGE of the factor weight rank below the rest and rows
+    with no data at all are left out. Ties are broken by the original order,
+    so the same inputs always give the same ranking.
+    """
+    factors = factors or SCREEN_FACTORS
+    names = list(factors)
+    if not rows:
+        return []
+
+    values = np.array(
+        [[np.nan if row.get(name) is None else float(row[name]) for name in names] for row in rows],
+        dtype=float,
+    )
+    present = ~np.isnan(values)
+    covered = present.any(axis=1)
+
+    # All-missing factor columns legitimately produce NaN statistics here
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanpercentile(values, WINSOR_PERCENTILES, axis=0)
+        clipped = np.clip(values, low, high)
+        mean = np.nanmean(clipped, axis=0)
+        std = np.nanstd(clipped, axis=0)
+    std = np.where(std > 0, std, 1.0)
+
+    direction = np.array([1.0 if factors[name][1] else -1.0 for name in names])
+    weights = np.array([factors[name][0] for name in names])
+    z_scores = np.nan_to_num((clipped - mean) / std * direction)
+    composite = z_scores @ weights
+    thin = present @ weights < MIN_COVERAGE * weights.sum()
+
+    order = np.lexsort((np.arange(len(rows)), -composite, thin))
+    ranked = []
+    for index in order:
+        if not covered[index]:
+            continue
+        row = dict(rows[index])
+        row["score"] = round(float(composite[index]), 4)
+        row["factor_scores"] = {name: round(float(z_scores[index, j]), 3) for j, name in enumerate(names)}
+        row["rank"] = len(ranked) + 1
+        ranked.append(row)
+    return ranked
+
+
+def format_screen_table(ranked: list, selected: int) -> str:
+    """Markdown table of the screen for the Portfolio Strategist and the final report."""
+    def show(value, scale=100, suffix="%"):
+        return "n/a" if value is None else f"{value * scale:.1f}{suffix}"
+
+    lines = [
+        "| Rank | Symbol | Score | Earnings yield | Revenue growth | Op. margin | 6M momentum | 1Y vol |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for row in ranked:
+        marker = " *" if row["rank"] <= selected else ""
+        lines.append(
+            f"| {row['rank']}{marker} | {row['symbol']} | {row['score']:.2f} | {show(row.get('earnings_yield'))} | "
+            f"{show(row.get('revenue_growth'))} | {show(row.get('operating_margin'))} | "
+            f"{show(row.get('momentum_6m'))} | {show(row.get('volatility_1y'))} |"
+        )
+    return "\n".join(lines)
+
+
+class CandidateScreener:
+    """
+    Quantitative pre-screen for sector research.
+
+    Pulls each candidate's overview and yearly income statement through the
+    (cached) Yahoo Finance MCP server and its price history from the local
+    price store, then ranks everything at once with array operations so only
+    the strongest names go through the full multi-agent pipeline.
+    """
+
+    def __init__(self, price_store=None, max_concurrency: int = 8):
+        self.price_store = price_store
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def _payload(self, server, tool_name: str, arguments: dict):
+        try:
+            return structured_payload(await server.call_tool(tool_name, arguments))
+        except Exception as e:
+            print(f"[SCREEN] {tool_name} failed for {arguments.get('symbol')}: {e}")
+            return None
+
+    async def _bars(self, server, symbol: str):
+        if self.price_store is None:
+            return None
+        try:
+            return await self.price_store.refresh(symbol, server)
+        except Exception as e:
+            print(f"[SCREEN] Price history failed for {symbol}: {e}")
+            return self.price_store.read(symbol)
+
+    async def _gather_row(self, server, symbol: str, slots: asyncio.Semaphore) -> dict:
+        async with slots:
+            overview, income, bars = await asyncio.gather(
+                self._payload(server, "get_company_overview", {"symbol": symbol}),
+                self._payload(server, "get_income_statement", {"symbol": symbol, "freq": "yearly"}),
+                self._bars(server, symbol),
+            )
+        row = {"symbol": symbol}
+        row.update(fundamentals_from_payloads(overview, income))
+        row.update(price_factors(bars))
+        return row
+
+    async def screen(self, symbols: list, server) -> list:
+        """Return the ranked screen rows for `symbols` (Yahoo Finance format)."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        rows = await asyncio.gather(*(self._gather_row(server, symbol, slots) for symbol in symbols))
+        return score_candidates(list(rows))
@@ -1,6 +1,7 @@
 # sector_agents.py - New agents for sector-level research
 from agents import Agent
 from datetime import datetime
+from schemas import SectorCompanies, PortfolioRecommendation
 
 
 class SectorAnalyst:
@@ -31,19 +32,10 @@ Here's how to find them:
 - One sentence: what do they do?
 - Why they matter in this sector (market position, unique advantage, growth story)
 
-**Format Your List Like This:**
-
-## Top Companies in [Sector]
-
-1. **Apple Inc. (AAPL, US)**
-   - Consumer electronics and services giant - iPhone, Mac, services ecosystem
-   - Market cap leader, 2 billion active devices, recession-resistant revenue streams
-
-2. **Microsoft Corporation (MSFT, US)**
-   - Cloud and enterprise software - Azure, Office, Windows
-   - Dominant enterprise position, AI leader with OpenAI, growing 15% annually
-
-[Continue for 5-10 companies]
+**Return Your List As Structured Fields:**
+- `sector`: the sector you researched
+- `companies`: largest and most relevant first, each with name, ticker (no exchange suffix -
+  RELIANCE, not RELIANCE.NS), exchange, a one-sentence description, and why it matters
 
 CRITICAL RULES:
 - Only PUBLIC companies investors can actually buy (no private companies)
@@ -60,7 +52,8 @@ The current datetime is {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
             name="Sector_Analyst",
             instructions=SectorAnalyst.get_instructions(),
             model="gpt-5-nano",
-            mcp_servers=mcp_servers
+            mcp_servers=mcp_servers,
+            output_type=SectorCompanies
         )
 
 
@@ -97,55 +90,17 @@ If you had $10,000 to invest in this sector, how would you split it?
 Example: 50% in Company A, 30% in Company B, 20% in Company C
 No hand-waving - give actual percentages and reasons.
 
-Your report structure:
-
-## My Sector Picks
-
-### The Bottom Line Up Front
-[2-3 sentences: What's happening in this sector and which stock I'd buy today]
-
-### The Rankings
-
-**🥇 #1: [Company Name] (Ticker) - BUY THIS**
-- Why it wins: [Specific data - P/E vs peers, growth rate, margin advantage]
-- What makes it special: [3 bullets - moat, growth driver, catalyst]
-- Where it's headed: [12-month price target with reasoning]
-- Risk level: [Low/Medium/High - with why]
-
-**🥈 #2: [Company Name] (Ticker) - SOLID OPTION**
-- Why it's good: [Specific reasons with numbers]
-- Strengths: [3 bullets]
-- Price target: [12-month]
-- Risk: [Level and reason]
-
-**🥉 #3: [Company Name] (Ticker) - HOLD OR SMALL BUY**
-[Same format, but be honest about why it's #3 not #1]
-
-[Continue for all companies - be clear about why each ranks where it does]
-
-### The Comparison Chart
-
-| Company | Valuation | Growth | Quality | Momentum | Overall |
-|---------|-----------|--------|---------|----------|---------|
-| AAPL    | 7/10      | 8/10   | 9/10    | 8/10     | 8.0/10  |
-
-[Fill with actual scores based on the data]
-
-### My $10,000 Portfolio
-
-**Here's exactly how I'd invest $10,000 in this sector:**
-- **50% ($5,000) → [Top Pick]** - [Why: specific growth/value/safety reason]
-- **30% ($3,000) → [Second Pick]** - [Why this gets the bronze medal]
-- **20% ($2,000) → [Third Pick]** - [Why this rounds out the portfolio]
-
-**Don't Touch:**
-- **[Company]** - [Straight talk: Why this is a skip - bad valuation, weak growth, red flags]
-
-### What's Happening in This Sector
-[2-3 paragraphs: Trends, tailwinds, headwinds - what's driving the space?]
+Your report comes back as structured fields:
 
-### My Final Take
-[One paragraph: Your honest recommendation - would you put money here today? Which stocks? How much conviction?]
+- `bottom_line`: 2-3 sentences - what's happening in this sector and which stock I'd buy today
+- `rankings`: EVERY company, #1 first. For each: rank, name, ticker, recommendation (BUY / HOLD / AVOID),
+  why it ranks there (specific data - P/E vs peers, growth rate, margin advantage - and why it beats
+  the next one down), 3 strengths (moat, growth driver, catalyst), a 12-month price target with reasoning,
+  risk level (Low / Medium / High) with why, and 0-10 scores for valuation, growth, quality, momentum and overall
+- `allocations`: exactly how you'd invest $10,000 - ticker, percent, and why (percentages add up to 100)
+- `avoid`: the companies to skip and the straight-talk reason - bad valuation, weak growth, red flags
+- `sector_trends`: 2-3 paragraphs - trends, tailwinds, headwinds, what's driving the space
+- `final_take`: one paragraph - would you put money here today? Which stocks? How much conviction?
 
 CRITICAL RULES:
 - Pick winners and losers - no fence-sitting
@@ -163,5 +118,6 @@ The current datetime is {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
             name="Portfolio_Strategist",
             instructions=PortfolioStrategist.get_instructions(),
             model="gpt-5-nano",
-            mcp_servers=[]  # No MCP servers needed, works with text reports
+            mcp_servers=[],  # No MCP servers needed, works with text reports
+            output_type=PortfolioRecommendation
         )
\ No newline at end of file
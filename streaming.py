@@ -0,0 +1,113 @@
+import time
+
+from pydantic_core import from_json
+
+# A streamed model response is written to the progress log at most this often...
+PARTIAL_FLUSH_SECONDS = 0.5
+# ...unless this much new preview text has built up first
+PARTIAL_FLUSH_CHARS = 400
+
+
+def _heading(name: str) -> str:
+    return name.replace("_", " ").capitalize()
+
+
+def _inline(value) -> str:
+    if isinstance(value, dict):
+        return ", ".join(f"{_heading(key)}: {_inline(item)}" for key, item in value.items() if item not in (None, ""))
+    if isinstance(value, list):
+        return "; ".join(_inline(item) for item in value)
+    return str(value)
+
+
+def render_partial(data) -> str:
+    """
+    Markdown preview of a (possibly incomplete) structured output: one
+    section per field in the order the model wrote them.
+    """
+    if not isinstance(data, dict):
+        return "" if data is None else str(data)
+    blocks = []
+    for name, value in data.items():
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            body = "\n".join(f"- {_inline(item)}" for item in value)
+        elif isinstance(value, dict):
+            body = "\n".join(f"- {_heading(key)}: {_inline(item)}" for key, item in value.items())
+        else:
+            body = str(value)
+        blocks.append(f"## {_heading(name)}\n{body}")
+    return "\n\n".join(blocks)
+
+
+class PartialOutputStream:
+    """
+    Turns the text deltas of one streamed agent run into a few coalesced
+    preview updates.
+
+    Structured outputs arrive as JSON, so the buffer is parsed leniently
+    (pydantic_core partial JSON, incomplete trailing strings included) and
+    rendered as markdown. Each flush publishes only the new tail of that
+    preview as `delta`, with `offset` set to how much preview the client
+    should already have; `reset` means "replace what you have with delta"
+    (first flush, or when the preview changed before the tail).
+    """
+
+    def __init__(
+        self,
+        publish,
+        structured: bool = False,
+        min_interval: float = PARTIAL_FLUSH_SECONDS,
+        min_chars: int = PARTIAL_FLUSH_CHARS,
+        clock=time.monotonic
+    ):
+        self.publish = publish
+        self.structured = structured
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self.clock = clock
+        self._buffer = []
+        self._buffered_chars = 0
+        self._preview = ""
+        self._sent = None
+        self._last_flush = clock()
+        self.flushes = 0
+
+    def _render(self) -> str:
+        text = "".join(self._buffer)
+        if not self.structured:
+            return text
+        try:
+            return render_partial(from_json(text, allow_partial="trailing-strings"))
+        except ValueError:
+            # Mid-token (e.g. half a key); keep the last good preview
+            return self._preview
+
+    def feed(self, delta: str) -> bool:
+        """Add streamed text; returns True when this call published an update."""
+        if not delta:
+            return False
+        self._buffer.append(delta)
+        self._buffered_chars += len(delta)
+        if self._buffered_chars >= self.min_chars or self.clock() - self._last_flush >= self.min_interval:
+            return self.flush()
+        return False
+
+    def flush(self) -> bool:
+        self._last_flush = self.clock()
+        self._buffered_chars = 0
+        self._preview = self._render()
+        if self._preview == self._sent:
+            return False
+        if self._sent is not None and self._preview.startswith(self._sent):
+            self.publish(self._preview[len(self._sent):], len(self._sent), False)
+        else:
+            self.publish(self._preview, 0, True)
+        self._sent = self._preview
+        self.flushes += 1
+        return True
+
+    @property
+    def text(self) -> str:
+        return self._preview
@@ -0,0 +1,161 @@
+import re
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+# Rough characters-per-token for English prose when tiktoken isn't installed
+CHARS_PER_TOKEN = 4
+
+# Report sections excerpted into each digest, most important first
+DIGEST_EXCERPTS = (
+    ("synthesis", "Why buy / why avoid"),
+    ("fundamental", "Financials"),
+    ("comparison", "Vs peers"),
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count for `text` (exact with tiktoken, otherwise a character estimate)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` to at most `max_tokens`, at a sentence or line boundary where possible."""
+    text = (text or "").strip()
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if _ENCODING is not None:
+        cut = _ENCODING.decode(_ENCODING.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:max_tokens * CHARS_PER_TOKEN]
+    boundaries = [match.start() for match in _SENTENCE_END.finditer(cut)]
+    # Only back off to a boundary if it keeps most of the allowance
+    if boundaries and boundaries[-1] > len(cut) // 2:
+        cut = cut[:boundaries[-1]]
+    return cut.rstrip() + " …"
+
+
+def _flatten(text: str) -> str:
+    """Collapse markdown lines and bullets into one line of prose."""
+    parts = []
+    for line in (text or "").splitlines():
+        line = " ".join(line.replace("**", "").strip().lstrip("-*•").split())
+        if line:
+            parts.append(line if line[-1] in ".!?:;" else f"{line};")
+    return " ".join(parts).rstrip(";")
+
+
+def _pct(value, scale: float = 1.0) -> str:
+    return "n/a" if value is None else f"{value * scale:+.1f}%"
+
+
+def _number(value) -> str:
+    return "n/a" if value is None else f"{value:,.2f}"
+
+
+def _digest_header(ticker: str, bundle: dict, screen_row: dict = None) -> list:
+    """The fixed-size part of a digest: the call, targets, risk and key numbers."""
+    metadata = bundle.get("metadata") or {}
+    if metadata.get("error"):
+        return [f"### {ticker}", f"- Research failed: {metadata['error']}"]
+
+    lines = [f"### {ticker}"]
+    recommendation = bundle.get("recommendation") or {}
+    if recommendation:
+        targets = ", ".join(
+            f"{label} {_number((recommendation.get(case) or {}).get('price_target'))}"
+            for label, case in (("base", "base_case"), ("bull", "bull_case"), ("bear", "bear_case"))
+        )
+        lines.append(
+            f"- Call: {recommendation.get('recommendation')} (conviction {recommendation.get('conviction')}/10) - "
+            f"{recommendation.get('headline', '')}"
+        )
+        lines.append(f"- 6-12M targets: {targets}")
+        if recommendation.get("derailers"):
+            lines.append(f"- Could derail: {'; '.join(recommendation['derailers'][:3])}")
+
+    sections = bundle.get("sections") or {}
+    if sections.get("executive_summary"):
+        lines.append(f"- Bottom line: {sections['executive_summary']}")
+
+    facts = metadata.get("technical_facts") or {}
+    if facts:
+        returns = facts.get("returns_pct") or {}
+        lines.append(
+            f"- Price: {_number(facts.get('last_close'))}; 1M {_pct(returns.get('1M'))}, 6M {_pct(returns.get('6M'))}, "
+            f"1Y {_pct(returns.get('1Y'))}; RSI14 {facts.get('rsi_14')}; 1y vol {facts.get('volatility_1y_pct')}%; "
+            f"{_pct(facts.get('pct_below_52w_high'))} vs 52w high"
+        )
+    if screen_row:
+        lines.append(
+            f"- Screen: rank {screen_row.get('rank')}, score {screen_row.get('score')}; "
+            f"earnings yield {_pct(screen_row.get('earnings_yield'), 100)}, "
+            f"revenue growth {_pct(screen_row.get('revenue_growth'), 100)}, "
+            f"operating margin {_pct(screen_row.get('operating_margin'), 100)}"
+        )
+    return lines
+
+
+def build_company_digest(ticker: str, bundle: dict, max_tokens: int, screen_row: dict = None) -> dict:
+    """
+    Compress one company's report bundle into a digest of at most ~max_tokens.
+
+    The structured fields (call, targets, risk, indicators, screen factors)
+    are always kept; whatever allowance is left is shared between excerpts of
+    the report's synthesis, financial and peer sections. Bundles without
+    sections (failed or pre-structured reports) fall back to the full report.
+
+    Returns {"ticker", "text", "tokens", "source_tokens"}.
+    """
+    bundle = bundle if isinstance(bundle, dict) else {"full_report": str(bundle)}
+    full_report = bundle.get("full_report") or ""
+    lines = _digest_header(ticker, bundle, screen_row)
+    remaining = max_tokens - estimate_tokens("\n".join(lines))
+
+    sections = bundle.get("sections") or {}
+    excerpts = [(label, sections.get(key)) for key, label in DIGEST_EXCERPTS if sections.get(key)]
+    if sections.get("risk"):
+        excerpts.append(("Risks", sections["risk"]))
+    if not excerpts and not (bundle.get("metadata") or {}).get("error"):
+        excerpts = [("Report", full_report)]
+
+    for i, (label, text) in enumerate(excerpts):
+        # Split what's left evenly; unused allowance rolls over to later excerpts
+        share = remaining // (len(excerpts) - i)
+        excerpt = trim_to_tokens(_flatten(text), share - estimate_tokens(f"- {label}: "))
+        if excerpt:
+            line = f"- {label}: {excerpt}"
+            lines.append(line)
+            remaining -= estimate_tokens(line)
+
+    text = "\n".join(lines)
+    return {
+        "ticker": ticker,
+        "text": text,
+        "tokens": estimate_tokens(text),
+        "source_tokens": estimate_tokens(full_report),
+    }
+
+
+def run_usage(result) -> dict:
+    """Actual model token usage of an agents RunResult, when the SDK reports it."""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    if usage is None or not getattr(usage, "requests", 0):
+        return {}
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
@@ -1,14 +1,28 @@
 #!/usr/bin/env python3
 """
 Simple test script to verify SSE functionality
+
+With --load N it becomes a load generator: N concurrent research sessions,
+each following its SSE progress stream to the end, reporting end-to-end
+latency, time to first event, event lag and server memory per session.
+Run it against `python app_demo.py --load` (simulated agents) or app.py.
+
+    python test_sse.py --load 50 --type stock --cancel-fraction 0.1
 """
+import argparse
 import requests
 import json
+import statistics
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BASE_URL = "http://localhost:5001"
 
 def test_research_start():
     """Test starting a research and getting session ID"""
-    url = "http://localhost:5001/research/stock"
+    url = f"{BASE_URL}/research/stock"
     data = {
         "symbol": "AAPL",
         "exchange": "US"
@@ -31,7 +45,7 @@ def test_research_start():
 
 def test_sse_connection(session_id):
     """Test SSE connection"""
-    url = f"http://localhost:5001/research/progress/{session_id}"
+    url = f"{BASE_URL}/research/progress/{session_id}"
     
     try:
         response = requests.get(url, stream=True, timeout=10)
@@ -58,12 +72,187 @@ def test_sse_connection(session_id):
     except Exception as e:
         print(f"❌ SSE error: {e}")
 
+def percentile(values, q):
+    """q-th percentile (0-100) by linear interpolation, or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def server_rss(base_url):
+    """Resident memory the server reports on /health (load mode), or None."""
+    try:
+        return requests.get(f"{base_url}/health", timeout=5).json().get("rss_bytes")
+    except Exception:
+        return None
+
+
+def run_session(base_url, index, kind, headers, cancel_after, timeout):
+    """Start one research session and follow its progress stream to the end."""
+    result = {"index": index, "kind": kind, "outcome": "failed", "events": 0, "lags": []}
+    started = time.monotonic()
+    if kind == "stock":
+        url, body = f"{base_url}/research/stock", {"symbol": "AAPL", "exchange": "US"}
+    else:
+        url, body = f"{base_url}/research/sector", {"sector": "Technology", "exchange": "US", "num_companies": 3}
+
+    try:
+        response = requests.post(url, json=body, headers=headers, timeout=timeout)
+        result["start_seconds"] = time.monotonic() - started
+        if response.status_code in (429, 503):
+            result["outcome"] = "rejected"
+            return result
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+        result["session_id"] = session_id
+
+        token = headers.get("Authorization", "")[7:]
+        stream = requests.get(
+            f"{base_url}/research/progress/{session_id}",
+            params={"token": token} if token else None,
+            stream=True,
+            timeout=(5, timeout),
+        )
+        for line in stream.iter_lines():
+            if not line or not line.startswith(b"data: "):
+                continue
+            received = datetime.now()
+            update = json.loads(line[6:])
+            if update.get("type") in ("connected", "keepalive"):
+                continue
+            result["events"] += 1
+            if "first_event_seconds" not in result:
+                result["first_event_seconds"] = time.monotonic() - started
+            # Event lag: server timestamp to arrival (assumes both on one clock)
+            if update.get("timestamp"):
+                sent = datetime.fromisoformat(update["timestamp"])
+                result["lags"].append(max(0.0, (received - sent).total_seconds()))
+            if cancel_after is not None and result["events"] == cancel_after:
+                requests.post(f"{base_url}/research/cancel/{session_id}", headers=headers, timeout=timeout)
+            if update.get("type") in ("complete", "error", "cancelled"):
+                result["outcome"] = update["type"]
+                break
+        stream.close()
+    except Exception as e:
+        result["error"] = str(e)
+    result["total_seconds"] = time.monotonic() - started
+    return result
+
+
+def run_load_test(base_url, sessions, kind="stock", cancel_fraction=0.0, cancel_after=3, token=None,
+                  ramp_seconds=0.0, timeout=600, users=1):
+    """
+    Drive `sessions` concurrent research + SSE sessions and print a summary.
+
+    With users > 1 the sessions are spread round-robin over that many bearer
+    tokens (`<token>-<n>`), which the demo server treats as separate users.
+    """
+    def headers_for(index):
+        user_token = f"{token or 'load-user'}-{index % users}" if users > 1 else token
+        return {"Authorization": f"Bearer {user_token}"} if user_token else {}
+    cancel_every = round(1 / cancel_fraction) if cancel_fraction > 0 else None
+
+    baseline_rss = server_rss(base_url)
+    peak_rss = baseline_rss
+    done = threading.Event()
+
+    def sample_memory():
+        nonlocal peak_rss
+        while not done.wait(0.5):
+            rss = server_rss(base_url)
+            if rss is not None and (peak_rss is None or rss > peak_rss):
+                peak_rss = rss
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+
+    print(f"🚀 Starting {sessions} concurrent {kind} sessions against {base_url}")
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = []
+        for index in range(sessions):
+            cancels = cancel_every is not None and index % cancel_every == 0
+            # Mixed load: one sector (batch) run for every three stock (interactive) runs
+            session_kind = ("sector" if index % 4 == 0 else "stock") if kind == "mixed" else kind
+            futures.append(pool.submit(
+                run_session, base_url, index, session_kind, headers_for(index), cancel_after if cancels else None, timeout
+            ))
+            if ramp_seconds:
+                time.sleep(ramp_seconds / sessions)
+        results = [future.result() for future in futures]
+    wall_seconds = time.monotonic() - started
+    done.set()
+    sampler.join()
+
+    outcomes = {}
+    for result in results:
+        outcomes[result["outcome"]] = outcomes.get(result["outcome"], 0) + 1
+    completed = [r["total_seconds"] for r in results if r["outcome"] == "complete"]
+    first_events = [r["first_event_seconds"] for r in results if "first_event_seconds" in r]
+    starts = [r["start_seconds"] for r in results if "start_seconds" in r]
+    lags = [lag for r in results for lag in r["lags"]]
+
+    def fmt(values):
+        if not values:
+            return "n/a"
+        return (f"p50 {percentile(values, 50):.3f}s  p95 {percentile(values, 95):.3f}s  "
+                f"max {max(values):.3f}s")
+
+    print(f"\n📊 {sessions} sessions in {wall_seconds:.1f}s: {outcomes}")
+    print(f"   start request:   {fmt(starts)}")
+    print(f"   first event:     {fmt(first_events)}")
+    print(f"   end-to-end:      {fmt(completed)}")
+    if kind == "mixed":
+        for session_kind in ("stock", "sector"):
+            kind_completed = [
+                r["total_seconds"] for r in results if r["outcome"] == "complete" and r["kind"] == session_kind
+            ]
+            print(f"     {session_kind + ':':<15}{fmt(kind_completed)}")
+    print(f"   event lag:       {fmt(lags)}  ({len(lags)} events, mean "
+          f"{statistics.mean(lags) if lags else 0:.3f}s)")
+    if baseline_rss is not None and peak_rss is not None:
+        per_session = (peak_rss - baseline_rss) / sessions
+        print(f"   server memory:   baseline {baseline_rss / 2**20:.1f} MiB, peak {peak_rss / 2**20:.1f} MiB, "
+              f"~{per_session / 2**10:.1f} KiB per session")
+    else:
+        print("   server memory:   n/a (server does not report rss_bytes on /health)")
+    for result in results:
+        if result.get("error"):
+            print(f"   ❌ session {result['index']}: {result['error']}")
+    return results
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE smoke test, or a load generator with --load N")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--load", type=int, metavar="N", help="Run N concurrent research + SSE sessions")
+    parser.add_argument("--type", choices=["stock", "sector", "mixed"], default="stock",
+                        help="mixed = one sector run per three stock runs")
+    parser.add_argument("--cancel-fraction", type=float, default=0.0,
+                        help="Share of sessions cancelled after --cancel-after progress events")
+    parser.add_argument("--cancel-after", type=int, default=3)
+    parser.add_argument("--ramp", type=float, default=0.0, help="Seconds over which to spread session starts")
+    parser.add_argument("--token", help="Bearer token sent with every request")
+    parser.add_argument("--users", type=int, default=1,
+                        help="Spread sessions over this many users (demo server: one per token)")
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+    BASE_URL = args.base_url.rstrip("/")
+
+    if args.load:
+        run_load_test(BASE_URL, args.load, args.type, args.cancel_fraction, args.cancel_after,
+                      args.token, args.ramp, args.timeout, args.users)
+        exit(0)
+
     print("🧪 Testing SSE functionality...")
     
     # Test health check first
     try:
-        response = requests.get("http://localhost:5001/health")
+        response = requests.get(f"{BASE_URL}/health")
         if response.status_code == 200:
             print("✅ Backend is running")
         else:
@@ -0,0 +1,72 @@
+"""Drives app.py's research routes through the Flask test client with a stand-in research run."""
+
+import asyncio
+import threading
+import time
+
+import app as api
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class Research:
+    """Stands in for research_system.research_stock: runs until released, cancels like the real one."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.sessions = []
+
+    async def research_stock(self, symbol, exchange="US", session_id=None, deadline_seconds=None):
+        self.sessions.append(session_id)
+        with api.research_system._cancellation(session_id):
+            while not self.released.is_set():
+                await asyncio.sleep(0.01)
+        return {"full_report": f"{symbol} report", "metadata": {"symbol": symbol}}
+
+
+class Client:
+    def __init__(self, monkeypatch):
+        self.flask = api.app.test_client()
+        self.uid = None
+        monkeypatch.setattr(api, "verify_request_user", lambda: (self.uid, {}))
+
+    def post(self, uid, path, body=None):
+        self.uid = uid
+        return self.flask.post(path, json=body or {})
+
+    def start_stock(self, uid, symbol):
+        response = self.post(uid, "/research/stock", {"symbol": symbol})
+        assert response.status_code == 200, response.json
+        return response.json
+
+    def cancel(self, uid, session_id):
+        return self.post(uid, f"/research/cancel/{session_id}")
+
+    def resume(self, uid, session_id):
+        return self.post(uid, f"/research/resume/{session_id}")
+
+
+def status(session_id):
+    return api.job_store.get_job(session_id)["status"]
+
+
+def event_types(session_id):
+    return [event.get("type") for _, event in api.job_store.read_events(session_id)]
+
+
+def executor_idle():
+    stats = api.research_executor.stats()
+    return stats["in_flight"] == 0 and stats["queued"] == 0
+
+
+def start_shared_run(client, research, symbol):
+    leader = client.start_stock("user-1", symbol)
+    follower = client.start_stock("user-2", symbol)
+    wait_until(lambda: research.sessions == [leader["session_id"]])
+    return leader["session_id"], follower["session_id"]
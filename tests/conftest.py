@@ -0,0 +1,35 @@
+import os
+import uuid
+
+import pytest
+
+# app.py builds its job store, MCP pool and executor at import time; keep
+# them in-process and offline for the tests
+os.environ["JOB_STORE_URL"] = "memory://"
+os.environ["MCP_POOL_ENABLED"] = "false"
+os.environ.pop("TICKER_UNIVERSE_CSV", None)
+
+
+@pytest.fixture
+def research(monkeypatch):
+    from app_harness import Research, api, executor_idle, wait_until
+
+    research = Research()
+    monkeypatch.setattr(api.research_system, "research_stock", research.research_stock)
+    yield research
+    research.released.set()
+    # Let every run finish before the next test swaps in its own fake
+    wait_until(executor_idle)
+
+
+@pytest.fixture
+def client(monkeypatch, research):
+    from app_harness import Client
+
+    return Client(monkeypatch)
+
+
+@pytest.fixture
+def symbol():
+    # Flights stay joinable for a while after they finish; keep tests apart
+    return "T" + uuid.uuid4().hex[:5].upper()
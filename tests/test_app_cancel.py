@@ -0,0 +1,57 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import app as api
+from app_harness import event_types, status, wait_until
+
+
+@pytest.fixture
+def slow_history(monkeypatch):
+    """Holds the "running" history write of every run until `released` is set."""
+    gate = SimpleNamespace(entered=threading.Event(), released=threading.Event())
+    record = api.record_history_entry
+
+    def record_history_entry(uid, session_id, payload, merge=True, decoded=None):
+        if payload.get("status") == "running":
+            gate.entered.set()
+            gate.released.wait(5)
+        return record(uid, session_id, payload, merge=merge, decoded=decoded)
+
+    monkeypatch.setattr(api, "record_history_entry", record_history_entry)
+    yield gate
+    gate.released.set()
+
+
+def assert_cancelled_before_research(research, session_id):
+    wait_until(lambda: api.research_executor.state(session_id) is None)
+    assert status(session_id) == "cancelled"
+    assert "cancelled" in event_types(session_id)
+    assert api.research_flights.flight_for(session_id) is None
+    assert research.sessions == []
+
+
+def test_cancel_while_the_start_is_recorded(client, research, symbol, slow_history):
+    leader = client.start_stock("user-1", symbol)["session_id"]
+    assert slow_history.entered.wait(5)
+
+    assert client.cancel("user-1", leader).status_code == 200
+    assert_cancelled_before_research(research, leader)
+
+    # The next request for the symbol starts a fresh run instead of joining the dead one
+    fresh = client.start_stock("user-2", symbol)
+    assert "coalesced" not in fresh
+    slow_history.released.set()
+    wait_until(lambda: research.sessions == [fresh["session_id"]])
+
+
+def test_a_run_stopped_without_a_user_cancel_still_finishes_its_flight(client, research, symbol, slow_history):
+    leader = client.start_stock("user-1", symbol)["session_id"]
+    follower = client.start_stock("user-2", symbol)["session_id"]
+    assert slow_history.entered.wait(5)
+
+    # No cancel flag in the store: the task just gets cancelled
+    assert api.research_executor.cancel(leader) == "running"
+    assert_cancelled_before_research(research, leader)
+    assert status(follower) == "cancelled"
@@ -0,0 +1,52 @@
+import time
+
+import app as api
+from app_harness import event_types, start_shared_run, status, wait_until
+
+
+def test_identical_requests_share_one_run(client, research, symbol):
+    leader = client.start_stock("user-1", symbol)
+    follower = client.start_stock("user-2", symbol)
+
+    assert follower["coalesced"] is True
+    assert api.job_store.get_job(follower["session_id"])["alias_of"] == leader["session_id"]
+
+    research.released.set()
+    wait_until(lambda: status(leader["session_id"]) == "complete")
+    wait_until(lambda: status(follower["session_id"]) == "complete")
+    assert research.sessions == [leader["session_id"]]
+
+
+def test_follower_cancel_leaves_the_shared_run_alone(client, research, symbol):
+    leader, follower = start_shared_run(client, research, symbol)
+
+    assert client.cancel("user-2", follower).status_code == 200
+    assert status(follower) == "cancelled"
+    time.sleep(0.1)
+    assert api.research_executor.state(leader) == "running"
+    assert api.job_store.is_cancelled(leader) is False
+
+    research.released.set()
+    wait_until(lambda: status(leader) == "complete")
+
+
+def test_last_requester_cancel_stops_the_shared_run(client, research, symbol):
+    leader, follower = start_shared_run(client, research, symbol)
+
+    # The leader leaving doesn't stop a run the follower still waits on
+    assert client.cancel("user-1", leader).status_code == 200
+    time.sleep(0.1)
+    assert api.research_executor.state(leader) == "running"
+
+    assert client.cancel("user-2", follower).status_code == 200
+    wait_until(lambda: api.research_executor.state(leader) is None)
+    assert api.job_store.is_cancelled(leader) is True
+    assert status(leader) == "cancelled"
+    wait_until(lambda: "cancelled" in event_types(leader))
+
+
+def test_cancel_checks_ownership(client, research, symbol):
+    leader = client.start_stock("user-1", symbol)["session_id"]
+
+    assert client.cancel("user-2", leader).status_code == 403
+    assert client.cancel("user-1", "no-such-session").status_code == 404
@@ -0,0 +1,122 @@
+import importlib
+import json
+import sys
+import time
+
+import pytest
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture(scope="module")
+def demo():
+    # Load mode is chosen when app_demo is imported
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DEMO_LOAD_MODE", "true")
+        mp.setenv("DEMO_AGENT_LATENCY", "fixed:0.01")
+        mp.setenv("SSE_POLL_INTERVAL", "0.05")
+        mp.setenv("RESEARCH_EVENT_LOOPS", "1")
+        sys.modules.pop("app_demo", None)
+        module = importlib.import_module("app_demo")
+    yield module
+    sys.modules.pop("app_demo", None)
+
+
+@pytest.fixture
+def client(demo, monkeypatch):
+    monkeypatch.setattr(demo, "DEMO_FAILURE_RATE", 0.0)
+    return demo.app.test_client()
+
+
+def post(client, path, body, user="load-user-1"):
+    return client.post(path, json=body, headers={"Authorization": f"Bearer {user}"})
+
+
+def history(client, session_id, user="load-user-1"):
+    return client.get(f"/history/{session_id}", headers={"Authorization": f"Bearer {user}"}).json["entry"]
+
+
+def stream_events(client, session_id):
+    body = client.get(f"/research/progress/{session_id}").get_data(as_text=True)
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+@pytest.mark.parametrize("spec, low, high", [
+    ("fixed:2", 2, 2),
+    ("uniform:1,3", 1, 3),
+    ("lognormal:3,0.5", 0, float("inf")),
+    ("exponential:2", 0, float("inf")),
+])
+def test_latency_specs(demo, spec, low, high):
+    sample = demo.parse_latency_spec(spec)
+    assert all(low <= sample() <= high for _ in range(20))
+
+
+@pytest.mark.parametrize("spec", ["gamma:1,2", "uniform:1", "fixed:", "exponential:0"])
+def test_bad_latency_specs(demo, spec):
+    with pytest.raises(ValueError, match="DEMO_AGENT_LATENCY"):
+        demo.parse_latency_spec(spec)
+
+
+def test_stock_research_streams_progress_to_completion(demo, client):
+    response = post(client, "/research/stock", {"symbol": "aapl"})
+    assert response.status_code == 200
+    session_id = response.json["session_id"]
+
+    wait_until(lambda: demo.job_store.get_job(session_id)["status"] == "complete")
+    events = stream_events(client, session_id)
+    assert events[0]["type"] == "connected"
+    agents = {event.get("agent") for event in events if event["type"] == "progress"}
+    assert set(demo.STOCK_ANALYSTS) <= agents
+    assert events[-1]["type"] == "complete"
+    assert events[-1]["symbol"] == "AAPL"
+
+    entry = history(client, session_id)
+    assert entry["status"] == "complete"
+    assert "AAPL" in entry["report"]
+    listed = client.get("/history", headers={"Authorization": "Bearer load-user-1"}).json["history"]
+    assert session_id in [item["session_id"] for item in listed]
+    assert all("report" not in item for item in listed)
+
+
+def test_sector_research_runs_every_company(demo, client):
+    response = post(client, "/research/sector", {"sector": "Chips", "num_companies": 3})
+    session_id = response.json["session_id"]
+
+    wait_until(lambda: demo.job_store.get_job(session_id)["status"] == "complete")
+    messages = [event.get("message", "") for event in stream_events(client, session_id)]
+    assert sum(message.startswith("Researching company") for message in messages) == 3
+
+
+def test_cancel_stops_the_run(demo, client, monkeypatch):
+    monkeypatch.setattr(demo, "sample_agent_seconds", lambda: 5.0)
+    session_id = post(client, "/research/stock", {"symbol": "MSFT"}).json["session_id"]
+    wait_until(lambda: demo.job_store.get_job(session_id)["status"] == "running")
+
+    assert post(client, f"/research/cancel/{session_id}", {}, user="someone-else").status_code == 403
+    assert post(client, f"/research/cancel/{session_id}", {}).json["success"]
+
+    wait_until(lambda: any(event["type"] == "cancelled" for _, event in demo.job_store.read_events(session_id)))
+    assert history(client, session_id)["status"] == "cancelled"
+    assert stream_events(client, session_id)[-1]["type"] == "cancelled"
+
+
+def test_a_simulated_failure_ends_the_run_with_an_error(demo, client, monkeypatch):
+    monkeypatch.setattr(demo, "DEMO_FAILURE_RATE", 1.0)
+    session_id = post(client, "/research/stock", {"symbol": "NVDA"}).json["session_id"]
+
+    wait_until(lambda: demo.job_store.get_job(session_id)["status"] == "error")
+    assert stream_events(client, session_id)[-1]["error"].startswith("Simulated failure in")
+    assert history(client, session_id)["status"] == "error"
+
+
+def test_health_reports_the_executor(client):
+    payload = client.get("/health").json
+    assert payload["mode"] == "demo-load"
+    assert payload["executor"]["loops"] == 1
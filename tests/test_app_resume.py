@@ -0,0 +1,63 @@
+import app as api
+from app_harness import start_shared_run, status, wait_until
+
+
+def test_resuming_a_live_run_is_a_conflict(client, research, symbol):
+    leader, follower = start_shared_run(client, research, symbol)
+    flight = api.research_flights.flight_for(leader)
+
+    assert client.resume("user-1", leader).status_code == 409
+    assert client.resume("user-2", follower).status_code == 409
+
+    assert set(api.research_flights.requesters(flight)) == {leader, follower}
+    assert api.job_store.is_cancelled(leader) is False
+    assert api.research_executor.state(leader) == "running"
+
+
+def test_resuming_a_lost_run_starts_from_its_checkpoints(client, research, symbol):
+    # A job left "running" by a worker that restarted: no flight, not in the executor
+    lost = f"stock_{symbol}_lost"
+    api.job_store.create_job(lost, "user-1", "stock", params={"symbol": symbol, "exchange": "US"})
+    api.job_store.update_job(lost, "running")
+    api.job_store.save_checkpoint(lost, f"{symbol}:financial", "financial analysis")
+
+    response = client.resume("user-1", lost)
+    assert response.status_code == 200
+    resumed = response.json["session_id"]
+    assert response.json["resumed_from"] == lost
+
+    assert status(lost) == "cancelled"
+    assert api.job_store.is_cancelled(lost) is True
+    assert api.job_store.load_checkpoints(resumed) == {f"{symbol}:financial": "financial analysis"}
+    wait_until(lambda: research.sessions == [resumed])
+
+
+def test_resuming_a_lost_follower_only_leaves_the_flight(client, research, symbol):
+    leader, follower = f"stock_{symbol}_leader", f"stock_{symbol}_follower"
+    params = {"symbol": symbol, "exchange": "US"}
+    flight, _ = api.research_flights.join((symbol, "US"), leader, "user-1")
+    api.research_flights.join((symbol, "US"), follower, "user-2")
+    api.job_store.create_job(leader, "user-1", "stock", params=params)
+    api.job_store.create_job(follower, "user-2", "stock", params=params, alias_of=leader)
+    api.set_job_status([leader, follower], "running")
+
+    try:
+        response = client.resume("user-2", follower)
+        assert response.status_code == 200
+        assert response.json["resumed_from"] == leader
+
+        assert follower not in api.research_flights.requesters(flight)
+        assert leader in api.research_flights.requesters(flight)
+        assert api.job_store.is_cancelled(leader) is False
+        assert status(follower) == "cancelled"
+    finally:
+        api.research_flights.finish(flight, success=False)
+
+
+def test_resume_rejects_finished_and_foreign_sessions(client, research, symbol):
+    leader = client.start_stock("user-1", symbol)["session_id"]
+
+    assert client.resume("user-2", leader).status_code == 403
+    research.released.set()
+    wait_until(lambda: status(leader) == "complete")
+    assert client.resume("user-1", leader).status_code == 409
@@ -0,0 +1,155 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import app as api
+from app_harness import event_types, status, wait_until
+from job_store import MemoryJobStore
+from research_system import EquityResearchSystem
+
+
+def report_bundle(symbol, recommendation="Buy", truncated=()):
+    return {
+        "full_report": f"{symbol} report",
+        "recommendation": {"recommendation": recommendation, "conviction": 7, "bottom_line": f"{symbol} looks fine"},
+        "metadata": {"symbol": symbol, "deadline": {"truncated": list(truncated)}},
+    }
+
+
+class Pipeline:
+    """Stands in for the single-company pipeline; symbols in `failing` raise."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.researched = []
+
+    async def research(self, symbol, exchange, yahoo_server, brave_server, session_id, checkpoints, deadline):
+        self.researched.append(symbol)
+        await asyncio.sleep(0.01)
+        if symbol in self.failing:
+            raise RuntimeError(f"no data for {symbol}")
+        return report_bundle(symbol)
+
+
+def use_pipeline(monkeypatch, system, pipeline):
+    @asynccontextmanager
+    async def connected_servers(*kinds):
+        yield tuple(object() for _ in kinds)
+
+    monkeypatch.setattr(system, "_connected_servers", connected_servers)
+    monkeypatch.setattr(system, "_research_stock_with_servers", pipeline.research)
+
+
+@pytest.fixture
+def system():
+    return EquityResearchSystem(
+        job_store=MemoryJobStore(),
+        use_tool_cache=False,
+        use_report_cache=False,
+        use_price_store=False,
+        use_ticker_universe=False,
+        server_factory=lambda kind, params: None,
+        batch_concurrency=2,
+    )
+
+
+def symbol_events(store, session_id):
+    return [event for _, event in store.read_events(session_id) if event.get("type") == "symbol_complete"]
+
+
+def test_every_symbol_is_announced_and_checkpointed(monkeypatch, system):
+    pipeline = Pipeline()
+    use_pipeline(monkeypatch, system, pipeline)
+    system.job_store.create_job("batch-1", "user-1", "batch")
+
+    bundle = asyncio.run(system.research_batch(["aapl", "MSFT", "AAPL", "NVDA"], session_id="batch-1"))
+
+    assert bundle["metadata"]["symbols"] == ["AAPL", "MSFT", "NVDA"]
+    assert sorted(pipeline.researched) == ["AAPL", "MSFT", "NVDA"]
+    assert [row["symbol"] for row in bundle["summary"]] == ["AAPL", "MSFT", "NVDA"]
+    assert bundle["failed"] == []
+    assert "| MSFT | Buy | 7 | MSFT looks fine |" in bundle["full_report"]
+
+    events = symbol_events(system.job_store, "batch-1")
+    assert sorted(event["symbol"] for event in events) == ["AAPL", "MSFT", "NVDA"]
+    assert [event["completed"] for event in events] == [1, 2, 3]
+    assert all(event["total"] == 3 and event["status"] == "complete" for event in events)
+
+    checkpoints = system.job_store.load_checkpoints("batch-1")
+    assert checkpoints["batch:NVDA"]["full_report"] == "NVDA report"
+
+
+def test_a_failed_symbol_does_not_sink_the_batch(monkeypatch, system):
+    use_pipeline(monkeypatch, system, Pipeline(failing={"MSFT"}))
+    system.job_store.create_job("batch-1", "user-1", "batch")
+
+    bundle = asyncio.run(system.research_batch(["AAPL", "MSFT", "NVDA"], session_id="batch-1"))
+
+    assert bundle["failed"] == ["MSFT"]
+    rows = {row["symbol"]: row for row in bundle["summary"]}
+    assert rows["AAPL"]["status"] == rows["NVDA"]["status"] == "complete"
+    assert rows["MSFT"]["status"] == "error"
+    assert rows["MSFT"]["error"] == "no data for MSFT"
+    assert "| MSFT | Failed |" in bundle["full_report"]
+
+    events = {event["symbol"]: event for event in symbol_events(system.job_store, "batch-1")}
+    assert events["MSFT"]["status"] == "error"
+    assert events["MSFT"]["message"].startswith("MSFT failed")
+    # The failure is checkpointed too, so the symbol's own report endpoint can explain it
+    assert system.job_store.load_checkpoints("batch-1")["batch:MSFT"]["metadata"]["error"] == "no data for MSFT"
+
+
+def test_resume_skips_only_finished_symbols(monkeypatch, system):
+    pipeline = Pipeline()
+    use_pipeline(monkeypatch, system, pipeline)
+    store = system.job_store
+    store.create_job("batch-2", "user-1", "batch")
+    store.save_checkpoint("batch-2", "batch:AAPL", report_bundle("AAPL", recommendation="Hold"))
+    store.save_checkpoint("batch-2", "batch:MSFT", {"full_report": "", "metadata": {"error": "timeout"}})
+    store.save_checkpoint("batch-2", "batch:NVDA", report_bundle("NVDA", truncated=["Report Generator"]))
+
+    bundle = asyncio.run(system.research_batch(["AAPL", "MSFT", "NVDA", "AMZN"], session_id="batch-2"))
+
+    # Failed and deadline-truncated reports are redone
+    assert sorted(pipeline.researched) == ["AMZN", "MSFT", "NVDA"]
+    rows = {row["symbol"]: row for row in bundle["summary"]}
+    assert rows["AAPL"]["recommendation"] == "Hold"
+    assert bundle["reports"]["AAPL"]["full_report"] == "AAPL report"
+    assert bundle["failed"] == []
+    assert len(symbol_events(store, "batch-2")) == 4
+
+
+def test_batch_endpoint_serves_each_report_and_resumes(monkeypatch, client, research):
+    pipeline = Pipeline(failing={"MSFT"})
+    use_pipeline(monkeypatch, api.research_system, pipeline)
+
+    response = client.post("user-1", "/research/batch", {"symbols": ["AAPL", "MSFT"]})
+    assert response.status_code == 200
+    session_id = response.json["session_id"]
+    assert response.json["symbols"] == ["AAPL", "MSFT"]
+    wait_until(lambda: status(session_id) == "complete")
+    assert event_types(session_id).count("symbol_complete") == 2
+
+    report = client.flask.get(f"/research/batch/{session_id}/aapl")
+    assert report.status_code == 200
+    assert report.json["report"]["full_report"] == "AAPL report"
+    client.uid = "user-2"
+    assert client.flask.get(f"/research/batch/{session_id}/AAPL").status_code == 403
+
+    # A lost run resumes from its checkpoints: only the failed symbol is researched again
+    wait_until(lambda: api.research_executor.state(session_id) is None)
+    api.job_store.update_job(session_id, "running")
+    pipeline.failing.clear()
+    pipeline.researched.clear()
+    resumed = client.resume("user-1", session_id)
+    assert resumed.status_code == 200
+    wait_until(lambda: status(resumed.json["session_id"]) == "complete")
+    assert pipeline.researched == ["MSFT"]
+
+
+def test_batch_endpoint_validates_symbols(client, research):
+    assert client.post("user-1", "/research/batch", {"symbols": "AAPL"}).status_code == 400
+    assert client.post("user-1", "/research/batch", {"symbols": [" "]}).status_code == 400
+    too_many = [f"S{i}" for i in range(api.MAX_BATCH_SYMBOLS + 1)]
+    assert client.post("user-1", "/research/batch", {"symbols": too_many}).status_code == 400
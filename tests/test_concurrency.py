@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+import pytest
+
+from concurrency import AsyncSlotLimiter
+
+
+def test_try_acquire_stops_at_the_limit():
+    limiter = AsyncSlotLimiter(2)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert limiter.in_use == 2
+
+    limiter.release()
+    assert limiter.try_acquire()
+
+
+def test_release_never_goes_negative():
+    limiter = AsyncSlotLimiter(1)
+    limiter.release()
+    assert limiter.in_use == 0
+    assert limiter.try_acquire()
+
+
+@pytest.mark.parametrize("limit", [0, -3])
+def test_limit_is_at_least_one(limit):
+    assert AsyncSlotLimiter(limit).limit == 1
+
+
+def test_context_manager_releases_on_error():
+    limiter = AsyncSlotLimiter(1, poll_interval=0.01)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with limiter:
+                assert limiter.in_use == 1
+                raise RuntimeError("boom")
+
+    asyncio.run(run())
+    assert limiter.in_use == 0
+
+
+def test_caps_concurrency_within_one_loop():
+    limiter = AsyncSlotLimiter(2, poll_interval=0.005)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_use)
+            await asyncio.sleep(0.02)
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert limiter.in_use == 0
+
+
+def test_caps_concurrency_across_event_loops():
+    limiter = AsyncSlotLimiter(2, poll_interval=0.005)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        async with limiter:
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            with lock:
+                running -= 1
+
+    async def loop_jobs():
+        await asyncio.gather(*(work() for _ in range(3)))
+
+    # Each thread runs its own event loop, like the executor's worker loops
+    threads = [threading.Thread(target=asyncio.run, args=(loop_jobs(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert peak == 2
+    assert limiter.in_use == 0
@@ -0,0 +1,124 @@
+import pytest
+
+import deadlines
+from deadlines import Deadline, MIN_STAGE_SECONDS, STOCK_STAGE_SHARES, parse_deadline_seconds
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadlines.time, "monotonic", clock)
+    return clock
+
+
+def test_budget_reserves_the_later_stages_shares(clock):
+    deadline = Deadline(100, STOCK_STAGE_SHARES)
+
+    # analysts 0.55, report 0.25, strategic 0.20
+    assert deadline.budget("analysts") == pytest.approx(55)
+    assert deadline.budget("report") == pytest.approx(80)
+    assert deadline.budget("strategic") == pytest.approx(100)
+
+
+def test_later_stages_get_what_earlier_ones_left(clock):
+    deadline = Deadline(100, STOCK_STAGE_SHARES)
+    clock.now += 30
+
+    assert deadline.remaining() == pytest.approx(70)
+    assert deadline.budget("report") == pytest.approx(50)
+    assert deadline.budget("strategic") == pytest.approx(70)
+
+
+def test_late_stage_gets_the_floor(clock):
+    deadline = Deadline(100, STOCK_STAGE_SHARES)
+    clock.now += 78
+
+    # 22s left, 20s reserved for the strategic stage: the floor applies
+    assert deadline.budget("report") == pytest.approx(MIN_STAGE_SECONDS)
+
+
+def test_floor_never_exceeds_the_time_left(clock):
+    deadline = Deadline(100, STOCK_STAGE_SHARES)
+    clock.now += 98
+
+    assert deadline.budget("report") == pytest.approx(2)
+    assert deadline.budget("strategic") == pytest.approx(2)
+
+    clock.now += 10
+    assert deadline.remaining() == 0
+    assert deadline.budget("strategic") == 0
+
+
+def test_short_deadline_budgets_fit_inside_it(clock):
+    deadline = Deadline(3, STOCK_STAGE_SHARES)
+
+    for stage in STOCK_STAGE_SHARES:
+        assert deadline.budget(stage) <= 3
+
+
+def test_stage_is_a_child_with_the_stage_budget(clock):
+    deadline = Deadline(100, STOCK_STAGE_SHARES)
+    stage = deadline.stage("analysts")
+
+    assert stage.parent is deadline
+    assert stage.seconds == pytest.approx(55)
+
+
+def test_child_never_outlasts_its_parent(clock):
+    parent = Deadline(10)
+    child = parent.child(100)
+
+    assert child.remaining() == pytest.approx(10)
+    clock.now += 4
+    assert child.remaining() == pytest.approx(6)
+
+
+def test_truncation_is_reported_up_with_labels(clock):
+    sector = Deadline(900)
+    research = sector.child(600)
+    company = research.child(100, STOCK_STAGE_SHARES, label="AAPL")
+
+    company.note_truncated("Report Generator")
+
+    assert company.was_truncated("Report Generator")
+    assert research.truncated == ["AAPL: Report Generator"]
+    assert sector.truncated == ["AAPL: Report Generator"]
+
+
+def test_to_dict_reports_elapsed_and_overrun(clock):
+    deadline = Deadline(10)
+    clock.now += 12
+    deadline.note_truncated("Strategic Analyst")
+
+    assert deadline.to_dict() == {
+        "seconds": 10,
+        "elapsed_seconds": 12,
+        "overrun_seconds": 2,
+        "truncated": ["Strategic Analyst"],
+    }
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("120", 120.0),
+    (45, 45.0),
+    ("0", None),
+    ("-5", None),
+    ("soon", None),
+])
+def test_parse_deadline_seconds(value, expected):
+    assert parse_deadline_seconds(value) == expected
+
+
+def test_parse_deadline_seconds_default():
+    assert parse_deadline_seconds(None, default=60) == 60
+    assert parse_deadline_seconds("bad", default=60) == 60
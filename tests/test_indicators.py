@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from indicators import (
+    atr,
+    compute_indicators,
+    ema,
+    ewm,
+    format_fact_sheet,
+    nearest_levels,
+    pivot_levels,
+    realized_volatility,
+    rsi,
+    sma,
+    true_range,
+)
+from price_store import BAR_DTYPE
+
+pd = pytest.importorskip("pandas")
+
+
+def random_walk(count, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+    high = close * (1 + rng.uniform(0, 0.02, count))
+    low = close * (1 - rng.uniform(0, 0.02, count))
+    return close, high, low
+
+
+def make_bars(close, high=None, low=None, start="2023-01-02"):
+    bars = np.zeros(len(close), dtype=BAR_DTYPE)
+    bars["date"] = np.datetime64(start, "D") + np.arange(len(close))
+    bars["close"] = close
+    bars["open"] = close
+    bars["high"] = close if high is None else high
+    bars["low"] = close if low is None else low
+    bars["volume"] = 1000.0
+    return bars
+
+
+@pytest.mark.parametrize("alpha", [2 / 13, 1 / 14, 0.5])
+def test_ewm_matches_pandas(alpha):
+    # Long enough to cross several of the closed-form blocks
+    close, _, _ = random_walk(1000)
+    expected = pd.Series(close).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(ewm(close, alpha), expected, rtol=1e-9)
+
+
+def test_ewm_of_nothing_is_empty():
+    assert len(ewm(np.array([]), 0.5)) == 0
+
+
+def test_ema_and_sma_match_pandas():
+    close, _, _ = random_walk(300)
+    series = pd.Series(close)
+
+    np.testing.assert_allclose(ema(close, 12), series.ewm(span=12, adjust=False).mean(), rtol=1e-9)
+    np.testing.assert_allclose(sma(close, 20), series.rolling(20).mean(), rtol=1e-9)
+    assert np.isnan(sma(close[:5], 20)).all()
+
+
+def test_rsi_and_atr_match_a_wilder_reference():
+    close, high, low = random_walk(400)
+    series = pd.Series(close)
+
+    change = series.diff().fillna(0.0)
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    expected_rsi = 100 - 100 / (1 + gain / loss)
+    np.testing.assert_allclose(rsi(close)[1:], expected_rsi[1:], rtol=1e-9)
+
+    previous = series.shift(1).fillna(series.iloc[0])
+    ranges = pd.concat([pd.Series(high - low), (pd.Series(high) - previous).abs(), (pd.Series(low) - previous).abs()], axis=1)
+    np.testing.assert_allclose(true_range(high, low, close), ranges.max(axis=1), rtol=1e-12)
+    expected_atr = ranges.max(axis=1).ewm(alpha=1 / 14, adjust=False).mean()
+    np.testing.assert_allclose(atr(high, low, close), expected_atr, rtol=1e-9)
+
+
+def test_rsi_of_a_steady_rise_is_100():
+    assert rsi(np.arange(1.0, 30.0))[-1] == 100.0
+
+
+def test_realized_volatility_matches_pandas():
+    close, _, _ = random_walk(120)
+    log_returns = np.diff(np.log(close))
+    expected = pd.Series(log_returns).tail(20).std() * np.sqrt(252)
+
+    assert realized_volatility(log_returns, 20) == pytest.approx(expected)
+    assert np.isnan(realized_volatility(log_returns[:5], 20))
+
+
+def test_pivots_and_nearest_levels():
+    high = np.array([1, 2, 3, 9, 3, 2, 1, 2, 3, 2, 1], dtype=float)
+    low = high - 0.5
+    highs, lows = pivot_levels(high, low, span=2)
+
+    assert list(highs) == [9.0, 3.0]
+    assert list(lows) == [0.5]
+    assert len(pivot_levels(high[:4], low[:4], span=2)[0]) == 0
+
+    levels = np.array([90.0, 95.0, 95.5, 105.0, 110.0, 120.0])
+    # 95.5 sits within 1% of 95 and is merged into it
+    assert nearest_levels(levels, 100.0, above=False) == [95.5, 90.0]
+    assert nearest_levels(levels, 100.0, above=True) == [105.0, 110.0]
+
+
+def test_compute_indicators_on_a_known_series():
+    close, high, low = random_walk(300)
+    facts = compute_indicators(make_bars(close, high, low))
+    series = pd.Series(close)
+
+    assert facts["bars"] == 300
+    assert facts["last_close"] == round(close[-1], 2)
+    assert facts["returns_pct"]["1M"] == round((close[-1] / close[-22] - 1) * 100, 2)
+    assert facts["sma_200"] == round(series.rolling(200).mean().iloc[-1], 2)
+    assert facts["high_52w"] == round(high[-252:].max(), 2)
+    running_peak = series.tail(252).cummax()
+    assert facts["max_drawdown_1y_pct"] == round((series.tail(252) / running_peak - 1).min() * 100, 2)
+    assert facts["ma_cross"] is not None
+    assert facts["volume_vs_60d_avg"] == 1.0
+
+    sheet = format_fact_sheet(facts)
+    assert f"Data: 300 daily bars through {facts['as_of']}" in sheet
+
+
+def test_short_history_leaves_gaps():
+    bars = make_bars(np.array([10.0, 11.0, np.nan, 12.0]))
+    facts = compute_indicators(bars)
+
+    # The NaN close is dropped before anything is computed
+    assert facts["bars"] == 3
+    assert facts["returns_pct"]["1W"] is None
+    assert facts["sma_50"] is None
+    assert facts["ma_cross"] is None
+    assert "n/a" in format_fact_sheet(facts)
+    assert compute_indicators(make_bars(np.array([10.0]))) == {}
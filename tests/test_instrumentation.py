@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from instrumentation import (
+    InstrumentedMCPServer,
+    MetricsRegistry,
+    PIPELINE_AGENT,
+    TURN_BUCKETS,
+    metrics_scope,
+    track_agent_run,
+    track_session,
+)
+
+
+def run_result(requests, input_tokens, output_tokens):
+    usage = SimpleNamespace(requests=requests, input_tokens=input_tokens, output_tokens=output_tokens)
+    return SimpleNamespace(context_wrapper=SimpleNamespace(usage=usage))
+
+
+class FakeServer:
+    name = "fake"
+    use_structured_content = False
+
+    def __init__(self, is_error=False):
+        self.is_error = is_error
+
+    async def call_tool(self, tool_name, arguments=None):
+        return SimpleNamespace(content=[], is_error=self.is_error)
+
+
+def test_counters_and_histograms_render_as_prometheus_text():
+    registry = MetricsRegistry()
+    registry.inc("research_agent_runs_total", {"agent": "News", "outcome": "ok"})
+    registry.inc("research_agent_runs_total", {"agent": "News", "outcome": "ok"})
+    registry.observe("research_agent_turns", 2, {"agent": "News"}, TURN_BUCKETS)
+    registry.observe("research_agent_turns", 9, {"agent": "News"}, TURN_BUCKETS)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE research_agent_runs_total counter" in lines
+    assert 'research_agent_runs_total{agent="News",outcome="ok"} 2' in lines
+    assert "# TYPE research_agent_turns histogram" in lines
+    # Buckets are cumulative
+    assert 'research_agent_turns_bucket{agent="News",le="1"} 0' in lines
+    assert 'research_agent_turns_bucket{agent="News",le="2"} 1' in lines
+    assert 'research_agent_turns_bucket{agent="News",le="13"} 2' in lines
+    assert 'research_agent_turns_bucket{agent="News",le="+Inf"} 2' in lines
+    assert 'research_agent_turns_sum{agent="News"} 11' in lines
+    assert 'research_agent_turns_count{agent="News"} 2' in lines
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.inc("research_tool_calls_total", {"tool": 'say "hi"\n'})
+
+    assert 'research_tool_calls_total{tool="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+def test_agent_run_records_turns_and_tokens():
+    registry = MetricsRegistry()
+    with metrics_scope() as scope:
+        with track_agent_run(registry, "Financial Analyst") as run:
+            run.result = run_result(requests=3, input_tokens=1200, output_tokens=300)
+
+    agent = scope.to_dict()["agents"]["Financial Analyst"]
+    assert agent["runs"] == 1
+    assert agent["errors"] == 0
+    assert agent["turns"] == 3
+    assert agent["input_tokens"] == 1200
+    assert agent["output_tokens"] == 300
+
+    text = registry.render()
+    assert 'research_agent_runs_total{agent="Financial Analyst",outcome="ok"} 1' in text
+    assert 'research_agent_tokens_total{agent="Financial Analyst",direction="input"} 1200' in text
+    assert 'research_agent_run_tokens_sum{agent="Financial Analyst"} 1500' in text
+
+
+def test_failed_run_reads_usage_from_the_exception():
+    registry = MetricsRegistry()
+    error = RuntimeError("max turns")
+    error.run_data = run_result(requests=10, input_tokens=5000, output_tokens=100)
+
+    with metrics_scope() as scope:
+        with pytest.raises(RuntimeError):
+            with track_agent_run(registry, "News Analyst"):
+                raise error
+
+    agent = scope.to_dict()["agents"]["News Analyst"]
+    assert agent["errors"] == 1
+    assert agent["turns"] == 10
+    assert 'research_agent_runs_total{agent="News Analyst",outcome="error"} 1' in registry.render()
+
+
+def test_timeouts_are_their_own_outcome():
+    registry = MetricsRegistry()
+    with pytest.raises(TimeoutError):
+        with track_agent_run(registry, "Technical Analyst"):
+            raise TimeoutError
+
+    assert 'research_agent_runs_total{agent="Technical Analyst",outcome="timeout"} 1' in registry.render()
+
+
+def test_nested_scopes_add_up_in_the_parent():
+    registry = MetricsRegistry()
+    with metrics_scope() as sector:
+        for symbol in ("AAPL", "MSFT"):
+            with metrics_scope() as company:
+                with track_agent_run(registry, "Report Generator") as run:
+                    run.result = run_result(requests=1, input_tokens=100, output_tokens=50)
+            assert company.to_dict()["agents"]["Report Generator"]["runs"] == 1
+
+    totals = sector.to_dict()["totals"]
+    assert totals["runs"] == 2
+    assert totals["input_tokens"] == 200
+    assert totals["output_tokens"] == 100
+
+
+def test_tool_calls_count_against_the_running_agent():
+    registry = MetricsRegistry()
+    server = InstrumentedMCPServer(FakeServer(), registry)
+
+    async def run():
+        with metrics_scope() as scope:
+            await server.call_tool("get_stock_info", {"symbol": "AAPL"})
+            with track_agent_run(registry, "Financial Analyst"):
+                await server.call_tool("get_income_statement", {"symbol": "AAPL"})
+        return scope
+
+    agents = asyncio.run(run()).to_dict()["agents"]
+    assert agents[PIPELINE_AGENT]["tool_calls"] == 1
+    assert agents["Financial Analyst"]["tool_calls"] == 1
+
+    text = registry.render()
+    assert 'research_tool_calls_total{agent="Financial Analyst",tool="get_income_statement"} 1' in text
+    assert "research_tool_errors_total" not in text
+
+
+def test_error_results_count_as_tool_errors():
+    registry = MetricsRegistry()
+    server = InstrumentedMCPServer(FakeServer(is_error=True), registry)
+
+    asyncio.run(server.call_tool("get_stock_info", {"symbol": "AAPL"}))
+
+    assert 'research_tool_errors_total{tool="get_stock_info"} 1' in registry.render()
+
+
+def test_session_outcome_is_labelled():
+    registry = MetricsRegistry()
+    with track_session(registry, "stock"):
+        pass
+    with pytest.raises(ValueError):
+        with track_session(registry, "sector"):
+            raise ValueError
+
+    text = registry.render()
+    assert 'research_session_seconds_count{kind="stock",outcome="ok"} 1' in text
+    assert 'research_session_seconds_count{kind="sector",outcome="error"} 1' in text
@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from job_executor import AsyncJobExecutor, BATCH, INTERACTIVE, ExecutorBusy
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class Gate:
+    """A job that runs until released, so tests control when slots free up."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.released = threading.Event()
+
+    async def run(self):
+        self.started.set()
+        while not self.released.is_set():
+            await asyncio.sleep(0.01)
+        return "released"
+
+
+def recorder(order, name):
+    async def run():
+        order.append(name)
+        return name
+    return run
+
+
+@pytest.fixture
+def executor():
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=1, max_queued=10)
+    executor.start()
+    return executor
+
+
+def test_submitted_job_returns_its_result(executor):
+    future = executor.submit("job", recorder([], "done"))
+    assert future.result(timeout=5) == "done"
+    wait_until(lambda: executor.state("job") is None)
+
+
+def test_jobs_wait_for_a_free_slot(executor):
+    gate = Gate()
+    executor.submit("blocker", gate.run)
+    assert gate.started.wait(5)
+
+    order = []
+    future = executor.submit("next", recorder(order, "next"))
+    time.sleep(0.1)
+    assert order == []
+    assert executor.state("blocker") == "running"
+    assert executor.state("next") == "queued"
+
+    gate.released.set()
+    assert future.result(timeout=5) == "next"
+
+
+def test_full_queue_raises_executor_busy():
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=1, max_queued=1)
+    gate = Gate()
+    executor.submit("blocker", gate.run)
+    assert gate.started.wait(5)
+    executor.submit("queued", recorder([], "queued"))
+
+    with pytest.raises(ExecutorBusy) as busy:
+        executor.submit("rejected", recorder([], "rejected"))
+    assert busy.value.retry_after >= 1
+    gate.released.set()
+
+
+def test_waiting_jobs_are_told_their_position(executor):
+    gate = Gate()
+    executor.submit("blocker", gate.run)
+    assert gate.started.wait(5)
+
+    positions = {"first": [], "second": []}
+    for name in positions:
+        def report(position, eta_seconds, name=name):
+            positions[name].append(position)
+        executor.submit(name, recorder([], name), on_position=report)
+
+    assert positions["first"] == [1]
+    assert positions["second"] == [2]
+    gate.released.set()
+
+
+def test_interactive_job_overtakes_queued_batch_work(executor):
+    gate = Gate()
+    executor.submit("blocker", gate.run)
+    assert gate.started.wait(5)
+
+    order = []
+    futures = [
+        executor.submit(f"batch-{i}", recorder(order, f"batch-{i}"), user="heavy", priority=BATCH)
+        for i in range(3)
+    ]
+    futures.append(executor.submit("stock", recorder(order, "stock"), user="light", priority=INTERACTIVE))
+
+    gate.released.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert order == ["stock", "batch-0", "batch-1", "batch-2"]
+
+
+def test_users_take_turns_within_a_class(executor):
+    gate = Gate()
+    executor.submit("blocker", gate.run)
+    assert gate.started.wait(5)
+
+    order = []
+    futures = [executor.submit(f"a-{i}", recorder(order, f"a-{i}"), user="a") for i in range(3)]
+    futures.append(executor.submit("b-0", recorder(order, "b-0"), user="b"))
+
+    gate.released.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert order == ["a-0", "b-0", "a-1", "a-2"]
+
+
+def test_batch_jobs_leave_a_slot_for_interactive_work():
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=2, max_queued=10)
+    gates = [Gate(), Gate()]
+    executor.submit("batch-0", gates[0].run, user="a", priority=BATCH)
+    executor.submit("batch-1", gates[1].run, user="b", priority=BATCH)
+    assert gates[0].started.wait(5)
+    time.sleep(0.1)
+    assert not gates[1].started.is_set()
+    assert executor.state("batch-1") == "queued"
+
+    assert executor.submit("stock", recorder([], "stock"), user="c").result(timeout=5) == "stock"
+    for gate in gates:
+        gate.released.set()
+
+
+def test_a_single_slot_is_shared_with_batch_work():
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=1, max_queued=10)
+    assert executor.max_batch_in_flight == 1
+    assert executor.submit("batch", recorder([], "batch"), priority=BATCH).result(timeout=5) == "batch"
+
+
+@pytest.mark.parametrize("max_in_flight, max_batch_in_flight", [(4, 4), (4, 0), (1, 2)])
+def test_batch_limit_must_leave_a_slot_free(max_in_flight, max_batch_in_flight):
+    with pytest.raises(ValueError):
+        AsyncJobExecutor(max_in_flight=max_in_flight, max_batch_in_flight=max_batch_in_flight)
+
+
+def test_per_user_queue_limit():
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=1, max_queued=10, max_queued_per_user=1)
+    gate = Gate()
+    executor.submit("blocker", gate.run, user="a")
+    assert gate.started.wait(5)
+    executor.submit("a-1", recorder([], "a-1"), user="a")
+
+    with pytest.raises(ExecutorBusy):
+        executor.submit("a-2", recorder([], "a-2"), user="a")
+    # Other users still get in
+    executor.submit("b-1", recorder([], "b-1"), user="b")
+    gate.released.set()
+
+
+def test_cancelling_a_queued_job_drops_it(executor):
+    gate = Gate()
+    executor.submit("blocker", gate.run)
+    assert gate.started.wait(5)
+
+    order = []
+    cancelled = executor.submit("cancelled", recorder(order, "cancelled"))
+    kept = executor.submit("kept", recorder(order, "kept"))
+
+    assert executor.cancel("cancelled") == "queued"
+    assert executor.state("cancelled") is None
+    with pytest.raises(CancelledError):
+        cancelled.result(timeout=1)
+
+    gate.released.set()
+    assert kept.result(timeout=5) == "kept"
+    assert order == ["kept"]
+
+
+def test_cancelling_a_running_job_stops_it(executor):
+    gate = Gate()
+    future = executor.submit("running", gate.run)
+    assert gate.started.wait(5)
+
+    assert executor.cancel("running") == "running"
+    with pytest.raises(CancelledError):
+        future.result(timeout=5)
+    wait_until(lambda: executor.state("running") is None)
+    assert executor.cancel("running") is None
+
+
+def test_cancel_check_stops_a_job_flagged_elsewhere():
+    flagged = set()
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=1, cancel_check=flagged.__contains__,
+                                cancel_poll_seconds=0.05)
+    gate = Gate()
+    future = executor.submit("job", gate.run)
+    assert gate.started.wait(5)
+
+    flagged.add("job")
+    with pytest.raises(CancelledError):
+        future.result(timeout=5)
+
+
+def test_only_completed_runs_feed_the_run_time_estimate():
+    executor = AsyncJobExecutor(num_loops=1, max_in_flight=1, expected_seconds={INTERACTIVE: 100.0})
+    executor.start()
+
+    async def handles_its_own_cancel():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            return "cancelled"
+
+    async def fails():
+        raise RuntimeError("boom")
+
+    gate = Gate()
+    future = executor.submit("cancelled", gate.run)
+    assert gate.started.wait(5)
+    executor.cancel("cancelled")
+    with pytest.raises(CancelledError):
+        future.result(timeout=5)
+
+    future = executor.submit("own-cancel", handles_its_own_cancel)
+    wait_until(lambda: executor.state("own-cancel") == "running")
+    time.sleep(0.05)
+    executor.cancel("own-cancel")
+    assert future.result(timeout=5) == "cancelled"
+
+    with pytest.raises(RuntimeError):
+        executor.submit("failed", fails).result(timeout=5)
+    wait_until(lambda: executor.stats()["interactive_failed_total"] == 1)
+
+    stats = executor.stats()
+    assert stats["interactive_cancelled_total"] == 2
+    assert stats["interactive_completed_total"] == 0
+    assert stats["interactive_expected_seconds"] == 100.0
+
+    executor.submit("done", recorder([], "done")).result(timeout=5)
+    wait_until(lambda: executor.stats()["interactive_completed_total"] == 1)
+    # Moved toward the (near-zero) real run time
+    assert executor.stats()["interactive_expected_seconds"] < 100.0
@@ -0,0 +1,217 @@
+import time
+
+import pytest
+
+from job_store import JobStore, MemoryJobStore, RedisJobStore, SQLiteJobStore, create_job_store
+
+
+def redis_store(max_events):
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisJobStore(fakeredis.FakeRedis(), max_events=max_events)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryJobStore(max_events=5)
+    if request.param == "redis":
+        return redis_store(max_events=5)
+    return SQLiteJobStore(str(tmp_path / "jobs.db"), max_events=5)
+
+
+def test_create_and_get_job(store):
+    store.create_job("s1", "user-1", "stock", params={"symbol": "AAPL"})
+
+    job = store.get_job("s1")
+    assert job["session_id"] == "s1"
+    assert job["owner"] == "user-1"
+    assert job["kind"] == "stock"
+    assert job["status"] == "queued"
+    assert job["params"] == {"symbol": "AAPL"}
+    assert job["alias_of"] is None
+    assert job["cancelled"] is False
+    assert store.get_owner("s1") == "user-1"
+
+
+def test_unknown_job_is_absent(store):
+    assert store.get_job("missing") is None
+    assert store.get_owner("missing") is None
+    assert store.is_cancelled("missing") is False
+
+
+def test_alias_is_recorded(store):
+    store.create_job("leader", "user-1", "stock")
+    store.create_job("follower", "user-2", "stock", alias_of="leader")
+
+    assert store.get_job("follower")["alias_of"] == "leader"
+
+
+def test_update_job_status(store):
+    store.create_job("s1", "user-1", "stock")
+    store.update_job("s1", "running")
+    assert store.get_job("s1")["status"] == "running"
+
+    store.update_job("s1", "complete")
+    assert store.get_job("s1")["status"] == "complete"
+
+
+def test_cancel_flag(store):
+    store.create_job("s1", "user-1", "stock")
+    assert store.is_cancelled("s1") is False
+
+    store.request_cancel("s1")
+    assert store.is_cancelled("s1") is True
+    assert store.get_job("s1")["cancelled"] is True
+
+
+def test_late_writes_do_not_create_jobs(store):
+    store.update_job("gone", "complete")
+    store.request_cancel("gone")
+
+    assert store.get_job("gone") is None
+
+
+def test_redis_keys_expire():
+    store = redis_store(max_events=5)
+    store.create_job("s1", "user-1", "stock")
+    store.append_event("s1", {"message": "x"})
+    store.save_checkpoint("s1", "stage", "x")
+
+    for key in (store._job_key("s1"), store._events_key("s1"), store._checkpoints_key("s1")):
+        assert 0 < store.client.ttl(key) <= store.ttl_seconds
+
+
+def test_redis_write_after_expiry_does_not_revive_the_job():
+    store = redis_store(max_events=5)
+    store.create_job("s1", "user-1", "stock")
+    # The job's hash expires (or is purged) while its run is still finishing
+    store.client.delete(store._job_key("s1"))
+
+    store.update_job("s1", "complete")
+    store.request_cancel("s1")
+    assert store.client.exists(store._job_key("s1")) == 0
+    assert store.get_job("s1") is None
+
+
+def test_redis_partial_hash_reads_as_absent():
+    store = redis_store(max_events=5)
+    # What an unguarded HSET on a missing key used to leave behind
+    store.client.hset(store._job_key("s1"), mapping={"status": "complete", "cancelled": "1"})
+
+    assert store.get_job("s1") is None
+    assert store.get_owner("s1") is None
+
+
+def test_events_get_increasing_sequence_numbers(store):
+    store.create_job("s1", "user-1", "stock")
+    seqs = [store.append_event("s1", {"message": f"step {i}"}) for i in range(3)]
+
+    assert seqs == [1, 2, 3]
+    assert store.read_events("s1") == [
+        (1, {"message": "step 0"}),
+        (2, {"message": "step 1"}),
+        (3, {"message": "step 2"}),
+    ]
+
+
+def test_replay_after_last_event_id(store):
+    store.create_job("s1", "user-1", "stock")
+    for i in range(4):
+        store.append_event("s1", {"message": f"step {i}"})
+
+    # A client reconnecting with Last-Event-ID: 2 only gets what it missed
+    assert [seq for seq, _ in store.read_events("s1", after_seq=2)] == [3, 4]
+    assert store.read_events("s1", after_seq=4) == []
+    assert [seq for seq, _ in store.read_events("s1", after_seq=0, limit=2)] == [1, 2]
+
+
+def test_event_buffer_keeps_newest_events(store):
+    store.create_job("s1", "user-1", "stock")
+    for i in range(8):
+        store.append_event("s1", {"message": f"step {i}"})
+
+    events = store.read_events("s1")
+    assert [seq for seq, _ in events] == [4, 5, 6, 7, 8]
+    # Sequence numbers keep counting past the trimmed events
+    assert store.append_event("s1", {"message": "step 8"}) == 9
+
+
+def test_events_are_kept_per_session(store):
+    store.create_job("s1", "user-1", "stock")
+    store.create_job("s2", "user-1", "stock")
+    store.append_event("s1", {"message": "one"})
+    store.append_event("s2", {"message": "two"})
+
+    assert store.read_events("s1") == [(1, {"message": "one"})]
+    assert store.read_events("s2") == [(1, {"message": "two"})]
+
+
+def test_checkpoints_round_trip_and_replace(store):
+    store.create_job("s1", "user-1", "stock")
+    store.save_checkpoint("s1", "AAPL:financial", "first draft")
+    store.save_checkpoint("s1", "AAPL:financial", "final")
+    store.save_checkpoint("s1", "AAPL:news", {"analysis": "text", "articles": []})
+
+    assert store.load_checkpoints("s1") == {
+        "AAPL:financial": "final",
+        "AAPL:news": {"analysis": "text", "articles": []},
+    }
+    assert store.load_checkpoints("other") == {}
+
+
+def test_copy_checkpoints_seeds_a_resumed_session(store):
+    store.create_job("s1", "user-1", "stock")
+    store.create_job("s2", "user-1", "stock")
+    store.save_checkpoint("s1", "AAPL:financial", "text")
+    store.save_checkpoint("s1", "AAPL:technical", "chart")
+
+    assert store.copy_checkpoints("s1", "s2") == 2
+    assert store.load_checkpoints("s2") == store.load_checkpoints("s1")
+
+
+def test_purge_finished_drops_only_old_finished_jobs(store):
+    if isinstance(store, RedisJobStore):
+        pytest.skip("Redis jobs expire through key TTLs instead")
+    store.create_job("done", "user-1", "stock")
+    store.create_job("running", "user-1", "stock")
+    store.append_event("done", {"message": "x"})
+    store.save_checkpoint("done", "stage", "x")
+    store.update_job("done", "complete")
+    store.update_job("running", "running")
+
+    store.purge_finished(older_than_seconds=3600)
+    assert store.get_job("done") is not None
+
+    time.sleep(0.01)
+    store.purge_finished(older_than_seconds=0)
+    assert store.get_job("done") is None
+    assert store.read_events("done") == []
+    assert store.load_checkpoints("done") == {}
+    assert store.get_job("running") is not None
+
+
+def test_delete_job(store):
+    store.create_job("s1", "user-1", "stock")
+    store.append_event("s1", {"message": "x"})
+    store.save_checkpoint("s1", "stage", "x")
+
+    store.delete_job("s1")
+    assert store.get_job("s1") is None
+    assert store.read_events("s1") == []
+    assert store.load_checkpoints("s1") == {}
+
+
+def test_incomplete_backend_fails_at_construction():
+    class PartialStore(JobStore):
+        def get_job(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        PartialStore()
+
+
+def test_create_job_store_from_url(tmp_path):
+    assert isinstance(create_job_store("memory://"), MemoryJobStore)
+    assert isinstance(create_job_store(f"sqlite:///{tmp_path / 'jobs.db'}"), SQLiteJobStore)
+    with pytest.raises(ValueError):
+        create_job_store("ftp://nowhere")
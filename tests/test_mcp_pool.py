@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from mcp.types import ErrorData
+
+import mcp_pool
+from mcp_pool import CONNECTION_CLOSED, MCPError, MCPServerPool, _server_answered
+
+
+def mcp_error(code):
+    data = ErrorData(code=code, message="error")
+    if hasattr(MCPError, "from_error_data"):
+        return MCPError.from_error_data(data)
+    return MCPError(data)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class FakeStdioServer:
+    """Stands in for MCPServerStdio; `broken` servers fail calls like a dead transport."""
+
+    instances = []
+    fail_connects = 0
+
+    def __init__(self, params, name, cache_tools_list, client_session_timeout_seconds):
+        self.params = params
+        self.name = name
+        self.session = None
+        self.connected = False
+        self.cleaned_up = False
+        self.broken = False
+        self.call_threads = []
+        FakeStdioServer.instances.append(self)
+
+    async def connect(self):
+        if FakeStdioServer.fail_connects:
+            FakeStdioServer.fail_connects -= 1
+            raise ConnectionError("spawn failed")
+        self.connected = True
+
+    async def cleanup(self):
+        self.cleaned_up = True
+
+    async def list_tools(self, run_context=None, agent=None):
+        if self.broken:
+            raise ConnectionError("pipe closed")
+        return ["get_stock_info"]
+
+    async def call_tool(self, tool_name, arguments=None):
+        self.call_threads.append(threading.current_thread().name)
+        if self.broken:
+            raise ConnectionError("pipe closed")
+        if tool_name == "unknown":
+            raise mcp_error(-32602)
+        return f"{self.name}:{tool_name}"
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    FakeStdioServer.instances = []
+    FakeStdioServer.fail_connects = 0
+    monkeypatch.setattr(mcp_pool, "MCPServerStdio", FakeStdioServer)
+    pool = MCPServerPool({"yahoo": {}, "brave": {}}, max_size=2, connect_timeout=5)
+    yield pool
+    pool.stop()
+
+
+def test_server_answered():
+    assert _server_answered(mcp_error(-32601))
+    assert not _server_answered(mcp_error(CONNECTION_CLOSED))
+    assert not _server_answered(ConnectionError("pipe closed"))
+
+
+def test_warm_start_connects_one_server_per_kind(pool):
+    pool.start(warm=True, wait=True)
+
+    stats = pool.stats()
+    assert [member["name"] for member in stats["yahoo"]] == ["yahoo-0"]
+    assert [member["name"] for member in stats["brave"]] == ["brave-0"]
+    assert all(member["healthy"] and member["leases"] == 0 for member in stats["yahoo"] + stats["brave"])
+
+
+def test_calls_run_on_the_pool_loop(pool):
+    async def run():
+        async with pool.lease("yahoo", "brave") as (yahoo, brave):
+            assert pool.stats()["yahoo"][0]["leases"] == 1
+            return await yahoo.call_tool("get_stock_info", {"symbol": "AAPL"}), await brave.list_tools()
+
+    # The caller's loop is short-lived; the session lives on the pool's thread
+    result, tools = asyncio.run(run())
+    assert result == "yahoo-0:get_stock_info"
+    assert tools == ["get_stock_info"]
+    assert FakeStdioServer.instances[0].call_threads == ["mcp-pool"]
+    wait_until(lambda: pool.stats()["yahoo"][0]["leases"] == 0)
+
+
+def test_pool_grows_to_max_size_then_shares(pool):
+    async def run():
+        async with pool.lease("yahoo") as (first,):
+            async with pool.lease("yahoo") as (second,):
+                async with pool.lease("yahoo") as (third,):
+                    return first.name, second.name, third.name
+
+    names = asyncio.run(run())
+    assert names[:2] == ("yahoo-0", "yahoo-1")
+    # Both servers busy: the third lease shares the least-loaded one
+    assert names[2] in ("yahoo-0", "yahoo-1")
+    assert len(pool.stats()["yahoo"]) == 2
+
+
+def test_a_server_that_fails_to_connect_is_retried(pool):
+    FakeStdioServer.fail_connects = 1
+
+    async def lease():
+        async with pool.lease("yahoo") as (yahoo,):
+            return await yahoo.call_tool("get_stock_info")
+
+    with pytest.raises(RuntimeError, match="unavailable"):
+        asyncio.run(lease())
+    assert pool.stats()["yahoo"][0]["leases"] == 0
+
+    # Reconnected after the first backoff
+    wait_until(lambda: pool.stats()["yahoo"][0]["healthy"], timeout=5)
+    assert asyncio.run(lease()) == "yahoo-0:get_stock_info"
+
+
+def test_a_dead_transport_restarts_the_server(pool):
+    pool.start(warm=True, wait=True)
+    first = FakeStdioServer.instances[0]
+    first.broken = True
+
+    async def call():
+        async with pool.lease("yahoo") as (yahoo,):
+            return await yahoo.call_tool("get_stock_info")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(call())
+
+    wait_until(lambda: pool.stats()["yahoo"][0]["restarts"] == 1)
+    wait_until(lambda: pool.stats()["yahoo"][0]["healthy"])
+    assert first.cleaned_up
+    assert asyncio.run(call()) == "yahoo-0:get_stock_info"
+
+
+def test_an_error_reply_does_not_restart_the_server(pool):
+    async def call():
+        async with pool.lease("yahoo") as (yahoo,):
+            return await yahoo.call_tool("unknown")
+
+    with pytest.raises(MCPError):
+        asyncio.run(call())
+    time.sleep(0.1)
+    assert pool.stats()["yahoo"][0]["restarts"] == 0
+
+
+def test_stop_cleans_up_every_server(pool):
+    pool.start(warm=True, wait=True)
+    pool.stop()
+
+    assert not pool.running
+    assert all(server.cleaned_up for server in FakeStdioServer.instances)
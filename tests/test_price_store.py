@@ -0,0 +1,129 @@
+import asyncio
+import json
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from price_store import BAR_DTYPE, PriceStore, bars_from_records, structured_payload
+
+
+def records(start, closes):
+    day = np.datetime64(start, "D")
+    return [
+        {"Date": str(day + i), "Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 100}
+        for i, close in enumerate(closes)
+    ]
+
+
+def bars(start, closes):
+    return bars_from_records(records(start, closes))
+
+
+class FakeYahoo:
+    """Answers get_historical_stock_prices from a fixed price history."""
+
+    def __init__(self, history):
+        self.history = history
+        self.periods = []
+
+    async def call_tool(self, tool_name, arguments=None):
+        self.periods.append(arguments["period"])
+        text = json.dumps({"prices": self.history})
+        return SimpleNamespace(is_error=False, structured_content=None, content=[SimpleNamespace(text=text)])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path / "prices"))
+
+
+def test_bars_from_records_sorts_and_keeps_the_last_duplicate():
+    parsed = bars_from_records([
+        {"date": "2024-01-03T00:00:00", "close": 3.0},
+        {"date": "2024-01-01", "close": 1.0, "volume": 10},
+        {"date": "2024-01-03", "close": 3.5},
+        {"date": "2024-01-02", "close": None},
+        {"close": 9.0},
+    ])
+
+    assert parsed.dtype == BAR_DTYPE
+    assert [str(day) for day in parsed["date"]] == ["2024-01-01", "2024-01-03"]
+    assert list(parsed["close"]) == [1.0, 3.5]
+    assert np.isnan(parsed["open"][0])
+
+
+def test_structured_payload_reads_structured_or_text_content():
+    assert structured_payload(SimpleNamespace(structured_content={"prices": []})) == {"prices": []}
+    text_result = SimpleNamespace(content=[SimpleNamespace(text="not json"), SimpleNamespace(text='{"a": 1}')])
+    assert structured_payload(text_result) == {"a": 1}
+    assert structured_payload(SimpleNamespace(is_error=True, structured_content={"a": 1})) is None
+
+
+def test_read_is_a_date_range_over_the_stored_bars(store):
+    store.append("AAPL", bars("2024-01-01", [1, 2, 3, 4, 5]))
+
+    assert len(store.read("AAPL")) == 5
+    window = store.read("aapl", start="2024-01-02", end="2024-01-04")
+    assert list(window["close"]) == [2, 3, 4]
+    assert isinstance(window, np.memmap)
+    assert len(store.read("MSFT")) == 0
+    assert store.symbols() == ["AAPL"]
+
+
+def test_append_only_adds_newer_bars_and_replaces_the_last_day(store):
+    store.append("AAPL", bars("2024-01-01", [1, 2, 3]))
+
+    # The last stored day may have been written mid-session; older bars are ignored
+    written = store.append("AAPL", bars("2024-01-02", [20, 30.5, 4]))
+    assert written == 2
+    assert list(store.read("AAPL")["close"]) == [1, 2, 30.5, 4]
+    assert str(store.last_date("AAPL")) == "2024-01-04"
+
+
+def test_reads_ignore_a_partial_trailing_record(store):
+    store.append("AAPL", bars("2024-01-01", [1, 2]))
+    with open(store._path("AAPL"), "ab") as handle:
+        handle.write(b"\0" * (BAR_DTYPE.itemsize // 2))
+
+    assert list(store.read("AAPL")["close"]) == [1, 2]
+
+
+def test_replace_swaps_the_whole_history(store):
+    store.append("AAPL", bars("2024-01-01", [1, 2, 3]))
+    store.replace("AAPL", bars("2023-06-01", [9, 8]))
+
+    assert list(store.read("AAPL")["close"]) == [9, 8]
+
+
+def test_refresh_fetches_only_the_missing_period(store):
+    start = date.today() - timedelta(days=3)
+    store.append("AAPL", bars(start.isoformat(), [1, 2]))
+    yahoo = FakeYahoo(records(start.isoformat(), [1, 2, 3, 4]))
+
+    history = asyncio.run(store.refresh("AAPL", yahoo))
+
+    assert yahoo.periods == ["1mo"]
+    assert list(history["close"]) == [1, 2, 3, 4]
+
+
+def test_first_refresh_loads_the_initial_period(store):
+    yahoo = FakeYahoo(records("2024-01-01", [1, 2, 3]))
+
+    history = asyncio.run(store.refresh("AAPL", yahoo))
+
+    assert yahoo.periods == ["5y"]
+    assert len(history) == 3
+
+
+def test_refresh_reloads_re_adjusted_history(store):
+    start = date.today() - timedelta(days=3)
+    store.append("AAPL", bars(start.isoformat(), [100, 110, 120]))
+    # A 2-for-1 split re-adjusts every earlier close
+    yahoo = FakeYahoo(records(start.isoformat(), [50, 55, 60, 65]))
+
+    history = asyncio.run(store.refresh("AAPL", yahoo))
+
+    assert yahoo.periods == ["1mo", "5y"]
+    assert list(history["close"]) == [50, 55, 60, 65]
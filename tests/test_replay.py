@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+import pytest
+from agents import Agent, RunConfig, Runner
+from mcp import types as mcp_types
+
+from instrumentation import MetricsRegistry, track_agent_run
+from replay import (
+    Cassette,
+    RecordingMCPServer,
+    RecordingModelProvider,
+    ReplayMCPServer,
+    ReplayMiss,
+    ReplayModelProvider,
+    model_turn,
+    prompt_digest,
+    sample_json,
+    synthetic_tool_result,
+)
+from schemas import SectorCompanies
+
+
+def run_agent(provider, prompt, name="News Analyst", output_type=None):
+    agent = Agent(name=name, instructions="Analyse the stock.", output_type=output_type)
+
+    async def run():
+        with track_agent_run(MetricsRegistry(), name) as handle:
+            handle.result = await Runner.run(
+                agent, prompt, run_config=RunConfig(model_provider=provider, tracing_disabled=True)
+            )
+        return handle.result.final_output
+
+    return asyncio.run(run())
+
+
+def test_prompt_digest_ignores_timestamps():
+    first = prompt_digest("Symbol: AAPL\nAs of 2024-05-01 09:30:00")
+    assert first == prompt_digest([{"role": "user", "content": "Symbol: AAPL\nAs of 2025-01-02T16:00"}])
+    assert first != prompt_digest("Symbol: MSFT\nAs of 2024-05-01 09:30:00")
+
+
+def test_model_turn_counts_earlier_model_items():
+    assert model_turn("Symbol: AAPL") == 0
+    assert model_turn([
+        {"role": "user", "content": "Symbol: AAPL"},
+        {"type": "function_call", "name": "get_news"},
+        {"type": "function_call_output", "output": "{}"},
+        {"role": "assistant", "content": "Done"},
+    ]) == 2
+
+
+def test_cassette_round_trip_and_round_robin(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassettes" / "run.json"))
+    result = synthetic_tool_result("get_current_stock_price", {"symbol": "AAPL"})
+    for seconds in (0.1, 0.2):
+        cassette.record_tool("yahoo", "get_current_stock_price", {"symbol": "AAPL"}, result, seconds)
+    cassette.save()
+
+    loaded = Cassette.load(cassette.path)
+    assert loaded.stats() == {"model_keys": 0, "model_responses": 0, "tool_keys": 1, "tool_results": 2}
+    seconds = [loaded.find_tool("yahoo", "get_current_stock_price", {"symbol": "AAPL"})["seconds"] for _ in range(3)]
+    assert seconds == [0.1, 0.2, 0.1]
+    assert loaded.find_tool("yahoo", "get_current_stock_price", {"symbol": "MSFT"}) is None
+
+
+def test_cassette_rejects_other_versions(tmp_path):
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps({"version": 0}))
+    with pytest.raises(ValueError, match="Unsupported cassette version"):
+        Cassette.load(str(path))
+    with pytest.raises(ValueError):
+        Cassette().save()
+
+
+def test_sample_json_fills_a_schema():
+    sample = sample_json(SectorCompanies.model_json_schema(), symbol="TCS")
+
+    companies = SectorCompanies.model_validate(sample)
+    assert companies.tickers() == ["AAPL", "MSFT", "NVDA", "GOOGL", "AMZN"]
+    assert companies.sector == "Synthetic sector for TCS."
+
+
+def test_synthetic_tool_results_are_deterministic():
+    history = synthetic_tool_result("get_historical_stock_prices", {"symbol": "msft", "period": "3mo"})
+    again = synthetic_tool_result("get_historical_stock_prices", {"symbol": "MSFT", "period": "1mo"})
+
+    prices = history.structured_content["prices"]
+    assert len(prices) == 66
+    assert prices[-22:] == again.structured_content["prices"]
+    assert json.loads(history.content[0].text) == history.structured_content
+    search = synthetic_tool_result("brave_web_search", {"query": "chips", "count": 3})
+    assert len(search.structured_content["results"]) == 3
+
+
+def test_replayed_tool_calls_use_the_recording_then_synthetic_data():
+    cassette = Cassette()
+    recorded = mcp_types.CallToolResult(content=[mcp_types.TextContent(type="text", text="recorded")], is_error=False)
+    cassette.record_tool("yahoo", "get_news", {"symbol": "AAPL"}, recorded, 0.5)
+
+    async def run(server):
+        return [await server.call_tool("get_news", {"symbol": "AAPL"}), await server.call_tool("get_news", {"symbol": "MSFT"})]
+
+    hit, miss = asyncio.run(run(ReplayMCPServer("yahoo", cassette, time_scale=0)))
+    assert hit.content[0].text == "recorded"
+    assert miss.structured_content["symbol"] == "MSFT"
+
+    hit, miss = asyncio.run(run(ReplayMCPServer("yahoo", cassette, time_scale=0, synthetic=False)))
+    assert miss.is_error
+    tools = asyncio.run(ReplayMCPServer("brave").list_tools())
+    assert [tool.name for tool in tools] == ["brave_web_search", "brave_local_search"]
+
+
+def test_recording_server_captures_tools_and_results():
+    cassette = Cassette()
+    server = RecordingMCPServer(ReplayMCPServer("yahoo", time_scale=0), cassette, "yahoo")
+
+    async def run():
+        async with server:
+            await server.list_tools()
+            return await server.call_tool("get_company_overview", {"symbol": "NVDA"})
+
+    result = asyncio.run(run())
+    assert len(cassette.tools["yahoo"]) == 10
+    entry = cassette.find_tool("yahoo", "get_company_overview", {"symbol": "NVDA"})
+    assert mcp_types.CallToolResult.model_validate(entry["result"]).structured_content == result.structured_content
+
+
+def test_a_recorded_run_replays_without_synthetic_answers(tmp_path):
+    cassette = Cassette(str(tmp_path / "run.json"))
+    recorder = RecordingModelProvider(ReplayModelProvider(time_scale=0, synthetic_chars=80), cassette)
+    recorded = run_agent(recorder, "Symbol: NVDA")
+    cassette.save()
+    assert "NVDA" in recorded
+
+    replay = ReplayModelProvider(Cassette.load(cassette.path), time_scale=0, synthetic=False)
+    assert run_agent(replay, "Symbol: NVDA") == recorded
+    # Same agent and turn, different prompt: served from the agent's other recordings
+    assert run_agent(replay, "Symbol: AMD") == recorded
+    with pytest.raises(ReplayMiss):
+        run_agent(replay, "Symbol: NVDA", name="Report Generator")
+
+
+def test_synthetic_structured_output_validates():
+    provider = ReplayModelProvider(time_scale=0)
+    companies = run_agent(provider, "Sector: semiconductors", name="Sector Analyst", output_type=SectorCompanies)
+
+    assert isinstance(companies, SectorCompanies)
+    assert len(companies.companies) == 5
@@ -0,0 +1,121 @@
+from schemas import (
+    Allocation,
+    NewsAnalysis,
+    NewsArticle,
+    PortfolioRecommendation,
+    RankedPick,
+    ResearchReport,
+    Scenario,
+    Scorecard,
+    SectorCompanies,
+    SectorCompany,
+    SkippedPick,
+    StrategicTake,
+    plain_ticker,
+)
+
+
+def article(headline, url):
+    return NewsArticle(headline=headline, date="2024-05-01", source="Wire", url=url, why_it_matters="It moved the stock")
+
+
+def company(name, ticker, exchange="NSE"):
+    return SectorCompany(name=name, ticker=ticker, exchange=exchange, description=f"{name} makes things", why_it_matters="")
+
+
+def pick(rank, ticker, price_target=None):
+    return RankedPick(
+        rank=rank, name=f"{ticker} Corp", ticker=ticker, recommendation="BUY", why="Cheapest", strengths=["Margins"],
+        price_target=price_target, price_target_reasoning="10x earnings", risk_level="Low", risk_reason="Net cash",
+        scores=Scorecard(valuation=8, growth=7.5, quality=9, momentum=6, overall=7.6),
+    )
+
+
+def test_plain_ticker():
+    assert plain_ticker(" reliance.ns ") == "RELIANCE"
+    assert plain_ticker("TCS.BO") == "TCS"
+    assert plain_ticker("BRK.B") == "BRK.B"
+    assert plain_ticker(None) == ""
+
+
+def test_news_links_are_unique_and_web_only():
+    news = NewsAnalysis(analysis=" Earnings beat. ", articles=[
+        article("Beat", "https://example.com/a"),
+        article("Beat again", "https://example.com/a"),
+        article("Rumour", "not a link"),
+    ])
+
+    assert news.links() == ["https://example.com/a"]
+    markdown = news.to_markdown()
+    assert markdown.startswith("Earnings beat.\n\n**Sources**\n")
+    assert "- [Beat](https://example.com/a) - Wire, 2024-05-01" in markdown
+    assert "- Rumour - Wire, 2024-05-01" in markdown
+    assert NewsAnalysis(analysis=" Quiet week. ", articles=[]).to_markdown() == "Quiet week."
+
+
+def test_research_report_sections_match_the_markdown():
+    report = ResearchReport(
+        bottom_line="Solid.", financial_picture="Growing.", technical_picture="Uptrend.",
+        news_and_sentiment="Upbeat.", peer_comparison="Ahead.", synthesis="Buy the dip.",
+        risks=["Debt", "FX"], risk_level="Medium", risk_level_reason="Leverage",
+    )
+
+    sections = report.sections()
+    assert sections["executive_summary"] == "Solid."
+    assert sections["risk"] == "- Debt\n- FX\n\n**Risk Level:** Medium - Leverage"
+    markdown = report.to_markdown()
+    assert markdown.startswith("## The Bottom Line\nSolid.")
+    assert markdown.endswith("## The Risk Reality Check\n" + sections["risk"])
+
+
+def test_strategic_take_numbers_reasons_and_scenarios():
+    take = StrategicTake(
+        recommendation="HOLD", headline="Fairly priced.", whats_happening="Steady.", stance="neutral",
+        reasons=["P/E 20", "Growth 5%"], opportunity_or_risk="Dividend.",
+        base_case=Scenario(description="Flat", price_target=1234.5),
+        bull_case=Scenario(description="Rerating", price_target=None),
+        bear_case=Scenario(description="Miss", price_target=900),
+        derailers=["Rates"], bottom_line="Wait.", conviction=6, conviction_reason="Mixed",
+    )
+
+    markdown = take.to_markdown()
+    assert "**My recommendation: HOLD**" in markdown
+    assert "1. P/E 20\n2. Growth 5%" in markdown
+    assert "- **Base case:** Flat (target: 1,234.50)" in markdown
+    assert "- **Bull case:** Rerating (target: n/a)" in markdown
+    assert markdown.endswith("**Conviction:** 6/10 - Mixed")
+
+
+def test_sector_tickers_drop_suffixes_blanks_and_duplicates():
+    sector = SectorCompanies(sector="Indian IT", companies=[
+        company("Tata Consultancy", "tcs.ns"),
+        company("Infosys", "INFY"),
+        company("Tata Consultancy", "TCS.BO", "BSE"),
+        company("Unknown", "  "),
+    ])
+
+    assert sector.tickers() == ["TCS", "INFY"]
+    markdown = sector.to_markdown()
+    assert markdown.startswith("## Top Companies in Indian IT\n\n1. **Tata Consultancy (TCS, NSE)**")
+    assert "   - Infosys makes things" in markdown
+    assert not markdown.endswith("\n")
+
+
+def test_portfolio_markdown_orders_by_rank():
+    portfolio = PortfolioRecommendation(
+        bottom_line="Buy AAA.",
+        rankings=[pick(2, "BBB"), pick(1, "AAA", price_target=150)],
+        allocations=[Allocation(ticker="AAA", percent=62.5, rationale="Best value")],
+        avoid=[SkippedPick(ticker="CCC", reason="Too much debt")],
+        sector_trends="Consolidation.", final_take="Stay selective.",
+    )
+
+    markdown = portfolio.to_markdown()
+    assert markdown.index("🥇 #1: AAA Corp (AAA)") < markdown.index("🥈 #2: BBB Corp (BBB)")
+    assert "- Price target (12-month): 150.00 - 10x earnings" in markdown
+    assert "| AAA | 8/10 | 7.5/10 | 9/10 | 6/10 | 7.6/10 |" in markdown
+    assert "- **62.5% ($6,250) → AAA** - Best value" in markdown
+    assert "**Don't Touch:**\n- **CCC** - Too much debt" in markdown
+
+    portfolio.avoid = []
+    assert "Don't Touch" not in portfolio.to_markdown()
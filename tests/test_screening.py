@@ -0,0 +1,129 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from screening import (
+    CandidateScreener,
+    fundamentals_from_payloads,
+    format_screen_table,
+    price_factors,
+    score_candidates,
+)
+
+SINGLE = {"value": (1.0, True)}
+
+
+def symbols(ranked):
+    return [row["symbol"] for row in ranked]
+
+
+def test_z_scores_are_winsorized():
+    values = [1.0, 2.0, 3.0, 4.0, 1000.0]
+    ranked = score_candidates([{"symbol": f"S{i}", "value": v} for i, v in enumerate(values)], SINGLE)
+
+    low, high = np.percentile(values, (5, 95))
+    clipped = np.clip(values, low, high)
+    expected = (clipped - clipped.mean()) / clipped.std()
+    scores = {row["symbol"]: row["score"] for row in ranked}
+    assert [scores[f"S{i}"] for i in range(5)] == pytest.approx(expected, abs=1e-4)
+    assert symbols(ranked) == ["S4", "S3", "S2", "S1", "S0"]
+    assert [row["rank"] for row in ranked] == [1, 2, 3, 4, 5]
+
+
+def test_lower_is_better_factors_are_flipped():
+    factors = {"value": (0.5, True), "risk": (0.5, False)}
+    ranked = score_candidates([
+        {"symbol": "SAFE", "value": 1.0, "risk": 0.1},
+        {"symbol": "RISKY", "value": 1.0, "risk": 0.9},
+    ], factors)
+
+    assert symbols(ranked) == ["SAFE", "RISKY"]
+    assert ranked[0]["factor_scores"]["risk"] > 0 > ranked[1]["factor_scores"]["risk"]
+
+
+def test_missing_data_scores_average_and_thin_rows_rank_last():
+    factors = {"a": (0.6, True), "b": (0.4, True)}
+    ranked = score_candidates([
+        {"symbol": "THIN", "a": None, "b": 100.0},
+        {"symbol": "LOW", "a": 1.0, "b": 1.0},
+        {"symbol": "NONE"},
+        {"symbol": "HIGH", "a": 3.0, "b": 2.0},
+    ], factors)
+
+    # THIN has the best "b" but covers under half the weight; NONE has no data
+    assert symbols(ranked) == ["HIGH", "LOW", "THIN"]
+    assert ranked[-1]["factor_scores"]["a"] == 0.0
+
+
+def test_ties_keep_the_original_order_and_constant_factors_score_zero():
+    ranked = score_candidates([{"symbol": s, "value": 5.0} for s in ("B", "A", "C")], SINGLE)
+
+    assert symbols(ranked) == ["B", "A", "C"]
+    assert all(row["score"] == 0.0 for row in ranked)
+    assert score_candidates([]) == []
+
+
+def test_fundamentals_from_payloads():
+    income = {"incomeStatement": [
+        {"index": "Total Revenue", "2023-12-31": 120.0, "2022-12-31": 100.0},
+        {"index": "Net Income", "2023-12-31": 10.0, "2022-12-31": 8.0},
+        {"Breakdown": "Operating Income", "2023-12-31": 30.0, "2022-12-31": float("nan")},
+    ]}
+    fundamentals = fundamentals_from_payloads({"companyName": "Acme", "marketCap": 200.0}, income)
+
+    assert fundamentals["name"] == "Acme"
+    assert fundamentals["earnings_yield"] == pytest.approx(0.05)
+    assert fundamentals["revenue_growth"] == pytest.approx(0.2)
+    assert fundamentals["operating_margin"] == pytest.approx(0.25)
+
+    empty = fundamentals_from_payloads(None, None)
+    assert empty["earnings_yield"] is None and empty["revenue_growth"] is None
+
+
+def test_price_factors_without_history():
+    assert price_factors(None) == {"momentum_6m": None, "volatility_1y": None}
+
+
+def test_screen_table_marks_selected_rows():
+    ranked = score_candidates([
+        {"symbol": "AAA", "earnings_yield": 0.1},
+        {"symbol": "BBB", "earnings_yield": 0.05},
+    ])
+    table = format_screen_table(ranked, selected=1)
+
+    assert "| 1 * | AAA |" in table
+    assert "| 2 | BBB |" in table
+    assert "| 10.0% | n/a |" in table
+
+
+class FakeYahoo:
+    """Serves overviews and income statements; symbols in `failing` raise."""
+
+    def __init__(self, companies, failing=()):
+        self.companies = companies
+        self.failing = set(failing)
+
+    async def call_tool(self, tool_name, arguments=None):
+        symbol = arguments["symbol"]
+        if symbol in self.failing:
+            raise ConnectionError("timed out")
+        overview, income = self.companies[symbol]
+        payload = overview if tool_name == "get_company_overview" else income
+        return SimpleNamespace(is_error=False, structured_content=None, content=[SimpleNamespace(text=json.dumps(payload))])
+
+
+def test_screener_ranks_every_symbol_and_survives_failed_calls():
+    def company(market_cap, net_income):
+        income = {"incomeStatement": [{"index": "Net Income", "2023-12-31": net_income}]}
+        return {"marketCap": market_cap}, income
+
+    yahoo = FakeYahoo({"AAA": company(100.0, 2.0), "BBB": company(100.0, 9.0)}, failing={"CCC"})
+
+    ranked = asyncio.run(CandidateScreener(max_concurrency=1).screen(["AAA", "BBB", "CCC"], yahoo))
+
+    # CCC has no data at all and drops out of the ranking
+    assert symbols(ranked) == ["BBB", "AAA"]
+    assert ranked[0]["earnings_yield"] == pytest.approx(0.09)
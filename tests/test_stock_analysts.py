@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from job_store import MemoryJobStore
+from research_system import EquityResearchSystem
+from schemas import NewsAnalysis, ResearchReport, Scenario, StrategicTake
+
+REPORT = ResearchReport(
+    bottom_line="Solid.", financial_picture="Growing.", technical_picture="Uptrend.", news_and_sentiment="Upbeat.",
+    peer_comparison="Ahead.", synthesis="Buy.", risks=["Debt"], risk_level="Low", risk_level_reason="Net cash",
+)
+TAKE = StrategicTake(
+    recommendation="BUY", headline="Cheap.", whats_happening="Growth.", stance="bullish", reasons=["P/E 12"],
+    opportunity_or_risk="Upside.", base_case=Scenario(description="Up", price_target=110.0),
+    bull_case=Scenario(description="Way up", price_target=130.0), bear_case=Scenario(description="Down", price_target=80.0),
+    derailers=["Rates"], bottom_line="Buy it.", conviction=7, conviction_reason="Clear",
+)
+
+
+class Analysts:
+    """Stands in for the four specialist runs, recording how many overlap."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.running = 0
+        self.peak = 0
+        self.prompts = {}
+
+    async def _run(self, label, prompt):
+        self.prompts[label] = prompt
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.02)
+        finally:
+            self.running -= 1
+
+    async def run_analyst(self, agent, prompt, max_turns, agent_label, analysis_label, session_id=None, deadline=None):
+        await self._run(agent_label, prompt)
+        if agent_label in self.failing:
+            return f"{analysis_label} unavailable due to error: boom"
+        return f"{agent_label} says fine"
+
+    async def run_news_analyst(self, news_agent, news_prompt, full_symbol, news_servers, session_id=None, deadline=None):
+        await self._run("News Analyst", news_prompt)
+        return NewsAnalysis(analysis="News Analyst says fine", articles=[])
+
+    async def run_streamed(self, agent, prompt, max_turns, agent_label, stage, session_id=None, symbol=None, budget=None):
+        return SimpleNamespace(final_output=REPORT if stage == "report" else TAKE)
+
+
+def make_system(concurrent_analysts=True):
+    return EquityResearchSystem(
+        job_store=MemoryJobStore(),
+        concurrent_analysts=concurrent_analysts,
+        use_tool_cache=False,
+        use_report_cache=False,
+        use_price_store=False,
+        use_ticker_universe=False,
+        server_factory=lambda kind, params: None,
+    )
+
+
+def use_analysts(monkeypatch, system, analysts):
+    monkeypatch.setattr(system, "_run_analyst", analysts.run_analyst)
+    monkeypatch.setattr(system, "_run_news_analyst", analysts.run_news_analyst)
+    monkeypatch.setattr(system, "_run_streamed", analysts.run_streamed)
+
+
+def research(system, session_id=None, checkpoints=None):
+    return asyncio.run(system._research_stock_pipeline("AAPL", "US", object(), object(), session_id, checkpoints))
+
+
+def test_the_four_analysts_run_at_once(monkeypatch):
+    system, analysts = make_system(), Analysts()
+    use_analysts(monkeypatch, system, analysts)
+
+    bundle = research(system)
+
+    assert analysts.peak == 4
+    assert bundle["analyses"]["financial"] == "Financial Analyst says fine"
+    assert bundle["analyses"]["comparative"] == "Risk Analyst says fine"
+    assert bundle["analyses"]["news"] == "News Analyst says fine"
+    assert "Stock symbol: AAPL" in analysts.prompts["Technical Analyst"]
+    assert bundle["recommendation"]["recommendation"] == "BUY"
+
+
+def test_analysts_run_one_at_a_time_when_concurrency_is_off(monkeypatch):
+    system, analysts = make_system(concurrent_analysts=False), Analysts()
+    use_analysts(monkeypatch, system, analysts)
+
+    research(system)
+
+    assert analysts.peak == 1
+    assert len(analysts.prompts) == 4
+
+
+def test_only_successful_analysts_are_checkpointed(monkeypatch):
+    system, analysts = make_system(), Analysts(failing={"Technical Analyst"})
+    use_analysts(monkeypatch, system, analysts)
+    system.job_store.create_job("stock-1", "user-1", "stock")
+
+    bundle = research(system, "stock-1")
+
+    assert "unavailable due to error" in bundle["analyses"]["technical"]
+    checkpoints = system.job_store.load_checkpoints("stock-1")
+    assert {"AAPL:financial", "AAPL:news", "AAPL:comparative", "AAPL:report"} <= set(checkpoints)
+    assert "AAPL:technical" not in checkpoints
+
+    # A resumed run only redoes the failed analyst
+    resumed = Analysts()
+    use_analysts(monkeypatch, system, resumed)
+    bundle = research(system, "stock-1", checkpoints)
+    assert list(resumed.prompts) == ["Technical Analyst"]
+    assert bundle["analyses"]["technical"] == "Technical Analyst says fine"
+
+
+def test_cancelling_the_gather_cancels_every_analyst():
+    started, cancelled = [], []
+
+    async def analyst(name):
+        started.append(name)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+
+    async def run():
+        gather = asyncio.create_task(EquityResearchSystem._gather_tasks([analyst(i) for i in range(4)]))
+        while len(started) < 4:
+            await asyncio.sleep(0)
+        gather.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await gather
+
+    asyncio.run(run())
+    assert sorted(cancelled) == [0, 1, 2, 3]
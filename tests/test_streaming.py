@@ -0,0 +1,111 @@
+from streaming import PartialOutputStream, render_partial
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Client:
+    """Applies published partial events the way a progress client would."""
+
+    def __init__(self):
+        self.text = ""
+        self.events = []
+
+    def publish(self, delta, offset, reset):
+        self.events.append((delta, offset, reset))
+        if reset:
+            self.text = delta
+        else:
+            assert offset == len(self.text)
+            self.text += delta
+
+
+def stream(structured=False, min_chars=1000, min_interval=0.5):
+    clock, client = Clock(), Client()
+    output = PartialOutputStream(client.publish, structured, min_interval=min_interval, min_chars=min_chars, clock=clock)
+    return output, client, clock
+
+
+def test_render_partial_sections_in_written_order():
+    rendered = render_partial({
+        "bottom_line": "Buy it.",
+        "risks": ["Debt", {"name": "FX", "impact": None}],
+        "base_case": {"description": "Flat", "price_target": 100},
+        "notes": "",
+    })
+
+    assert rendered == (
+        "## Bottom line\nBuy it.\n\n"
+        "## Risks\n- Debt\n- Name: FX\n\n"
+        "## Base case\n- Description: Flat\n- Price target: 100"
+    )
+    assert render_partial(None) == ""
+    assert render_partial("plain") == "plain"
+
+
+def test_deltas_are_coalesced_until_the_interval_passes():
+    output, client, clock = stream()
+
+    assert not output.feed("Hello")
+    assert not output.feed(", world")
+    clock.now = 0.6
+    assert output.feed("!")
+
+    assert client.events == [("Hello, world!", 0, True)]
+
+
+def test_a_burst_of_text_flushes_before_the_interval():
+    output, client, clock = stream(min_chars=10)
+
+    assert not output.feed("12345")
+    assert output.feed("67890")
+    assert output.feed("abcdefghij")
+
+    # Later flushes only send the new tail, at the offset the client has reached
+    assert client.events == [("1234567890", 0, True), ("abcdefghij", 10, False)]
+    assert client.text == output.text == "1234567890abcdefghij"
+
+
+def test_structured_output_is_rendered_from_partial_json():
+    output, client, clock = stream(structured=True, min_chars=1)
+
+    output.feed('{"bottom_line": "Cheap')
+    assert client.text == "## Bottom line\nCheap"
+    output.feed(' and growing", "risks": ["Deb')
+    assert client.text == "## Bottom line\nCheap and growing\n\n## Risks\n- Deb"
+    assert client.events[-1][2] is False
+
+    # A half-written key renders nothing new, so nothing is published
+    output.feed('t"]')
+    assert not output.feed(', "ba')
+    output.feed('se_case": {"description": "Flat"}}')
+    assert client.text.endswith("## Risks\n- Debt\n\n## Base case\n- Description: Flat")
+
+
+def test_a_changed_preview_resets_the_client():
+    output, client, clock = stream(structured=True, min_chars=1)
+
+    output.feed('{"summary": "ok", "price_target": 1')
+    # "1." doesn't parse as a number yet, so the field drops out of the preview
+    output.feed('.')
+    assert client.events[-1] == ("## Summary\nok", 0, True)
+    output.feed('5}')
+
+    assert client.text == output.text == "## Summary\nok\n\n## Price target\n1.5"
+    assert client.events[-1][2] is False
+    assert output.flushes == len(client.events) == 3
+
+
+def test_flush_without_new_text_publishes_nothing():
+    output, client, clock = stream()
+    output.feed("done")
+
+    assert output.flush()
+    assert not output.flush()
+    assert not output.feed("")
+    assert client.events == [("done", 0, True)]
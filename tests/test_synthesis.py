@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+import synthesis
+from synthesis import _flatten, build_company_digest, estimate_tokens, run_usage, trim_to_tokens
+
+LONG_SECTION = " ".join(f"Sentence number {i} explains one more detail of the business." for i in range(200))
+
+
+def bundle():
+    return {
+        "full_report": LONG_SECTION * 3,
+        "recommendation": {
+            "recommendation": "BUY",
+            "conviction": 8,
+            "headline": "Cheap for its growth",
+            "base_case": {"price_target": 120.0},
+            "bull_case": {"price_target": 150.0},
+            "bear_case": {"price_target": None},
+            "derailers": ["Rates", "Competition", "FX", "Regulation"],
+        },
+        "sections": {
+            "executive_summary": "A quality compounder on sale.",
+            "synthesis": LONG_SECTION,
+            "fundamental": LONG_SECTION,
+            "comparison": LONG_SECTION,
+            "risk": "- Debt\n- FX",
+        },
+        "metadata": {"technical_facts": {
+            "last_close": 101.5,
+            "returns_pct": {"1M": 2.5, "6M": -4.0, "1Y": None},
+            "rsi_14": 55.1,
+            "volatility_1y_pct": 24.3,
+            "pct_below_52w_high": -8.2,
+        }},
+    }
+
+
+def test_character_estimate_without_tiktoken(monkeypatch):
+    monkeypatch.setattr(synthesis, "_ENCODING", None)
+
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+    assert trim_to_tokens("First sentence here. Second one is longer.", 7) == "First sentence here. …"
+    assert trim_to_tokens("x" * 40, 5) == "x" * 20 + " …"
+
+
+def test_trim_keeps_short_text_and_respects_the_budget():
+    assert trim_to_tokens("  Short.  ", 50) == "Short."
+    assert trim_to_tokens("Anything", 0) == ""
+
+    trimmed = trim_to_tokens(LONG_SECTION, 60)
+    assert trimmed.endswith("business. …")
+    assert estimate_tokens(trimmed) <= 62
+
+
+def test_flatten_joins_markdown_lines_into_prose():
+    text = "**Revenue** grew 12%\n\n- Margins widened\n* Cash: strong\nDebt fell."
+    assert _flatten(text) == "Revenue grew 12%; Margins widened; Cash: strong; Debt fell."
+
+
+def test_digest_keeps_the_header_and_fits_the_budget():
+    digest = build_company_digest("AAA", bundle(), max_tokens=400, screen_row={"rank": 1, "score": 1.23, "earnings_yield": 0.05})
+    text = digest["text"]
+
+    assert text.startswith("### AAA\n- Call: BUY (conviction 8/10) - Cheap for its growth")
+    assert "- 6-12M targets: base 120.00, bull 150.00, bear n/a" in text
+    assert "- Could derail: Rates; Competition; FX\n" in text
+    assert "- Price: 101.50; 1M +2.5%, 6M -4.0%, 1Y n/a; RSI14 55.1" in text
+    assert "- Screen: rank 1, score 1.23; earnings yield +5.0%" in text
+    # Every excerpt gets a share of what's left after the header
+    for label in ("Why buy / why avoid", "Financials", "Vs peers", "Risks"):
+        assert f"\n- {label}: " in text
+    assert digest["tokens"] <= 400 + 5
+    assert digest["source_tokens"] == estimate_tokens(LONG_SECTION * 3)
+
+
+def test_a_larger_budget_gives_longer_excerpts():
+    small = build_company_digest("AAA", bundle(), max_tokens=300)
+    large = build_company_digest("AAA", bundle(), max_tokens=1200)
+
+    assert small["tokens"] < large["tokens"] <= 1200 + 5
+
+
+def test_digest_of_a_failed_or_unstructured_report():
+    failed = build_company_digest("BBB", {"full_report": "", "metadata": {"error": "timeout"}}, max_tokens=200)
+    assert failed["text"] == "### BBB\n- Research failed: timeout"
+
+    legacy = build_company_digest("CCC", "- Old style\nPlain markdown report.", max_tokens=200)
+    assert legacy["text"] == "### CCC\n- Report: Old style; Plain markdown report."
+
+
+def test_run_usage_reads_the_sdk_usage():
+    usage = SimpleNamespace(requests=2, input_tokens=100, output_tokens=40, total_tokens=140)
+    result = SimpleNamespace(context_wrapper=SimpleNamespace(usage=usage))
+
+    assert run_usage(result) == {"requests": 2, "input_tokens": 100, "output_tokens": 40, "total_tokens": 140}
+    assert run_usage(SimpleNamespace(context_wrapper=SimpleNamespace(usage=SimpleNamespace(requests=0)))) == {}
+    assert run_usage(object()) == {}
@@ -0,0 +1,100 @@
+import pytest
+
+from ticker_universe import Listing, TickerUniverse, _market_cap, load_ticker_universe
+
+SNAPSHOT = """Ticker,Company Name,Exchange,Sector,Industry,Market Cap
+AAPL,Apple Inc.,NASDAQ,Technology,Consumer Electronics,3.4T
+MSFT,Microsoft Corporation,NASDAQ,Technology,Software - Infrastructure,"3,100,000,000,000"
+XOM,Exxon Mobil Corporation,NYSE,Energy,Oil & Gas Integrated,480B
+NEE,NextEra Energy Inc.,NYSE,Utilities,Utilities - Regulated Electric,150B
+TEVA,Teva Pharmaceutical Industries,NYSE,Healthcare,Drug Manufacturers - Specialty & Generic,20B
+JPM,JPMorgan Chase & Co.,NYSE,Financial Services,Banks - Diversified,600B
+FITB,Fifth Third Bancorp,NASDAQ,Financial Services,Banks - Regional,25B
+RELIANCE.NS,Reliance Industries,,Energy,Oil & Gas Refining & Marketing,20T
+RELIANCE.BO,Reliance Industries,,Energy,Oil & Gas Refining & Marketing,20T
+,Missing Symbol,NYSE,Energy,,1B
+"""
+
+
+@pytest.fixture
+def universe(tmp_path):
+    path = tmp_path / "universe.csv"
+    path.write_text(SNAPSHOT)
+    return TickerUniverse.from_csv(str(path))
+
+
+def symbols(listings):
+    return [listing.symbol for listing in listings]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2.9T", 2.9e12),
+    ("850B", 850e9),
+    ("$1,234,567", 1234567.0),
+    ("", 0.0),
+    ("n/a", 0.0),
+])
+def test_market_cap_parsing(text, expected):
+    assert _market_cap(text) == pytest.approx(expected)
+
+
+def test_csv_columns_and_suffixes(universe):
+    # The row without a symbol is skipped
+    assert len(universe) == 9
+    reliance = universe.get("RELIANCE.NS", "NSE")
+    assert reliance.exchange == "NSE"
+    assert reliance.market_cap == pytest.approx(20e12)
+    assert universe.get("RELIANCE", "BSE").exchange == "BSE"
+
+
+def test_csv_without_a_symbol_column(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("Name,Sector\nApple,Technology\n")
+    with pytest.raises(ValueError):
+        TickerUniverse.from_csv(str(path))
+    assert load_ticker_universe(str(path)) is None
+
+
+def test_get_and_markets(universe):
+    assert universe.get("aapl").name == "Apple Inc."
+    assert universe.get("AAPL", "NSE") is None
+    # "INDIA" requests are served from NSE
+    assert universe.get("RELIANCE", "INDIA").exchange == "NSE"
+    assert universe.covers_market("US")
+    assert universe.covers_market("INDIA")
+    assert not universe.covers_market("LSE")
+
+
+def test_search_exact_prefix_and_fuzzy(universe):
+    assert symbols(universe.search("msft")) == ["MSFT"]
+    # Symbol and name-word prefixes, largest first
+    assert symbols(universe.search("ne", "US")) == ["NEE"]
+    assert symbols(universe.search("exxon")) == ["XOM"]
+    # A misspelt name still finds every listing of it
+    assert sorted(listing.exchange for listing in universe.search("relience industries")) == ["BSE", "NSE"]
+    assert universe.search("") == []
+
+
+def test_top_by_market_cap_exact_label(universe):
+    assert symbols(universe.top_by_market_cap("Technology")) == ["AAPL", "MSFT"]
+    assert symbols(universe.top_by_market_cap("technology", limit=1)) == ["AAPL"]
+    assert symbols(universe.top_by_market_cap("Energy", "NSE")) == ["RELIANCE"]
+
+
+def test_top_by_market_cap_falls_back_to_word_prefixes(universe):
+    assert symbols(universe.top_by_market_cap("banking")) == ["JPM", "FITB"]
+    assert symbols(universe.top_by_market_cap("regional banks")) == ["FITB"]
+    assert symbols(universe.top_by_market_cap("oil gas", "NSE")) == ["RELIANCE"]
+
+
+def test_fallback_does_not_match_inside_words(universe):
+    # "ener" sits inside "Generic" but starts no word of it
+    assert "TEVA" not in symbols(universe.top_by_market_cap("energies"))
+    assert symbols(universe.top_by_market_cap("energies")) == ["XOM"]
+    assert universe.top_by_market_cap("nuclear") == []
+
+
+def test_listing_market_maps_venues():
+    listing = Listing("X", "X Corp", "NASDAQGS", "Technology", "Software", 1.0)
+    assert listing.market == "US"
+    assert Listing("X", "X Corp", "LSE", "", "", 0.0).market == "LSE"
@@ -0,0 +1,257 @@
+import asyncio
+
+import pytest
+
+import tool_cache
+from tool_cache import CachedMCPServer, MINUTE, DAY, ToolResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "monotonic", clock)
+    return clock
+
+
+class Result:
+    def __init__(self, content, is_error=False):
+        self.content = content
+        self.is_error = is_error
+
+    def __repr__(self):
+        return f"Result({self.content!r})"
+
+
+class FakeServer:
+    """Counts calls; the first `failures` calls raise, later ones answer after `delay`."""
+
+    name = "fake"
+
+    def __init__(self, delay=0.05, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+
+    async def call_tool(self, tool_name, arguments=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError("upstream unavailable")
+        return Result(f"{tool_name}:{arguments}")
+
+
+def test_ttl_rules_match_tool_names():
+    cache = ToolResultCache()
+    assert cache.ttl_for("get_income_statement") == DAY
+    assert cache.ttl_for("get_current_stock_price") == MINUTE
+    assert cache.ttl_for("something_else") == cache.default_ttl
+
+
+def test_hit_until_the_ttl_expires(clock):
+    cache = ToolResultCache()
+    cache.put("get_current_stock_price", {"symbol": "AAPL"}, "190.00")
+
+    clock.now += MINUTE - 1
+    assert cache.get("get_current_stock_price", {"symbol": "AAPL"}) == "190.00"
+
+    clock.now += 2
+    assert cache.get("get_current_stock_price", {"symbol": "AAPL"}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_keys_ignore_argument_order():
+    cache = ToolResultCache()
+    cache.put("get_historical_stock_prices", {"symbol": "AAPL", "period": "1y"}, "bars")
+    assert cache.get("get_historical_stock_prices", {"period": "1y", "symbol": "AAPL"}) == "bars"
+    assert cache.get("get_historical_stock_prices", {"symbol": "MSFT", "period": "1y"}) is None
+
+
+def test_lru_eviction_by_size():
+    value = "x" * 100
+    entry_size = len(repr(value))
+    cache = ToolResultCache(max_bytes=entry_size * 2)
+    cache.put("search", {"q": "a"}, value)
+    cache.put("search", {"q": "b"}, value)
+    # Touching "a" makes "b" the least recently used
+    assert cache.get("search", {"q": "a"}) == value
+
+    cache.put("search", {"q": "c"}, value)
+    assert cache.get("search", {"q": "b"}) is None
+    assert cache.get("search", {"q": "a"}) == value
+    assert cache.get("search", {"q": "c"}) == value
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversized_results_are_not_cached():
+    cache = ToolResultCache(max_bytes=10)
+    cache.put("search", {"q": "a"}, "x" * 100)
+    assert cache.stats()["entries"] == 0
+
+
+def test_claim_and_settle():
+    cache = ToolResultCache()
+    future, owner = cache.claim("search", {"q": "a"})
+    waiter_future, waiter_owner = cache.claim("search", {"q": "a"})
+
+    assert owner is True
+    assert waiter_owner is False
+    assert waiter_future is future
+    assert cache.stats()["in_flight"] == 1
+
+    cache.settle("search", {"q": "a"}, future, "result")
+    assert future.result(timeout=0) == "result"
+    assert cache.stats()["in_flight"] == 0
+    # The next miss starts a new claim
+    assert cache.claim("search", {"q": "a"})[1] is True
+
+
+def test_settle_with_an_error():
+    cache = ToolResultCache()
+    future, _ = cache.claim("search", {"q": "a"})
+    cache.settle("search", {"q": "a"}, future, error=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        future.result(timeout=0)
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_stats_count_coalesced_lookups_as_saved():
+    cache = ToolResultCache()
+    cache.put("search", {"q": "a"}, "cached")
+    cache.get("search", {"q": "a"})
+    for _ in range(3):
+        cache.get("search", {"q": "b"})
+        cache.claim("search", {"q": "b"})
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["coalesced"] == 2
+    assert stats["hit_rate"] == 0.25
+    assert stats["effective_hit_rate"] == 0.75
+    assert stats["per_tool"]["search"] == {"hits": 1, "misses": 3, "coalesced": 2}
+
+
+def test_cached_server_answers_repeats_from_the_cache():
+    server = FakeServer()
+    cached = CachedMCPServer(server, ToolResultCache())
+
+    async def run():
+        first = await cached.call_tool("search", {"q": "a"})
+        second = await cached.call_tool("search", {"q": "a"})
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert server.calls == 1
+
+
+def test_cached_server_never_caches_error_results():
+    class ErrorServer(FakeServer):
+        async def call_tool(self, tool_name, arguments=None):
+            self.calls += 1
+            return Result("rate limited", is_error=True)
+
+    server = ErrorServer()
+    cached = CachedMCPServer(server, ToolResultCache())
+
+    async def run():
+        await cached.call_tool("search", {"q": "a"})
+        await cached.call_tool("search", {"q": "a"})
+
+    asyncio.run(run())
+    assert server.calls == 2
+
+
+def test_concurrent_misses_share_one_call():
+    server = FakeServer()
+    cache = ToolResultCache()
+    cached = CachedMCPServer(server, cache)
+
+    async def run():
+        return await asyncio.gather(*(cached.call_tool("search", {"q": "a"}) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert server.calls == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_a_failed_shared_call_is_retried_once():
+    server = FakeServer(failures=1)
+    cached = CachedMCPServer(server, ToolResultCache())
+
+    async def run():
+        return await asyncio.gather(
+            *(cached.call_tool("search", {"q": "a"}) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert server.calls == 2
+    assert isinstance(results[0], RuntimeError)
+    assert all(isinstance(result, Result) for result in results[1:])
+
+
+def test_a_second_failure_is_passed_to_every_waiter():
+    server = FakeServer(failures=10)
+    cached = CachedMCPServer(server, ToolResultCache())
+
+    async def run():
+        return await asyncio.gather(
+            *(cached.call_tool("search", {"q": "a"}) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert server.calls == 2
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_waiters_survive_the_owner_being_cancelled():
+    server = FakeServer(delay=0.2)
+    cached = CachedMCPServer(server, ToolResultCache())
+
+    async def run():
+        owner = asyncio.create_task(cached.call_tool("search", {"q": "a"}))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cached.call_tool("search", {"q": "a"})) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, Result) for result in results)
+    # The cancelled call plus one retry for all the waiters
+    assert server.calls == 2
+
+
+def test_waiters_share_one_retry_after_the_shared_call_fails():
+    server = FakeServer(failures=1)
+    cache = ToolResultCache()
+    cached = CachedMCPServer(server, cache)
+
+    async def run():
+        owner = asyncio.create_task(cached.call_tool("search", {"q": "a"}))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cached.call_tool("search", {"q": "a"})) for _ in range(3)]
+        with pytest.raises(RuntimeError):
+            await owner
+        results = await asyncio.gather(*waiters)
+        # The retry's result is cached for everyone after
+        later = await cached.call_tool("search", {"q": "a"})
+        return results, later
+
+    results, later = asyncio.run(run())
+    assert server.calls == 2
+    assert all(result is results[0] for result in results)
+    assert later is results[0]
+    # Three waiters on the first call, then two of them on the retry
+    assert cache.stats()["coalesced"] == 5
+    assert cache.stats()["in_flight"] == 0
@@ -0,0 +1,261 @@
+from bisect import bisect_left
+from itertools import islice
+from dataclasses import dataclass
+import csv
+import difflib
+import os
+import re
+
+# Request exchange -> listing venues (as written in the snapshot) it covers;
+# "INDIA" requests are served from NSE (see TickerUniverse._markets)
+MARKET_VENUES = {
+    "US": {"US", "NYSE", "NASDAQ", "NASDAQGS", "NASDAQGM", "NASDAQCM", "AMEX", "NYSEAMERICAN", "NYSEARCA", "BATS"},
+    "NSE": {"NSE", "NSI"},
+    "BSE": {"BSE", "BOM"},
+}
+
+# Yahoo Finance suffixes stripped from snapshot symbols (research adds them back)
+_SYMBOL_SUFFIXES = (".NS", ".BO")
+
+# Accepted spellings for each snapshot column (headers are lower-cased, spaces as "_")
+_COLUMNS = {
+    "symbol": ("symbol", "ticker"),
+    "name": ("name", "company", "company_name", "companyname"),
+    "exchange": ("exchange", "market", "venue"),
+    "sector": ("sector",),
+    "industry": ("industry",),
+    "market_cap": ("market_cap", "marketcap", "mktcap"),
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class Listing:
+    symbol: str
+    name: str
+    exchange: str
+    sector: str
+    industry: str
+    market_cap: float
+
+    @property
+    def market(self) -> str:
+        """The request exchange ("US", "NSE", "BSE") this listing belongs to."""
+        for market, venues in MARKET_VENUES.items():
+            if self.exchange in venues:
+                return market
+        return self.exchange
+
+    def to_dict(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "name": self.name,
+            "exchange": self.exchange,
+            "sector": self.sector,
+            "industry": self.industry,
+            "market_cap": self.market_cap,
+        }
+
+
+def _venue(exchange: str) -> str:
+    return re.sub(r"[^A-Z]", "", (exchange or "").upper())
+
+
+def _words(text: str) -> list:
+    return _WORD.findall((text or "").lower())
+
+
+def _market_cap(text: str) -> float:
+    """Parse "2.9T", "850B", "1,234,567" style market caps; 0 when unknown."""
+    text = (text or "").strip().replace(",", "").replace("$", "").upper()
+    if not text:
+        return 0.0
+    scale = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}.get(text[-1])
+    try:
+        return float(text[:-1]) * scale if scale else float(text)
+    except ValueError:
+        return 0.0
+
+
+class TickerUniverse:
+    """
+    Offline index of listed symbols loaded from a CSV snapshot.
+
+    The snapshot needs symbol, name, exchange, sector, industry and
+    market_cap columns. Listings are indexed by symbol, by sorted symbol and
+    name-word keys for prefix lookups, and by market then sector with each
+    bucket pre-sorted by market cap. Sector discovery and symbol validation
+    are then dictionary and bisect lookups instead of web searches.
+    """
+
+    def __init__(self, listings=()):
+        self._by_key = {}
+        self._prefix_keys = []
+        self._sectors = {}
+        self._names = {}
+        self._listed_markets = set()
+        for listing in listings:
+            self._by_key[(listing.symbol, listing.market)] = listing
+        self._build_indexes()
+
+    @classmethod
+    def from_csv(cls, path: str) -> "TickerUniverse":
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            reader = csv.DictReader(handle)
+            columns = {}
+            for field in reader.fieldnames or []:
+                for column, spellings in _COLUMNS.items():
+                    if re.sub(r"\s+", "_", field.strip().lower()) in spellings:
+                        columns.setdefault(column, field)
+            if "symbol" not in columns:
+                raise ValueError(f"Ticker universe {path} has no symbol/ticker column")
+
+            listings = []
+            for row in reader:
+                def value(column):
+                    return (row.get(columns[column]) or "").strip() if column in columns else ""
+
+                symbol = value("symbol").upper()
+                if not symbol:
+                    continue
+                exchange = _venue(value("exchange")) or "US"
+                for suffix in _SYMBOL_SUFFIXES:
+                    if symbol.endswith(suffix):
+                        symbol = symbol[:-len(suffix)]
+                        if not value("exchange"):
+                            exchange = "NSE" if suffix == ".NS" else "BSE"
+                listings.append(Listing(
+                    symbol=symbol,
+                    name=value("name"),
+                    exchange=exchange,
+                    sector=value("sector"),
+                    industry=value("industry"),
+                    market_cap=_market_cap(value("market_cap")),
+                ))
+        return cls(listings)
+
+    def _build_indexes(self):
+        prefix_keys = []
+        sectors = {}
+        for key, listing in self._by_key.items():
+            self._listed_markets.add(listing.market)
+            prefix_keys.append((listing.symbol.lower(), 0, key))
+            for word in _words(listing.name):
+                prefix_keys.append((word, 1, key))
+            # One name can be listed on several venues (NSE and BSE, dual share classes)
+            self._names.setdefault(listing.name.lower(), []).append(key)
+            for label in {listing.sector.lower(), listing.industry.lower()} - {""}:
+                sectors.setdefault((listing.market, label), []).append(listing)
+        self._prefix_keys = sorted(prefix_keys)
+        # Largest companies first, so "top N in sector" is a slice
+        self._sectors = {
+            key: sorted(bucket, key=lambda listing: (-listing.market_cap, listing.symbol))
+            for key, bucket in sectors.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    @staticmethod
+    def _markets(exchange: str) -> list:
+        exchange = (exchange or "US").upper()
+        return ["NSE"] if exchange == "INDIA" else [exchange]
+
+    def covers_market(self, exchange: str) -> bool:
+        """True when the snapshot lists any symbols for this request exchange."""
+        return any(market in self._listed_markets for market in self._markets(exchange))
+
+    def get(self, symbol: str, exchange: str = "US"):
+        symbol = (symbol or "").strip().upper()
+        for suffix in _SYMBOL_SUFFIXES:
+            if symbol.endswith(suffix):
+                symbol = symbol[:-len(suffix)]
+        for market in self._markets(exchange):
+            listing = self._by_key.get((symbol, market))
+            if listing is not None:
+                return listing
+        return None
+
+    def search(self, query: str, exchange: str = None, limit: int = 10) -> list:
+        """
+        Listings matching `query`: exact symbol first, then symbol and
+        name-word prefixes (largest first), then fuzzy name matches.
+        """
+        query = (query or "").strip().lower()
+        if not query:
+            return []
+        markets = set(self._markets(exchange)) if exchange else None
+
+        def wanted(key):
+            return markets is None or key[1] in markets
+
+        found = []
+        seen = set()
+
+        def add(key):
+            if key not in seen and wanted(key):
+                seen.add(key)
+                found.append(self._by_key[key])
+
+        for market in sorted(markets or self._listed_markets):
+            if (query.upper(), market) in self._by_key:
+                add((query.upper(), market))
+
+        # Every key sharing the prefix sits in one contiguous run of the sorted list
+        first_word = _words(query)[0] if _words(query) else query
+        prefixed = []
+        start = bisect_left(self._prefix_keys, (first_word,))
+        for token, kind, key in islice(self._prefix_keys, start, None):
+            if not token.startswith(first_word):
+                break
+            if kind == 0 or query in self._by_key[key].name.lower():
+                prefixed.append(key)
+        for key in sorted(set(prefixed), key=lambda key: -self._by_key[key].market_cap):
+            add(key)
+
+        if len(found) < limit:
+            for name in difflib.get_close_matches(query, self._names, n=limit, cutoff=0.75):
+                for key in sorted(self._names[name], key=lambda key: -self._by_key[key].market_cap):
+                    add(key)
+        return found[:limit]
+
+    def top_by_market_cap(self, sector: str, exchange: str = "US", limit: int = 10) -> list:
+        """
+        The largest listings whose sector or industry matches `sector` on the
+        given exchange. Falls back to labels with a word starting like every
+        word of the query (e.g. "banking" -> "Banks - Regional") when there's
+        no exact match.
+        """
+        label = (sector or "").strip().lower()
+        markets = self._markets(exchange)
+        matches = []
+        for market in markets:
+            matches.extend(self._sectors.get((market, label), []))
+        if not matches:
+            stems = [word[:4] for word in _words(label)]
+            for (market, key_label), bucket in self._sectors.items():
+                if market not in markets or not stems:
+                    continue
+                # Stems match the start of a label word, so "energy" doesn't hit "Generic"
+                label_words = _words(key_label)
+                if all(any(word.startswith(stem) for word in label_words) for stem in stems):
+                    matches.extend(bucket)
+
+        unique = {(listing.symbol, listing.market): listing for listing in matches}
+        ranked = sorted(unique.values(), key=lambda listing: (-listing.market_cap, listing.symbol))
+        return ranked[:limit]
+
+
+def load_ticker_universe(path: str = None):
+    """Load the snapshot at `path` (or TICKER_UNIVERSE_CSV); None when unset or unreadable."""
+    path = path or os.getenv("TICKER_UNIVERSE_CSV")
+    if not path:
+        return None
+    try:
+        universe = TickerUniverse.from_csv(path)
+    except (OSError, ValueError) as e:
+        print(f"[TICKER_UNIVERSE] Could not load {path}: {e}")
+        return None
+    print(f"[TICKER_UNIVERSE] Loaded {len(universe)} listings from {path}")
+    return universe
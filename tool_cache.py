@@ -0,0 +1,246 @@
+from agents.mcp import MCPServer
+from collections import OrderedDict
+from concurrent.futures import Future
+import asyncio
+import json
+import threading
+import time
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# First matching substring of the tool name wins. Quotes move every tick,
+# statements change once a quarter at most.
+DEFAULT_TTL_RULES = [
+    ("income_statement", DAY),
+    ("cashflow", DAY),
+    ("balance", DAY),
+    ("company_overview", DAY),
+    ("dividends", DAY),
+    ("stock_splits", DAY),
+    ("capital_gains", DAY),
+    ("price_by_date", DAY),
+    ("earning", 6 * HOUR),
+    ("recommendations", 6 * HOUR),
+    ("historical", 15 * MINUTE),
+    ("date_range", 15 * MINUTE),
+    ("performance", 15 * MINUTE),
+    ("news", 10 * MINUTE),
+    ("search", 10 * MINUTE),
+    ("option", 5 * MINUTE),
+    ("quote", MINUTE),
+    ("current", MINUTE),
+    ("comparison", MINUTE),
+]
+
+
+class ToolResultCache:
+    """
+    Thread-safe LRU cache of MCP tool results with per-tool TTLs.
+
+    Entries are keyed on tool name plus canonical JSON arguments, so the same
+    quote fetched by the Financial, Technical and Comparative analysts (or by
+    several companies in a sector run) only hits the MCP server once.
+
+    Misses are shared too: while one caller fetches a key (see claim()),
+    others asking for it wait for that result instead of calling the server
+    in parallel. The pending results are thread-safe futures, so callers on
+    different event loops share them as well.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_rules: list = None, default_ttl: float = 5 * MINUTE):
+        self.max_bytes = max_bytes
+        self.ttl_rules = ttl_rules if ttl_rules is not None else DEFAULT_TTL_RULES
+        self.default_ttl = default_ttl
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._coalesced = 0
+        self._per_tool = {}
+        # key -> Future for fetches in progress
+        self._inflight = {}
+
+    def ttl_for(self, tool_name: str) -> float:
+        name = tool_name.lower()
+        for pattern, ttl in self.ttl_rules:
+            if pattern in name:
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict = None) -> str:
+        return tool_name + ":" + json.dumps(arguments or {}, sort_keys=True, default=str)
+
+    @staticmethod
+    def _estimate_size(result) -> int:
+        if hasattr(result, "model_dump_json"):
+            try:
+                return len(result.model_dump_json())
+            except Exception:
+                pass
+        return len(repr(result))
+
+    def _count(self, tool_name: str, hit: bool):
+        counters = self._per_tool.setdefault(tool_name, {"hits": 0, "misses": 0, "coalesced": 0})
+        if hit:
+            self._hits += 1
+            counters["hits"] += 1
+        else:
+            self._misses += 1
+            counters["misses"] += 1
+
+    def get(self, tool_name: str, arguments: dict = None):
+        """Return the cached result, or None on a miss or expired entry."""
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, result = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._count(tool_name, hit=True)
+                    return result
+                del self._entries[key]
+                self._bytes -= size
+            self._count(tool_name, hit=False)
+            return None
+
+    def claim(self, tool_name: str, arguments: dict = None) -> tuple:
+        """
+        After a miss: return (future, owner). The owner makes the call and must
+        settle() the future; everyone else awaits the owner's result.
+        """
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                self._per_tool.setdefault(tool_name, {"hits": 0, "misses": 0, "coalesced": 0})["coalesced"] += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def settle(self, tool_name: str, arguments: dict, future: Future, result=None, error: BaseException = None):
+        """Hand a claimed call's result (or the exception it failed with) to the callers waiting on it."""
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def put(self, tool_name: str, arguments: dict, result):
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return
+        size = self._estimate_size(result)
+        if size > self.max_bytes:
+            return
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (time.monotonic() + ttl, size, result)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._inflight),
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                # Coalesced lookups count as misses above but never reached the server either
+                "effective_hit_rate": round((self._hits + self._coalesced) / lookups, 4) if lookups else 0.0,
+                "per_tool": {name: dict(counters) for name, counters in self._per_tool.items()},
+            }
+
+
+class CachedMCPServer(MCPServer):
+    """MCP server wrapper that answers repeated tool calls from a ToolResultCache."""
+
+    def __init__(self, server: MCPServer, cache: ToolResultCache):
+        super().__init__(use_structured_content=getattr(server, "use_structured_content", False))
+        self.server = server
+        self.cache = cache
+
+    @property
+    def name(self) -> str:
+        return self.server.name
+
+    async def connect(self):
+        await self.server.connect()
+
+    async def cleanup(self):
+        await self.server.cleanup()
+
+    async def list_tools(self, run_context=None, agent=None):
+        return await self.server.list_tools(run_context, agent)
+
+    async def call_tool(self, tool_name: str, arguments: dict = None, meta: dict = None):
+        cached = self.cache.get(tool_name, arguments)
+        if cached is not None:
+            return cached
+
+        future, owner = self.cache.claim(tool_name, arguments)
+        if not owner:
+            try:
+                return await self._wait(future)
+            except Exception:
+                # The first caller's attempt failed. One waiter claims the retry and the
+                # rest wait on it; a second failure is passed on rather than retried again
+                future, owner = self.cache.claim(tool_name, arguments)
+                if not owner:
+                    return await self._wait(future)
+
+        try:
+            result = await self._call(tool_name, arguments, meta)
+        except BaseException as e:
+            # A cancelled caller's waiters retry rather than being cancelled too
+            error = e if isinstance(e, Exception) else RuntimeError(f"{tool_name} call was cancelled")
+            self.cache.settle(tool_name, arguments, future, error=error)
+            raise
+        # Never cache failures; the next caller should get a fresh attempt
+        if not (getattr(result, "is_error", False) or getattr(result, "isError", False)):
+            self.cache.put(tool_name, arguments, result)
+        self.cache.settle(tool_name, arguments, future, result)
+        return result
+
+    @staticmethod
+    async def _wait(future: Future):
+        # Shielded so that one waiter giving up doesn't cancel the shared result
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def _call(self, tool_name: str, arguments: dict = None, meta: dict = None):
+        if meta is None:
+            return await self.server.call_tool(tool_name, arguments)
+        return await self.server.call_tool(tool_name, arguments, meta=meta)
+
+    async def list_prompts(self):
+        return await self.server.list_prompts()
+
+    async def get_prompt(self, name: str, arguments: dict = None):
+        return await self.server.get_prompt(name, arguments)